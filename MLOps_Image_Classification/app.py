@@ -4,11 +4,14 @@ Provides endpoints for prediction, model monitoring, retraining, and data upload
 Enhanced with security, logging, rate limiting, and persistence.
 """
 
-from flask import Flask, request, jsonify, render_template, send_from_directory
+from flask import Flask, request, jsonify, render_template, send_file, abort, g
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
+from functools import wraps
+import hmac
+import uuid
 import os
 import sys
 import numpy as np
@@ -26,12 +29,42 @@ from logging.handlers import RotatingFileHandler
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.preprocessing import DataPreprocessor
-from src.model import ImageClassificationModel, load_latest_model
+from src.model import ImageClassificationModel, load_latest_model, load_model_from_path
+from src.model_store import wait_for_pending_saves
 from src.prediction import ImagePredictor
+from src.prediction_store import PredictionStore, parse_time
+from src.rolling_stats import RollingStatistics, parse_window, DEFAULT_WINDOWS
+from src.drift import (
+    DriftMonitor, build_reference_profile, save_reference_profile, load_reference_profile
+)
+from src.cluster_stats import ClusterStatsPublisher, history_totals, load_snapshots, aggregate
+from src.admission import AdmissionController
+from src import metrics
+from src.profiling import RequestProfiler
+from src.shadow import ShadowEvaluator
+from src.response_cache import ResponseCache
+from src.event_stream import EventBroadcaster
+from src.static_assets import StaticAssetIndex
+from src.async_logging import AsyncLogging, HOT_PATH
+from src.tensor_input import parse_tensor, TensorPayloadError
+from src.training_shards import TrainingShards, resolve_label
+from src.inference_server import InferenceClient, RemoteModelClassifier, RemoteModel
+from src.graph_serving import GraphImageModel, warm_up as warm_up_graph_model
+from src.image_validation import (
+    ImageLimits, ImageRejected, validate_image_header, SIZE_REASONS
+)
+from src.response_format import (
+    parse_response_options, shape_prediction, shape_batch, encode_response
+)
+from src.checkpointing import (
+    TrainingCheckpointer, new_run_dir, find_resumable_run, find_completed_run, load_run_state,
+    garbage_collect_runs
+)
 from config import get_config, Config
+from tensorflow.keras.callbacks import LambdaCallback
 
-# Initialize Flask app
-app = Flask(__name__)
+# Initialize Flask app (static files are served by serve_static from the asset index)
+app = Flask(__name__, static_folder=None)
 
 # Load configuration
 config_obj = get_config()
@@ -69,17 +102,30 @@ def setup_logging():
     console_handler.setLevel(log_level)
     console_handler.setFormatter(log_format)
     
-    # Configure app logger
     app.logger.setLevel(log_level)
-    app.logger.addHandler(file_handler)
-    app.logger.addHandler(console_handler)
-    
-    # Configure werkzeug logger
     log = logging.getLogger('werkzeug')
     log.setLevel(logging.WARNING)
-    log.addHandler(file_handler)
+    
+    if not app.config['LOG_ASYNC']:
+        app.logger.addHandler(file_handler)
+        app.logger.addHandler(console_handler)
+        log.addHandler(file_handler)
+        return None
+    
+    # Request threads only enqueue; formatting, writing and rotation happen
+    # on the listener thread, and hot-path lines are sampled under load
+    pipeline = AsyncLogging(
+        [file_handler, console_handler],
+        queue_size=app.config['LOG_QUEUE_SIZE'],
+        sample_rate=app.config['LOG_SAMPLE_RATE'],
+        burst=app.config['LOG_HOT_PATH_BURST'],
+        summary_interval=app.config['LOG_SUMMARY_INTERVAL']
+    ).start()
+    pipeline.attach(app.logger)
+    pipeline.attach(log)
+    return pipeline
 
-setup_logging()
+log_pipeline = setup_logging()
 
 # Global variables
 model_classifier = None
@@ -88,6 +134,8 @@ preprocessor = None
 class_names = ['Airplane', 'Automobile', 'Bird', 'Cat', 'Deer', 
                'Dog', 'Frog', 'Horse', 'Ship', 'Truck']
 model_start_time = datetime.now()
+# Bumped whenever the served model or its metadata changes (cache key)
+model_generation = 0
 is_retraining = False
 retraining_status = {}
 
@@ -98,36 +146,351 @@ def allowed_file(filename):
            filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
 
+def upload_path(filename):
+    """Unique temporary path for an upload, so concurrent requests never share a file."""
+    return os.path.join(app.config['UPLOAD_FOLDER'], f"{uuid.uuid4().hex}_{filename}")
+
+
+def response_options():
+    """Shaping/encoding options of the current prediction request."""
+    return parse_response_options(
+        request.args,
+        accept=request.headers.get('Accept'),
+        accept_encoding=request.headers.get('Accept-Encoding'),
+        num_classes=len(class_names)
+    )
+
+
+def encoded_response(payload, options):
+    """Build a response in the negotiated encoding."""
+    body, headers = encode_response(
+        payload, options,
+        gzip_min_bytes=app.config['RESPONSE_GZIP_MIN_BYTES'],
+        gzip_level=app.config['RESPONSE_GZIP_LEVEL']
+    )
+    return app.response_class(body, headers=headers)
+
+
+# Memoized bodies of read-mostly endpoints, revalidated with ETags
+response_cache = ResponseCache(encode=app.json.dumps)
+
+
+def cached_json(name, key, build):
+    """
+    JSON response memoized per key, with an ETag; a matching If-None-Match
+    gets a 304 without the body being rebuilt or sent.
+    """
+    entry = response_cache.get(name, key, build)
+    response = app.response_class(entry.body, mimetype='application/json')
+    response.set_etag(entry.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
+# Indexed static files: content-hash ETags, fingerprinted URLs, thumbnails
+static_index = StaticAssetIndex(
+    app.config['STATIC_DIR'],
+    cache_dir=app.config['STATIC_CACHE_DIR'],
+    thumbnail_width=app.config['STATIC_THUMBNAIL_WIDTH'],
+    refresh_interval=app.config['STATIC_INDEX_REFRESH_SECONDS']
+)
+
+# Indexed prediction log; predictions are written in batches off the request thread
+prediction_store = PredictionStore(
+    app.config['PREDICTIONS_DB'],
+    batch_size=app.config['PREDICTION_STORE_BATCH_SIZE'],
+    flush_interval=app.config['PREDICTION_STORE_FLUSH_SECONDS']
+).start() if app.config['PREDICTION_STORE_ENABLED'] else None
+
+# Trailing-window counters; shared by successive predictors so a retrain keeps them
+rolling_stats = RollingStatistics(class_names)
+
+
+def _load_reference_profile():
+    try:
+        return load_reference_profile(app.config['REFERENCE_PROFILE_FILE'])
+    except Exception as e:
+        app.logger.warning(f"Could not load drift reference profile: {str(e)}")
+        return None
+
+
+# Live inputs and outputs compared against the training-set profile
+drift_monitor = DriftMonitor(
+    class_names,
+    reference=_load_reference_profile(),
+    half_life=app.config['DRIFT_HALF_LIFE'],
+    min_samples=app.config['DRIFT_MIN_SAMPLES']
+)
+
+
+# Uploaded training samples, packed and deduplicated (see src/training_shards.py)
+training_shards = TrainingShards(
+    app.config['TRAINING_SHARDS_DIR'],
+    class_names,
+    shard_size=app.config['TRAINING_SHARD_SIZE']
+)
+
+
+image_limits = ImageLimits(
+    max_dimension=app.config['IMAGE_MAX_DIMENSION'],
+    max_pixels=app.config['IMAGE_MAX_PIXELS'],
+    max_frames=app.config['IMAGE_MAX_FRAMES'],
+    downscale_pixels=app.config['IMAGE_DOWNSCALE_PIXELS']
+)
+
+
+REMOTE_MODEL_MESSAGE = ('The model lives in the inference server process (INFERENCE_MODE=remote); '
+                        'retrain with train_model_locally.py and restart serve.py')
+MULTI_WORKER_MESSAGE = ('Each serve.py worker holds its own model and retraining state; '
+                        'retrain with train_model_locally.py and restart serve.py, or run with SERVE_WORKERS=1')
+
+
+def model_update_conflict():
+    """Why this process may not retrain or evaluate its model, or None."""
+    if app.config['INFERENCE_MODE'] == 'remote':
+        return REMOTE_MODEL_MESSAGE
+    if app.config['SERVE_ACTIVE_WORKERS'] > 1:
+        return MULTI_WORKER_MESSAGE
+    return None
+
+
+def image_rejected_response(e):
+    """413 for images over the size limits, 400 for malformed ones."""
+    status = 413 if e.reason in SIZE_REASONS else 400
+    return jsonify({'error': str(e), 'reason': e.reason}), status
+
+
+def new_graph_model(model):
+    """In-graph decode backend for a model, or None (PREDICTION_BACKEND=pil or remote inference)."""
+    if app.config['PREDICTION_BACKEND'] != 'graph':
+        return None
+    if isinstance(model, RemoteModel):
+        app.logger.warning("PREDICTION_BACKEND=graph needs the model in this process; using PIL decoding")
+        return None
+    graph_model = GraphImageModel.from_keras(model, app.config['GRAPH_PARALLEL_ITERATIONS'])
+    warm_up_graph_model(graph_model)
+    return graph_model
+
+
+def new_predictor(model):
+    """ImagePredictor over the configured persistence."""
+    return ImagePredictor(
+        model,
+        class_names,
+        preprocessor,
+        persistence_file=app.config['PREDICTIONS_FILE'],
+        store=prediction_store,
+        history_load_limit=app.config['PREDICTION_HISTORY_LOAD_LIMIT'],
+        rolling_stats=rolling_stats,
+        drift_monitor=drift_monitor,
+        graph_model=new_graph_model(model)
+    )
+
+
+# Server-sent events: dashboard state computed once, pushed to every subscriber
+event_broadcaster = EventBroadcaster(
+    min_interval=app.config['SSE_MIN_INTERVAL_SECONDS'],
+    poll_interval=app.config['SSE_POLL_INTERVAL_SECONDS'],
+    max_subscribers=app.config['SSE_MAX_SUBSCRIBERS']
+)
+
+
+def _uptime_event():
+    uptime_seconds = (datetime.now() - model_start_time).total_seconds()
+    return {
+        'start_time': model_start_time.isoformat(),
+        'uptime_seconds': uptime_seconds,
+        'uptime_minutes': uptime_seconds / 60,
+        'uptime_hours': uptime_seconds / 3600
+    }
+
+
+# Uptime is pushed once a minute (the dashboard shows hours and minutes)
+event_broadcaster.add_topic(
+    'uptime', _uptime_event,
+    key_fn=lambda: int((datetime.now() - model_start_time).total_seconds() // 60)
+)
+event_broadcaster.add_topic(
+    'retrain', lambda: {'is_retraining': is_retraining, 'status': dict(retraining_status)}
+)
+event_broadcaster.add_topic(
+    'statistics', lambda: predictor.get_prediction_statistics(),
+    key_fn=lambda: (id(predictor), predictor.history_generation)
+)
+event_broadcaster.add_topic(
+    'model', lambda: {'version': model_classifier.model_version, 'generation': model_generation},
+    key_fn=lambda: (model_generation, model_classifier.model_version)
+)
+
+
+# Adaptive admission control for inference endpoints
+admission_controller = AdmissionController(
+    latency_target_ms=app.config['ADMISSION_LATENCY_TARGET_MS'],
+    batch_latency_target_ms=app.config['ADMISSION_BATCH_LATENCY_TARGET_MS'],
+    max_in_flight=app.config['ADMISSION_MAX_IN_FLIGHT'],
+    min_in_flight=app.config['ADMISSION_MIN_IN_FLIGHT']
+) if app.config['ADMISSION_CONTROL_ENABLED'] else None
+
+
+def admission_controlled(cost_fn=None, batch=False):
+    """
+    Admit the request only if the controller has capacity, otherwise shed it
+    with a fast 503 and a Retry-After header.
+    
+    Args:
+        cost_fn: Optional function returning the number of slots the request needs
+        batch: Measure the request against the batch latency target
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if admission_controller is None:
+                return view(*args, **kwargs)
+            
+            slots = admission_controller.try_acquire(cost_fn() if cost_fn else 1)
+            if not slots:
+                metrics.LOAD_SHED_TOTAL.labels(request.path).inc()
+                retry_after = admission_controller.retry_after_seconds()
+                app.logger.warning("Request shed by admission control: %s", request.path, extra=HOT_PATH)
+                response = jsonify({
+                    'error': 'Server overloaded. Please retry later.',
+                    'retry_after_seconds': retry_after
+                })
+                response.status_code = 503
+                response.headers['Retry-After'] = str(retry_after)
+                return _with_admission_headers(response)
+            
+            start = time.perf_counter()
+            try:
+                response = app.make_response(view(*args, **kwargs))
+            except Exception:
+                admission_controller.release(slots)
+                raise
+            
+            # Only successful requests say anything about inference latency
+            latency = time.perf_counter() - start if response.status_code < 400 else None
+            admission_controller.release(slots, latency, batch=batch)
+            return _with_admission_headers(response)
+        return wrapper
+    return decorator
+
+
+def profiled(view):
+    """Include the request in a running profiling session (no-op when idle)."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not request_profiler.active:
+            return view(*args, **kwargs)
+        token = request_profiler.enter_request()
+        try:
+            return view(*args, **kwargs)
+        finally:
+            request_profiler.exit_request(token)
+    return wrapper
+
+
+def admin_required(view):
+    """Require the admin token (Authorization: Bearer <ADMIN_TOKEN>)."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        expected = app.config['ADMIN_TOKEN']
+        if not expected:
+            return jsonify({'error': 'Admin endpoints are disabled (ADMIN_TOKEN not set)'}), 403
+        
+        auth_header = request.headers.get('Authorization', '')
+        supplied = auth_header[7:] if auth_header.startswith('Bearer ') else ''
+        if not hmac.compare_digest(supplied.encode(), expected.encode()):
+            app.logger.warning(f"Unauthorized admin request from {request.remote_addr}")
+            return jsonify({'error': 'Unauthorized'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+
+# On-demand profiler for the inference endpoints
+request_profiler = RequestProfiler(
+    app.config['PROFILE_DIR'],
+    sample_interval_ms=app.config['PROFILE_SAMPLE_INTERVAL_MS'],
+    max_seconds=app.config['PROFILE_MAX_SECONDS'],
+    max_requests=app.config['PROFILE_MAX_REQUESTS']
+)
+
+
+def _with_admission_headers(response):
+    """Expose controller state so proxies and clients can back off."""
+    state = admission_controller.state()
+    response.headers['X-Admission-Limit'] = str(state['limit'])
+    response.headers['X-Admission-In-Flight'] = str(state['in_flight'])
+    return response
+
+
+@app.before_request
+def start_request_timer():
+    """Track in-flight requests and start the latency clock."""
+    if app.config['ENABLE_METRICS']:
+        g.request_start = time.perf_counter()
+        g.counted_in_flight = True
+        metrics.REQUESTS_IN_FLIGHT.inc()
+
+
+@app.after_request
+def record_request_metrics(response):
+    """Count the request and observe its latency per endpoint."""
+    start = g.pop('request_start', None)
+    if start is not None:
+        # Use the URL rule, not the raw path, to keep label cardinality bounded
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.observe_request(endpoint, request.method, response.status_code,
+                                time.perf_counter() - start)
+    return response
+
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    """Release the in-flight slot, also for requests that raised."""
+    # Requests rejected by an earlier before_request hook never incremented it
+    if g.pop('counted_in_flight', False):
+        metrics.REQUESTS_IN_FLIGHT.dec()
+
+
 def load_model_on_startup():
     """Load the trained model on startup."""
-    global model_classifier, predictor, preprocessor
+    global model_classifier, predictor, preprocessor, model_generation
     
     try:
         app.logger.info("Initializing model on startup...")
         
         # Initialize preprocessor
-        preprocessor = DataPreprocessor()
+        preprocessor = DataPreprocessor(image_limits=image_limits)
         
-        # Try to load existing model
-        try:
-            model_classifier = load_latest_model(app.config['MODEL_DIR'])
-            app.logger.info("✅ Existing model loaded successfully!")
-        except FileNotFoundError:
-            app.logger.error("❌ No model found! Please train model locally first.")
-            app.logger.error("Run: python train_model_locally.py")
-            raise FileNotFoundError("Model not found. Train model locally and commit to repository.")
+        # The inference server process holds the model; this worker only talks to it
+        if app.config['INFERENCE_MODE'] == 'remote':
+            model_classifier = RemoteModelClassifier(InferenceClient(
+                app.config['INFERENCE_SOCKET'], timeout=app.config['INFERENCE_TIMEOUT_SECONDS']
+            ))
+            app.logger.info(f"✅ Using inference server at {app.config['INFERENCE_SOCKET']}")
+        else:
+            # Try to load existing model
+            try:
+                model_classifier = load_latest_model(
+                    app.config['MODEL_DIR'],
+                    serving_only=app.config['SERVING_FAST_LOAD']
+                )
+                app.logger.info("✅ Existing model loaded successfully!")
+            except FileNotFoundError:
+                app.logger.error("❌ No model found! Please train model locally first.")
+                app.logger.error("Run: python train_model_locally.py")
+                raise FileNotFoundError("Model not found. Train model locally and commit to repository.")
         
         # Initialize predictor with persistence
-        predictor = ImagePredictor(
-            model_classifier.model, 
-            class_names, 
-            preprocessor,
-            persistence_file=app.config['PREDICTIONS_FILE']
-        )
+        predictor = new_predictor(model_classifier.model)
         
         # Load previous prediction history
         predictor.load_from_persistence()
         
+        metrics.set_model_version(model_classifier.model_version)
+        metrics.set_retraining(False)
+        model_generation += 1
+        
         app.logger.info("✅ Predictor initialized successfully!")
         
     except Exception as e:
@@ -139,6 +502,39 @@ def load_model_on_startup():
 load_model_on_startup()
 
 
+# All-time totals are recomputed only when the history changed
+_history_totals = {'key': None, 'totals': None}
+
+
+def _stats_snapshot():
+    """This replica's mergeable statistics (published for /api/statistics/cluster)."""
+    key = (id(predictor), predictor.history_generation)
+    if _history_totals['key'] != key:
+        _history_totals['totals'] = history_totals(predictor.prediction_history, len(class_names))
+        _history_totals['key'] = key
+    return {
+        'model_version': model_classifier.model_version,
+        'totals': _history_totals['totals'],
+        'windows': {label: rolling_stats.window_sketch(parse_window(label)) for label in DEFAULT_WINDOWS}
+    }
+
+
+# Each replica publishes its snapshot to the shared directory on a timer
+cluster_stats_publisher = ClusterStatsPublisher(
+    app.config['CLUSTER_STATS_DIR'],
+    _stats_snapshot,
+    replica_id=app.config['REPLICA_ID'] or None,
+    interval=app.config['CLUSTER_STATS_INTERVAL_SECONDS']
+).start() if app.config['CLUSTER_STATS_ENABLED'] else None
+
+# Expose Prometheus metrics on a dedicated port
+if app.config['ENABLE_METRICS']:
+    if metrics.start_metrics_server(app.config['METRICS_PORT']):
+        app.logger.info(f"Metrics available on port {app.config['METRICS_PORT']}")
+    else:
+        app.logger.info(f"Metrics port {app.config['METRICS_PORT']} already served by another worker")
+
+
 @app.route('/')
 def home():
     """Render main dashboard."""
@@ -166,16 +562,17 @@ def model_info():
         return jsonify({'error': 'Model not loaded'}), 500
     
     try:
-        info = {
-            'input_shape': model_classifier.input_shape,
-            'num_classes': model_classifier.num_classes,
-            'class_names': class_names,
-            'training_metadata': model_classifier.training_metadata,
-            'model_summary': model_classifier.get_model_summary()
-        }
+        def build():
+            return {
+                'input_shape': model_classifier.input_shape,
+                'num_classes': model_classifier.num_classes,
+                'class_names': class_names,
+                'training_metadata': model_classifier.training_metadata,
+                'model_summary': model_classifier.get_model_summary()
+            }
         
         app.logger.debug("Model info retrieved successfully")
-        return jsonify(info)
+        return cached_json('model_info', (model_generation, model_classifier.model_version), build)
     except Exception as e:
         app.logger.error(f"Error getting model info: {str(e)}", exc_info=True)
         return jsonify({'error': str(e)}), 500
@@ -183,27 +580,45 @@ def model_info():
 
 @app.route('/api/model/uptime', methods=['GET'])
 def model_uptime():
-    """Get model uptime statistics."""
+    """
+    Get model uptime statistics.
+    
+    The body is refreshed once per UPTIME_CACHE_RESOLUTION_SECONDS (or when the
+    model or retraining state changes); polls in between are answered with 304.
+    """
     try:
-        uptime_seconds = (datetime.now() - model_start_time).total_seconds()
+        now = datetime.now()
+        uptime_seconds = (now - model_start_time).total_seconds()
+        resolution = app.config['UPTIME_CACHE_RESOLUTION_SECONDS']
         
-        return jsonify({
-            'start_time': model_start_time.isoformat(),
-            'current_time': datetime.now().isoformat(),
-            'uptime_seconds': uptime_seconds,
-            'uptime_minutes': uptime_seconds / 60,
-            'uptime_hours': uptime_seconds / 3600,
-            'is_retraining': is_retraining
-        })
+        def build():
+            return {
+                'start_time': model_start_time.isoformat(),
+                'current_time': now.isoformat(),
+                'uptime_seconds': uptime_seconds,
+                'uptime_minutes': uptime_seconds / 60,
+                'uptime_hours': uptime_seconds / 3600,
+                'is_retraining': is_retraining
+            }
+        
+        window = int(uptime_seconds // resolution) if resolution > 0 else uptime_seconds
+        return cached_json('model_uptime', (model_generation, is_retraining, window), build)
     except Exception as e:
         app.logger.error(f"Error getting uptime: {str(e)}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/predict', methods=['POST'])
-@limiter.limit("30 per minute") if limiter else lambda f: f
+@limiter.limit(app.config['PREDICT_RATE_LIMIT']) if limiter else lambda f: f
+@admission_controlled()
+@profiled
 def predict():
-    """Predict class for uploaded image."""
+    """Predict class for uploaded image (see src/response_format.py for response options)."""
+    try:
+        options = response_options()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     if 'file' not in request.files:
         app.logger.warning("No file uploaded in request")
         return jsonify({'error': 'No file uploaded'}), 400
@@ -221,22 +636,35 @@ def predict():
     try:
         # Save uploaded file
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        filepath = upload_path(filename)
+        with metrics.stage_timer('upload_receive'):
+            file.save(filepath)
         
-        app.logger.info(f"Processing prediction for: {filename}")
+        app.logger.info("Processing prediction for: %s", filename, extra=HOT_PATH)
         
         # Make prediction
         result = predictor.predict_from_file(filepath)
+        result['file_name'] = filename
         
         # Save prediction to persistence
-        predictor.save_to_persistence()
+        with metrics.stage_timer('persistence'):
+            predictor.save_to_persistence()
+        event_broadcaster.notify()
         
         # Clean up
         os.remove(filepath)
         
-        app.logger.info(f"Prediction successful: {result['predicted_class']} ({result['confidence']:.2%})")
-        return jsonify(result)
+        app.logger.info("Prediction successful: %s (%.2f%%)", result['predicted_class'],
+                        result['confidence'] * 100, extra=HOT_PATH)
+        with metrics.stage_timer('serialization'):
+            response = encoded_response(shape_prediction(result, options), options)
+        return response
+    
+    except ImageRejected as e:
+        app.logger.warning("Rejected upload %s: %s", filename, e, extra=HOT_PATH)
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        return image_rejected_response(e)
     
     except Exception as e:
         app.logger.error(f"Error during prediction: {str(e)}", exc_info=True)
@@ -246,9 +674,16 @@ def predict():
 
 
 @app.route('/api/predict/batch', methods=['POST'])
-@limiter.limit("10 per minute") if limiter else lambda f: f
+@limiter.limit(app.config['BATCH_PREDICT_RATE_LIMIT']) if limiter else lambda f: f
+@admission_controlled(cost_fn=lambda: len(request.files.getlist('files')), batch=True)
+@profiled
 def predict_batch():
-    """Predict classes for multiple uploaded images."""
+    """Predict classes for multiple uploaded images (same response options as /api/predict)."""
+    try:
+        options = response_options()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
     if 'files' not in request.files:
         app.logger.warning("No files uploaded in batch request")
         return jsonify({'error': 'No files uploaded'}), 400
@@ -263,72 +698,383 @@ def predict_batch():
         results = []
         errors = []
         
-        app.logger.info(f"Processing batch of {len(files)} images")
+        app.logger.info("Processing batch of %d images", len(files), extra=HOT_PATH)
         
-        for file in files:
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                file.save(filepath)
-                
-                try:
-                    result = predictor.predict_from_file(filepath)
-                    results.append(result)
-                except Exception as e:
-                    app.logger.error(f"Error processing {filename}: {str(e)}")
-                    errors.append({
-                        'filename': filename,
-                        'error': str(e)
-                    })
-                finally:
-                    if os.path.exists(filepath):
-                        os.remove(filepath)
+        saved = []
+        try:
+            for file in files:
+                if file and allowed_file(file.filename):
+                    filename = secure_filename(file.filename)
+                    filepath = upload_path(filename)
+                    with metrics.stage_timer('upload_receive'):
+                        file.save(filepath)
+                    saved.append((filename, filepath))
+            
+            # One call for the whole batch (decoded in parallel with the graph backend)
+            outcomes = predictor.predict_files([filepath for _, filepath in saved])
+        finally:
+            for _, filepath in saved:
+                if os.path.exists(filepath):
+                    os.remove(filepath)
+        
+        for (filename, _), outcome in zip(saved, outcomes):
+            if isinstance(outcome, ImageRejected):
+                app.logger.warning("Rejected upload %s: %s", filename, outcome, extra=HOT_PATH)
+                errors.append({
+                    'filename': filename,
+                    'error': str(outcome),
+                    'reason': outcome.reason
+                })
+            elif isinstance(outcome, Exception):
+                app.logger.error(f"Error processing {filename}: {str(outcome)}")
+                errors.append({
+                    'filename': filename,
+                    'error': str(outcome)
+                })
+            else:
+                outcome['file_name'] = filename
+                results.append(outcome)
         
         # Save predictions to persistence
-        predictor.save_to_persistence()
+        with metrics.stage_timer('persistence'):
+            predictor.save_to_persistence()
+        event_broadcaster.notify()
         
-        app.logger.info(f"Batch processing complete: {len(results)} successful, {len(errors)} errors")
+        app.logger.info("Batch processing complete: %d successful, %d errors",
+                        len(results), len(errors), extra=HOT_PATH)
         
-        return jsonify({
-            'total_processed': len(results),
-            'total_errors': len(errors),
-            'predictions': results,
-            'errors': errors
-        })
+        with metrics.stage_timer('serialization'):
+            response = encoded_response(shape_batch({
+                'total_processed': len(results),
+                'total_errors': len(errors),
+                'predictions': results,
+                'errors': errors
+            }, options), options)
+        return response
     
     except Exception as e:
         app.logger.error(f"Error during batch prediction: {str(e)}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/predict/tensor', methods=['POST'])
+@limiter.limit(app.config['PREDICT_RATE_LIMIT']) if limiter else lambda f: f
+@admission_controlled()
+@profiled
+def predict_tensor():
+    """
+    Predict classes for raw pixel tensors (.npy body, or raw bytes with
+    X-Tensor-Shape / X-Tensor-Dtype headers), skipping image decoding.
+    A batch is a single model call, so it is admitted as one unit of work.
+    """
+    try:
+        options = response_options()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        with metrics.stage_timer('upload_receive'):
+            images = parse_tensor(
+                request.get_data(cache=False),
+                shape=request.headers.get('X-Tensor-Shape'),
+                dtype=request.headers.get('X-Tensor-Dtype'),
+                max_batch=app.config['TENSOR_MAX_BATCH']
+            )
+    except TensorPayloadError as e:
+        app.logger.warning("Rejected tensor payload: %s", e, extra=HOT_PATH)
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        app.logger.info("Processing tensor prediction: shape %s", images.shape, extra=HOT_PATH)
+        results = predictor.predict_tensor(images)
+        
+        with metrics.stage_timer('persistence'):
+            predictor.save_to_persistence()
+        event_broadcaster.notify()
+        
+        with metrics.stage_timer('serialization'):
+            if images.ndim == 3:
+                payload = shape_prediction(results[0], options)
+            else:
+                payload = shape_batch({
+                    'total_processed': len(results),
+                    'predictions': results
+                }, options)
+            response = encoded_response(payload, options)
+        return response
+    
+    except Exception as e:
+        app.logger.error(f"Error during tensor prediction: {str(e)}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/admission', methods=['GET'])
+def admission_state():
+    """Get admission controller state (in-flight work, limit, latency)."""
+    if admission_controller is None:
+        return jsonify({'enabled': False})
+    
+    state = admission_controller.state()
+    state['enabled'] = True
+    state['retry_after_seconds'] = admission_controller.retry_after_seconds()
+    return jsonify(state)
+
+
+@app.route('/api/admin/profile', methods=['POST'])
+@admin_required
+def start_profiling():
+    """
+    Profile the next N inference requests or T seconds.
+    
+    JSON body (all optional): requests, seconds, tf_trace (default true),
+    wait (block until the session ends and return its summary).
+    """
+    body = request.get_json(silent=True) or {}
+    try:
+        status = request_profiler.start(
+            max_requests=body.get('requests'),
+            seconds=body.get('seconds'),
+            tf_trace=bool(body.get('tf_trace', True))
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({'error': str(e), 'status': request_profiler.status()}), 409
+    
+    app.logger.info(f"Profiling session started: {status['session_id']}")
+    
+    if body.get('wait'):
+        summary = request_profiler.wait(timeout=status['seconds'] + 30)
+        if summary is not None:
+            return jsonify({'active': False, 'summary': summary})
+    return jsonify(status), 202
+
+
+@app.route('/api/admin/profile', methods=['GET'])
+@admin_required
+def profiling_status():
+    """Running session state or the summary of the last one."""
+    return jsonify(request_profiler.status())
+
+
+@app.route('/api/admin/profile', methods=['DELETE'])
+@admin_required
+def stop_profiling():
+    """End the running profiling session early and return its summary."""
+    summary = request_profiler.stop()
+    if summary is None:
+        return jsonify({'error': 'No profiling session running'}), 404
+    return jsonify({'active': False, 'summary': summary})
+
+
+@app.route('/api/admin/shadow', methods=['POST'])
+@admin_required
+def start_shadow():
+    """
+    Shadow a sample of live traffic to a candidate model.
+    
+    JSON body: model_path (relative to MODEL_DIR, e.g. a candidate's manifest
+    .json), sample_rate (optional).
+    """
+    body = request.get_json(silent=True) or {}
+    model_dir = os.path.realpath(app.config['MODEL_DIR'])
+    model_path = os.path.realpath(os.path.join(model_dir, str(body.get('model_path', ''))))
+    if not model_path.startswith(model_dir + os.sep):
+        return jsonify({'error': 'model_path must point inside the model directory'}), 400
+    
+    try:
+        candidate = load_model_from_path(model_path, serving_only=app.config['SERVING_FAST_LOAD'])
+        shadow = ShadowEvaluator(
+            candidate.model,
+            class_names,
+            version=candidate.model_version or os.path.basename(model_path),
+            sample_rate=float(body.get('sample_rate', app.config['SHADOW_SAMPLE_RATE'])),
+            queue_size=app.config['SHADOW_QUEUE_SIZE'],
+            max_defer_ms=app.config['SHADOW_MAX_DEFER_MS']
+        )
+    except FileNotFoundError as e:
+        return jsonify({'error': str(e)}), 404
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    previous = predictor.shadow
+    predictor.attach_shadow(shadow.start())
+    if previous is not None:
+        previous.stop()
+    
+    app.logger.info(f"Shadow evaluation started for candidate {shadow.version}")
+    return jsonify(shadow.stats()), 202
+
+
+@app.route('/api/admin/shadow', methods=['GET'])
+@admin_required
+def shadow_status():
+    """Agreement, confidence deltas and latency of the shadowed candidate."""
+    if predictor.shadow is None:
+        return jsonify({'error': 'No shadow evaluation running'}), 404
+    return jsonify(predictor.shadow.stats())
+
+
+@app.route('/api/admin/shadow', methods=['DELETE'])
+@admin_required
+def stop_shadow():
+    """Stop shadow evaluation and return its final results."""
+    shadow = predictor.shadow
+    if shadow is None:
+        return jsonify({'error': 'No shadow evaluation running'}), 404
+    predictor.attach_shadow(None)
+    shadow.stop()
+    return jsonify(shadow.stats())
+
+
 @app.route('/api/statistics', methods=['GET'])
 def get_statistics():
     """Get prediction statistics."""
     try:
-        stats = predictor.get_prediction_statistics()
-        return jsonify(stats)
+        return cached_json(
+            'statistics',
+            (id(predictor), predictor.history_generation),
+            predictor.get_prediction_statistics
+        )
     except Exception as e:
         app.logger.error(f"Error getting statistics: {str(e)}", exc_info=True)
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/statistics/rolling', methods=['GET'])
+def get_rolling_statistics():
+    """
+    Prediction statistics over trailing windows (default 1m, 5m, 1h, 24h).
+    
+    Query parameters: window (repeatable or comma-separated, e.g. 30s, 5m, 1h).
+    """
+    labels = [label.strip() for value in request.args.getlist('window')
+              for label in value.split(',') if label.strip()] or list(DEFAULT_WINDOWS)
+    try:
+        windows = {label: parse_window(label) for label in labels}
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({
+        'windows': {label: rolling_stats.window_stats(seconds) for label, seconds in windows.items()}
+    })
+
+
+@app.route('/api/drift', methods=['GET'])
+def get_drift():
+    """Drift of recent inputs and predictions from the training-set profile."""
+    report = drift_monitor.report()
+    metrics.set_drift_score(report['drift_score'])
+    report['drift_threshold'] = app.config['DRIFT_THRESHOLD']
+    report['retraining_needed'] = model_classifier.check_retraining_needed(
+        drift_score=report['drift_score'], drift_threshold=app.config['DRIFT_THRESHOLD']
+    ) if report['ready'] else None
+    return jsonify(report)
+
+
+@app.route('/api/statistics/cluster', methods=['GET'])
+def get_cluster_statistics():
+    """
+    Statistics merged across all live replicas.
+    
+    Replicas whose last snapshot is older than CLUSTER_STATS_STALE_SECONDS
+    are listed under 'stale_replicas' and left out of the numbers.
+    """
+    if cluster_stats_publisher is None:
+        return jsonify({'error': 'Cluster statistics are disabled'}), 404
+    
+    try:
+        fresh, stale = load_snapshots(
+            app.config['CLUSTER_STATS_DIR'],
+            stale_after=app.config['CLUSTER_STATS_STALE_SECONDS'],
+            expire_after=app.config['CLUSTER_STATS_EXPIRE_SECONDS']
+        )
+        # This replica's own numbers are taken live rather than from its last file
+        own = cluster_stats_publisher.snapshot()
+        own['age_seconds'] = 0.0
+        snapshots = [s for s in fresh if s['replica_id'] != own['replica_id']] + [own]
+        stale = [s for s in stale if s['replica_id'] != own['replica_id']]
+        
+        merged = aggregate(snapshots, class_names)
+        merged['replicas'] = [{
+            'replica_id': s['replica_id'],
+            'model_version': s.get('model_version'),
+            'total_predictions': s['totals']['count'],
+            'age_seconds': s['age_seconds']
+        } for s in sorted(snapshots, key=lambda s: s['replica_id'])]
+        merged['stale_replicas'] = [{
+            'replica_id': s['replica_id'],
+            'age_seconds': s['age_seconds']
+        } for s in stale]
+        merged['model_versions'] = sorted({str(s.get('model_version')) for s in snapshots})
+        return jsonify(merged)
+    except Exception as e:
+        app.logger.error(f"Error aggregating cluster statistics: {str(e)}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/predictions', methods=['GET'])
+def query_predictions():
+    """
+    Page through stored predictions, newest first.
+    
+    Query parameters: since, until (epoch seconds or ISO 8601), class,
+    min_confidence, max_confidence, limit, cursor (next_cursor of the
+    previous page), probabilities=true.
+    """
+    if prediction_store is None:
+        return jsonify({'error': 'Prediction store is disabled'}), 404
+    
+    try:
+        predicted_class = request.args.get('class') or None
+        if predicted_class is not None and predicted_class not in class_names:
+            raise ValueError(f"Unknown class: {predicted_class}")
+        
+        min_confidence = request.args.get('min_confidence', type=float)
+        max_confidence = request.args.get('max_confidence', type=float)
+        limit = request.args.get('limit', 50, type=int)
+        if not 1 <= limit <= app.config['PREDICTIONS_PAGE_MAX']:
+            raise ValueError(f"limit must be between 1 and {app.config['PREDICTIONS_PAGE_MAX']}")
+        
+        page = prediction_store.query(
+            since=parse_time(request.args.get('since')),
+            until=parse_time(request.args.get('until')),
+            predicted_class=predicted_class,
+            min_confidence=min_confidence,
+            max_confidence=max_confidence,
+            cursor=request.args.get('cursor') or None,
+            limit=limit,
+            include_probabilities=request.args.get('probabilities', 'false').lower() == 'true'
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        app.logger.error(f"Error querying predictions: {str(e)}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+    
+    page['limit'] = limit
+    return jsonify(page)
+
+
 @app.route('/api/visualizations', methods=['GET'])
 def get_visualizations():
     """Get available visualization images."""
     try:
-        static_dir = app.config['STATIC_DIR']
-        visualizations = []
+        assets = static_index.assets()
         
-        if os.path.exists(static_dir):
-            for filename in os.listdir(static_dir):
-                if filename.endswith('.png'):
+        def build():
+            visualizations = []
+            for asset in sorted(assets, key=lambda a: a.name):
+                if '/' not in asset.name and asset.name.endswith('.png'):
                     visualizations.append({
-                        'name': filename.replace('_', ' ').replace('.png', '').title(),
-                        'filename': filename,
-                        'url': f'/static/{filename}'
+                        'name': asset.name.replace('_', ' ').replace('.png', '').title(),
+                        'filename': asset.name,
+                        'url': static_index.url_for(asset.name),
+                        'thumbnail_url': static_index.url_for(asset.name, thumbnail=True)
                     })
+            return {'visualizations': visualizations}
         
-        return jsonify({'visualizations': visualizations})
+        return cached_json('visualizations', static_index.version, build)
     except Exception as e:
         app.logger.error(f"Error getting visualizations: {str(e)}", exc_info=True)
         return jsonify({'error': str(e)}), 500
@@ -351,33 +1097,45 @@ def upload_training_data():
         return jsonify({'error': 'Number of files and labels must match'}), 400
     
     try:
-        # Create directory for new training data
-        new_data_dir = os.path.join(app.config['TRAIN_DIR'], 'uploaded')
-        os.makedirs(new_data_dir, exist_ok=True)
-        
-        saved_files = []
+        pixels = []
+        accepted_files = []
+        rejected_files = []
         
         app.logger.info(f"Uploading {len(files)} training files")
         
         for file, label in zip(files, labels):
             if file and allowed_file(file.filename):
                 filename = secure_filename(file.filename)
-                # Add label to filename
-                labeled_filename = f"{label}_{filename}"
-                filepath = os.path.join(new_data_dir, labeled_filename)
-                file.save(filepath)
-                saved_files.append({
-                    'filename': labeled_filename,
-                    'label': label,
-                    'path': filepath
-                })
+                try:
+                    label_index = resolve_label(label, class_names)
+                except ValueError as e:
+                    rejected_files.append({'filename': filename, 'error': str(e), 'reason': 'unknown_label'})
+                    continue
+                try:
+                    # Decoded and resized once; only 32x32 pixels are stored
+                    pixels.append(preprocessor.load_image_pixels(file.stream))
+                except ImageRejected as e:
+                    rejected_files.append({'filename': filename, 'error': str(e), 'reason': e.reason})
+                    continue
+                accepted_files.append({'filename': filename, 'label': class_names[label_index],
+                                       'label_index': label_index})
         
-        app.logger.info(f"Successfully uploaded {len(saved_files)} training files")
+        if pixels:
+            statuses = training_shards.add(np.stack(pixels), [f['label_index'] for f in accepted_files])
+            for entry, status in zip(accepted_files, statuses):
+                entry['status'] = status
+        saved = sum(1 for f in accepted_files if f['status'] == 'added')
+        
+        app.logger.info(f"Stored {saved} training samples "
+                        f"({len(accepted_files) - saved} duplicates, {len(rejected_files)} rejected)")
         
         return jsonify({
             'message': 'Training data uploaded successfully',
-            'files_saved': len(saved_files),
-            'files': saved_files
+            'files_saved': saved,
+            'duplicates': len(accepted_files) - saved,
+            'files': accepted_files,
+            'files_rejected': rejected_files,
+            'dataset': training_shards.summary()
         })
     
     except Exception as e:
@@ -385,65 +1143,191 @@ def upload_training_data():
         return jsonify({'error': str(e)}), 500
 
 
-def retrain_model_background(X_train, y_train, X_val, y_val):
+@app.route('/api/training-data', methods=['GET'])
+def training_data_summary():
+    """Uploaded training samples: per-class counts, shards and dataset fingerprint."""
+    try:
+        training_shards.refresh()
+        summary = training_shards.summary()
+        completed = find_completed_run(app.config['CHECKPOINT_DIR'])
+        trained_on = load_run_state(completed).get('data_fingerprint') if completed else None
+        summary['changed_since_last_retrain'] = trained_on != summary['fingerprint']
+        return jsonify(summary)
+    except Exception as e:
+        app.logger.error(f"Error reading training data: {str(e)}", exc_info=True)
+        return jsonify({'error': str(e)}), 500
+
+
+def retrain_model_background(X_train, y_train, X_val, y_val, run_dir, resume=False, data_fingerprint=None):
     """Background function for retraining model."""
-    global is_retraining, retraining_status, model_classifier, predictor
+    global is_retraining, retraining_status, model_classifier, predictor, model_generation
     
+    checkpointer = None
     try:
         app.logger.info("Background retraining started")
         
+        epochs = app.config['RETRAINING_EPOCHS']
+        checkpointer = TrainingCheckpointer(
+            run_dir,
+            save_every=app.config['CHECKPOINT_EVERY_EPOCHS'],
+            max_to_keep=app.config['CHECKPOINT_MAX_TO_KEEP'],
+            epochs_requested=epochs
+        )
+        
+        # A previous save may still be reading the weights we are about to train
+        wait_for_pending_saves()
+        
+        # Models loaded for serving only have no optimizer yet
+        if not model_classifier.is_compiled():
+            model_classifier.compile_model()
+        
+        # Pick up weights, optimizer state and epoch counter of an interrupted run
+        initial_epoch = checkpointer.restore(model_classifier.model) if resume else 0
+        
         retraining_status = {
             'status': 'in_progress',
             'start_time': datetime.now().isoformat(),
-            'message': 'Retraining started...'
+            'message': f'Retraining resumed from epoch {initial_epoch}...'
+                       if initial_epoch else 'Retraining started...',
+            'run_id': checkpointer.run_id,
+            'resumed_from_epoch': initial_epoch if resume else None,
+            'current_epoch': initial_epoch,
+            'total_epochs': epochs
         }
         
-        # Retrain the model
-        history = model_classifier.retrain_model(
-            X_train, y_train, X_val, y_val,
-            epochs=app.config['RETRAINING_EPOCHS'],
-            batch_size=app.config['RETRAINING_BATCH_SIZE']
-        )
+        def update_progress(epoch, logs):
+            retraining_status['current_epoch'] = epoch + 1
         
-        # Save the updated model
-        model_classifier.save_model(model_dir=app.config['MODEL_DIR'])
+        if initial_epoch < epochs:
+            # Retrain the model
+            history = model_classifier.retrain_model(
+                X_train, y_train, X_val, y_val,
+                epochs=epochs,
+                batch_size=app.config['RETRAINING_BATCH_SIZE'],
+                extra_callbacks=[checkpointer, LambdaCallback(on_epoch_end=update_progress)],
+                initial_epoch=initial_epoch
+            )
+            final_history = history.history
+        else:
+            # All epochs finished before the interruption; only saving is left
+            final_history = checkpointer.load_state().get('history', {})
+        
+        # Save the updated model on the background writer
+        save_future = model_classifier.save_model(
+            model_dir=app.config['MODEL_DIR'], background=True
+        )
         
         # Update predictor with new model
-        predictor = ImagePredictor(
-            model_classifier.model,
-            class_names,
-            preprocessor,
-            persistence_file=app.config['PREDICTIONS_FILE']
+        previous_predictor = predictor
+        # Unsaved history stays with the old predictor; persist it first
+        previous_predictor.save_to_persistence()
+        predictor = new_predictor(model_classifier.model)
+        # A running shadow evaluation now compares against the retrained model
+        predictor.attach_shadow(previous_predictor.shadow)
+        model_generation += 1
+        
+        # Drift is measured against what the retrained model was trained on
+        try:
+            profile = build_reference_profile(X_train, y_train, class_names, model=model_classifier.model)
+            save_reference_profile(profile, app.config['REFERENCE_PROFILE_FILE'])
+            drift_monitor.set_reference(profile)
+        except Exception as e:
+            app.logger.error(f"Could not update drift reference profile: {str(e)}", exc_info=True)
+        
+        final_accuracy = float(final_history['accuracy'][-1]) if final_history.get('accuracy') else None
+        final_val_accuracy = float(final_history['val_accuracy'][-1]) if final_history.get('val_accuracy') else None
+        checkpointer.mark('completed', final_accuracy=final_accuracy, data_fingerprint=data_fingerprint)
+        garbage_collect_runs(
+            app.config['CHECKPOINT_DIR'],
+            keep_runs=app.config['CHECKPOINT_KEEP_RUNS'],
+            exclude=run_dir
         )
         
         retraining_status = {
             'status': 'completed',
             'end_time': datetime.now().isoformat(),
             'message': 'Retraining completed successfully',
-            'final_accuracy': float(history.history['accuracy'][-1]),
-            'final_val_accuracy': float(history.history['val_accuracy'][-1])
+            'run_id': checkpointer.run_id,
+            'resumed_from_epoch': initial_epoch if resume else None,
+            'current_epoch': epochs,
+            'total_epochs': epochs,
+            'final_accuracy': final_accuracy,
+            'final_val_accuracy': final_val_accuracy,
+            'model_saved': False
         }
+        completed_status = retraining_status
+        
+        def on_model_saved(future):
+            global model_generation
+            if future.exception() is not None:
+                app.logger.error(f"Saving retrained model failed: {future.exception()}")
+                completed_status['save_error'] = str(future.exception())
+            else:
+                completed_status['model_saved'] = True
+                completed_status['model_version'] = future.result()['sha256'][:12]
+                metrics.set_model_version(completed_status['model_version'],
+                                          previous=model_classifier.model_version)
+                model_classifier.model_version = completed_status['model_version']
+                model_generation += 1
+                app.logger.info("Retrained model saved")
         
-        app.logger.info(f"Retraining completed successfully. Final accuracy: {history.history['accuracy'][-1]:.4f}")
+        save_future.add_done_callback(on_model_saved)
+        
+        app.logger.info(f"Retraining completed successfully. Final accuracy: {final_accuracy}")
         
     except Exception as e:
         app.logger.error(f"Retraining failed: {str(e)}", exc_info=True)
+        if checkpointer is not None:
+            # Failed runs keep their checkpoints and can be resumed
+            checkpointer.mark('failed', error=str(e))
         retraining_status = {
             'status': 'failed',
             'end_time': datetime.now().isoformat(),
-            'error': str(e)
+            'error': str(e),
+            'run_id': os.path.basename(run_dir)
         }
     
     finally:
         is_retraining = False
+        metrics.set_retraining(False)
+        event_broadcaster.notify()
+
+
+@app.route('/api/events', methods=['GET'])
+def event_stream():
+    """
+    Server-sent events for the dashboard: a 'snapshot' event with every topic,
+    then 'uptime', 'retrain', 'statistics' and 'model' events carrying only
+    the fields that changed.
+    """
+    subscription = event_broadcaster.subscribe()
+    if subscription is None:
+        return jsonify({'error': 'Too many event stream subscribers; poll instead'}), 503
+    
+    return app.response_class(
+        subscription.messages(
+            heartbeat=app.config['SSE_HEARTBEAT_SECONDS'],
+            max_seconds=app.config['SSE_MAX_STREAM_SECONDS']
+        ),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 
 @app.route('/api/retrain', methods=['POST'])
 # Removed rate limiting - using is_retraining flag instead to prevent concurrent retraining
 def trigger_retraining():
-    """Trigger model retraining."""
+    """
+    Trigger model retraining, optionally resuming an interrupted run (?resume=true).
+    
+    Skipped while the drift score is below DRIFT_THRESHOLD, unless ?force=true.
+    """
     global is_retraining
     
+    conflict = model_update_conflict()
+    if conflict:
+        return jsonify({'error': conflict}), 409
+    
     if is_retraining:
         app.logger.warning("Retraining already in progress")
         return jsonify({
@@ -452,31 +1336,75 @@ def trigger_retraining():
         }), 400
     
     try:
-        app.logger.info("Retraining triggered")
+        body = request.get_json(silent=True) or {}
+        resume = str(request.args.get('resume', body.get('resume', 'false'))).lower() == 'true'
+        force = str(request.args.get('force', body.get('force', 'false'))).lower() == 'true'
         
-        # Prepare data for retraining
-        data = preprocessor.prepare_training_data()
+        # Skip a full retrain while production inputs still match the training data
+        drift = drift_monitor.report()
+        metrics.set_drift_score(drift['drift_score'])
+        if not (force or resume) and drift['ready'] and not model_classifier.check_retraining_needed(
+                drift_score=drift['drift_score'], drift_threshold=app.config['DRIFT_THRESHOLD']):
+            app.logger.info(f"Retraining skipped: drift score {drift['drift_score']:.3f} "
+                            f"below {app.config['DRIFT_THRESHOLD']}")
+            return jsonify({
+                'message': 'Retraining not needed: inputs have not drifted (use ?force=true to override)',
+                'status': 'skipped',
+                'drift_threshold': app.config['DRIFT_THRESHOLD'],
+                'drift': drift
+            })
+        
+        # The last completed retrain already saw every uploaded sample
+        data_fingerprint = training_shards.refresh()
+        completed = find_completed_run(app.config['CHECKPOINT_DIR'])
+        if not (force or resume) and completed and \
+                load_run_state(completed).get('data_fingerprint') == data_fingerprint:
+            app.logger.info("Retraining skipped: training data unchanged since the last retrain")
+            return jsonify({
+                'message': 'Retraining not needed: no new training data since the last retrain '
+                           '(use ?force=true to override)',
+                'status': 'skipped',
+                'last_run_id': os.path.basename(completed),
+                'dataset': training_shards.summary()
+            })
+        
+        run_dir = find_resumable_run(app.config['CHECKPOINT_DIR']) if resume else None
+        if run_dir is None:
+            resume = False
+            run_dir = new_run_dir(app.config['CHECKPOINT_DIR'])
+        
+        app.logger.info(f"Retraining triggered (run: {os.path.basename(run_dir)}, resume: {resume})")
+        
+        # Prepare data for retraining: CIFAR-10 plus the uploaded shards (memory-mapped, no decoding)
+        data = preprocessor.prepare_training_data(extra_samples=training_shards.load())
         
         is_retraining = True
+        metrics.set_retraining(True)
+        event_broadcaster.notify()
         
         # Start retraining in background thread
         thread = threading.Thread(
             target=retrain_model_background,
             args=(data['X_train'], data['y_train'], 
-                  data['X_test'], data['y_test'])
+                  data['X_test'], data['y_test'], run_dir),
+            kwargs={'resume': resume, 'data_fingerprint': data_fingerprint}
         )
         thread.daemon = True
         thread.start()
         
         return jsonify({
-            'message': 'Retraining started',
+            'message': 'Retraining resumed' if resume else 'Retraining started',
             'status': 'in_progress',
+            'run_id': os.path.basename(run_dir),
+            'resumed': resume,
+            'resume_from_epoch': load_run_state(run_dir).get('checkpoint_epoch') if resume else None,
             'check_status_url': '/api/retrain/status'
         })
     
     except Exception as e:
         app.logger.error(f"Error triggering retraining: {str(e)}", exc_info=True)
         is_retraining = False
+        metrics.set_retraining(False)
         return jsonify({'error': str(e)}), 500
 
 
@@ -493,6 +1421,10 @@ def retraining_status_endpoint():
 @limiter.limit("5 per hour") if limiter else lambda f: f
 def evaluate_model():
     """Evaluate model on test data."""
+    conflict = model_update_conflict()
+    if conflict:
+        return jsonify({'error': conflict}), 409
+    
     try:
         app.logger.info("Model evaluation requested")
         
@@ -500,14 +1432,14 @@ def evaluate_model():
         data = preprocessor.prepare_training_data()
         
         # Evaluate
-        metrics = model_classifier.evaluate_model(
+        evaluation = model_classifier.evaluate_model(
             data['X_test'],
             data['y_test'],
             class_names
         )
         
-        app.logger.info(f"Model evaluation complete. Accuracy: {metrics['accuracy']:.4f}")
-        return jsonify(metrics)
+        app.logger.info(f"Model evaluation complete. Accuracy: {evaluation['accuracy']:.4f}")
+        return jsonify(evaluation)
     
     except Exception as e:
         app.logger.error(f"Error evaluating model: {str(e)}", exc_info=True)
@@ -516,8 +1448,34 @@ def evaluate_model():
 
 @app.route('/static/<path:filename>')
 def serve_static(filename):
-    """Serve static files."""
-    return send_from_directory(app.config['STATIC_DIR'], filename)
+    """
+    Serve static files from the asset index.
+    
+    Fingerprinted and thumbnail names change with the content, so they are
+    cacheable forever; plain names are revalidated with their content ETag.
+    """
+    asset, kind = static_index.resolve(filename)
+    if asset is None:
+        abort(404)
+    
+    if kind == 'thumbnail':
+        response = send_file(asset.thumbnail_path, mimetype='image/webp',
+                             etag=f"{asset.etag}-thumb", conditional=True)
+    elif asset.gzip_body is not None and request.accept_encodings['gzip']:
+        response = app.response_class(asset.gzip_body, mimetype=asset.mimetype)
+        response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(f"{asset.etag}-gz")
+        response = response.make_conditional(request)
+    else:
+        response = send_file(asset.path, mimetype=asset.mimetype, etag=asset.etag, conditional=True)
+    
+    if asset.gzip_body is not None:
+        response.headers['Vary'] = 'Accept-Encoding'
+    if kind == 'plain':
+        response.headers['Cache-Control'] = 'no-cache'
+    else:
+        response.headers['Cache-Control'] = f"public, max-age={app.config['STATIC_IMMUTABLE_MAX_AGE']}, immutable"
+    return response
 
 
 @app.errorhandler(413)
@@ -530,14 +1488,14 @@ def request_entity_too_large(error):
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
-    app.logger.warning(f"404 error: {request.url}")
+    app.logger.warning("404 error: %s", request.url, extra=HOT_PATH)
     return jsonify({'error': 'Endpoint not found'}), 404
 
 
 @app.errorhandler(429)
 def ratelimit_handler(error):
     """Handle rate limit errors."""
-    app.logger.warning(f"Rate limit exceeded: {request.remote_addr}")
+    app.logger.warning("Rate limit exceeded: %s", request.remote_addr, extra=HOT_PATH)
     return jsonify({'error': 'Rate limit exceeded. Please try again later.'}), 429
 
 
@@ -567,10 +1525,17 @@ if __name__ == '__main__':
     print("  GET  /api/model/uptime          - Model uptime")
     print("  POST /api/predict               - Single image prediction [Rate limited: 30/min]")
     print("  POST /api/predict/batch         - Batch prediction [Rate limited: 10/min]")
+    print("  GET  /api/admission             - Admission control state")
+    print("  POST /api/admin/profile         - Profile next N requests / T seconds [Admin token]")
     print("  GET  /api/statistics            - Prediction statistics")
+    print("  GET  /api/statistics/rolling    - Statistics over trailing windows")
+    print("  GET  /api/statistics/cluster    - Statistics merged across replicas")
+    print("  GET  /api/predictions           - Query stored predictions")
     print("  GET  /api/visualizations        - Available visualizations")
     print("  POST /api/upload/training-data  - Upload training data [Rate limited: 5/hr]")
-    print("  POST /api/retrain               - Trigger retraining [Rate limited: 1/hr]")
+    print("  GET  /api/training-data         - Uploaded training samples and dataset fingerprint")
+    print("  GET  /api/drift                 - Input/prediction drift score")
+    print("  POST /api/retrain               - Trigger retraining if drifted (?force=true, ?resume=true) [Rate limited: 1/hr]")
     print("  GET  /api/retrain/status        - Retraining status")
     print("  POST /api/model/evaluate        - Evaluate model [Rate limited: 5/hr]")
     print("="*70)
@@ -0,0 +1,160 @@
+"""
+Graph serving benchmark.
+
+Compares the two ImagePredictor backends end to end, from upload files on
+disk to prediction dicts (header validation, decoding, resizing, model call):
+    pil    DataPreprocessor decodes each file with PIL, then one model call
+    graph  one tf.function decodes and resizes the files in-graph
+           (tf.map_fn, parallel_iterations) and classifies them
+For every upload size it times batch uploads of 1, 8 and 32 files
+(predict_files, as /api/predict/batch), then measures throughput and
+latency of single-file requests from concurrent threads (predict_from_file,
+as /api/predict).
+
+Uses a randomly-initialized stand-in CNN, so it runs offline.
+
+Usage:
+    python benchmarks/bench_graph_serving.py --threads 4 --duration 5 --output results/graph.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.graph_serving import GraphImageModel, warm_up
+from src.prediction import ImagePredictor
+from src.preprocessing import DataPreprocessor
+from benchmarks.run_benchmarks import make_stand_in_model, time_call, CLASS_NAMES
+
+
+UPLOADS = (('png', 32, 32), ('jpeg', 256, 256), ('jpeg', 1024, 768))
+BATCH_SIZES = (1, 8, 32)
+
+
+def write_uploads(tmp_dir, fmt, width, height, count, seed=0):
+    """Smooth random images saved as upload files."""
+    rng = np.random.default_rng(seed)
+    paths = []
+    for i in range(count):
+        small = rng.integers(0, 256, (8, 8, 3), dtype=np.uint8)
+        image = Image.fromarray(small).resize((width, height), Image.Resampling.BILINEAR)
+        path = os.path.join(tmp_dir, f'upload_{width}x{height}_{i}.{fmt}')
+        image.save(path, format=fmt.upper())
+        paths.append(path)
+    return paths
+
+
+def make_predictors(model, parallel_iterations):
+    preprocessor = DataPreprocessor()
+    graph_model = GraphImageModel.from_keras(model, parallel_iterations)
+    warm_up(graph_model)
+    return {
+        'pil': ImagePredictor(model, CLASS_NAMES, preprocessor),
+        'graph': ImagePredictor(model, CLASS_NAMES, preprocessor, graph_model=graph_model)
+    }
+
+
+def bench_batches(predictors, paths, repeats):
+    """predict_files latency per batch size."""
+    results = {}
+    for batch_size in BATCH_SIZES:
+        batch = paths[:batch_size]
+        for name, predictor in predictors.items():
+            result = time_call(lambda: predictor.predict_files(batch), repeats=repeats,
+                               setup=predictor.clear_history)
+            result['images_per_second'] = batch_size / (result['median_ms'] / 1000)
+            results[f'{name}_x{batch_size}'] = result
+    return results
+
+
+def bench_concurrent(predictor, paths, threads, duration):
+    """Single-file requests from `threads` closed-loop clients."""
+    latencies = [[] for _ in range(threads)]
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        i = index
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            predictor.predict_from_file(paths[i % len(paths)])
+            latencies[index].append((time.perf_counter() - start) * 1000)
+            i += 1
+
+    pool = [threading.Thread(target=client, args=(t,)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    predictor.clear_history()
+
+    latencies = np.asarray([ms for thread in latencies for ms in thread])
+    return {
+        'requests_per_second': len(latencies) / duration,
+        'latency_p50_ms': float(np.percentile(latencies, 50)),
+        'latency_p95_ms': float(np.percentile(latencies, 95))
+    }
+
+
+def run(threads=4, duration=5.0, repeats=10, parallel_iterations=8):
+    """
+    Benchmark both backends for every upload size.
+
+    Returns:
+        dict of results
+    """
+    model = make_stand_in_model().model
+    predictors = make_predictors(model, parallel_iterations)
+    results = {'threads': threads, 'duration_seconds': duration,
+               'parallel_iterations': parallel_iterations, 'uploads': {}}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for fmt, width, height in UPLOADS:
+            paths = write_uploads(tmp_dir, fmt, width, height, max(BATCH_SIZES))
+            results['uploads'][f'{fmt}_{width}x{height}'] = {
+                'batches': bench_batches(predictors, paths, repeats),
+                'concurrent': {name: bench_concurrent(predictor, paths, threads, duration)
+                               for name, predictor in predictors.items()}
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Graph serving benchmark')
+    parser.add_argument('--threads', type=int, default=4, help='Concurrent single-file clients')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per concurrent run')
+    parser.add_argument('--repeats', type=int, default=10)
+    parser.add_argument('--parallel-iterations', type=int, default=8)
+    parser.add_argument('--output', default=None, help='Optional JSON output path')
+    args = parser.parse_args()
+
+    results = run(args.threads, args.duration, args.repeats, args.parallel_iterations)
+
+    for upload, r in results['uploads'].items():
+        print(f"\n{upload}")
+        print(f"{'Batch':>6} {'PIL ms':>9} {'Graph ms':>9} {'PIL img/s':>10} {'Graph img/s':>12}")
+        for batch_size in BATCH_SIZES:
+            pil, graph = r['batches'][f'pil_x{batch_size}'], r['batches'][f'graph_x{batch_size}']
+            print(f"{batch_size:>6} {pil['median_ms']:>9.1f} {graph['median_ms']:>9.1f} "
+                  f"{pil['images_per_second']:>10.0f} {graph['images_per_second']:>12.0f}")
+        for name, c in r['concurrent'].items():
+            print(f"  {results['threads']} threads, {name}: {c['requests_per_second']:.0f} req/s, "
+                  f"p50 {c['latency_p50_ms']:.1f} ms, p95 {c['latency_p95_ms']:.1f} ms")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""
+Inference server benchmark.
+
+Runs the same closed-loop load (W worker processes x T threads, each thread
+decoding a PNG upload and classifying it, one image per request) in both
+serving modes:
+    local   every worker loads the model and calls it directly (serve.py today)
+    remote  workers only decode; one inference server process batches the
+            model calls of all of them (INFERENCE_MODE=remote)
+and reports throughput, latency percentiles, the server's average batch size
+and the memory (PSS) of all processes involved.
+
+Usage:
+    python benchmarks/bench_inference_server.py --workers 4 --threads 4 --duration 10
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config import Config
+from src.inference_server import InferenceServerProcess
+
+
+def make_uploads(count=32, seed=0):
+    """PNG-encoded 32x32 images, as uploaded."""
+    rng = np.random.default_rng(seed)
+    uploads = []
+    for _ in range(count):
+        buffer = io.BytesIO()
+        Image.fromarray(rng.integers(0, 256, (32, 32, 3), dtype=np.uint8)).save(buffer, format='PNG')
+        uploads.append(buffer.getvalue())
+    return uploads
+
+
+def proportional_set_size(pid):
+    """PSS of a process in MB (shared pages split between their users), None if unknown."""
+    try:
+        with open(f'/proc/{pid}/smaps_rollup', 'r') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def _worker(mode, model_dir, socket_path, threads, duration, barrier, results):
+    """One HTTP-worker stand-in: `threads` closed-loop clients."""
+    import threading
+    from src.preprocessing import DataPreprocessor
+
+    if mode == 'remote':
+        from src.inference_server import InferenceClient, RemoteModel
+        model = RemoteModel(InferenceClient(socket_path))
+    else:
+        from src.prefork import configure_tf_threads
+        from src.model import load_latest_model
+        configure_tf_threads(max(1, (os.cpu_count() or 1) // threads), 1)
+        model = load_latest_model(model_dir, serving_only=True).model
+    preprocessor = DataPreprocessor()
+    uploads = make_uploads(seed=os.getpid())
+    model.predict(np.zeros((1, 32, 32, 3), dtype=np.float32), verbose=0)
+
+    latencies = [[] for _ in range(threads)]
+
+    def client(index, deadline):
+        i = index
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            pixels = preprocessor.load_image_pixels(io.BytesIO(uploads[i % len(uploads)]))
+            model.predict(pixels[np.newaxis].astype(np.float32) / 255.0, verbose=0)
+            latencies[index].append((time.perf_counter() - start) * 1000)
+            i += 1
+
+    barrier.wait()
+    deadline = time.perf_counter() + duration
+    pool = [threading.Thread(target=client, args=(t, deadline)) for t in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    results.put({'latencies': [ms for thread in latencies for ms in thread],
+                 'pss_mb': proportional_set_size(os.getpid())})
+
+
+def bench_mode(mode, model_dir, socket_path, workers, threads, duration, timeout=600):
+    """Run one mode; the inference server must already be up for 'remote'."""
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    processes = [ctx.Process(target=_worker, args=(mode, model_dir, socket_path, threads,
+                                                   duration, barrier, results))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    collected = []
+    try:
+        for _ in processes:
+            collected.append(results.get(timeout=timeout))
+    finally:
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+    latencies = np.asarray([ms for r in collected for ms in r['latencies']])
+    return {
+        'mode': mode,
+        'requests': len(latencies),
+        'requests_per_second': len(latencies) / duration,
+        'latency_p50_ms': float(np.percentile(latencies, 50)),
+        'latency_p95_ms': float(np.percentile(latencies, 95)),
+        'latency_p99_ms': float(np.percentile(latencies, 99)),
+        'workers_pss_mb': sum(r['pss_mb'] or 0 for r in collected)
+    }
+
+
+def run(workers=2, threads=4, duration=5.0, model_dir=None, max_batch=64, max_wait_ms=0.0):
+    """
+    Benchmark local and remote serving under the same load.
+
+    Returns:
+        dict of results
+    """
+    model_dir = model_dir or Config.MODEL_DIR
+    results = {'workers': workers, 'threads': threads, 'duration_seconds': duration,
+               'max_batch': max_batch, 'max_wait_ms': max_wait_ms}
+    results['local'] = bench_mode('local', model_dir, None, workers, threads, duration)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        socket_path = os.path.join(tmp_dir, 'inference.sock')
+        server = InferenceServerProcess(model_dir, socket_path, intra_op_threads=os.cpu_count(),
+                                        max_batch=max_batch, max_wait_ms=max_wait_ms).start()
+        try:
+            before = server.info
+            remote = bench_mode('remote', model_dir, socket_path, workers, threads, duration)
+            from src.inference_server import InferenceClient
+            after = InferenceClient(socket_path).info()
+            batches = after['batches'] - before['batches']
+            remote['average_batch_size'] = (after['images'] - before['images']) / batches if batches else None
+            remote['server_pss_mb'] = proportional_set_size(server.process.pid)
+        finally:
+            server.stop()
+    results['remote'] = remote
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inference server benchmark')
+    parser.add_argument('--workers', type=int, default=2, help='Worker processes')
+    parser.add_argument('--threads', type=int, default=4, help='Client threads per worker')
+    parser.add_argument('--duration', type=float, default=5.0, help='Seconds per mode')
+    parser.add_argument('--model-dir', default=None)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=0.0)
+    parser.add_argument('--output', default=None, help='Optional JSON output path')
+    args = parser.parse_args()
+
+    results = run(args.workers, args.threads, args.duration, args.model_dir,
+                  args.max_batch, args.max_wait_ms)
+
+    print(f"\n{results['workers']} workers x {results['threads']} threads, "
+          f"{results['duration_seconds']:.0f}s per mode")
+    print(f"\n{'Mode':<8} {'Req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Batch':>6} {'PSS MB':>8}")
+    for mode in ('local', 'remote'):
+        r = results[mode]
+        batch = f"{r['average_batch_size']:.1f}" if r.get('average_batch_size') else '1'
+        pss = r['workers_pss_mb'] + (r.get('server_pss_mb') or 0)
+        print(f"{mode:<8} {r['requests_per_second']:>8.0f} {r['latency_p50_ms']:>8.1f} "
+              f"{r['latency_p95_ms']:>8.1f} {r['latency_p99_ms']:>8.1f} {batch:>6} {pss:>8.0f}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
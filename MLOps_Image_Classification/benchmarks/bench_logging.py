@@ -0,0 +1,159 @@
+"""
+Logging overhead benchmark.
+
+Simulates request threads logging the two per-prediction lines at high RPS
+and measures the time each simulated request spends in logging:
+    - sync: f-strings, RotatingFileHandler + console handler on the request
+      thread (the previous setup)
+    - async: lazy %-formatting, hot-path sampling, queue handler + background
+      listener writing to the same handlers
+
+Usage:
+    python benchmarks/bench_logging.py --threads 8 --requests 5000 --output results/logging.json
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import threading
+import statistics
+from logging.handlers import RotatingFileHandler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.async_logging import AsyncLogging, HOT_PATH
+
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+
+def _make_handlers(log_dir, console_stream):
+    formatter = logging.Formatter(LOG_FORMAT)
+    file_handler = RotatingFileHandler(
+        os.path.join(log_dir, 'app.log'), maxBytes=1024 * 1024, backupCount=3
+    )
+    console_handler = logging.StreamHandler(console_stream)
+    for handler in (file_handler, console_handler):
+        handler.setFormatter(formatter)
+    return [file_handler, console_handler]
+
+
+def _sync_request(logger, i):
+    result = {'predicted_class': 'Cat', 'confidence': 0.8731}
+    logger.info(f"Processing prediction for: upload_{i}.png")
+    logger.info(f"Prediction successful: {result['predicted_class']} ({result['confidence']:.2%})")
+
+
+def _async_request(logger, i):
+    result = {'predicted_class': 'Cat', 'confidence': 0.8731}
+    logger.info("Processing prediction for: %s", f"upload_{i}.png", extra=HOT_PATH)
+    logger.info("Prediction successful: %s (%.2f%%)", result['predicted_class'],
+                result['confidence'] * 100, extra=HOT_PATH)
+
+
+def _drive(logger, request_fn, threads, requests_per_thread):
+    """Run request_fn from several threads; return per-request latencies (us) and wall time."""
+    latencies = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(slot):
+        barrier.wait()
+        timings = latencies[slot]
+        for i in range(requests_per_thread):
+            start = time.perf_counter()
+            request_fn(logger, i)
+            timings.append((time.perf_counter() - start) * 1e6)
+
+    workers = [threading.Thread(target=worker, args=(slot,)) for slot in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    return [t for timings in latencies for t in timings], wall
+
+
+def _summarize(latencies, wall):
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'mean_us': statistics.mean(latencies),
+        'p50_us': latencies[len(latencies) // 2],
+        'p99_us': latencies[int(len(latencies) * 0.99)],
+        'max_us': latencies[-1],
+        'requests_per_second': len(latencies) / wall
+    }
+
+
+def run(threads=8, requests_per_thread=5000):
+    """
+    Benchmark both logging setups.
+
+    Args:
+        threads: Concurrent simulated request threads
+        requests_per_thread: Simulated requests per thread
+
+    Returns:
+        dict of results per setup
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir, open(os.devnull, 'w') as devnull:
+        # Previous setup: everything on the request thread
+        sync_dir = os.path.join(tmp_dir, 'sync')
+        os.makedirs(sync_dir)
+        sync_logger = logging.getLogger('bench_logging.sync')
+        sync_logger.propagate = False
+        sync_logger.setLevel(logging.INFO)
+        for handler in _make_handlers(sync_dir, devnull):
+            sync_logger.addHandler(handler)
+        results['sync'] = _summarize(*_drive(sync_logger, _sync_request, threads, requests_per_thread))
+
+        # New setup: enqueue only, sampled hot path
+        async_dir = os.path.join(tmp_dir, 'async')
+        os.makedirs(async_dir)
+        async_logger = logging.getLogger('bench_logging.async')
+        async_logger.propagate = False
+        async_logger.setLevel(logging.INFO)
+        pipeline = AsyncLogging(_make_handlers(async_dir, devnull)).start()
+        pipeline.attach(async_logger)
+        results['async'] = _summarize(*_drive(async_logger, _async_request, threads, requests_per_thread))
+        pipeline.stop()
+
+    results['p99_reduction_pct'] = (1 - results['async']['p99_us'] / results['sync']['p99_us']) * 100
+    results['mean_reduction_pct'] = (1 - results['async']['mean_us'] / results['sync']['mean_us']) * 100
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Logging overhead benchmark')
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=5000, help='Simulated requests per thread')
+    parser.add_argument('--output', default=None, help='Optional JSON output path')
+    args = parser.parse_args()
+
+    results = run(args.threads, args.requests)
+
+    print(f"\n{'Setup':<8} {'Mean (us)':>10} {'p50 (us)':>10} {'p99 (us)':>10} {'Req/s':>10}")
+    for name in ('sync', 'async'):
+        r = results[name]
+        print(f"{name:<8} {r['mean_us']:>10.1f} {r['p50_us']:>10.1f} "
+              f"{r['p99_us']:>10.1f} {r['requests_per_second']:>10.0f}")
+    print(f"\nLogging time per request: mean -{results['mean_reduction_pct']:.0f}%, "
+          f"p99 -{results['p99_reduction_pct']:.0f}%")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Model load-time benchmark.
+
+Compares loading the same randomly-initialized CNN from:
+    - the canonical .keras artifact (full model incl. optimizer and compile config)
+    - a legacy .h5 file
+    - the weights-only fast path (architecture in code + memory-mapped weights),
+      with and without checksum verification
+
+Usage:
+    python benchmarks/bench_model_loading.py --repeats 5 --output results/model_loading.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from tensorflow import keras
+
+from src.model import ImageClassificationModel
+from src.model_store import write_model, manifest_path
+
+
+def _time_it(fn, repeats):
+    """Run fn `repeats` times and return timings in milliseconds."""
+    timings = []
+    for _ in range(repeats):
+        keras.backend.clear_session()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run(repeats=5):
+    """
+    Benchmark all load paths.
+
+    Args:
+        repeats: Timed loads per format
+
+    Returns:
+        dict of results per format
+    """
+    model_classifier = ImageClassificationModel()
+    model_classifier.create_cnn_model()
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        manifest = write_model(
+            model_classifier.model, model_dir, 'cifar10_cnn_model',
+            metadata={'input_shape': model_classifier.input_shape,
+                      'num_classes': model_classifier.num_classes},
+            exports=('weights', 'h5')
+        )
+        manifest_file = manifest_path(model_dir, 'cifar10_cnn_model')
+        keras_path = os.path.join(model_dir, manifest['artifact'])
+        h5_path = os.path.join(model_dir, 'cifar10_cnn_model.h5')
+        weights_path = os.path.join(model_dir, manifest['weights']['file'])
+
+        cases = {
+            'keras_full': (keras_path, lambda: keras.models.load_model(keras_path)),
+            'h5_full': (h5_path, lambda: keras.models.load_model(h5_path)),
+            'weights_only': (weights_path, lambda: ImageClassificationModel()
+                             .load_serving_weights(manifest_file, verify_checksum=False)),
+            'weights_only_verified': (weights_path, lambda: ImageClassificationModel()
+                                      .load_serving_weights(manifest_file)),
+        }
+
+        # Warm up imports and graph construction once
+        for _, fn in cases.values():
+            fn()
+
+        results = {}
+        for name, (path, fn) in cases.items():
+            timings = _time_it(fn, repeats)
+            results[name] = {
+                'file_bytes': os.path.getsize(path),
+                'mean_ms': statistics.mean(timings),
+                'median_ms': statistics.median(timings),
+                'min_ms': min(timings),
+                'repeats': repeats
+            }
+
+    baseline = results['keras_full']['median_ms']
+    for result in results.values():
+        result['speedup_vs_keras'] = baseline / result['median_ms']
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Model load-time benchmark')
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--output', default=None, help='Optional JSON output path')
+    args = parser.parse_args()
+
+    results = run(args.repeats)
+
+    print(f"\n{'Format':<24} {'Size (KB)':>10} {'Median (ms)':>12} {'Speedup':>8}")
+    for name, result in results.items():
+        print(f"{name:<24} {result['file_bytes'] / 1024:>10.0f} "
+              f"{result['median_ms']:>12.1f} {result['speedup_vs_keras']:>7.1f}x")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
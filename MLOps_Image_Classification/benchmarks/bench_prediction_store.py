@@ -0,0 +1,173 @@
+"""
+Prediction store benchmark.
+
+Fills a SQLite prediction store with synthetic rows (one per second, classes
+and confidences drawn like real output) and times the queries behind
+/api/predictions: first page, deep cursor pages, time windows, class and
+confidence filters. Also times the batched writer against the previous
+rewrite-the-whole-JSON persistence for the same number of predictions.
+
+Usage:
+    python benchmarks/bench_prediction_store.py --rows 10000000 --output results/store.json
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.prediction_store import PredictionStore
+from benchmarks.run_benchmarks import make_history, CLASS_NAMES
+
+
+START_TS = 1735689600.0  # 2025-01-01T00:00:00Z
+
+
+def fill(db_path, rows, chunk=200000, seed=0):
+    """Bulk-insert synthetic rows directly (bypasses the writer queue)."""
+    PredictionStore(db_path)  # schema
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(db_path)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=OFF')
+    for offset in range(0, rows, chunk):
+        n = min(chunk, rows - offset)
+        classes = rng.integers(0, len(CLASS_NAMES), size=n)
+        confidences = rng.beta(5, 2, size=n)
+        times = rng.uniform(5, 80, size=n)
+        ts = START_TS + np.arange(offset, offset + n, dtype=np.float64)
+        with conn:
+            conn.executemany(
+                'INSERT INTO predictions (ts, timestamp, predicted_class, predicted_class_index, '
+                'confidence, prediction_time_ms) VALUES (?, ?, ?, ?, ?, ?)',
+                ((float(ts[i]), str(ts[i]), CLASS_NAMES[classes[i]], int(classes[i]),
+                  float(confidences[i]), float(times[i])) for i in range(n))
+            )
+    conn.close()
+
+
+def _time_query(store, repeats, **kwargs):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        page = store.query(**kwargs)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'median_ms': statistics.median(timings),
+        'max_ms': max(timings),
+        'rows': len(page['predictions'])
+    }
+
+
+def bench_queries(store, rows, repeats=20):
+    """Median latency of typical /api/predictions queries."""
+    middle = START_TS + rows // 2
+    results = {
+        'latest_page': _time_query(store, repeats, limit=50),
+        'last_hour': _time_query(store, repeats, since=START_TS + rows - 3600, limit=50),
+        'one_hour_window_mid_table': _time_query(store, repeats, since=middle, until=middle + 3600, limit=50),
+        'class_filter': _time_query(store, repeats, predicted_class='Cat', limit=50),
+        'class_in_window': _time_query(store, repeats, predicted_class='Cat', since=middle,
+                                       until=middle + 86400, limit=50),
+        'low_confidence': _time_query(store, repeats, max_confidence=0.2, limit=50),
+    }
+
+    # Walk 20 pages deep with the cursor; each page should cost the same
+    cursor = None
+    page_ms = []
+    for _ in range(20):
+        start = time.perf_counter()
+        page = store.query(cursor=cursor, limit=50)
+        page_ms.append((time.perf_counter() - start) * 1000)
+        cursor = page['next_cursor']
+    results['cursor_page_20'] = {'median_ms': page_ms[-1], 'max_ms': max(page_ms), 'rows': 50}
+    return results
+
+
+def bench_writes(tmp_dir, predictions=2000):
+    """Per-request persistence cost: full JSON rewrite vs queued store append."""
+    history = make_history(predictions)
+
+    json_path = os.path.join(tmp_dir, 'predictions.json')
+    json_ms = []
+    for i in range(1, predictions + 1):
+        start = time.perf_counter()
+        with open(json_path, 'w') as f:
+            json.dump(history[:i], f, indent=2)
+        json_ms.append((time.perf_counter() - start) * 1000)
+
+    store = PredictionStore(os.path.join(tmp_dir, 'writes.db')).start()
+    store_ms = []
+    for entry in history:
+        start = time.perf_counter()
+        store.append([entry])
+        store_ms.append((time.perf_counter() - start) * 1000)
+    store.stop()
+
+    return {
+        'json_rewrite_mean_ms': statistics.mean(json_ms),
+        'json_rewrite_last_ms': json_ms[-1],
+        'store_append_mean_ms': statistics.mean(store_ms),
+        'store_transactions': store.transactions
+    }
+
+
+def run(rows=1000000, repeats=20, write_predictions=2000):
+    """
+    Benchmark store queries at the given table size and per-request writes.
+
+    Returns:
+        dict of results
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'predictions.db')
+        start = time.perf_counter()
+        fill(db_path, rows)
+        fill_seconds = time.perf_counter() - start
+
+        store = PredictionStore(db_path)
+        results = {
+            'rows': rows,
+            'fill_seconds': fill_seconds,
+            'queries': bench_queries(store, rows, repeats),
+            'writes': bench_writes(tmp_dir, write_predictions)
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Prediction store benchmark')
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--writes', type=int, default=2000, help='Predictions for the write comparison')
+    parser.add_argument('--output', default=None, help='Optional JSON output path')
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeats, args.writes)
+
+    print(f"\n{results['rows']:,} rows (filled in {results['fill_seconds']:.1f}s)")
+    print(f"\n{'Query':<28} {'Median (ms)':>12} {'Max (ms)':>10}")
+    for name, r in results['queries'].items():
+        print(f"{name:<28} {r['median_ms']:>12.2f} {r['max_ms']:>10.2f}")
+    w = results['writes']
+    print(f"\nPersistence per request: JSON rewrite {w['json_rewrite_mean_ms']:.2f} ms mean "
+          f"({w['json_rewrite_last_ms']:.2f} ms at the end), store append "
+          f"{w['store_append_mean_ms']:.3f} ms ({w['store_transactions']} transactions)")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults saved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
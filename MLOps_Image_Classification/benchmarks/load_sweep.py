@@ -0,0 +1,418 @@
+"""
+Load-sweep harness: finds the concurrency level at which the API saturates.
+
+The harness
+    1. writes a randomly-initialized stand-in model to a scratch directory,
+    2. boots app.py against it with rate limiting off (models, persistence,
+       uploads and logs all live in the scratch directory),
+    3. runs locust headless at increasing user counts with the
+       locustfile_improved.py user classes,
+    4. finds the knee: the first level whose p99 exceeds the target or whose
+       error rate exceeds the limit,
+    5. writes a capacity report (max sustainable RPS, latency curve, error
+       breakdown) as JSON with stable key order, so reports from two commits
+       can be diffed or compared with --compare.
+
+Usage:
+    python benchmarks/load_sweep.py
+    python benchmarks/load_sweep.py --users 1 2 4 8 16 32 --run-time 30 --p99-target-ms 1000
+    python benchmarks/load_sweep.py --user-classes HighLoadUser --compare results/capacity/previous.json
+"""
+
+import os
+import re
+import csv
+import sys
+import json
+import time
+import socket
+import argparse
+import contextlib
+import platform
+import tempfile
+import subprocess
+import urllib.request
+from datetime import datetime
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, PROJECT_DIR)
+
+LOCUSTFILE = os.path.join(PROJECT_DIR, 'locustfile_improved.py')
+DEFAULT_OUTPUT = os.path.join(PROJECT_DIR, 'results', 'capacity', 'capacity_report.json')
+DEFAULT_USERS = (1, 2, 4, 8, 16, 32, 64)
+
+STATUS_CODE_RE = re.compile(r'\b([45]\d\d)\b')
+
+
+def find_free_port():
+    """Ask the OS for an unused TCP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def prepare_stand_in_model(model_dir):
+    """
+    Write a randomly-initialized CNN in the serving format.
+
+    Args:
+        model_dir: Directory the app will load models from
+    """
+    from src.model import ImageClassificationModel
+
+    model_classifier = ImageClassificationModel()
+    model_classifier.create_cnn_model()
+    model_classifier.save_model(model_dir=model_dir, exports=('weights',))
+
+
+def start_app(work_dir, port, admission=True, extra_env=None):
+    """
+    Boot app.py against the scratch directory.
+
+    Args:
+        work_dir: Scratch directory (models/, persistence/, uploads/, logs)
+        port: Port for the API
+        admission: Whether admission control stays enabled
+        extra_env: Additional environment variables
+
+    Returns:
+        subprocess.Popen
+    """
+    env = dict(os.environ)
+    env.update({
+        'FLASK_ENV': 'production',
+        'FLASK_DEBUG': 'False',
+        'HOST': '127.0.0.1',
+        'PORT': str(port),
+        'RATE_LIMIT_ENABLED': 'False',
+        'ADMISSION_CONTROL_ENABLED': str(admission),
+        'MODEL_DIR': os.path.join(work_dir, 'models'),
+        'PERSISTENCE_DIR': os.path.join(work_dir, 'persistence'),
+        'UPLOAD_FOLDER': os.path.join(work_dir, 'uploads'),
+        'CHECKPOINT_DIR': os.path.join(work_dir, 'checkpoints'),
+        'PROFILE_DIR': os.path.join(work_dir, 'profiles'),
+        'LOG_FILE': os.path.join(work_dir, 'app.log'),
+        'METRICS_PORT': str(find_free_port()),
+        'PYTHONUNBUFFERED': '1'
+    })
+    env.update(extra_env or {})
+
+    server_log = open(os.path.join(work_dir, 'server.out'), 'w')
+    return subprocess.Popen(
+        [sys.executable, os.path.join(PROJECT_DIR, 'app.py')],
+        cwd=PROJECT_DIR, env=env, stdout=server_log, stderr=subprocess.STDOUT
+    )
+
+
+def wait_for_health(host, process, timeout=180):
+    """
+    Poll /api/health until the app answers.
+
+    Raises:
+        RuntimeError: If the app exits or does not become healthy in time
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App exited during start-up (code {process.returncode})")
+        try:
+            with urllib.request.urlopen(f"{host}/api/health", timeout=2) as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        time.sleep(1)
+    raise RuntimeError(f"App did not become healthy within {timeout}s")
+
+
+def run_locust_level(host, users, run_time, csv_prefix, user_classes):
+    """
+    Run one headless locust level.
+
+    Stats are reset once all users are spawned, so ramp-up is not measured.
+
+    Args:
+        host: Base URL of the app
+        users: Concurrent simulated users
+        run_time: Seconds to run
+        csv_prefix: Prefix for locust CSV output
+        user_classes: Locust user class names
+    """
+    command = [
+        sys.executable, '-m', 'locust',
+        '-f', LOCUSTFILE,
+        '--headless', '--only-summary', '--reset-stats',
+        '--host', host,
+        '--users', str(users),
+        '--spawn-rate', str(users),
+        '--run-time', f'{run_time}s',
+        '--csv', csv_prefix,
+        '--exit-code-on-error', '0',
+        *user_classes
+    ]
+    subprocess.run(command, cwd=PROJECT_DIR, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL, check=False)
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def classify_error(message):
+    """Bucket a locust error message by HTTP status (or 'connection')."""
+    match = STATUS_CODE_RE.search(message)
+    return f'http_{match.group(1)}' if match else 'connection'
+
+
+def parse_locust_csv(csv_prefix):
+    """
+    Summarize one level from locust's CSV output.
+
+    Args:
+        csv_prefix: Prefix passed to --csv
+
+    Returns:
+        dict with throughput, latency percentiles, error rate and breakdowns
+    """
+    with open(f'{csv_prefix}_stats.csv', newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    def summarize(row):
+        requests = int(row['Request Count'])
+        failures = int(row['Failure Count'])
+        return {
+            'requests': requests,
+            'failures': failures,
+            'error_rate': failures / requests if requests else 0.0,
+            'rps': _as_float(row['Requests/s']),
+            'avg_ms': _as_float(row['Average Response Time']),
+            'p50_ms': _as_float(row['50%']),
+            'p95_ms': _as_float(row['95%']),
+            'p99_ms': _as_float(row['99%']),
+            'max_ms': _as_float(row['Max Response Time'])
+        }
+
+    level = {'endpoints': {}}
+    for row in rows:
+        if row['Name'] == 'Aggregated':
+            level.update(summarize(row))
+        else:
+            level['endpoints'][row['Name']] = summarize(row)
+
+    errors = {}
+    by_status = {}
+    failures_file = f'{csv_prefix}_failures.csv'
+    if os.path.exists(failures_file):
+        with open(failures_file, newline='') as f:
+            for row in csv.DictReader(f):
+                count = int(row['Occurrences'])
+                key = f"{row['Name']}: {row['Error']}"
+                errors[key] = errors.get(key, 0) + count
+                bucket = classify_error(row['Error'])
+                by_status[bucket] = by_status.get(bucket, 0) + count
+
+    level['errors'] = dict(sorted(errors.items()))
+    level['errors_by_status'] = dict(sorted(by_status.items()))
+    level['successful_rps'] = (level.get('rps') or 0.0) * (1 - level.get('error_rate', 0.0))
+    return level
+
+
+def find_knee(levels, p99_target_ms, max_error_rate):
+    """
+    Locate the saturation point of a sweep.
+
+    Args:
+        levels: Level summaries in increasing user order
+        p99_target_ms: Latency objective for the aggregated p99
+        max_error_rate: Highest acceptable failure fraction
+
+    Returns:
+        dict with the knee (first violating level) and the sustainable capacity
+        (best successful RPS among levels within the objective)
+    """
+    def within_slo(level):
+        return (level.get('p99_ms') is not None
+                and level['p99_ms'] <= p99_target_ms
+                and level['error_rate'] <= max_error_rate)
+
+    knee = next((level for level in levels if not within_slo(level)), None)
+    sustainable = [level for level in levels if within_slo(level)
+                   and (knee is None or level['users'] < knee['users'])]
+    best = max(sustainable, key=lambda level: level['successful_rps'], default=None)
+
+    return {
+        'knee_users': knee['users'] if knee else None,
+        'knee_p99_ms': knee['p99_ms'] if knee else None,
+        'knee_error_rate': knee['error_rate'] if knee else None,
+        'knee_reason': (None if knee is None else
+                        'p99' if (knee.get('p99_ms') or 0) > p99_target_ms else 'errors'),
+        'max_sustainable_rps': best['successful_rps'] if best else 0.0,
+        'max_sustainable_users': best['users'] if best else None,
+        'p99_at_max_sustainable_ms': best['p99_ms'] if best else None,
+        'saturated': knee is not None
+    }
+
+
+def git_commit():
+    """Commit the report was produced from (None outside a git checkout)."""
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR,
+            stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_reports(current, previous):
+    """
+    Capacity change between two reports.
+
+    Returns:
+        dict with before/after values of the headline numbers
+    """
+    keys = ('max_sustainable_rps', 'max_sustainable_users', 'p99_at_max_sustainable_ms', 'knee_users')
+    diff = {}
+    for key in keys:
+        before = previous['capacity'].get(key)
+        after = current['capacity'].get(key)
+        entry = {'before': before, 'after': after}
+        if isinstance(before, (int, float)) and isinstance(after, (int, float)) and before:
+            entry['change_pct'] = (after / before - 1) * 100
+        diff[key] = entry
+    diff['previous_commit'] = previous.get('meta', {}).get('commit')
+    return diff
+
+
+def run_sweep(users_levels=DEFAULT_USERS, run_time=30, p99_target_ms=1000, max_error_rate=0.01,
+              user_classes=('ImageClassificationUser',), admission=True, stop_after_knee=True,
+              work_dir=None):
+    """
+    Boot the app and sweep the concurrency levels.
+
+    Args:
+        users_levels: Simulated user counts, increasing
+        run_time: Seconds per level
+        p99_target_ms: Latency objective for the knee
+        max_error_rate: Error objective for the knee
+        user_classes: locustfile_improved.py user classes to run
+        admission: Keep admission control enabled
+        stop_after_knee: Skip the levels after the first violating one
+        work_dir: Keep the scratch directory (server logs, locust CSVs) here
+            instead of a temporary one
+
+    Returns:
+        capacity report dict
+    """
+    levels = []
+    with (tempfile.TemporaryDirectory() if work_dir is None
+          else contextlib.nullcontext(work_dir)) as work_dir:
+        os.makedirs(work_dir, exist_ok=True)
+        prepare_stand_in_model(os.path.join(work_dir, 'models'))
+
+        port = find_free_port()
+        host = f'http://127.0.0.1:{port}'
+        process = start_app(work_dir, port, admission=admission)
+        try:
+            wait_for_health(host, process)
+
+            for users in sorted(users_levels):
+                csv_prefix = os.path.join(work_dir, f'level_{users}')
+                print(f"Running {users} users for {run_time}s...")
+                run_locust_level(host, users, run_time, csv_prefix, user_classes)
+
+                level = {'users': users, **parse_locust_csv(csv_prefix)}
+                levels.append(level)
+                print(f"  {level['rps']:.1f} rps, p99 {level['p99_ms']} ms, "
+                      f"errors {level['error_rate']:.1%}")
+
+                if stop_after_knee and find_knee(levels, p99_target_ms, max_error_rate)['saturated']:
+                    break
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'user_classes': list(user_classes),
+            'run_time_seconds': run_time,
+            'admission_control': admission,
+            'rate_limiting': False
+        },
+        'objectives': {
+            'p99_target_ms': p99_target_ms,
+            'max_error_rate': max_error_rate
+        },
+        'capacity': find_knee(levels, p99_target_ms, max_error_rate),
+        'latency_curve': [
+            {key: level[key] for key in ('users', 'rps', 'successful_rps', 'p50_ms', 'p95_ms',
+                                         'p99_ms', 'error_rate')}
+            for level in levels
+        ],
+        'levels': levels
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrency sweep to find the API saturation point')
+    parser.add_argument('--users', type=int, nargs='+', default=list(DEFAULT_USERS))
+    parser.add_argument('--run-time', type=int, default=30, help='Seconds per level')
+    parser.add_argument('--p99-target-ms', type=float, default=1000)
+    parser.add_argument('--max-error-rate', type=float, default=0.01)
+    parser.add_argument('--user-classes', nargs='+', default=['ImageClassificationUser'],
+                        help='User classes from locustfile_improved.py')
+    parser.add_argument('--no-admission', action='store_true',
+                        help='Disable admission control (measure raw queueing instead of shedding)')
+    parser.add_argument('--full-sweep', action='store_true',
+                        help='Keep running levels after the knee')
+    parser.add_argument('--work-dir', default=None,
+                        help='Keep server logs and locust CSVs in this directory')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--compare', default=None, help='Earlier capacity report to compare against')
+    args = parser.parse_args()
+
+    report = run_sweep(
+        users_levels=args.users,
+        run_time=args.run_time,
+        p99_target_ms=args.p99_target_ms,
+        max_error_rate=args.max_error_rate,
+        user_classes=args.user_classes,
+        admission=not args.no_admission,
+        stop_after_knee=not args.full_sweep,
+        work_dir=args.work_dir
+    )
+
+    if args.compare:
+        with open(args.compare) as f:
+            report['comparison'] = compare_reports(report, json.load(f))
+
+    capacity = report['capacity']
+    print(f"\n{'Users':>6} {'RPS':>8} {'OK RPS':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'Errors':>8}")
+    for point in report['latency_curve']:
+        print(f"{point['users']:>6} {point['rps']:>8.1f} {point['successful_rps']:>8.1f} "
+              f"{point['p50_ms']:>8.0f} {point['p95_ms']:>8.0f} {point['p99_ms']:>8.0f} "
+              f"{point['error_rate']:>8.1%}")
+    print(f"\nMax sustainable: {capacity['max_sustainable_rps']:.1f} rps "
+          f"at {capacity['max_sustainable_users']} users")
+    if capacity['saturated']:
+        print(f"Knee: {capacity['knee_users']} users ({capacity['knee_reason']})")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"\nCapacity report saved: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
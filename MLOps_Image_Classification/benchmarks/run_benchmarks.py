@@ -0,0 +1,424 @@
+"""
+Micro-benchmark suite for the serving and evaluation hot paths.
+
+Benchmarks (all offline, using a randomly-initialized stand-in CNN):
+    - preprocessing: DataPreprocessor.load_and_preprocess_uploaded_image for
+      several image sizes and formats
+    - inference: predict_single_image (one call per image) vs predict_batch
+      at several batch sizes
+    - persistence: save_to_persistence / load_from_persistence and
+      get_prediction_statistics at 1k/100k/1M history entries
+    - evaluation: ImageClassificationModel.evaluate_model
+
+Results are written as JSON. When a baseline exists, every case is compared
+against it and flagged as a regression if its median is more than
+`--tolerance` slower. Baselines are machine-specific: the report records a
+host fingerprint (CPU, core count, Python and TensorFlow versions), and a
+baseline from another host is not compared against; regenerate it with
+--update-baseline.
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --quick --groups preprocessing inference
+    python benchmarks/run_benchmarks.py --fail-on-regression
+    python benchmarks/run_benchmarks.py --update-baseline
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import contextlib
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from PIL import Image
+import tensorflow as tf
+from tensorflow import keras
+
+from src.model import ImageClassificationModel
+from src.preprocessing import DataPreprocessor
+from src.prediction import ImagePredictor
+from benchmarks.load_sweep import git_commit
+
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'baseline.json')
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, '..', 'results', 'benchmarks', 'latest.json')
+
+CLASS_NAMES = ['Airplane', 'Automobile', 'Bird', 'Cat', 'Deer',
+               'Dog', 'Frog', 'Horse', 'Ship', 'Truck']
+
+IMAGE_SIZES = ((32, 32), (224, 224), (1024, 768))
+IMAGE_FORMATS = ('PNG', 'JPEG')
+BATCH_SIZES = (1, 8, 32, 128)
+HISTORY_SIZES = (1_000, 100_000, 1_000_000)
+QUICK_HISTORY_SIZES = (1_000, 10_000)
+EVALUATION_SAMPLES = 1_000
+
+GROUPS = ('preprocessing', 'inference', 'persistence', 'evaluation')
+
+
+def time_call(fn, repeats=5, warmup=1, setup=None):
+    """
+    Time a callable.
+
+    Args:
+        fn: Function to time
+        repeats: Timed runs
+        warmup: Untimed runs before measuring
+        setup: Optional function run (untimed) before every call
+
+    Returns:
+        dict with median/mean/min/max in milliseconds
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+
+    timings = []
+    for _ in range(repeats):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'median_ms': statistics.median(timings),
+        'mean_ms': statistics.mean(timings),
+        'min_ms': min(timings),
+        'max_ms': max(timings),
+        'repeats': repeats
+    }
+
+
+def make_stand_in_model():
+    """Randomly-initialized CNN with the production architecture."""
+    keras.utils.set_random_seed(42)
+    model_classifier = ImageClassificationModel()
+    model_classifier.create_cnn_model()
+    return model_classifier
+
+
+def make_history(n, seed=0):
+    """
+    Synthetic prediction history shaped like ImagePredictor results.
+
+    Args:
+        n: Number of entries
+        seed: Random seed
+
+    Returns:
+        list of prediction dicts
+    """
+    rng = np.random.default_rng(seed)
+    probabilities = rng.dirichlet(np.ones(len(CLASS_NAMES)), size=n)
+    times = rng.uniform(5, 80, size=n)
+    start = datetime(2025, 1, 1)
+
+    history = []
+    for i in range(n):
+        probs = probabilities[i]
+        idx = int(np.argmax(probs))
+        history.append({
+            'predicted_class': CLASS_NAMES[idx],
+            'predicted_class_index': idx,
+            'confidence': float(probs[idx]),
+            'prediction_time_ms': float(times[i]),
+            'timestamp': (start + timedelta(seconds=i)).isoformat(),
+            'all_probabilities': {name: float(p) for name, p in zip(CLASS_NAMES, probs)},
+            'file_path': f'uploads/image_{i}.png',
+            'file_name': f'image_{i}.png'
+        })
+    return history
+
+
+def bench_preprocessing(repeats=20):
+    """Time upload decoding/resizing for each image size and format."""
+    preprocessor = DataPreprocessor()
+    rng = np.random.default_rng(0)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for width, height in IMAGE_SIZES:
+            pixels = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+            for fmt in IMAGE_FORMATS:
+                path = os.path.join(tmp_dir, f'image_{width}x{height}.{fmt.lower()}')
+                Image.fromarray(pixels).save(path, format=fmt)
+                results[f'preprocess_{fmt.lower()}_{width}x{height}'] = {
+                    **time_call(lambda: preprocessor.load_and_preprocess_uploaded_image(path),
+                                repeats=repeats),
+                    'file_bytes': os.path.getsize(path)
+                }
+    return results
+
+
+def bench_inference(model_classifier, repeats=3):
+    """Compare per-image predict_single_image calls against predict_batch."""
+    predictor = ImagePredictor(model_classifier.model, CLASS_NAMES)
+    rng = np.random.default_rng(0)
+    results = {}
+
+    for batch_size in BATCH_SIZES:
+        images = rng.random((batch_size, 32, 32, 3), dtype=np.float32)
+
+        def single():
+            for image in images:
+                predictor.predict_single_image(image)
+
+        def batch():
+            predictor.predict_batch(images)
+
+        for name, fn in (('single', single), ('batch', batch)):
+            result = time_call(fn, repeats=repeats, setup=predictor.clear_history)
+            result['per_image_ms'] = result['median_ms'] / batch_size
+            results[f'predict_{name}_x{batch_size}'] = result
+
+    return results
+
+
+def bench_persistence(history_sizes=HISTORY_SIZES):
+    """Time persistence round trips and statistics for growing histories."""
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in history_sizes:
+            history = make_history(size)
+            persistence_file = os.path.join(tmp_dir, f'predictions_{size}.json')
+            predictor = ImagePredictor(None, CLASS_NAMES, persistence_file=persistence_file)
+            predictor.prediction_history = history
+
+            # Large histories take seconds per call; fewer repeats keep the suite usable
+            repeats = 5 if size <= 10_000 else (3 if size <= 100_000 else 1)
+            warmup = 1 if size <= 100_000 else 0
+
+            results[f'save_to_persistence_{size}'] = time_call(
+                predictor.save_to_persistence, repeats=repeats, warmup=warmup
+            )
+            results[f'save_to_persistence_{size}']['file_bytes'] = os.path.getsize(persistence_file)
+
+            results[f'get_prediction_statistics_{size}'] = time_call(
+                predictor.get_prediction_statistics, repeats=repeats, warmup=warmup
+            )
+
+            # Free the in-memory history before loading a second copy
+            del history, predictor
+            loader = ImagePredictor(None, CLASS_NAMES, persistence_file=persistence_file)
+            with contextlib.redirect_stdout(io.StringIO()):
+                results[f'load_from_persistence_{size}'] = time_call(
+                    loader.load_from_persistence, repeats=repeats, warmup=warmup
+                )
+
+            del loader
+            os.remove(persistence_file)
+
+    return results
+
+
+def bench_evaluation(model_classifier, num_samples=EVALUATION_SAMPLES, repeats=3):
+    """Time evaluate_model on a random labelled sample."""
+    rng = np.random.default_rng(0)
+    X_test = rng.random((num_samples, 32, 32, 3), dtype=np.float32)
+    y_test = keras.utils.to_categorical(rng.integers(0, 10, num_samples), 10)
+
+    return {
+        f'evaluate_model_{num_samples}': time_call(
+            lambda: model_classifier.evaluate_model(X_test, y_test, CLASS_NAMES),
+            repeats=repeats
+        )
+    }
+
+
+def cpu_model():
+    """CPU model name (from /proc/cpuinfo on Linux)."""
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    return line.split(':', 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def host_fingerprint():
+    """What the timings depend on besides the code."""
+    return {
+        'cpu_model': cpu_model(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'tensorflow': tf.__version__
+    }
+
+
+def run(groups=GROUPS, quick=False):
+    """
+    Run the benchmark groups.
+
+    Args:
+        groups: Subset of GROUPS to run
+        quick: Use smaller persistence sizes (for CI smoke runs)
+
+    Returns:
+        dict with 'meta' and 'results'
+    """
+    random.seed(0)
+    model_classifier = None
+    if 'inference' in groups or 'evaluation' in groups:
+        model_classifier = make_stand_in_model()
+
+    results = {}
+    if 'preprocessing' in groups:
+        results.update(bench_preprocessing())
+    if 'inference' in groups:
+        results.update(bench_inference(model_classifier))
+    if 'persistence' in groups:
+        results.update(bench_persistence(QUICK_HISTORY_SIZES if quick else HISTORY_SIZES))
+    if 'evaluation' in groups:
+        results.update(bench_evaluation(model_classifier))
+
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'tensorflow': tf.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'host': host_fingerprint(),
+            'commit': git_commit(),
+            'groups': list(groups),
+            'quick': quick
+        },
+        'results': results
+    }
+
+
+def baseline_mismatch(report, baseline):
+    """
+    Host fingerprint fields that differ between a report and a baseline.
+
+    Returns:
+        list of field names (['host'] if the baseline has no fingerprint);
+        empty if the two are comparable
+    """
+    expected = baseline.get('meta', {}).get('host')
+    if expected is None:
+        return ['host']
+    actual = report['meta']['host']
+    return sorted(key for key in set(expected) | set(actual) if expected.get(key) != actual.get(key))
+
+
+def compare_to_baseline(report, baseline, tolerance=0.25, min_delta_ms=1.0):
+    """
+    Flag cases that got slower than the baseline.
+
+    Each result gains 'baseline_median_ms', 'change_pct' and 'regression'.
+    Cases missing from the baseline are reported with regression=False.
+    Sub-millisecond cases jitter by tens of percent, so a slowdown must also
+    exceed `min_delta_ms` in absolute terms to count.
+
+    Args:
+        report: Output of run()
+        baseline: Earlier output of run()
+        tolerance: Allowed relative slowdown of the median (0.25 = 25%)
+        min_delta_ms: Smallest absolute slowdown reported as a regression
+
+    Returns:
+        list of regressed case names
+    """
+    regressions = []
+    baseline_results = baseline.get('results', {})
+
+    for name, result in report['results'].items():
+        reference = baseline_results.get(name)
+        if reference is None:
+            result.update({'baseline_median_ms': None, 'change_pct': None, 'regression': False})
+            continue
+
+        change = result['median_ms'] / reference['median_ms'] - 1
+        result['baseline_median_ms'] = reference['median_ms']
+        result['change_pct'] = change * 100
+        result['regression'] = (change > tolerance
+                                and result['median_ms'] - reference['median_ms'] > min_delta_ms)
+        if result['regression']:
+            regressions.append(name)
+
+    report['regressions'] = regressions
+    report['tolerance'] = tolerance
+    report['min_delta_ms'] = min_delta_ms
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hot-path micro-benchmarks')
+    parser.add_argument('--groups', nargs='+', choices=GROUPS, default=list(GROUPS))
+    parser.add_argument('--quick', action='store_true',
+                        help='Smaller persistence sizes (1k/10k instead of 1k/100k/1M)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Allowed slowdown vs. baseline before flagging (0.25 = 25%%)')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help='Ignore slowdowns smaller than this many milliseconds')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Write this run as the new baseline')
+    parser.add_argument('--fail-on-regression', action='store_true',
+                        help='Exit with status 1 if any case regressed')
+    args = parser.parse_args()
+
+    report = run(args.groups, quick=args.quick)
+
+    regressions = []
+    mismatch = []
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        mismatch = baseline_mismatch(report, baseline)
+        if mismatch:
+            report['baseline_mismatch'] = mismatch
+        else:
+            regressions = compare_to_baseline(report, baseline, args.tolerance, args.min_delta_ms)
+
+    print(f"\n{'Case':<42} {'Median (ms)':>12} {'Baseline':>10} {'Change':>8}")
+    for name, result in report['results'].items():
+        baseline_ms = result.get('baseline_median_ms')
+        change = result.get('change_pct')
+        baseline_text = '-' if baseline_ms is None else f'{baseline_ms:.2f}'
+        change_text = '' if change is None else f'{change:+.0f}%'
+        flag = '  REGRESSION' if result.get('regression') else ''
+        print(f"{name:<42} {result['median_ms']:>12.2f} {baseline_text:>10} {change_text:>8}{flag}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved: {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+
+    if mismatch:
+        print(f"\nNot compared: the baseline was recorded on another host (differs in: "
+              f"{', '.join(mismatch)}). Regenerate it with --update-baseline.")
+        if args.fail_on_regression:
+            sys.exit(2)
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
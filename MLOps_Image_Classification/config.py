@@ -26,16 +26,71 @@ class Config:
     UPLOAD_FOLDER = os.path.join(BASE_DIR, os.getenv('UPLOAD_FOLDER', 'uploads'))
     MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
     ALLOWED_EXTENSIONS = set(os.getenv('ALLOWED_EXTENSIONS', 'png,jpg,jpeg').split(','))
+    # Largest batch accepted by /api/predict/tensor
+    TENSOR_MAX_BATCH = int(os.getenv('TENSOR_MAX_BATCH', 64))
+    # Uploads are checked from their header before decoding (see src/image_validation.py)
+    IMAGE_MAX_DIMENSION = int(os.getenv('IMAGE_MAX_DIMENSION', 8192))
+    IMAGE_MAX_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', 25_000_000))
+    IMAGE_MAX_FRAMES = int(os.getenv('IMAGE_MAX_FRAMES', 1))
+    # JPEGs above this many pixels are decoded at reduced size
+    IMAGE_DOWNSCALE_PIXELS = int(os.getenv('IMAGE_DOWNSCALE_PIXELS', 1_000_000))
+    # Load only inference weights (no optimizer) into an architecture built in code
+    SERVING_FAST_LOAD = os.getenv('SERVING_FAST_LOAD', 'True').lower() == 'true'
+    # 'graph': uploads are decoded and resized inside the TF graph (src/graph_serving.py)
+    # instead of by PIL; images of a batch upload are decoded in parallel
+    PREDICTION_BACKEND = os.getenv('PREDICTION_BACKEND', 'pil').lower()
+    GRAPH_PARALLEL_ITERATIONS = int(os.getenv('GRAPH_PARALLEL_ITERATIONS', 8))
     
     # API Configuration
     API_VERSION = os.getenv('API_VERSION', 'v1')
     HOST = os.getenv('HOST', '0.0.0.0')
     PORT = int(os.getenv('PORT', 5000))
+    # /api/model/uptime body refresh interval (its uptime and current_time are at most
+    # this stale); polls in between revalidate with 304
+    UPTIME_CACHE_RESOLUTION_SECONDS = float(os.getenv('UPTIME_CACHE_RESOLUTION_SECONDS', 1))
+    
+    # Pre-fork serving (serve.py): 0 workers / intra-op threads means auto-tune
+    SERVE_WORKERS = int(os.getenv('SERVE_WORKERS', 0))
+    SERVE_INTRA_OP_THREADS = int(os.getenv('SERVE_INTRA_OP_THREADS', 0))
+    SERVE_INTER_OP_THREADS = int(os.getenv('SERVE_INTER_OP_THREADS', 1))
+    SERVE_THREADS_PER_WORKER = int(os.getenv('SERVE_THREADS_PER_WORKER', 8))
+    SERVE_MAX_WORKERS = int(os.getenv('SERVE_MAX_WORKERS', 4))
+    SERVE_AUTOTUNE_SECONDS = float(os.getenv('SERVE_AUTOTUNE_SECONDS', 3))
+    # Workers actually started by serve.py (set in each worker; not an environment setting)
+    SERVE_ACTIVE_WORKERS = 1
+    # 'remote': HTTP workers send decoded pixels to one inference server process
+    # (src/inference_server.py, started by serve.py) instead of loading the model
+    INFERENCE_MODE = os.getenv('INFERENCE_MODE', 'local').lower()
+    INFERENCE_SOCKET = os.getenv('INFERENCE_SOCKET', '/tmp/mlops_inference.sock')
+    INFERENCE_MAX_BATCH = int(os.getenv('INFERENCE_MAX_BATCH', 64))
+    INFERENCE_MAX_WAIT_MS = float(os.getenv('INFERENCE_MAX_WAIT_MS', 0))
+    INFERENCE_TIMEOUT_SECONDS = float(os.getenv('INFERENCE_TIMEOUT_SECONDS', 30))
+    
+    # Server-sent events (/api/events)
+    SSE_MIN_INTERVAL_SECONDS = float(os.getenv('SSE_MIN_INTERVAL_SECONDS', 1.0))
+    SSE_POLL_INTERVAL_SECONDS = float(os.getenv('SSE_POLL_INTERVAL_SECONDS', 5.0))
+    SSE_HEARTBEAT_SECONDS = float(os.getenv('SSE_HEARTBEAT_SECONDS', 15.0))
+    SSE_MAX_STREAM_SECONDS = float(os.getenv('SSE_MAX_STREAM_SECONDS', 300))
+    SSE_MAX_SUBSCRIBERS = int(os.getenv('SSE_MAX_SUBSCRIBERS', 100))
     
     # Rate Limiting
     RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'True').lower() == 'true'
     RATE_LIMIT_STORAGE_URL = os.getenv('RATE_LIMIT_STORAGE_URL', 'memory://')
     RATE_LIMIT_DEFAULT = os.getenv('RATE_LIMIT_DEFAULT', '200 per day, 50 per hour')
+    PREDICT_RATE_LIMIT = os.getenv('PREDICT_RATE_LIMIT', '30 per minute')
+    BATCH_PREDICT_RATE_LIMIT = os.getenv('BATCH_PREDICT_RATE_LIMIT', '10 per minute')
+    
+    # Admission Control (load shedding on inference endpoints)
+    ADMISSION_CONTROL_ENABLED = os.getenv('ADMISSION_CONTROL_ENABLED', 'True').lower() == 'true'
+    ADMISSION_LATENCY_TARGET_MS = float(os.getenv('ADMISSION_LATENCY_TARGET_MS', 500))
+    # Wall-clock target for /api/predict/batch requests (their own moving average)
+    ADMISSION_BATCH_LATENCY_TARGET_MS = float(os.getenv('ADMISSION_BATCH_LATENCY_TARGET_MS', 5000))
+    ADMISSION_MAX_IN_FLIGHT = int(os.getenv('ADMISSION_MAX_IN_FLIGHT', 8))
+    ADMISSION_MIN_IN_FLIGHT = int(os.getenv('ADMISSION_MIN_IN_FLIGHT', 1))
+    
+    # Response Encoding (gzip only when the client accepts it)
+    RESPONSE_GZIP_MIN_BYTES = int(os.getenv('RESPONSE_GZIP_MIN_BYTES', 1024))
+    RESPONSE_GZIP_LEVEL = int(os.getenv('RESPONSE_GZIP_LEVEL', 6))
     
     # Logging Configuration
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -45,6 +100,11 @@ class Config:
         'LOG_FORMAT',
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
+    LOG_ASYNC = os.getenv('LOG_ASYNC', 'True').lower() == 'true'
+    LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+    LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.01))
+    LOG_HOT_PATH_BURST = int(os.getenv('LOG_HOT_PATH_BURST', 10))
+    LOG_SUMMARY_INTERVAL = float(os.getenv('LOG_SUMMARY_INTERVAL', 1.0))
     
     # Model Training Configuration
     DEFAULT_EPOCHS = int(os.getenv('DEFAULT_EPOCHS', 15))
@@ -52,28 +112,85 @@ class Config:
     RETRAINING_EPOCHS = int(os.getenv('RETRAINING_EPOCHS', 15))
     RETRAINING_BATCH_SIZE = int(os.getenv('RETRAINING_BATCH_SIZE', 64))
     
+    # Retraining Checkpoints
+    CHECKPOINT_DIR = os.path.join(BASE_DIR, os.getenv('CHECKPOINT_DIR', 'checkpoints'))
+    CHECKPOINT_EVERY_EPOCHS = int(os.getenv('CHECKPOINT_EVERY_EPOCHS', 1))
+    CHECKPOINT_MAX_TO_KEEP = int(os.getenv('CHECKPOINT_MAX_TO_KEEP', 2))
+    CHECKPOINT_KEEP_RUNS = int(os.getenv('CHECKPOINT_KEEP_RUNS', 3))
+    
+    # Drift monitoring: /api/retrain only runs once the drift score reaches the threshold
+    REFERENCE_PROFILE_FILE = os.path.join(MODEL_DIR, os.getenv('REFERENCE_PROFILE_FILE', 'reference_profile.json'))
+    DRIFT_THRESHOLD = float(os.getenv('DRIFT_THRESHOLD', 0.25))
+    DRIFT_HALF_LIFE = int(os.getenv('DRIFT_HALF_LIFE', 2000))
+    DRIFT_MIN_SAMPLES = int(os.getenv('DRIFT_MIN_SAMPLES', 200))
+    
+    # Distributed Training Configuration
+    DISTRIBUTED_NUM_WORKERS = int(os.getenv('DISTRIBUTED_NUM_WORKERS', 2))
+    
     # Monitoring Configuration
     ENABLE_METRICS = os.getenv('ENABLE_METRICS', 'True').lower() == 'true'
     METRICS_PORT = int(os.getenv('METRICS_PORT', 9090))
     
+    # Admin / Profiling Configuration (admin endpoints are disabled without a token)
+    ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+    PROFILE_DIR = os.path.join(BASE_DIR, os.getenv('PROFILE_DIR', 'profiles'))
+    PROFILE_MAX_SECONDS = float(os.getenv('PROFILE_MAX_SECONDS', 60))
+    PROFILE_MAX_REQUESTS = int(os.getenv('PROFILE_MAX_REQUESTS', 1000))
+    PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', 5))
+    
+    # Shadow Evaluation of candidate models (POST /api/admin/shadow)
+    SHADOW_SAMPLE_RATE = float(os.getenv('SHADOW_SAMPLE_RATE', 0.1))
+    SHADOW_QUEUE_SIZE = int(os.getenv('SHADOW_QUEUE_SIZE', 64))
+    SHADOW_MAX_DEFER_MS = float(os.getenv('SHADOW_MAX_DEFER_MS', 1000))
+    
     # Data directories
     DATA_DIR = os.path.join(BASE_DIR, 'data')
     TRAIN_DIR = os.path.join(DATA_DIR, 'train')
     TEST_DIR = os.path.join(DATA_DIR, 'test')
+    # Uploaded training samples as packed 32x32 uint8 shards (see src/training_shards.py)
+    TRAINING_SHARDS_DIR = os.path.join(TRAIN_DIR, os.getenv('TRAINING_SHARDS_DIR', 'shards'))
+    TRAINING_SHARD_SIZE = int(os.getenv('TRAINING_SHARD_SIZE', 10000))
     
     # Static and template directories
     STATIC_DIR = os.path.join(BASE_DIR, 'static')
+    # Generated thumbnails of static images (one per content hash)
+    STATIC_CACHE_DIR = os.path.join(BASE_DIR, os.getenv('STATIC_CACHE_DIR', 'static_cache'))
+    STATIC_THUMBNAIL_WIDTH = int(os.getenv('STATIC_THUMBNAIL_WIDTH', 480))
+    STATIC_INDEX_REFRESH_SECONDS = float(os.getenv('STATIC_INDEX_REFRESH_SECONDS', 2.0))
+    STATIC_IMMUTABLE_MAX_AGE = int(os.getenv('STATIC_IMMUTABLE_MAX_AGE', 31536000))
     TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
     
     # Persistence
-    PERSISTENCE_DIR = os.path.join(BASE_DIR, 'persistence')
+    PERSISTENCE_DIR = os.path.join(BASE_DIR, os.getenv('PERSISTENCE_DIR', 'persistence'))
     PREDICTIONS_FILE = os.path.join(PERSISTENCE_DIR, 'predictions.json')
     STATS_FILE = os.path.join(PERSISTENCE_DIR, 'statistics.pkl')
+    # serve.py layout auto-tuning cache
+    SERVE_TUNING_FILE = os.path.join(PERSISTENCE_DIR, os.getenv('SERVE_TUNING_FILE', 'tuning/serving_tuning.json'))
+    # Indexed prediction store (SQLite, WAL); replaces rewriting PREDICTIONS_FILE
+    PREDICTION_STORE_ENABLED = os.getenv('PREDICTION_STORE_ENABLED', 'True').lower() == 'true'
+    PREDICTIONS_DB = os.path.join(PERSISTENCE_DIR, os.getenv('PREDICTIONS_DB', 'predictions.db'))
+    PREDICTION_STORE_BATCH_SIZE = int(os.getenv('PREDICTION_STORE_BATCH_SIZE', 500))
+    PREDICTION_STORE_FLUSH_SECONDS = float(os.getenv('PREDICTION_STORE_FLUSH_SECONDS', 0.5))
+    # Most recent predictions kept in memory for /api/statistics after a restart
+    PREDICTION_HISTORY_LOAD_LIMIT = int(os.getenv('PREDICTION_HISTORY_LOAD_LIMIT', 100000))
+    PREDICTIONS_PAGE_MAX = int(os.getenv('PREDICTIONS_PAGE_MAX', 500))
+    
+    # Cluster statistics: each replica publishes a snapshot to a shared directory
+    CLUSTER_STATS_ENABLED = os.getenv('CLUSTER_STATS_ENABLED', 'True').lower() == 'true'
+    # Relative to PERSISTENCE_DIR (an absolute path, e.g. a shared volume, is used as is)
+    CLUSTER_STATS_DIR = os.path.join(PERSISTENCE_DIR, os.getenv('CLUSTER_STATS_DIR', 'cluster'))
+    CLUSTER_STATS_INTERVAL_SECONDS = float(os.getenv('CLUSTER_STATS_INTERVAL_SECONDS', 10))
+    CLUSTER_STATS_STALE_SECONDS = float(os.getenv('CLUSTER_STATS_STALE_SECONDS', 30))
+    CLUSTER_STATS_EXPIRE_SECONDS = float(os.getenv('CLUSTER_STATS_EXPIRE_SECONDS', 86400))
+    # Defaults to host name and process id
+    REPLICA_ID = os.getenv('REPLICA_ID', '')
     
     @classmethod
     def init_app(cls):
         """Initialize application directories."""
         os.makedirs(cls.MODEL_DIR, exist_ok=True)
+        os.makedirs(cls.CHECKPOINT_DIR, exist_ok=True)
+        os.makedirs(cls.PROFILE_DIR, exist_ok=True)
         os.makedirs(cls.UPLOAD_FOLDER, exist_ok=True)
         os.makedirs(cls.LOG_DIR, exist_ok=True)
         os.makedirs(cls.DATA_DIR, exist_ok=True)
@@ -0,0 +1,133 @@
+"""
+Production launcher: serve app.py with several worker processes per container.
+
+The master process prepares what the workers can share (imported modules,
+the page-cached weights file), picks the worker/thread layout for this
+machine and forks the workers (see src/prefork.py).
+
+Usage:
+    # Auto-tuned layout (benchmarked once per machine and model, then cached)
+    python serve.py
+
+    # Fixed layout
+    python serve.py --workers 2 --intra-op-threads 2
+
+    # Only run the tuning benchmark and print the results
+    python serve.py --tune-only --retune
+
+    # One inference server process batching for every HTTP worker
+    INFERENCE_MODE=remote python serve.py --workers 4
+"""
+
+import os
+import sys
+import argparse
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+from src.prefork import (
+    available_cores, autotune, preload_modules, run_server, warm_shared_weights
+)
+from src.inference_server import InferenceServerProcess
+from config import get_config
+
+
+def parse_args():
+    """Parse command line arguments."""
+    config = get_config()
+    parser = argparse.ArgumentParser(description='Pre-fork multi-worker API server')
+    parser.add_argument('--bind', default=f"{config.HOST}:{config.PORT}")
+    parser.add_argument('--workers', type=int, default=config.SERVE_WORKERS,
+                        help='Worker processes (0 = auto-tune)')
+    parser.add_argument('--intra-op-threads', type=int, default=config.SERVE_INTRA_OP_THREADS,
+                        help='TensorFlow intra-op threads per worker (0 = cores / workers)')
+    parser.add_argument('--inter-op-threads', type=int, default=config.SERVE_INTER_OP_THREADS)
+    parser.add_argument('--threads', type=int, default=config.SERVE_THREADS_PER_WORKER,
+                        help='Request threads per worker')
+    parser.add_argument('--max-workers', type=int, default=config.SERVE_MAX_WORKERS)
+    parser.add_argument('--tune-seconds', type=float, default=config.SERVE_AUTOTUNE_SECONDS,
+                        help='Benchmark duration per candidate layout')
+    parser.add_argument('--retune', action='store_true', help='Ignore the cached tuning result')
+    parser.add_argument('--tune-only', action='store_true', help='Print the tuning results and exit')
+    return parser.parse_args()
+
+
+def resolve_layout(args, config, cores):
+    """Layout from the command line, or auto-tuned when the worker count is 0."""
+    if config.INFERENCE_MODE == 'remote':
+        # Workers only parse and decode; the inference server gets the cores for the model
+        return {
+            'workers': args.workers or cores,
+            'intra_op_threads': 1,
+            'inter_op_threads': 1,
+            'results': [],
+            'cached': False
+        }
+    if args.workers > 0 and not args.tune_only:
+        return {
+            'workers': args.workers,
+            'intra_op_threads': args.intra_op_threads or max(1, cores // args.workers),
+            'inter_op_threads': args.inter_op_threads,
+            'results': [],
+            'cached': False
+        }
+    return autotune(
+        config.MODEL_DIR,
+        cores=cores,
+        max_workers=args.max_workers,
+        duration=args.tune_seconds,
+        cache_file=config.SERVE_TUNING_FILE,
+        retune=args.retune
+    )
+
+
+def main():
+    args = parse_args()
+    config = get_config()
+    config.init_app()
+    cores = available_cores()
+
+    print("=" * 70)
+    print("🚀 Pre-fork API Server")
+    print("=" * 70)
+    print(f"Cores available: {cores}")
+
+    layout = resolve_layout(args, config, cores)
+    if layout['results']:
+        source = 'cached' if layout['cached'] else 'measured'
+        print(f"\nLayout benchmark ({source}):")
+        print(f"{'Workers':>8} {'Intra-op':>9} {'Images/s':>10} {'p50 ms':>8} {'p95 ms':>8}")
+        for result in layout['results']:
+            if result['images_per_second'] is None:
+                continue
+            print(f"{result['workers']:>8} {result['intra_op_threads']:>9} "
+                  f"{result['images_per_second']:>10.0f} {result['latency_p50_ms']:>8.1f} "
+                  f"{result['latency_p95_ms']:>8.1f}")
+    print(f"\nWorkers: {layout['workers']}, intra-op threads: {layout['intra_op_threads']}, "
+          f"inter-op threads: {layout['inter_op_threads']}, request threads: {args.threads}")
+    if args.tune_only:
+        return
+
+    if config.INFERENCE_MODE == 'remote':
+        server = InferenceServerProcess(
+            config.MODEL_DIR, config.INFERENCE_SOCKET,
+            intra_op_threads=args.intra_op_threads or cores,
+            inter_op_threads=args.inter_op_threads,
+            max_batch=config.INFERENCE_MAX_BATCH,
+            max_wait_ms=config.INFERENCE_MAX_WAIT_MS
+        ).start()
+        print(f"Inference server: {config.INFERENCE_SOCKET} (pid {server.process.pid}, "
+              f"model {server.info.get('model_version')})")
+
+    weights_file = warm_shared_weights(config.MODEL_DIR)
+    print(f"Weights file cached: {weights_file or 'none (model has no weights export)'}")
+    preload_modules()
+
+    print(f"\n🌐 Serving on http://{args.bind}")
+    print("=" * 70)
+    run_server(layout, args.bind, threads_per_worker=args.threads)
+
+
+if __name__ == '__main__':
+    main()
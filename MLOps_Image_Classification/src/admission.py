@@ -0,0 +1,158 @@
+"""
+Admission Control Module
+Adaptive, latency-aware admission control for inference endpoints.
+"""
+
+import math
+import time
+import threading
+
+
+class AdmissionController:
+    """
+    Limits concurrent inference work and sheds load before latency degrades.
+
+    The controller tracks in-flight work and an exponentially weighted moving
+    average (EWMA) of request latency. Its concurrency limit adapts AIMD-style:
+    it shrinks multiplicatively while latency is above the target and grows by
+    one slot while latency is comfortably below it and the limit is being used.
+    Batch requests have their own EWMA and target: a batch is judged by the
+    wall-clock latency its client saw, without pulling the single-image
+    average over its target.
+    Requests that would exceed the limit are rejected immediately instead of
+    queueing behind work that already misses the target.
+    """
+
+    def __init__(self, latency_target_ms=500, max_in_flight=8, min_in_flight=1,
+                 ewma_alpha=0.2, decrease_factor=0.8, headroom=0.7,
+                 batch_latency_target_ms=None):
+        """
+        Initialize admission controller.
+
+        Args:
+            latency_target_ms: Latency the controller tries to stay under
+            max_in_flight: Upper bound for the adaptive concurrency limit
+            min_in_flight: Lower bound for the adaptive concurrency limit
+            ewma_alpha: Weight of the newest latency sample in the EWMA
+            decrease_factor: Multiplier applied to the limit when over target
+            headroom: Fraction of the target below which the limit may grow
+            batch_latency_target_ms: Target for batch requests (default: 10x
+                latency_target_ms)
+        """
+        self.latency_target_ms = float(latency_target_ms)
+        self.batch_latency_target_ms = float(batch_latency_target_ms or 10 * latency_target_ms)
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.min_in_flight = max(1, min(int(min_in_flight), self.max_in_flight))
+        self.ewma_alpha = ewma_alpha
+        self.decrease_factor = decrease_factor
+        self.headroom = headroom
+
+        self._lock = threading.Lock()
+        self._limit = float(self.max_in_flight)
+        self._in_flight = 0
+        self._ewma_ms = None
+        self._batch_ewma_ms = None
+        self._admitted = 0
+        self._shed = 0
+        self._last_shed = None
+
+    @property
+    def limit(self):
+        """Current concurrency limit (whole slots)."""
+        return max(self.min_in_flight, int(self._limit))
+
+    def try_acquire(self, cost=1):
+        """
+        Try to admit a unit of work.
+
+        Args:
+            cost: Slots the work needs (e.g. images in a batch); capped at the
+                current limit so large batches are never starved
+
+        Returns:
+            int: Slots acquired (pass to release), or 0 if the request is shed
+        """
+        with self._lock:
+            cost = max(1, min(int(cost), self.limit))
+            if self._in_flight + cost > self.limit:
+                self._shed += 1
+                self._last_shed = time.time()
+                return 0
+            self._in_flight += cost
+            self._admitted += 1
+            return cost
+
+    def _update_ewma(self, ewma_ms, sample_ms):
+        if ewma_ms is None:
+            return sample_ms
+        return ewma_ms + self.ewma_alpha * (sample_ms - ewma_ms)
+
+    def release(self, slots, latency_seconds=None, batch=False):
+        """
+        Release slots and feed the measured latency back into the controller.
+
+        Args:
+            slots: Value returned by try_acquire
+            latency_seconds: Wall-clock latency of the request (None if it
+                failed before doing inference)
+            batch: The request was a batch (measured against
+                batch_latency_target_ms, in its own EWMA)
+        """
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - slots)
+            if latency_seconds is None:
+                return
+
+            # The wall-clock latency the client saw: a slow batch counts as slow
+            sample_ms = latency_seconds * 1000
+            if batch:
+                self._batch_ewma_ms = self._update_ewma(self._batch_ewma_ms, sample_ms)
+                ewma_ms, target_ms = self._batch_ewma_ms, self.batch_latency_target_ms
+                other_ms, other_target_ms = self._ewma_ms, self.latency_target_ms
+            else:
+                self._ewma_ms = self._update_ewma(self._ewma_ms, sample_ms)
+                ewma_ms, target_ms = self._ewma_ms, self.latency_target_ms
+                other_ms, other_target_ms = self._batch_ewma_ms, self.batch_latency_target_ms
+
+            # Only the class that just finished can shrink the limit; growing
+            # also needs the other class not to be over its target
+            if ewma_ms > target_ms:
+                self._limit = max(self.min_in_flight, self._limit * self.decrease_factor)
+            elif (ewma_ms < target_ms * self.headroom
+                  and (other_ms is None or other_ms <= other_target_ms)
+                  and self._in_flight + slots >= self.limit):
+                self._limit = min(self.max_in_flight, self._limit + 1)
+
+    def retry_after_seconds(self):
+        """
+        Suggested client back-off: time to drain the work already admitted.
+
+        Returns:
+            int: Seconds (at least 1)
+        """
+        with self._lock:
+            latency_ms = self._ewma_ms or self.latency_target_ms
+            drain_ms = latency_ms * max(1, self._in_flight) / self.limit
+        return max(1, math.ceil(drain_ms / 1000))
+
+    def state(self):
+        """
+        Snapshot of the controller state.
+
+        Returns:
+            dict
+        """
+        with self._lock:
+            return {
+                'in_flight': self._in_flight,
+                'limit': self.limit,
+                'max_in_flight': self.max_in_flight,
+                'latency_target_ms': self.latency_target_ms,
+                'ewma_latency_ms': self._ewma_ms,
+                'batch_latency_target_ms': self.batch_latency_target_ms,
+                'batch_ewma_latency_ms': self._batch_ewma_ms,
+                'overloaded': self._in_flight >= self.limit,
+                'admitted_total': self._admitted,
+                'shed_total': self._shed,
+                'last_shed_timestamp': self._last_shed
+            }
@@ -0,0 +1,184 @@
+"""
+Async Logging Module
+Non-blocking logging for request threads.
+
+Request threads only put LogRecords on a bounded queue; a background
+QueueListener formats them and writes to the real handlers (including file
+rotation). Hot-path messages, marked with `extra=HOT_PATH`, are rate-limited:
+the first `burst` of them per interval are written, after that only a sampled
+fraction, and a one-line summary per interval reports how many were suppressed.
+"""
+
+import queue
+import atexit
+import logging
+import threading
+import itertools
+from collections import Counter
+from logging.handlers import QueueHandler, QueueListener
+
+
+# Pass as `extra=` to mark a record as hot-path (sampled under load)
+HOT_PATH = {'hot_path': True}
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never formats or blocks on the caller's thread.
+
+    The stock handler formats the message before enqueueing (so it can be
+    pickled for other processes). Records stay in-process here, so the
+    formatting is left to the listener thread. A full queue drops the record
+    instead of blocking the request.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class HotPathSampler(logging.Filter):
+    """
+    Rate-limits hot-path records and summarizes what was suppressed.
+
+    Records without the `hot_path` attribute always pass. Per interval, the
+    first `burst` hot-path records pass; after that one in every
+    round(1 / sample_rate) passes. Suppressed records are counted per message
+    template and reported by `flush_summary`.
+    """
+
+    def __init__(self, sample_rate=0.01, burst=10):
+        """
+        Initialize sampler.
+
+        Args:
+            sample_rate: Fraction of hot-path records kept once the burst is used
+                (0 keeps none)
+            burst: Hot-path records per interval that are always kept
+        """
+        super().__init__()
+        self.burst = burst
+        self.sample_every = round(1 / sample_rate) if sample_rate > 0 else 0
+        self._lock = threading.Lock()
+        self._seen = Counter()
+        self._suppressed = Counter()
+        self._in_interval = 0
+        self._sample_counter = itertools.count()
+
+    def filter(self, record):
+        if not getattr(record, 'hot_path', False):
+            return True
+
+        # Only the un-formatted template is used as key; args are never formatted here
+        with self._lock:
+            self._seen[record.msg] += 1
+            self._in_interval += 1
+            if self._in_interval <= self.burst:
+                return True
+            if self.sample_every and next(self._sample_counter) % self.sample_every == 0:
+                return True
+            self._suppressed[record.msg] += 1
+            return False
+
+    def flush_summary(self):
+        """
+        Reset the interval.
+
+        Returns:
+            dict template -> (seen, suppressed) for templates with suppressed
+            records in the interval
+        """
+        with self._lock:
+            summary = {msg: (self._seen[msg], count) for msg, count in self._suppressed.items()}
+            self._seen.clear()
+            self._suppressed.clear()
+            self._in_interval = 0
+        return summary
+
+
+class AsyncLogging:
+    """
+    Wires a logger to a background listener with hot-path sampling.
+
+    Usage:
+        pipeline = AsyncLogging([file_handler, console_handler]).start()
+        pipeline.attach(app.logger)
+    """
+
+    def __init__(self, handlers, queue_size=10000, sample_rate=0.01, burst=10,
+                 summary_interval=1.0):
+        """
+        Initialize pipeline.
+
+        Args:
+            handlers: Handlers the listener writes to
+            queue_size: Maximum queued records before new ones are dropped
+            sample_rate: Hot-path sampling rate once the burst is used
+            burst: Hot-path records per interval that are always written
+            summary_interval: Seconds per summary interval
+        """
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = NonBlockingQueueHandler(self.queue)
+        self.sampler = HotPathSampler(sample_rate=sample_rate, burst=burst)
+        self.queue_handler.addFilter(self.sampler)
+        self.listener = QueueListener(self.queue, *handlers, respect_handler_level=True)
+        self.summary_interval = summary_interval
+        self.summary_logger = None
+        self._stop = threading.Event()
+        self._summary_thread = None
+
+    def attach(self, logger):
+        """
+        Route a logger through the queue.
+
+        The first attached logger also receives the per-interval summaries.
+
+        Args:
+            logger: logging.Logger
+        """
+        logger.addHandler(self.queue_handler)
+        if self.summary_logger is None:
+            self.summary_logger = logger
+
+    def start(self):
+        """Start the listener and summary threads (stopped at interpreter exit)."""
+        self.listener.start()
+        self._summary_thread = threading.Thread(
+            target=self._summary_loop, name='log-summary', daemon=True
+        )
+        self._summary_thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def _summary_loop(self):
+        while not self._stop.wait(self.summary_interval):
+            self.emit_summary()
+
+    def emit_summary(self):
+        """Log one line per template that had suppressed records."""
+        for msg, (seen, suppressed) in self.sampler.flush_summary().items():
+            if self.summary_logger is not None:
+                self.summary_logger.info(
+                    "Log summary (last %.0fs): %d x '%s' (%d suppressed)",
+                    self.summary_interval, seen, msg, suppressed
+                )
+        if self.queue_handler.dropped and self.summary_logger is not None:
+            dropped, self.queue_handler.dropped = self.queue_handler.dropped, 0
+            self.summary_logger.warning("Log queue full: %d records dropped", dropped)
+
+    def stop(self):
+        """Flush summaries and drain the queue."""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self.emit_summary()
+        self.listener.stop()
@@ -0,0 +1,247 @@
+"""
+Checkpointing Module
+Periodic, resumable checkpoints of weights, optimizer state and epoch counter
+for long-running (re)training jobs.
+"""
+
+import os
+import json
+import shutil
+from datetime import datetime
+
+import tensorflow as tf
+from tensorflow import keras
+
+
+RUN_STATE_FILE = 'run_state.json'
+
+
+class TrainingCheckpointer(keras.callbacks.Callback):
+    """
+    Keras callback that checkpoints a training run into its own run directory.
+
+    Each checkpoint holds the model weights, the optimizer state and the number
+    of completed epochs. Only the newest `max_to_keep` checkpoints are kept.
+    A small JSON run state next to the checkpoints records progress so an
+    interrupted run can be found and resumed.
+    """
+
+    def __init__(self, run_dir, save_every=1, max_to_keep=2, epochs_requested=None):
+        """
+        Initialize checkpointer.
+
+        Args:
+            run_dir: Directory for this run's checkpoints and state
+            save_every: Save a checkpoint every N epochs
+            max_to_keep: Number of checkpoints kept before older ones are deleted
+            epochs_requested: Total epochs of the run (recorded in the run state)
+        """
+        super().__init__()
+        self.run_dir = run_dir
+        self.save_every = max(1, int(save_every))
+        self.max_to_keep = max_to_keep
+        self.epochs_requested = epochs_requested
+        self.epoch = tf.Variable(0, dtype=tf.int64, trainable=False)
+        self._checkpoint = None
+        self._manager = None
+        os.makedirs(run_dir, exist_ok=True)
+
+    @property
+    def run_id(self):
+        return os.path.basename(os.path.normpath(self.run_dir))
+
+    def _ensure_manager(self, model):
+        """Create the checkpoint manager once the model and optimizer exist."""
+        if self._manager is not None:
+            return
+        # Optimizer slots must exist before restore so nothing is deferred
+        model.optimizer.build(model.trainable_variables)
+        self._checkpoint = tf.train.Checkpoint(
+            model=model, optimizer=model.optimizer, epoch=self.epoch
+        )
+        self._manager = tf.train.CheckpointManager(
+            self._checkpoint, os.path.join(self.run_dir, 'checkpoints'),
+            max_to_keep=self.max_to_keep
+        )
+
+    def restore(self, model):
+        """
+        Restore the latest checkpoint of this run into a compiled model.
+
+        Args:
+            model: Compiled Keras model with the same architecture
+
+        Returns:
+            int: Number of completed epochs (0 if there is no checkpoint)
+        """
+        self._ensure_manager(model)
+        if self._manager.latest_checkpoint is None:
+            return 0
+        self._checkpoint.restore(self._manager.latest_checkpoint).assert_existing_objects_matched()
+        print(f"Restored checkpoint: {self._manager.latest_checkpoint}")
+        return int(self.epoch.numpy())
+
+    def load_state(self):
+        """Load the run state, or an empty dict if none was written yet."""
+        return load_run_state(self.run_dir)
+
+    def _write_state(self, **updates):
+        state = self.load_state()
+        state.setdefault('run_id', self.run_id)
+        state.setdefault('start_time', datetime.now().isoformat())
+        state['epochs_requested'] = self.epochs_requested
+        state['updated_time'] = datetime.now().isoformat()
+        state.update(updates)
+
+        # Write-then-rename so a crash never leaves a half-written state file
+        path = os.path.join(self.run_dir, RUN_STATE_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def on_train_begin(self, logs=None):
+        self._ensure_manager(self.model)
+        self._write_state(status='in_progress', epochs_completed=int(self.epoch.numpy()))
+
+    def on_epoch_end(self, epoch, logs=None):
+        completed = epoch + 1
+        self.epoch.assign(completed)
+
+        state = self.load_state()
+        history = state.get('history', {})
+        for key, value in (logs or {}).items():
+            history.setdefault(key, []).append(float(value))
+
+        if completed % self.save_every == 0:
+            self._manager.save(checkpoint_number=completed)
+            self._write_state(epochs_completed=completed, checkpoint_epoch=completed,
+                              history=history)
+        else:
+            self._write_state(epochs_completed=completed, history=history)
+
+    def mark(self, status, **details):
+        """
+        Record the final status of the run.
+
+        Args:
+            status: 'completed' or 'failed'
+            details: Extra fields stored in the run state
+        """
+        self._write_state(status=status, **details)
+
+
+def load_run_state(run_dir):
+    """
+    Load the JSON state of a run directory.
+
+    Args:
+        run_dir: Run directory
+
+    Returns:
+        dict (empty if the state file is missing or unreadable)
+    """
+    path = os.path.join(run_dir, RUN_STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def new_run_dir(checkpoint_root):
+    """
+    Create a fresh run directory.
+
+    Args:
+        checkpoint_root: Directory holding all run directories
+
+    Returns:
+        str: Path of the new run directory
+    """
+    run_id = datetime.now().strftime('run_%Y%m%d_%H%M%S_%f')
+    run_dir = os.path.join(checkpoint_root, run_id)
+    os.makedirs(run_dir, exist_ok=True)
+    return run_dir
+
+
+def list_runs(checkpoint_root):
+    """
+    List run directories, oldest first.
+
+    Args:
+        checkpoint_root: Directory holding all run directories
+
+    Returns:
+        list of run directory paths
+    """
+    if not os.path.isdir(checkpoint_root):
+        return []
+    runs = [
+        os.path.join(checkpoint_root, name)
+        for name in os.listdir(checkpoint_root)
+        if name.startswith('run_') and os.path.isdir(os.path.join(checkpoint_root, name))
+    ]
+    return sorted(runs)
+
+
+def find_resumable_run(checkpoint_root):
+    """
+    Find the most recent run that was interrupted after at least one checkpoint.
+
+    A run is resumable if it never reached 'completed' and has a checkpoint.
+
+    Args:
+        checkpoint_root: Directory holding all run directories
+
+    Returns:
+        str or None: Run directory to resume
+    """
+    for run_dir in reversed(list_runs(checkpoint_root)):
+        state = load_run_state(run_dir)
+        if state.get('status') == 'completed':
+            continue
+        if tf.train.latest_checkpoint(os.path.join(run_dir, 'checkpoints')):
+            return run_dir
+    return None
+
+
+def find_completed_run(checkpoint_root):
+    """
+    Find the most recent run that completed.
+
+    Args:
+        checkpoint_root: Directory holding all run directories
+
+    Returns:
+        str or None: Run directory
+    """
+    for run_dir in reversed(list_runs(checkpoint_root)):
+        if load_run_state(run_dir).get('status') == 'completed':
+            return run_dir
+    return None
+
+
+def garbage_collect_runs(checkpoint_root, keep_runs=3, exclude=None):
+    """
+    Delete old run directories, keeping the newest `keep_runs`.
+
+    Args:
+        checkpoint_root: Directory holding all run directories
+        keep_runs: Number of most recent runs to keep
+        exclude: Optional run directory that must never be deleted
+
+    Returns:
+        list of deleted run directories
+    """
+    runs = list_runs(checkpoint_root)
+    stale = runs[:-keep_runs] if keep_runs > 0 else runs
+    deleted = []
+    for run_dir in stale:
+        if exclude and os.path.abspath(run_dir) == os.path.abspath(exclude):
+            continue
+        shutil.rmtree(run_dir, ignore_errors=True)
+        deleted.append(run_dir)
+    return deleted
@@ -0,0 +1,237 @@
+"""
+Cluster Statistics Module
+Cluster-wide prediction statistics from per-replica snapshots.
+
+Each replica periodically writes a compact snapshot of its own statistics
+to a directory shared by all replicas (one small JSON file per replica):
+    - all-time totals: count, per-class counts, confidence sum/min/max and
+      latency sum
+    - trailing-window sketches from RollingStatistics (counts, sums and a
+      latency histogram on fixed bounds)
+
+Every field is a count, a sum or a histogram on shared bounds, so snapshots
+merge by addition and cluster-wide quantiles come from the merged
+histogram; raw predictions never leave the replica. Snapshots older than
+`stale_after` (replica dead or hung) are reported but left out of the merge,
+and files older than `expire_after` are deleted.
+"""
+
+import os
+import json
+import time
+import atexit
+import socket
+import threading
+
+import numpy as np
+
+from src.rolling_stats import merge_window_sketches, summarize_window
+
+
+SNAPSHOT_SUFFIX = '.stats.json'
+
+
+def default_replica_id():
+    """Host name plus process id, unique per worker process."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def history_totals(history, num_classes):
+    """
+    All-time totals of a prediction history.
+
+    Args:
+        history: List of prediction dicts
+        num_classes: Number of classes
+
+    Returns:
+        dict of counts and sums (mergeable with merge_totals)
+    """
+    if not history:
+        return {'count': 0, 'class_counts': [0] * num_classes, 'confidence_sum': 0.0,
+                'confidence_min': None, 'confidence_max': None, 'latency_sum': 0.0}
+
+    confidences = np.fromiter((p['confidence'] for p in history), dtype=np.float64, count=len(history))
+    latencies = np.fromiter((p.get('prediction_time_ms') or 0.0 for p in history),
+                            dtype=np.float64, count=len(history))
+    classes = np.fromiter((p['predicted_class_index'] for p in history), dtype=np.int64, count=len(history))
+    return {
+        'count': len(history),
+        'class_counts': np.bincount(classes, minlength=num_classes).tolist(),
+        'confidence_sum': float(confidences.sum()),
+        'confidence_min': float(confidences.min()),
+        'confidence_max': float(confidences.max()),
+        'latency_sum': float(latencies.sum())
+    }
+
+
+def merge_totals(totals_list):
+    """Sum all-time totals of several replicas."""
+    totals_list = list(totals_list)
+    mins = [t['confidence_min'] for t in totals_list if t['confidence_min'] is not None]
+    maxs = [t['confidence_max'] for t in totals_list if t['confidence_max'] is not None]
+    return {
+        'count': sum(t['count'] for t in totals_list),
+        'class_counts': np.sum([t['class_counts'] for t in totals_list], axis=0).tolist(),
+        'confidence_sum': sum(t['confidence_sum'] for t in totals_list),
+        'confidence_min': min(mins) if mins else None,
+        'confidence_max': max(maxs) if maxs else None,
+        'latency_sum': sum(t['latency_sum'] for t in totals_list)
+    }
+
+
+def summarize_totals(totals, class_names):
+    """Totals in the shape of ImagePredictor.get_prediction_statistics."""
+    count = totals['count']
+    if count == 0:
+        return {'message': 'No predictions made yet'}
+    return {
+        'total_predictions': count,
+        'average_confidence': totals['confidence_sum'] / count,
+        'min_confidence': totals['confidence_min'],
+        'max_confidence': totals['confidence_max'],
+        'average_prediction_time_ms': totals['latency_sum'] / count,
+        'predictions_per_class': {
+            name: int(n) for name, n in zip(class_names, totals['class_counts'])
+        }
+    }
+
+
+def write_snapshot(directory, snapshot):
+    """Atomically replace this replica's snapshot file."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, snapshot['replica_id'] + SNAPSHOT_SUFFIX)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(snapshot, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_snapshots(directory, stale_after, expire_after=None, now=None):
+    """
+    Read every replica snapshot in a directory.
+
+    Args:
+        directory: Shared snapshot directory
+        stale_after: Seconds after which a snapshot is left out of merges
+        expire_after: Seconds after which a snapshot file is deleted
+        now: Epoch seconds (defaults to time.time())
+
+    Returns:
+        tuple (fresh snapshots, stale snapshots)
+    """
+    now = time.time() if now is None else now
+    fresh, stale = [], []
+    if not os.path.isdir(directory):
+        return fresh, stale
+
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(SNAPSHOT_SUFFIX):
+            continue
+        path = os.path.join(directory, filename)
+        try:
+            with open(path, 'r') as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            # Being replaced or truncated; the next read picks it up
+            continue
+        age = now - snapshot.get('published_at', 0)
+        if expire_after is not None and age > expire_after:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        snapshot['age_seconds'] = age
+        (stale if age > stale_after else fresh).append(snapshot)
+    return fresh, stale
+
+
+def aggregate(snapshots, class_names):
+    """
+    Merge replica snapshots into cluster-wide statistics.
+
+    Args:
+        snapshots: Fresh snapshots (each with 'totals' and 'windows')
+        class_names: Class names
+
+    Returns:
+        dict with 'totals' (shaped like /api/statistics) and 'windows'
+        (shaped like /api/statistics/rolling)
+    """
+    windows = {}
+    labels = {label for snapshot in snapshots for label in snapshot.get('windows', {})}
+    for label in labels:
+        sketches = [s['windows'][label] for s in snapshots if label in s.get('windows', {})]
+        windows[label] = summarize_window(merge_window_sketches(sketches), class_names)
+    return {
+        'totals': summarize_totals(merge_totals(s['totals'] for s in snapshots), class_names)
+        if snapshots else {'message': 'No predictions made yet'},
+        'windows': windows
+    }
+
+
+class ClusterStatsPublisher:
+    """
+    Publishes this replica's snapshot to the shared directory on a timer.
+
+    Usage:
+        publisher = ClusterStatsPublisher('persistence/cluster', build_snapshot).start()
+        fresh, stale = load_snapshots('persistence/cluster', stale_after=30)
+    """
+
+    def __init__(self, directory, build_fn, replica_id=None, interval=10.0):
+        """
+        Initialize publisher.
+
+        Args:
+            directory: Shared snapshot directory
+            build_fn: Function returning {'totals': ..., 'windows': ...}
+            replica_id: Name of this replica (defaults to host name and pid)
+            interval: Seconds between two publications
+        """
+        self.directory = directory
+        self.build_fn = build_fn
+        self.replica_id = replica_id or default_replica_id()
+        self.interval = interval
+        self.published = 0
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def snapshot(self):
+        """This replica's current snapshot."""
+        snapshot = dict(self.build_fn())
+        snapshot['replica_id'] = self.replica_id
+        snapshot['published_at'] = time.time()
+        return snapshot
+
+    def publish(self):
+        try:
+            write_snapshot(self.directory, self.snapshot())
+            self.published += 1
+        except Exception as e:
+            self.errors += 1
+            print(f"Warning: Could not publish cluster statistics: {str(e)}")
+
+    def start(self):
+        """Publish now and then every interval (file removed at interpreter exit)."""
+        if self._thread is None:
+            self.publish()
+            self._thread = threading.Thread(target=self._run, name='cluster-stats', daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.publish()
+
+    def stop(self):
+        """Stop publishing and withdraw this replica's snapshot."""
+        self._stop.set()
+        try:
+            os.remove(os.path.join(self.directory, self.replica_id + SNAPSHOT_SUFFIX))
+        except OSError:
+            pass
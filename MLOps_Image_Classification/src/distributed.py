@@ -0,0 +1,461 @@
+"""
+Distributed Training Module
+Runs data-parallel training of ImageClassificationModel across several local
+worker processes using TensorFlow's MultiWorkerMirroredStrategy.
+"""
+
+import os
+import json
+import time
+import shutil
+import socket
+import tempfile
+import multiprocessing
+from multiprocessing.connection import wait
+from datetime import datetime
+from types import SimpleNamespace
+
+import numpy as np
+
+
+def find_free_ports(count):
+    """
+    Find free TCP ports on localhost.
+
+    Args:
+        count: Number of ports to reserve
+
+    Returns:
+        list of port numbers
+    """
+    sockets = []
+    ports = []
+    try:
+        for _ in range(count):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            sock.bind(('localhost', 0))
+            sockets.append(sock)
+            ports.append(sock.getsockname()[1])
+    finally:
+        for sock in sockets:
+            sock.close()
+    return ports
+
+
+def build_tf_config(ports, task_index):
+    """
+    Build the TF_CONFIG cluster spec for one local worker.
+
+    Args:
+        ports: List of ports, one per worker
+        task_index: Index of this worker (0 is the chief)
+
+    Returns:
+        dict suitable for the TF_CONFIG environment variable
+    """
+    return {
+        'cluster': {'worker': [f'localhost:{port}' for port in ports]},
+        'task': {'type': 'worker', 'index': task_index}
+    }
+
+
+def is_chief(task_index):
+    """Worker 0 is the chief and owns all checkpoint and metadata writes."""
+    return task_index == 0
+
+
+def threads_per_worker(num_workers, cpu_count=None):
+    """
+    Split the local cores between workers so they do not oversubscribe.
+
+    Args:
+        num_workers: Number of local worker processes
+        cpu_count: Number of available cores (defaults to os.cpu_count())
+
+    Returns:
+        int: Intra-op threads per worker (at least 1)
+    """
+    cpu_count = cpu_count or os.cpu_count() or 1
+    return max(1, cpu_count // num_workers)
+
+
+def load_training_arrays(synthetic=False, num_samples=None, seed=42):
+    """
+    Load training/validation arrays for a worker.
+
+    Every worker loads the data itself; sharding happens in the input pipeline.
+
+    Args:
+        synthetic: Use random data instead of CIFAR-10 (offline benchmarking)
+        num_samples: Optional cap on the number of training samples
+        seed: Random seed for synthetic data
+
+    Returns:
+        tuple: (X_train, y_train, X_val, y_val)
+    """
+    if synthetic:
+        from tensorflow.keras.utils import to_categorical
+        rng = np.random.default_rng(seed)
+        n_train = num_samples or 2048
+        n_val = max(64, n_train // 8)
+        X_train = rng.random((n_train, 32, 32, 3), dtype=np.float32)
+        y_train = to_categorical(rng.integers(0, 10, n_train), 10)
+        X_val = rng.random((n_val, 32, 32, 3), dtype=np.float32)
+        y_val = to_categorical(rng.integers(0, 10, n_val), 10)
+        return X_train, y_train, X_val, y_val
+
+    from src.preprocessing import DataPreprocessor
+    data = DataPreprocessor().prepare_training_data()
+    X_train, y_train = data['X_train'], data['y_train']
+    if num_samples:
+        X_train, y_train = X_train[:num_samples], y_train[:num_samples]
+    return X_train, y_train, data['X_test'], data['y_test']
+
+
+def make_sharded_dataset(X, y, global_batch_size, shuffle=False, seed=42):
+    """
+    Build a batched dataset that tf.distribute shards by element across workers.
+
+    Args:
+        X: Images
+        y: One-hot labels
+        global_batch_size: Batch size summed over all workers
+        shuffle: Whether to shuffle (training only)
+        seed: Shuffle seed, identical on every worker
+
+    Returns:
+        tf.data.Dataset
+    """
+    import tensorflow as tf
+
+    dataset = tf.data.Dataset.from_tensor_slices((X, y))
+    if shuffle:
+        dataset = dataset.shuffle(len(X), seed=seed, reshuffle_each_iteration=True)
+    # Equal-sized batches keep every worker in lock-step for the all-reduce
+    dataset = dataset.batch(global_batch_size, drop_remainder=shuffle)
+    dataset = dataset.prefetch(tf.data.AUTOTUNE)
+
+    options = tf.data.Options()
+    options.experimental_distribute.auto_shard_policy = \
+        tf.data.experimental.AutoShardPolicy.DATA
+    return dataset.with_options(options)
+
+
+def _worker_output_dir(output_dir, task_index):
+    """Chief writes to output_dir, other workers to a throwaway directory."""
+    if is_chief(task_index):
+        return output_dir
+    return tempfile.mkdtemp(prefix=f'worker_{task_index}_')
+
+
+def _make_step_functions(strategy, model, global_batch_size):
+    """
+    Build the distributed train and evaluation steps.
+
+    A custom loop is used instead of `model.fit` because Keras 3 cannot fit
+    under a multi-worker strategy. Gradients are all-reduced across workers by
+    the optimizer when they are applied.
+
+    Returns:
+        tuple: (train_step, eval_step), each returning summed
+        (loss, correct predictions, samples) over all replicas
+    """
+    import tensorflow as tf
+    from tensorflow import keras
+
+    def _batch_metrics(labels, predictions):
+        per_example_loss = keras.losses.categorical_crossentropy(labels, predictions)
+        correct = tf.cast(
+            tf.equal(tf.argmax(predictions, axis=1), tf.argmax(labels, axis=1)),
+            tf.float32
+        )
+        samples = tf.cast(tf.shape(labels)[0], tf.float32)
+        return per_example_loss, tf.reduce_sum(correct), samples
+
+    def _train_step(images, labels):
+        with tf.GradientTape() as tape:
+            predictions = model(images, training=True)
+            per_example_loss, correct, samples = _batch_metrics(labels, predictions)
+            loss = tf.nn.compute_average_loss(
+                per_example_loss, global_batch_size=global_batch_size
+            )
+        gradients = tape.gradient(loss, model.trainable_variables)
+        model.optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+        return tf.reduce_sum(per_example_loss), correct, samples
+
+    def _eval_step(images, labels):
+        predictions = model(images, training=False)
+        per_example_loss, correct, samples = _batch_metrics(labels, predictions)
+        return tf.reduce_sum(per_example_loss), correct, samples
+
+    def _reduce(values):
+        return tuple(
+            strategy.reduce(tf.distribute.ReduceOp.SUM, value, axis=None)
+            for value in values
+        )
+
+    @tf.function
+    def train_step(batch):
+        return _reduce(strategy.run(_train_step, args=batch))
+
+    @tf.function
+    def eval_step(batch):
+        return _reduce(strategy.run(_eval_step, args=batch))
+
+    return train_step, eval_step
+
+
+def _barrier(strategy):
+    """Block until every worker reaches this point."""
+    import tensorflow as tf
+
+    strategy.reduce(
+        tf.distribute.ReduceOp.SUM,
+        strategy.run(lambda: tf.constant(1.0)),
+        axis=None
+    )
+
+
+def _run_epoch(step_fn, dist_dataset):
+    """Run one pass over a distributed dataset and return (loss, accuracy)."""
+    total_loss = total_correct = total_samples = 0.0
+    for batch in dist_dataset:
+        loss, correct, samples = step_fn(batch)
+        total_loss += float(loss)
+        total_correct += float(correct)
+        total_samples += float(samples)
+    total_samples = max(total_samples, 1.0)
+    return total_loss / total_samples, total_correct / total_samples
+
+
+def run_worker(task_index, ports, output_dir, epochs=15, batch_size=64,
+               synthetic=False, num_samples=None, save_model=True):
+    """
+    Entry point of one worker process.
+
+    Args:
+        task_index: Index of this worker in the cluster
+        ports: Ports of all workers (defines the cluster)
+        output_dir: Directory for checkpoints, model and metadata (chief only)
+        epochs: Number of epochs
+        batch_size: Per-worker batch size
+        synthetic: Train on random data instead of CIFAR-10
+        num_samples: Optional cap on the number of training samples
+        save_model: Whether the chief saves the final model
+    """
+    num_workers = len(ports)
+    os.environ['TF_CONFIG'] = json.dumps(build_tf_config(ports, task_index))
+
+    import tensorflow as tf
+    from src.model import ImageClassificationModel
+
+    threads = threads_per_worker(num_workers)
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    strategy = tf.distribute.MultiWorkerMirroredStrategy()
+
+    X_train, y_train, X_val, y_val = load_training_arrays(synthetic, num_samples)
+    global_batch_size = batch_size * num_workers
+    train_ds = strategy.experimental_distribute_dataset(
+        make_sharded_dataset(X_train, y_train, global_batch_size, shuffle=True)
+    )
+    val_ds = strategy.experimental_distribute_dataset(
+        make_sharded_dataset(X_val, y_val, global_batch_size)
+    )
+
+    with strategy.scope():
+        model_classifier = ImageClassificationModel()
+        model = model_classifier.create_cnn_model()
+        model.optimizer.build(model.trainable_variables)
+    train_step, eval_step = _make_step_functions(strategy, model, global_batch_size)
+
+    # Every worker must take part in saving, but only the chief's copy is kept
+    write_dir = _worker_output_dir(output_dir, task_index)
+    checkpoint_dir = os.path.join(write_dir, 'checkpoints')
+    os.makedirs(checkpoint_dir, exist_ok=True)
+
+    history = {'loss': [], 'accuracy': [], 'val_loss': [], 'val_accuracy': []}
+    start = time.perf_counter()
+    for epoch in range(1, epochs + 1):
+        loss, accuracy = _run_epoch(train_step, train_ds)
+        val_loss, val_accuracy = _run_epoch(eval_step, val_ds)
+        for key, value in zip(history, (loss, accuracy, val_loss, val_accuracy)):
+            history[key].append(value)
+
+        model.save_weights(os.path.join(checkpoint_dir, f'epoch_{epoch:03d}.weights.h5'))
+        if is_chief(task_index):
+            print(f"Epoch {epoch}/{epochs} - loss: {loss:.4f} - accuracy: {accuracy:.4f}"
+                  f" - val_loss: {val_loss:.4f} - val_accuracy: {val_accuracy:.4f}")
+    train_seconds = time.perf_counter() - start
+
+    model_classifier.record_training_metadata(
+        SimpleNamespace(history=history), global_batch_size, epochs
+    )
+    model_classifier.training_metadata.update({
+        'distributed': True,
+        'num_workers': num_workers,
+        'per_worker_batch_size': batch_size
+    })
+
+    if is_chief(task_index):
+        summary = {
+            'num_workers': num_workers,
+            'epochs': epochs,
+            'train_samples': int(len(X_train)),
+            'global_batch_size': global_batch_size,
+            'intra_op_threads': threads,
+            'train_seconds': train_seconds,
+            'samples_per_second': len(X_train) * epochs / train_seconds,
+            'final_loss': history['loss'][-1],
+            'final_accuracy': history['accuracy'][-1],
+            'timestamp': datetime.now().isoformat()
+        }
+        with open(os.path.join(output_dir, 'training_summary.json'), 'w') as f:
+            json.dump(summary, f, indent=2)
+
+        if save_model:
+            model_classifier.save_model(model_dir=write_dir)
+    else:
+        shutil.rmtree(write_dir, ignore_errors=True)
+
+    # Keep workers alive until the chief has finished writing
+    _barrier(strategy)
+
+
+def wait_for_workers(processes, timeout=None):
+    """
+    Wait for all worker processes, failing fast.
+
+    A worker that dies leaves the others blocked in a collective op, so the
+    first non-zero exit (or the timeout) terminates the survivors.
+
+    Args:
+        processes: Started worker processes, in task order
+        timeout: Optional timeout in seconds for the whole run
+
+    Returns:
+        list: Task indices of the workers that failed or were terminated
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    running = dict(enumerate(processes))
+    failed = []
+    while running:
+        remaining = None if deadline is None else max(0, deadline - time.monotonic())
+        ready = wait([process.sentinel for process in running.values()], remaining)
+        if not ready:
+            failed.extend(running)
+            break
+        for task_index, process in list(running.items()):
+            if process.sentinel in ready:
+                process.join()
+                del running[task_index]
+                if process.exitcode != 0:
+                    failed.append(task_index)
+        if failed:
+            failed.extend(running)
+            break
+
+    for process in running.values():
+        process.terminate()
+    for process in running.values():
+        process.join()
+    return sorted(failed)
+
+
+def launch_local_workers(num_workers, output_dir, epochs=15, batch_size=64,
+                         synthetic=False, num_samples=None, save_model=True,
+                         timeout=None):
+    """
+    Launch N local worker processes and wait for them to finish.
+
+    Args:
+        num_workers: Number of worker processes
+        output_dir: Directory for the chief's checkpoints, model and metadata
+        epochs: Number of epochs
+        batch_size: Per-worker batch size
+        synthetic: Train on random data instead of CIFAR-10
+        num_samples: Optional cap on the number of training samples
+        save_model: Whether the chief saves the final model
+        timeout: Optional timeout in seconds for the whole run
+
+    Returns:
+        dict: Training summary written by the chief
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    ports = find_free_ports(num_workers)
+
+    # TensorFlow is not fork-safe, so every worker gets a fresh interpreter
+    ctx = multiprocessing.get_context('spawn')
+    processes = []
+    for task_index in range(num_workers):
+        process = ctx.Process(
+            target=run_worker,
+            args=(task_index, ports, output_dir),
+            kwargs={
+                'epochs': epochs,
+                'batch_size': batch_size,
+                'synthetic': synthetic,
+                'num_samples': num_samples,
+                'save_model': save_model
+            }
+        )
+        process.start()
+        processes.append(process)
+
+    failed = wait_for_workers(processes, timeout)
+    if failed:
+        raise RuntimeError(f"Distributed training failed on workers: {failed}")
+
+    with open(os.path.join(output_dir, 'training_summary.json'), 'r') as f:
+        return json.load(f)
+
+
+def run_scaling_report(worker_counts=(1, 2, 4, 8), output_dir='results/scaling',
+                       epochs=2, batch_size=64, synthetic=True, num_samples=4096):
+    """
+    Train with increasing worker counts and report the speedup over one worker.
+
+    Args:
+        worker_counts: Worker counts to measure
+        output_dir: Directory for per-run outputs and the report
+        epochs: Epochs per run
+        batch_size: Per-worker batch size
+        synthetic: Train on random data instead of CIFAR-10
+        num_samples: Number of training samples per run
+
+    Returns:
+        dict: Scaling report
+    """
+    runs = []
+    for num_workers in worker_counts:
+        run_dir = os.path.join(output_dir, f'workers_{num_workers}')
+        summary = launch_local_workers(
+            num_workers, run_dir, epochs=epochs, batch_size=batch_size,
+            synthetic=synthetic, num_samples=num_samples, save_model=False
+        )
+        runs.append(summary)
+        print(f"{num_workers} worker(s): {summary['train_seconds']:.1f}s, "
+              f"{summary['samples_per_second']:.0f} samples/s")
+
+    # Speedup is relative to the first (smallest) worker count
+    baseline = runs[0]
+    for run in runs:
+        run['speedup'] = baseline['train_seconds'] / run['train_seconds']
+        run['efficiency'] = run['speedup'] * baseline['num_workers'] / run['num_workers']
+
+    report = {
+        'cpu_count': os.cpu_count(),
+        'epochs': epochs,
+        'per_worker_batch_size': batch_size,
+        'synthetic_data': synthetic,
+        'runs': runs,
+        'timestamp': datetime.now().isoformat()
+    }
+
+    report_path = os.path.join(output_dir, 'scaling_report.json')
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Scaling report saved: {report_path}")
+
+    return report
@@ -0,0 +1,276 @@
+"""
+Drift Module
+Streaming input and prediction drift detection against a training profile.
+
+A reference profile is computed once from the training data: histograms of
+per-image channel means and standard deviations, plus the distribution of
+the model's predicted classes and confidences on held-out data. Live traffic
+updates the same histograms on every inference, with exponential decay so
+they describe recent traffic (`half_life` images).
+
+Each feature is compared with its reference by the Population Stability
+Index (PSI). The drift score is the largest PSI of any component:
+below 0.1 means no meaningful shift, above 0.25 is a significant one.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+
+from src.preprocessing import get_data_statistics
+
+
+PIXEL_FEATURES = ('mean_r', 'mean_g', 'mean_b', 'std_r', 'std_g', 'std_b')
+PIXEL_BINS = 20
+CONFIDENCE_BINS = 20
+# Per-image channel std of [0, 1] pixels is at most 0.5
+_FEATURE_RANGES = np.array([1.0, 1.0, 1.0, 0.5, 0.5, 0.5])
+_PSI_EPSILON = 1e-4
+
+
+def pixel_features(images, chunk_size=4096):
+    """
+    Per-image channel means and standard deviations.
+
+    Args:
+        images: (N, H, W, 3) pixels, uint8 or float in [0, 1]
+        chunk_size: Images converted at a time (bounds memory on a full
+            training set)
+
+    Returns:
+        (N, 6) float array ordered like PIXEL_FEATURES
+    """
+    images = np.asarray(images)
+    if images.ndim == 3:
+        images = images[np.newaxis]
+    features = np.empty((len(images), len(PIXEL_FEATURES)), dtype=np.float32)
+    for start in range(0, len(images), chunk_size):
+        chunk = images[start:start + chunk_size]
+        flat = chunk.reshape(len(chunk), -1, chunk.shape[-1]).astype(np.float32, copy=False)
+        if images.dtype == np.uint8:
+            flat = flat / 255.0
+        # Moments from two sums; several times cheaper than mean() + std() on small batches
+        n = flat.shape[1]
+        mean = np.einsum('ijk->ik', flat) / n
+        mean_sq = np.einsum('ijk,ijk->ik', flat, flat) / n
+        features[start:start + len(chunk), :3] = mean
+        features[start:start + len(chunk), 3:] = np.sqrt(np.maximum(mean_sq - mean * mean, 0))
+    return features
+
+
+def _feature_bins(features):
+    """Histogram bin of each feature value, shape (N, 6)."""
+    scaled = features / _FEATURE_RANGES
+    return np.clip((scaled * PIXEL_BINS).astype(np.int64), 0, PIXEL_BINS - 1)
+
+
+def _confidence_bins(confidences):
+    return np.clip((np.asarray(confidences) * CONFIDENCE_BINS).astype(np.int64), 0, CONFIDENCE_BINS - 1)
+
+
+def _histograms(features, predicted_classes, confidences, num_classes):
+    """Pixel, class and confidence histograms of a set of observations."""
+    # One bincount over all features: feature f uses bins [f * PIXEL_BINS, (f + 1) * PIXEL_BINS)
+    bins = _feature_bins(features) + np.arange(len(PIXEL_FEATURES)) * PIXEL_BINS
+    pixel = np.bincount(bins.ravel(), minlength=len(PIXEL_FEATURES) * PIXEL_BINS).astype(np.float64)
+    pixel = pixel.reshape(len(PIXEL_FEATURES), PIXEL_BINS)
+    classes = np.bincount(predicted_classes, minlength=num_classes).astype(np.float64)
+    confidence = np.bincount(_confidence_bins(confidences), minlength=CONFIDENCE_BINS).astype(np.float64)
+    return pixel, classes, confidence
+
+
+def psi(reference, live):
+    """
+    Population Stability Index between two histograms on the same bins.
+
+    Returns:
+        float (0 for identical distributions)
+    """
+    reference = np.asarray(reference, dtype=np.float64)
+    live = np.asarray(live, dtype=np.float64)
+    p = reference / reference.sum() + _PSI_EPSILON
+    q = live / live.sum() + _PSI_EPSILON
+    return float(np.sum((q - p) * np.log(q / p)))
+
+
+def build_reference_profile(X, y, class_names, model=None, sample_size=2000, seed=0):
+    """
+    Reference profile of a training set.
+
+    Args:
+        X: Training images, uint8 or float in [0, 1]
+        y: Labels (integers or one-hot)
+        class_names: Class names
+        model: Model whose predicted classes and confidences on a sample of X
+            form the prediction reference (label distribution when None)
+        sample_size: Images sampled for the model predictions
+
+    Returns:
+        JSON-serializable dict
+    """
+    labels = np.argmax(y, axis=1) if np.ndim(y) > 1 else np.ravel(y)
+    summary = get_data_statistics(X, labels, class_names)
+    features = pixel_features(X)
+
+    if model is not None:
+        rng = np.random.default_rng(seed)
+        sample = rng.choice(len(X), size=min(sample_size, len(X)), replace=False)
+        images = X[sample]
+        if images.dtype == np.uint8:
+            images = images.astype(np.float32) / 255.0
+        predictions = model.predict(images, verbose=0)
+        predicted = np.argmax(predictions, axis=1)
+        confidences = predictions.max(axis=1)
+    else:
+        predicted = labels.astype(np.int64)
+        confidences = None
+
+    pixel, classes, confidence = _histograms(
+        features, predicted, confidences if confidences is not None else [], len(class_names)
+    )
+    return {
+        'created_at': datetime.now().isoformat(),
+        'total_samples': summary['total_samples'],
+        'pixel_mean': summary['pixel_mean'],
+        'pixel_std': summary['pixel_std'],
+        'channel_mean': summary['channel_mean'],
+        'channel_std': summary['channel_std'],
+        'class_distribution': summary['class_distribution'],
+        'pixel_histograms': pixel.tolist(),
+        'class_histogram': classes.tolist(),
+        'confidence_histogram': confidence.tolist() if confidences is not None else None
+    }
+
+
+def save_reference_profile(profile, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(profile, f)
+    os.replace(tmp_path, path)
+
+
+def load_reference_profile(path):
+    """Saved profile, or None if there is none."""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+class DriftMonitor:
+    """
+    Decayed live histograms compared against a reference profile.
+
+    Usage:
+        monitor = DriftMonitor(class_names, reference=load_reference_profile(path))
+        monitor.observe(images, probabilities)   # on every inference
+        monitor.report()['drift_score']
+    """
+
+    def __init__(self, class_names, reference=None, half_life=2000, min_samples=200):
+        """
+        Initialize monitor.
+
+        Args:
+            class_names: Class names
+            reference: Profile from build_reference_profile (None disables scoring)
+            half_life: Images after which an observation counts half
+            min_samples: Images needed before a score is reported
+        """
+        self.class_names = list(class_names)
+        self.half_life = half_life
+        self.min_samples = min_samples
+        self._decay = 0.5 ** (1.0 / half_life)
+        self._lock = threading.Lock()
+        self.reference = reference
+        self.reset()
+
+    def reset(self):
+        """Forget live traffic (e.g. after the model or reference changed)."""
+        with self._lock:
+            self.samples = 0
+            self._pixel = np.zeros((len(PIXEL_FEATURES), PIXEL_BINS))
+            self._classes = np.zeros(len(self.class_names))
+            self._confidence = np.zeros(CONFIDENCE_BINS)
+
+    def set_reference(self, reference):
+        self.reference = reference
+        self.reset()
+
+    def observe(self, images, probabilities):
+        """
+        Add a batch of live inputs and the model's outputs.
+
+        Args:
+            images: (N, 32, 32, 3) model inputs
+            probabilities: (N, num_classes) model outputs
+        """
+        probabilities = np.asarray(probabilities)
+        pixel, classes, confidence = _histograms(
+            pixel_features(images), np.argmax(probabilities, axis=1),
+            probabilities.max(axis=1), len(self.class_names)
+        )
+        decay = self._decay ** len(probabilities)
+        with self._lock:
+            self._pixel *= decay
+            self._pixel += pixel
+            self._classes *= decay
+            self._classes += classes
+            self._confidence *= decay
+            self._confidence += confidence
+            self.samples += len(probabilities)
+
+    @property
+    def ready(self):
+        return self.reference is not None and self.samples >= self.min_samples
+
+    def report(self):
+        """
+        Current drift score and its components.
+
+        Returns:
+            dict; drift_score is None until a reference is loaded and
+            min_samples images were observed
+        """
+        with self._lock:
+            pixel = self._pixel.copy()
+            classes = self._classes.copy()
+            confidence = self._confidence.copy()
+            samples = self.samples
+
+        report = {
+            'ready': self.ready,
+            'samples': samples,
+            'min_samples': self.min_samples,
+            'half_life': self.half_life,
+            'drift_score': None,
+            'components': None,
+            'reference': None
+        }
+        if self.reference is None:
+            return report
+        report['reference'] = {
+            'created_at': self.reference.get('created_at'),
+            'total_samples': self.reference.get('total_samples')
+        }
+        if not self.ready:
+            return report
+
+        reference_pixel = self.reference['pixel_histograms']
+        pixel_psi = {name: psi(reference_pixel[f], pixel[f]) for f, name in enumerate(PIXEL_FEATURES)}
+        components = {
+            'pixel': max(pixel_psi.values()),
+            'pixel_features': pixel_psi,
+            'predicted_class': psi(self.reference['class_histogram'], classes),
+            'confidence': psi(self.reference['confidence_histogram'], confidence)
+            if self.reference.get('confidence_histogram') else None
+        }
+        report['components'] = components
+        report['drift_score'] = max(
+            v for k, v in components.items() if k != 'pixel_features' and v is not None
+        )
+        return report
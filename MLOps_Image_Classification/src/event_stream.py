@@ -0,0 +1,254 @@
+"""
+Event Stream Module
+Server-sent events (SSE) push channel for dashboard updates.
+
+One broadcaster thread computes the state of each topic (e.g. uptime, retrain
+status, statistics, model version) and fans the result out to every
+subscriber, so the cost does not grow with the number of open dashboards:
+    - a topic is only recomputed when its cheap key changes
+    - an event is only sent when the topic's payload actually changed, and
+      then only with the top-level fields that changed (clients merge them)
+    - `notify()` wakes the broadcaster early, but ticks are never closer than
+      `min_interval`, so bursts of changes are coalesced
+    - each subscriber has a bounded queue; a subscriber too slow to drain it
+      is disconnected (the browser reconnects and gets a fresh snapshot)
+"""
+
+import json
+import time
+import queue
+import threading
+import itertools
+
+
+def format_event(event, data, event_id=None, retry_ms=None):
+    """
+    Encode one SSE message.
+
+    Args:
+        event: Event name
+        data: JSON-serializable payload
+        event_id: Optional id field
+        retry_ms: Optional reconnection delay for the client
+
+    Returns:
+        str
+    """
+    lines = []
+    if retry_ms is not None:
+        lines.append(f"retry: {int(retry_ms)}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'), default=str)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def _delta(previous, current):
+    """Top-level fields of current that differ from previous (all if not dicts)."""
+    if not isinstance(previous, dict) or not isinstance(current, dict):
+        return current
+    return {k: v for k, v in current.items() if previous.get(k, object()) != v}
+
+
+class Subscription:
+    """One connected client."""
+
+    def __init__(self, broadcaster, queue_size):
+        self._broadcaster = broadcaster
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def put(self, message):
+        """Queue a message; returns False if the subscriber fell behind."""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except queue.Full:
+            return False
+
+    def messages(self, heartbeat=15.0, max_seconds=None):
+        """
+        Yield SSE messages until the subscription is closed.
+
+        Args:
+            heartbeat: Seconds of silence before a keep-alive comment is sent
+            max_seconds: Close the stream after this long (the client reconnects)
+        """
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+        try:
+            while not self.closed:
+                timeout = heartbeat
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    timeout = min(timeout, remaining)
+                try:
+                    message = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.close()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self._broadcaster.unsubscribe(self)
+
+
+class EventBroadcaster:
+    """
+    Computes topic state once and pushes changes to all subscribers.
+
+    Usage:
+        broadcaster = EventBroadcaster(min_interval=1.0)
+        broadcaster.add_topic('statistics', key_fn=lambda: predictor.history_generation,
+                              build_fn=predictor.get_prediction_statistics)
+        subscription = broadcaster.subscribe()
+        return Response(subscription.messages(), mimetype='text/event-stream')
+    """
+
+    def __init__(self, min_interval=1.0, poll_interval=5.0, max_subscribers=100,
+                 queue_size=32, retry_ms=3000):
+        """
+        Initialize broadcaster.
+
+        Args:
+            min_interval: Minimum seconds between two ticks (coalescing)
+            poll_interval: Seconds between ticks without notify()
+            max_subscribers: Subscribers accepted at the same time
+            queue_size: Messages buffered per subscriber
+            retry_ms: Reconnection delay sent to clients
+        """
+        self.min_interval = min_interval
+        self.poll_interval = max(poll_interval, min_interval)
+        self.max_subscribers = max_subscribers
+        self.queue_size = queue_size
+        self.retry_ms = retry_ms
+
+        self._topics = {}
+        self._state = {}
+        self._keys = {}
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._ids = itertools.count(1)
+        self.ticks = 0
+        self.builds = 0
+        self.errors = 0
+
+    def add_topic(self, name, build_fn, key_fn=None):
+        """
+        Register a topic.
+
+        Args:
+            name: Event name
+            build_fn: Function returning the topic's payload
+            key_fn: Cheap function whose result changes whenever the payload
+                may have changed; without it the payload is rebuilt every tick
+        """
+        self._topics[name] = (build_fn, key_fn)
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        """
+        Add a subscriber, primed with a snapshot of every topic.
+
+        Returns:
+            Subscription, or None when at capacity
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            subscription = Subscription(self, self.queue_size)
+            self._subscribers.add(subscription)
+            first = self._thread is None
+            if first:
+                self._thread = threading.Thread(target=self._run, name='sse-broadcaster', daemon=True)
+
+        if first:
+            self._refresh()
+            self._thread.start()
+        else:
+            # State may be up to poll_interval old; follow up promptly
+            self.notify()
+        subscription.put(format_event('snapshot', dict(self._state), event_id=next(self._ids),
+                                      retry_ms=self.retry_ms))
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def notify(self):
+        """Something changed; push soon (coalesced to min_interval)."""
+        self._wake.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.closed = True
+            subscription.put(None)
+
+    def _refresh(self):
+        """Recompute changed topics; returns {topic: delta} of changed payloads."""
+        changes = {}
+        for name, (build_fn, key_fn) in self._topics.items():
+            key = key_fn() if key_fn is not None else None
+            if key_fn is not None and name in self._state and self._keys.get(name) == key:
+                continue
+            payload = build_fn()
+            self.builds += 1
+            self._keys[name] = key
+            previous = self._state.get(name)
+            if payload != previous:
+                changes[name] = _delta(previous, payload) if previous is not None else payload
+                self._state[name] = payload
+        return changes
+
+    def tick(self):
+        """Run one broadcast round (called by the background thread)."""
+        self.ticks += 1
+        changes = self._refresh()
+        if not changes:
+            return 0
+
+        messages = [format_event(name, delta, event_id=next(self._ids)) for name, delta in changes.items()]
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            for message in messages:
+                if not subscription.put(message):
+                    # Too slow; drop it rather than buffer without bound
+                    subscription.closed = True
+                    self.unsubscribe(subscription)
+                    break
+        return len(messages)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            if self._subscribers:
+                try:
+                    self.tick()
+                except Exception:
+                    # A failing topic must not end the stream for everyone
+                    self.errors += 1
+            # Coalesce: changes arriving now are picked up by the next tick
+            self._stop.wait(self.min_interval)
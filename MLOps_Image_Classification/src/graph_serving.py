@@ -0,0 +1,126 @@
+"""
+Graph Serving Module
+Classifies encoded PNG/JPEG bytes with decoding and resizing inside the
+TensorFlow graph.
+
+The PIL path (DataPreprocessor) decodes and resizes each upload in Python,
+holding the GIL, before the model sees it. Here one tf.function takes a batch
+of encoded images and runs, for each of them,
+    tf.io.decode_image -> float32 -> LANCZOS resize to 32x32 -> [0, 1]
+under tf.map_fn with parallel_iterations, so the TF runtime decodes the
+images of a batch concurrently on its intra-op threads, then classifies the
+whole batch in one model call. It returns the probabilities and the
+normalized 32x32x3 pixels (drift and shadow monitoring use them).
+
+The app traces the function from the live Keras model, so it always matches
+the model being served, retrains included. The same function is exported as
+a SavedModel signature ('image_bytes' export, see model_store), which TF
+Serving or any TF runtime can call without this repository's Python code:
+    serving_default(image_bytes: string[N]) -> probabilities: float32[N, 10],
+                                               images: float32[N, 32, 32, 3]
+
+Header validation (src/image_validation.py) is not part of the graph:
+callers must check dimensions and format before handing bytes to it, as
+tf.io.decode_image allocates the full decoded image.
+"""
+
+import numpy as np
+import tensorflow as tf
+
+
+IMAGE_SIZE = (32, 32)
+SIGNATURE_NAME = 'serving_default'
+DEFAULT_PARALLEL_ITERATIONS = 8
+
+
+def decode_and_resize(image_bytes, image_size=IMAGE_SIZE):
+    """
+    One encoded image to float32 RGB pixels in [0, 1] (graph op).
+
+    Grayscale and palette images are expanded and alpha is dropped, like
+    PIL's convert('RGB'); animated images use their first frame.
+    """
+    image = tf.io.decode_image(image_bytes, channels=3, expand_animations=False)
+    image.set_shape([None, None, 3])
+    image = tf.image.resize(tf.cast(image, tf.float32), image_size, method='lanczos3', antialias=True)
+    return tf.clip_by_value(image / 255.0, 0.0, 1.0)
+
+
+class ImageBytesModule(tf.Module):
+    """tf.Module holding a Keras model behind an encoded-bytes signature."""
+
+    def __init__(self, model, parallel_iterations=DEFAULT_PARALLEL_ITERATIONS, image_size=IMAGE_SIZE):
+        super().__init__()
+        self.model = model
+        self.parallel_iterations = parallel_iterations
+        self.image_size = tuple(image_size)
+
+    @tf.function(input_signature=[tf.TensorSpec([None], tf.string, name='image_bytes')])
+    def serve(self, image_bytes):
+        images = tf.map_fn(
+            lambda b: decode_and_resize(b, self.image_size),
+            image_bytes,
+            fn_output_signature=tf.TensorSpec(self.image_size + (3,), tf.float32),
+            parallel_iterations=self.parallel_iterations
+        )
+        return {'probabilities': self.model(images, training=False), 'images': images}
+
+
+def export_image_bytes_model(model, path, parallel_iterations=DEFAULT_PARALLEL_ITERATIONS):
+    """
+    Write a SavedModel whose default signature classifies encoded images.
+
+    Args:
+        model: Keras model (inputs in [0, 1])
+        path: Target directory
+        parallel_iterations: Images of a batch decoded concurrently
+    """
+    module = ImageBytesModule(model, parallel_iterations)
+    tf.saved_model.save(module, path, signatures={SIGNATURE_NAME: module.serve})
+
+
+class GraphImageModel:
+    """
+    Encoded-bytes classifier for ImagePredictor: built in memory from the
+    live Keras model, or loaded from an exported SavedModel.
+
+    Usage:
+        graph_model = GraphImageModel.from_keras(model)
+        probabilities, images = graph_model.predict_encoded([png_bytes, jpeg_bytes])
+    """
+
+    def __init__(self, serve_fn):
+        self._serve = serve_fn
+
+    @classmethod
+    def from_keras(cls, model, parallel_iterations=DEFAULT_PARALLEL_ITERATIONS):
+        module = ImageBytesModule(model, parallel_iterations)
+        instance = cls(module.serve)
+        # Keep the module (and the traced function's captures) alive
+        instance._module = module
+        return instance
+
+    @classmethod
+    def load(cls, path):
+        loaded = tf.saved_model.load(path)
+        instance = cls(loaded.signatures[SIGNATURE_NAME])
+        instance._module = loaded
+        return instance
+
+    def predict_encoded(self, encoded_images):
+        """
+        Args:
+            encoded_images: list of PNG/JPEG bytes
+
+        Returns:
+            tuple (float32 probabilities (N, num_classes),
+                   float32 pixels in [0, 1] (N, 32, 32, 3))
+        """
+        outputs = self._serve(image_bytes=tf.constant(list(encoded_images), dtype=tf.string))
+        return outputs['probabilities'].numpy(), outputs['images'].numpy()
+
+
+def warm_up(graph_model, count=2):
+    """Trace the function and build the decoders before the first request."""
+    encoded = tf.io.encode_png(np.zeros((8, 8, 3), dtype=np.uint8)).numpy()
+    graph_model.predict_encoded([encoded] * count)
@@ -0,0 +1,151 @@
+"""
+Image Validation Module
+Header-only checks of uploaded images before any pixel is decoded.
+
+The first bytes identify the format (PNG or JPEG, whatever the file
+extension says). PIL then parses only the header of that one format, which
+gives dimensions, mode and frame count without decoding pixel data. Uploads
+are rejected when they are:
+    - not PNG/JPEG, empty or with an unreadable header
+    - larger than max_dimension on a side, or than max_pixels in total
+      (this also stops decompression bombs: a few KB of PNG that would
+      decode to gigabytes)
+    - in an unsupported mode, or animated (more than max_frames frames)
+
+Large but acceptable JPEGs are routed to a reduced-size decode (the JPEG
+decoder scales by 1/2, 1/4 or 1/8 while decoding), since the model only
+needs 32x32 pixels.
+"""
+
+from PIL import Image
+
+from src import metrics
+
+
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+JPEG_MAGIC = b'\xff\xd8\xff'
+ALLOWED_MODES = ('1', 'L', 'LA', 'P', 'PA', 'RGB', 'RGBA', 'RGBX', 'CMYK', 'YCbCr',
+                 'I', 'I;16', 'I;16B', 'F')
+
+REJECTION_REASONS = (
+    'empty', 'unsupported_format', 'corrupt_header', 'too_large_dimensions',
+    'too_many_pixels', 'unsupported_mode', 'animated'
+)
+# Reasons meaning "too big" rather than "malformed" (HTTP 413 instead of 400)
+SIZE_REASONS = ('too_large_dimensions', 'too_many_pixels')
+
+
+class ImageRejected(ValueError):
+    """Raised when an upload fails header validation."""
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+
+
+class ImageLimits:
+    """Limits applied by validate_image_header."""
+
+    def __init__(self, max_dimension=8192, max_pixels=25_000_000, max_frames=1,
+                 downscale_pixels=1_000_000):
+        """
+        Args:
+            max_dimension: Largest accepted width or height
+            max_pixels: Largest accepted width * height
+            max_frames: Largest accepted frame count (1 rejects animations)
+            downscale_pixels: JPEGs above this many pixels are decoded at
+                reduced size
+        """
+        self.max_dimension = max_dimension
+        self.max_pixels = max_pixels
+        self.max_frames = max_frames
+        self.downscale_pixels = downscale_pixels
+
+
+class ImageHeader:
+    """What the header says about an upload, and how to decode it."""
+
+    __slots__ = ('format', 'width', 'height', 'mode', 'frames', 'downscale')
+
+    def __init__(self, format, width, height, mode, frames, downscale):
+        self.format = format
+        self.width = width
+        self.height = height
+        self.mode = mode
+        self.frames = frames
+        self.downscale = downscale
+
+
+def sniff_format(head):
+    """Image format from the first bytes of a file ('PNG', 'JPEG' or None)."""
+    if head.startswith(PNG_MAGIC):
+        return 'PNG'
+    if head.startswith(JPEG_MAGIC):
+        return 'JPEG'
+    return None
+
+
+def _reject(reason, message):
+    metrics.record_image_rejection(reason)
+    return ImageRejected(reason, message)
+
+
+def validate_image_header(fp, limits=None):
+    """
+    Check an upload from its header only.
+
+    Args:
+        fp: Path or binary file object (rewound afterwards)
+        limits: ImageLimits (defaults when None)
+
+    Returns:
+        ImageHeader
+
+    Raises:
+        ImageRejected: With a `reason` from REJECTION_REASONS
+    """
+    limits = limits or ImageLimits()
+    close = isinstance(fp, str)
+    f = open(fp, 'rb') if close else fp
+    try:
+        start = f.tell()
+        head = f.read(len(PNG_MAGIC))
+        f.seek(start)
+        if not head:
+            raise _reject('empty', 'Empty file')
+
+        image_format = sniff_format(head)
+        if image_format is None:
+            raise _reject('unsupported_format', 'Not a PNG or JPEG image')
+
+        try:
+            # Lazy open: parses the header of this one format, decodes nothing
+            with Image.open(f, formats=(image_format,)) as img:
+                width, height = img.size
+                mode = img.mode
+                frames = getattr(img, 'n_frames', 1)
+        except Image.DecompressionBombError:
+            raise _reject('too_many_pixels', 'Image dimensions exceed the decompression limit')
+        except Exception:
+            raise _reject('corrupt_header', f'Unreadable {image_format} header')
+        finally:
+            f.seek(start)
+    finally:
+        if close:
+            f.close()
+
+    if width <= 0 or height <= 0 or max(width, height) > limits.max_dimension:
+        raise _reject('too_large_dimensions',
+                      f'Image is {width}x{height}; the limit is {limits.max_dimension} per side')
+    if width * height > limits.max_pixels:
+        raise _reject('too_many_pixels',
+                      f'Image has {width * height} pixels; the limit is {limits.max_pixels}')
+    if mode not in ALLOWED_MODES:
+        raise _reject('unsupported_mode', f'Unsupported image mode: {mode}')
+    if frames > limits.max_frames:
+        raise _reject('animated', f'Animated images are not supported ({frames} frames)')
+
+    return ImageHeader(
+        image_format, width, height, mode, frames,
+        downscale=image_format == 'JPEG' and width * height > limits.downscale_pixels
+    )
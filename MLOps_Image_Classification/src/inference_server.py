@@ -0,0 +1,514 @@
+"""
+Inference Server Module
+One process owns the model and batches inference for every HTTP worker.
+
+With INFERENCE_MODE=remote, HTTP workers parse requests and decode images,
+and never load the model. They send 32x32x3 uint8 tensors over a Unix
+domain socket to a single inference server process. That process is the
+only one with TensorFlow's runtime and weights. Its batcher takes the
+oldest pending request plus every request queued behind it, up to
+max_batch images. This works across all connections, so all workers on the
+host share each model call. While one batch runs, the next one builds up;
+at low load a request is never held back unless max_wait_ms is set.
+
+Wire format (little-endian), one frame per call on a per-thread connection:
+    request:  4s magic 'IMGQ' | B op | I request id | I count | count x 3072 uint8
+    response: 4s magic 'IMGP' | B status | I request id | I payload bytes | f model ms | payload
+where op 1 is predict (payload: count x num_classes float32) and op 2 is info
+(payload: JSON). Status 1 carries an error message.
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import atexit
+import socket
+import signal
+import struct
+import threading
+import subprocess
+
+import numpy as np
+
+
+REQUEST = struct.Struct('<4sBII')
+RESPONSE = struct.Struct('<4sBIIf')
+REQUEST_MAGIC = b'IMGQ'
+RESPONSE_MAGIC = b'IMGP'
+OP_PREDICT = 1
+OP_INFO = 2
+STATUS_OK = 0
+STATUS_ERROR = 1
+IMAGE_SHAPE = (32, 32, 3)
+IMAGE_BYTES = int(np.prod(IMAGE_SHAPE))
+
+
+def _recv_exactly(sock, size):
+    """Read exactly `size` bytes (None if the peer closed before the first byte)."""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            if received == 0:
+                return None
+            raise ConnectionError('Connection closed mid-frame')
+        received += n
+    return buffer
+
+
+def to_uint8(images):
+    """Model inputs as uint8 pixels ([0, 1] floats are scaled and rounded)."""
+    images = np.asarray(images)
+    if images.dtype == np.uint8:
+        return images
+    return np.clip(np.rint(images * 255.0), 0, 255).astype(np.uint8)
+
+
+class _Pending:
+    """One predict call waiting for the batcher."""
+
+    __slots__ = ('conn', 'send_lock', 'request_id', 'images')
+
+    def __init__(self, conn, send_lock, request_id, images):
+        self.conn = conn
+        self.send_lock = send_lock
+        self.request_id = request_id
+        self.images = images
+
+
+class InferenceServer:
+    """
+    Serves a Keras model to local processes over a Unix domain socket.
+
+    Usage:
+        server = InferenceServer(model, '/tmp/inference.sock', info={...}).start()
+        ...
+        server.stop()
+    """
+
+    def __init__(self, model, socket_path, info=None, max_batch=64, max_wait_ms=0.0):
+        """
+        Initialize server.
+
+        Args:
+            model: Keras model (inputs in [0, 1])
+            socket_path: Unix socket path (a stale file is replaced)
+            info: JSON-serializable model description returned by op info
+            max_batch: Most images per model call
+            max_wait_ms: How long a batch may wait for more requests
+                (0: only batch what is already queued)
+        """
+        self.model = model
+        self.socket_path = socket_path
+        self.info = dict(info or {})
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._stop = threading.Event()
+        self._listener = None
+        self._threads = []
+        self._connections = set()
+        self._stats_lock = threading.Lock()
+        self.batches = 0
+        self.images = 0
+        self.requests = 0
+        self.errors = 0
+
+    def start(self):
+        """Listen and start the batcher (socket removed at interpreter exit)."""
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path) or '.', exist_ok=True)
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(self.socket_path)
+        self._listener.listen(128)
+        for target, name in ((self._accept_loop, 'inference-accept'),
+                             (self._batch_loop, 'inference-batcher')):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        atexit.register(self.stop)
+        return self
+
+    def serve_forever(self):
+        self.start()
+        self._stop.wait()
+
+    def stop(self):
+        self._stop.set()
+        self._queue.put(None)
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        # Clients see their connection drop and reconnect to the next server
+        for conn in list(self._connections):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'requests': self.requests,
+                'images': self.images,
+                'batches': self.batches,
+                'errors': self.errors,
+                'average_batch_size': self.images / self.batches if self.batches else None
+            }
+
+    def _accept_loop(self):
+        while not self._stop.is_set():
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._connection_loop, args=(conn,),
+                             name='inference-conn', daemon=True).start()
+
+    def _send(self, conn, send_lock, request_id, payload, status=STATUS_OK, elapsed_ms=0.0):
+        with send_lock:
+            conn.sendall(RESPONSE.pack(RESPONSE_MAGIC, status, request_id, len(payload), elapsed_ms) + payload)
+
+    def _connection_loop(self, conn):
+        send_lock = threading.Lock()
+        self._connections.add(conn)
+        try:
+            while not self._stop.is_set():
+                header = _recv_exactly(conn, REQUEST.size)
+                if header is None:
+                    return
+                magic, op, request_id, count = REQUEST.unpack(header)
+                if magic != REQUEST_MAGIC:
+                    raise ConnectionError('Bad frame')
+                if op == OP_INFO:
+                    self._send(conn, send_lock, request_id, json.dumps({**self.info, **self.stats()}).encode())
+                elif op == OP_PREDICT and count == 0:
+                    self._send(conn, send_lock, request_id, b'')
+                elif op == OP_PREDICT:
+                    body = _recv_exactly(conn, count * IMAGE_BYTES)
+                    if body is None:
+                        return
+                    images = np.frombuffer(body, dtype=np.uint8).reshape((count,) + IMAGE_SHAPE)
+                    self._queue.put(_Pending(conn, send_lock, request_id, images))
+                else:
+                    self._send(conn, send_lock, request_id, f'Unknown op {op}'.encode(), STATUS_ERROR)
+        except (OSError, ConnectionError):
+            pass
+        finally:
+            self._connections.discard(conn)
+            conn.close()
+
+    def _next_batch(self):
+        """Oldest pending call plus whatever queued behind it, up to max_batch images."""
+        first = self._queue.get()
+        if first is None:
+            return []
+        batch, size = [first], len(first.images)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch:
+            try:
+                timeout = deadline - time.perf_counter()
+                pending = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if pending is None:
+                self._queue.put(None)
+                break
+            batch.append(pending)
+            size += len(pending.images)
+        return batch
+
+    def _batch_loop(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            try:
+                images = np.concatenate([p.images for p in batch]).astype(np.float32) / 255.0
+                start = time.perf_counter()
+                probabilities = np.asarray(self.model.predict(images, verbose=0), dtype=np.float32)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+            except Exception as e:
+                with self._stats_lock:
+                    self.errors += len(batch)
+                for pending in batch:
+                    self._reply(pending, str(e).encode(), STATUS_ERROR)
+                continue
+
+            with self._stats_lock:
+                self.batches += 1
+                self.requests += len(batch)
+                self.images += len(images)
+            offset = 0
+            for pending in batch:
+                n = len(pending.images)
+                self._reply(pending, probabilities[offset:offset + n].tobytes(), STATUS_OK, elapsed_ms)
+                offset += n
+
+    def _reply(self, pending, payload, status, elapsed_ms=0.0):
+        try:
+            self._send(pending.conn, pending.send_lock, pending.request_id, payload, status, elapsed_ms)
+        except OSError:
+            pass  # client went away
+
+
+class InferenceClient:
+    """
+    Client of an InferenceServer; one connection per calling thread.
+
+    Usage:
+        client = InferenceClient('/tmp/inference.sock')
+        probabilities, model_ms = client.predict(pixels)   # uint8 (N, 32, 32, 3)
+    """
+
+    def __init__(self, socket_path, timeout=30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._request_ids = iter(range(1, 2 ** 32))
+        self._id_lock = threading.Lock()
+
+    def _connection(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _disconnect(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def _call(self, op, count=0, body=b''):
+        with self._id_lock:
+            request_id = next(self._request_ids)
+        frame = REQUEST.pack(REQUEST_MAGIC, op, request_id, count) + body
+        # A connection broken by a server restart is retried once on a new one
+        for attempt in (0, 1):
+            try:
+                sock = self._connection()
+                sock.sendall(frame)
+                header = _recv_exactly(sock, RESPONSE.size)
+                if header is None:
+                    raise ConnectionError('Inference server closed the connection')
+                magic, status, reply_id, size, elapsed_ms = RESPONSE.unpack(header)
+                if magic != RESPONSE_MAGIC or reply_id != request_id:
+                    raise ConnectionError('Unexpected reply from inference server')
+                payload = _recv_exactly(sock, size) if size else bytearray()
+                break
+            except (OSError, ConnectionError):
+                self._disconnect()
+                if attempt:
+                    raise
+        if status != STATUS_OK:
+            raise RuntimeError(f"Inference server error: {bytes(payload).decode(errors='replace')}")
+        return payload, elapsed_ms
+
+    def predict(self, images):
+        """
+        Args:
+            images: uint8 (N, 32, 32, 3) or (32, 32, 3), or floats in [0, 1]
+
+        Returns:
+            tuple (float32 probabilities (N, num_classes), model time in ms)
+        """
+        images = to_uint8(images).reshape((-1,) + IMAGE_SHAPE)
+        if not len(images):
+            return np.empty((0, 0), dtype=np.float32), 0.0
+        payload, elapsed_ms = self._call(OP_PREDICT, len(images), np.ascontiguousarray(images).tobytes())
+        return np.frombuffer(payload, dtype=np.float32).reshape(len(images), -1), elapsed_ms
+
+    def info(self):
+        """Model description and batching counters of the server."""
+        payload, _ = self._call(OP_INFO)
+        return json.loads(bytes(payload))
+
+    def wait_until_ready(self, timeout=120.0, interval=0.2):
+        """Poll the server until it answers (it loads the model first)."""
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.info()
+            except (OSError, ConnectionError):
+                self._disconnect()
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(interval)
+
+
+class RemoteModel:
+    """Stands in for the Keras model in ImagePredictor, predicting via the server."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def predict(self, images, verbose=0):
+        return self.client.predict(images)[0]
+
+
+class RemoteModelClassifier:
+    """
+    Serving-side view of the model held by the inference server, with the
+    attributes app.py reads from ImageClassificationModel.
+    """
+
+    is_remote = True
+
+    def __init__(self, client):
+        self.client = client
+        info = client.info()
+        self.model = RemoteModel(client)
+        self.model_version = info.get('model_version')
+        self.input_shape = tuple(info.get('input_shape', IMAGE_SHAPE))
+        self.num_classes = info.get('num_classes')
+        self.training_metadata = info.get('training_metadata', {})
+        self._summary = info.get('model_summary', '')
+
+    def get_model_summary(self):
+        return self._summary
+
+    def check_retraining_needed(self, *args, **kwargs):
+        from src.model import ImageClassificationModel
+        # Plain decision logic; it does not use the model itself
+        return ImageClassificationModel.check_retraining_needed(self, *args, **kwargs)
+
+
+def run_inference_server(model_dir, socket_path, intra_op_threads=None, inter_op_threads=1,
+                         max_batch=64, max_wait_ms=0.0):
+    """
+    Process entry point: load the model and serve until terminated.
+
+    Args:
+        model_dir: Model directory
+        socket_path: Unix socket path
+        intra_op_threads: TensorFlow intra-op threads (None: TensorFlow default)
+        inter_op_threads: TensorFlow inter-op threads
+        max_batch: Most images per model call
+        max_wait_ms: How long a batch may wait for more requests
+    """
+    if intra_op_threads:
+        from src.prefork import configure_tf_threads
+        configure_tf_threads(intra_op_threads, inter_op_threads)
+    from src.model import load_latest_model
+
+    model_classifier = load_latest_model(model_dir, serving_only=True)
+    # Build the predict function before the first request arrives
+    model_classifier.model.predict(np.zeros((1,) + IMAGE_SHAPE, dtype=np.float32), verbose=0)
+    info = {
+        'model_version': model_classifier.model_version,
+        'input_shape': list(model_classifier.input_shape),
+        'num_classes': model_classifier.num_classes,
+        'training_metadata': model_classifier.training_metadata,
+        'model_summary': model_classifier.get_model_summary(),
+        'pid': os.getpid()
+    }
+    server = InferenceServer(model_classifier.model, socket_path, info=json.loads(json.dumps(info, default=str)),
+                             max_batch=max_batch, max_wait_ms=max_wait_ms)
+    print(f"Inference server listening on {socket_path} (max batch {max_batch})")
+    server.serve_forever()
+
+
+class InferenceServerProcess:
+    """
+    Runs the inference server as a child process and restarts it if it dies.
+
+    Usage:
+        server = InferenceServerProcess('models', '/tmp/inference.sock').start()
+        ...
+        server.stop()
+    """
+
+    def __init__(self, model_dir, socket_path, intra_op_threads=None, inter_op_threads=1,
+                 max_batch=64, max_wait_ms=0.0, startup_timeout=300.0):
+        self.model_dir = model_dir
+        self.socket_path = socket_path
+        self.args = [
+            '--model-dir', model_dir, '--socket', socket_path,
+            '--intra-op-threads', str(intra_op_threads or 0), '--inter-op-threads', str(inter_op_threads),
+            '--max-batch', str(max_batch), '--max-wait-ms', str(max_wait_ms)
+        ]
+        self.startup_timeout = startup_timeout
+        self.restarts = 0
+        self.process = None
+        self.info = None
+        self._owner_pid = os.getpid()
+        self._stop = threading.Event()
+
+    def _launch(self):
+        # A plain subprocess: a fresh interpreter, and nothing for forked HTTP workers to inherit
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        self.process = subprocess.Popen([sys.executable, '-m', 'src.inference_server'] + self.args, cwd=root)
+        client = InferenceClient(self.socket_path)
+        deadline = time.monotonic() + self.startup_timeout
+        while self.process.poll() is None:
+            try:
+                return client.wait_until_ready(timeout=min(5.0, max(0.0, deadline - time.monotonic())))
+            except (OSError, ConnectionError):
+                if time.monotonic() > deadline:
+                    raise
+        raise RuntimeError(f"Inference server exited during start-up ({self.process.returncode})")
+
+    def start(self):
+        """Start the server and wait until it answers; returns self."""
+        self.info = self._launch()
+        threading.Thread(target=self._watch, name='inference-monitor', daemon=True).start()
+        atexit.register(self.stop)
+        return self
+
+    def _watch(self):
+        while not self._stop.is_set():
+            if self.process.poll() is None:
+                self._stop.wait(1.0)
+                continue
+            print(f"Inference server exited ({self.process.returncode}); restarting")
+            self.restarts += 1
+            try:
+                self._launch()
+            except Exception as e:
+                print(f"Warning: Could not restart inference server: {str(e)}")
+                self._stop.wait(5.0)
+
+    def stop(self):
+        # Forked HTTP workers inherit this object (and its atexit hook); only the owner stops it
+        if os.getpid() != self._owner_pid:
+            return
+        self._stop.set()
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Inference server (one model, batched for all workers)')
+    parser.add_argument('--model-dir', required=True)
+    parser.add_argument('--socket', required=True)
+    parser.add_argument('--intra-op-threads', type=int, default=0)
+    parser.add_argument('--inter-op-threads', type=int, default=1)
+    parser.add_argument('--max-batch', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=0.0)
+    args = parser.parse_args()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    run_inference_server(args.model_dir, args.socket, intra_op_threads=args.intra_op_threads or None,
+                         inter_op_threads=args.inter_op_threads, max_batch=args.max_batch,
+                         max_wait_ms=args.max_wait_ms)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Metrics Module
+Prometheus metrics for the API: request counters, per-endpoint and per-stage
+latency histograms, in-flight gauges, model version, retraining state and
+input drift score.
+
+All timings use the monotonic `time.perf_counter` clock. Labelled children are
+resolved once and cached, so the hot path is a dictionary lookup plus one
+histogram observation.
+
+When several worker processes serve the app (e.g. gunicorn), set
+PROMETHEUS_MULTIPROC_DIR to an empty, writable directory before start-up. Every
+worker then writes its samples to memory-mapped files in that directory, and
+the exposition merges them, so scrapes are consistent regardless of which
+worker answers. Call `mark_process_dead(pid)` from gunicorn's `child_exit` hook.
+"""
+
+import os
+import time
+
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY,
+    generate_latest, start_http_server, multiprocess, CONTENT_TYPE_LATEST
+)
+
+
+PIPELINE_STAGES = (
+    'upload_receive', 'validate', 'decode', 'resize', 'inference', 'persistence', 'serialization'
+)
+
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+    0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def is_multiprocess():
+    """Whether metrics are shared between worker processes."""
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+
+REQUESTS_TOTAL = Counter(
+    'http_requests_total', 'HTTP requests', ['endpoint', 'method', 'status']
+)
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ['endpoint'],
+    buckets=LATENCY_BUCKETS
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight', 'HTTP requests being processed',
+    multiprocess_mode='livesum'
+)
+STAGE_LATENCY = Histogram(
+    'pipeline_stage_duration_seconds', 'Prediction pipeline stage latency', ['stage'],
+    buckets=LATENCY_BUCKETS
+)
+INFERENCE_IN_FLIGHT = Gauge(
+    'inference_in_flight', 'Model inference calls in progress',
+    multiprocess_mode='livesum'
+)
+LOAD_SHED_TOTAL = Counter(
+    'admission_shed_total', 'Requests rejected by admission control', ['endpoint']
+)
+MODEL_INFO = Gauge(
+    'model_info', 'Model version currently served (value is 1)', ['version'],
+    multiprocess_mode='livemax'
+)
+RETRAINING_IN_PROGRESS = Gauge(
+    'retraining_in_progress', 'Whether a retraining run is active',
+    multiprocess_mode='livemax'
+)
+DRIFT_SCORE = Gauge(
+    'input_drift_score', 'Largest PSI between live traffic and the training profile',
+    multiprocess_mode='livemax'
+)
+IMAGE_REJECTED_TOTAL = Counter(
+    'image_rejected_total', 'Uploads rejected by header validation', ['reason']
+)
+
+# Pre-resolved children keep label lookups off the hot path
+_stage_histograms = {stage: STAGE_LATENCY.labels(stage) for stage in PIPELINE_STAGES}
+
+
+class stage_timer:
+    """
+    Context manager that records the duration of a pipeline stage.
+
+    Usage:
+        with stage_timer('decode'):
+            ...
+    """
+
+    __slots__ = ('_histogram', '_start')
+
+    def __init__(self, stage):
+        self._histogram = _stage_histograms[stage]
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._histogram.observe(time.perf_counter() - self._start)
+        return False
+
+
+def observe_request(endpoint, method, status, seconds):
+    """
+    Record one finished HTTP request.
+
+    Args:
+        endpoint: URL rule (bounded cardinality, e.g. '/api/predict')
+        method: HTTP method
+        status: Response status code
+        seconds: Request latency
+    """
+    REQUESTS_TOTAL.labels(endpoint, method, str(status)).inc()
+    REQUEST_LATENCY.labels(endpoint).observe(seconds)
+
+
+def set_model_version(version, previous=None):
+    """
+    Publish the served model version.
+
+    Args:
+        version: New model version
+        previous: Version being replaced (its series is set to 0)
+    """
+    if previous and previous != version:
+        MODEL_INFO.labels(str(previous)).set(0)
+    MODEL_INFO.labels(str(version or 'unknown')).set(1)
+
+
+def set_retraining(active):
+    """Publish whether retraining is running."""
+    RETRAINING_IN_PROGRESS.set(1 if active else 0)
+
+
+def set_drift_score(score):
+    """Publish the latest drift score (None while not enough data)."""
+    if score is not None:
+        DRIFT_SCORE.set(score)
+
+
+def record_image_rejection(reason):
+    """Count one upload rejected by header validation."""
+    IMAGE_REJECTED_TOTAL.labels(reason).inc()
+
+
+def get_registry():
+    """
+    Registry used for exposition.
+
+    Returns:
+        CollectorRegistry merging all worker processes in multiprocess mode,
+        otherwise the default registry
+    """
+    if is_multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics():
+    """
+    Render metrics in the Prometheus text exposition format.
+
+    Returns:
+        tuple: (payload bytes, content type)
+    """
+    return generate_latest(get_registry()), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port, addr='0.0.0.0'):
+    """
+    Serve metrics on a dedicated port.
+
+    With several workers only the first one binds the port; since it exposes
+    the merged multiprocess registry, the others do not need their own server.
+
+    Args:
+        port: Port to listen on
+        addr: Address to bind
+
+    Returns:
+        bool: True if this process started the server
+    """
+    try:
+        start_http_server(port, addr=addr, registry=get_registry())
+        return True
+    except OSError:
+        return False
+
+
+def mark_process_dead(pid):
+    """Clean up a dead worker's live gauges (gunicorn child_exit hook)."""
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid)
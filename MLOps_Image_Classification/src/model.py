@@ -14,6 +14,11 @@ import os
 import json
 from datetime import datetime
 
+from src.model_store import (
+    write_model, write_model_async, verified_artifact_path, manifest_path,
+    read_manifest, load_weights_file
+)
+
 
 class ImageClassificationModel:
     """Class for handling model operations."""
@@ -24,13 +29,18 @@ class ImageClassificationModel:
         self.model = None
         self.history = None
         self.training_metadata = {}
+        self.model_version = None
     
-    def create_cnn_model(self):
+    def create_cnn_model(self, compile=True):
         """
         Create a CNN model for image classification.
         
+        Args:
+            compile: Whether to compile the model (serving-only replicas skip
+                the optimizer and loss)
+        
         Returns:
-            Compiled Keras model
+            Keras model (compiled unless compile=False)
         """
         model = models.Sequential([
             # First Convolutional Block
@@ -69,15 +79,22 @@ class ImageClassificationModel:
             layers.Dense(self.num_classes, activation='softmax')
         ])
         
-        # Compile the model
-        model.compile(
+        self.model = model
+        if compile:
+            self.compile_model()
+        return model
+    
+    def compile_model(self):
+        """Compile the model with the training optimizer, loss and metrics."""
+        self.model.compile(
             optimizer='adam',
             loss='categorical_crossentropy',
             metrics=['accuracy']
         )
-        
-        self.model = model
-        return model
+    
+    def is_compiled(self):
+        """Whether the model has an optimizer (models loaded for serving do not)."""
+        return getattr(self.model, 'optimizer', None) is not None
     
     def train_model(self, X_train, y_train, X_val, y_val, 
                    epochs=15, batch_size=64, callbacks=None):
@@ -128,21 +145,34 @@ class ImageClassificationModel:
         )
         
         # Store metadata
+        self.record_training_metadata(self.history, batch_size, epochs)
+        
+        return self.history
+    
+    def record_training_metadata(self, history, batch_size, epochs):
+        """
+        Store training metadata from a finished training run.
+        
+        Args:
+            history: Keras History (or any object with a `history` dict)
+            batch_size: Batch size used for training
+            epochs: Number of epochs requested
+        """
+        self.history = history
         self.training_metadata = {
             'timestamp': datetime.now().isoformat(),
-            'epochs_trained': len(self.history.history['loss']),
-            'final_train_accuracy': float(self.history.history['accuracy'][-1]),
-            'final_val_accuracy': float(self.history.history['val_accuracy'][-1]),
-            'final_train_loss': float(self.history.history['loss'][-1]),
-            'final_val_loss': float(self.history.history['val_loss'][-1]),
+            'epochs_trained': len(history.history['loss']),
+            'final_train_accuracy': float(history.history['accuracy'][-1]),
+            'final_val_accuracy': float(history.history['val_accuracy'][-1]),
+            'final_train_loss': float(history.history['loss'][-1]),
+            'final_val_loss': float(history.history['val_loss'][-1]),
             'batch_size': batch_size,
             'total_epochs_requested': epochs
         }
-        
-        return self.history
     
     def retrain_model(self, X_train, y_train, X_val, y_val, 
-                     epochs=20, batch_size=64):
+                     epochs=20, batch_size=64, extra_callbacks=None,
+                     initial_epoch=0):
         """
         Retrain the existing model with new data.
         
@@ -153,6 +183,8 @@ class ImageClassificationModel:
             y_val: Validation labels
             epochs: Number of epochs
             batch_size: Batch size
+            extra_callbacks: Additional Keras callbacks (e.g. checkpointing)
+            initial_epoch: Epoch to start from when resuming a run
         
         Returns:
             Training history
@@ -160,6 +192,9 @@ class ImageClassificationModel:
         if self.model is None:
             raise ValueError("No model to retrain. Create a model first.")
         
+        if not self.is_compiled():
+            self.compile_model()
+        
         print(f"Retraining model starting at {datetime.now()}")
         
         # Callbacks for retraining
@@ -178,12 +213,15 @@ class ImageClassificationModel:
                 verbose=1
             )
         ]
+        if extra_callbacks:
+            callbacks.extend(extra_callbacks)
         
         # Continue training
         history = self.model.fit(
             X_train, y_train,
             batch_size=batch_size,
             epochs=epochs,
+            initial_epoch=initial_epoch,
             validation_data=(X_val, y_val),
             callbacks=callbacks,
             verbose=1
@@ -196,6 +234,8 @@ class ImageClassificationModel:
             'retrain_final_accuracy': float(history.history['accuracy'][-1]),
             'retrain_final_val_accuracy': float(history.history['val_accuracy'][-1])
         }
+        if initial_epoch:
+            retrain_metadata['resumed_from_epoch'] = initial_epoch
         
         self.training_metadata['retraining_history'] = self.training_metadata.get('retraining_history', [])
         self.training_metadata['retraining_history'].append(retrain_metadata)
@@ -218,87 +258,106 @@ class ImageClassificationModel:
             raise ValueError("No model to evaluate. Train a model first.")
         
         # Make predictions
-        y_pred_proba = self.model.predict(X_test)
+        y_pred_proba = self.model.predict(X_test, verbose=0)
         y_pred = np.argmax(y_pred_proba, axis=1)
         y_true = np.argmax(y_test, axis=1)
         
+        # Report on every class, even ones missing from a small test sample
+        labels = np.arange(self.num_classes)
+        
         # Calculate metrics
-        from sklearn.metrics import precision_score, recall_score, f1_score
+        from sklearn.metrics import precision_recall_fscore_support
+        
+        precision_macro, recall_macro, f1_macro, _ = precision_recall_fscore_support(
+            y_true, y_pred, labels=labels, average='macro', zero_division=0
+        )
+        precision_weighted, recall_weighted, f1_weighted, _ = precision_recall_fscore_support(
+            y_true, y_pred, labels=labels, average='weighted', zero_division=0
+        )
         
         metrics = {
             'accuracy': float(accuracy_score(y_true, y_pred)),
-            'precision_macro': float(precision_score(y_true, y_pred, average='macro')),
-            'precision_weighted': float(precision_score(y_true, y_pred, average='weighted')),
-            'recall_macro': float(recall_score(y_true, y_pred, average='macro')),
-            'recall_weighted': float(recall_score(y_true, y_pred, average='weighted')),
-            'f1_macro': float(f1_score(y_true, y_pred, average='macro')),
-            'f1_weighted': float(f1_score(y_true, y_pred, average='weighted')),
-            'confusion_matrix': confusion_matrix(y_true, y_pred).tolist(),
+            'precision_macro': float(precision_macro),
+            'precision_weighted': float(precision_weighted),
+            'recall_macro': float(recall_macro),
+            'recall_weighted': float(recall_weighted),
+            'f1_macro': float(f1_macro),
+            'f1_weighted': float(f1_weighted),
+            'confusion_matrix': confusion_matrix(y_true, y_pred, labels=labels).tolist(),
             'evaluation_timestamp': datetime.now().isoformat()
         }
         
         # Classification report
         if class_names is not None:
-            report = classification_report(y_true, y_pred, 
-                                          target_names=class_names, 
-                                          output_dict=True)
+            report = classification_report(y_true, y_pred,
+                                          labels=labels,
+                                          target_names=class_names,
+                                          output_dict=True,
+                                          zero_division=0)
             metrics['classification_report'] = report
         
         return metrics
     
-    def save_model(self, model_dir='../models', model_name='cifar10_cnn_model'):
+    def save_model(self, model_dir='../models', model_name='cifar10_cnn_model',
+                   exports=('weights',), background=False):
         """
         Save the model and metadata.
         
+        The model is written once in the canonical `.keras` format and published
+        atomically together with a manifest holding its checksum and metadata.
+        
         Args:
             model_dir: Directory to save model
             model_name: Base name for model files
+            exports: Extra formats to write ('weights' for the fast serving
+                load path, 'h5', 'saved_model', 'image_bytes' for a
+                SavedModel that takes encoded images)
+            background: Write on the background writer thread
+        
+        Returns:
+            Manifest dict, or a Future resolving to it when background=True
         """
         if self.model is None:
             raise ValueError("No model to save. Train a model first.")
         
-        os.makedirs(model_dir, exist_ok=True)
-        
-        # Save as HDF5
-        h5_path = os.path.join(model_dir, f'{model_name}.h5')
-        self.model.save(h5_path)
-        print(f"Model saved as HDF5: {h5_path}")
-        
-        # Save as TensorFlow SavedModel
-        tf_path = os.path.join(model_dir, model_name)
-        self.model.save(tf_path)
-        print(f"Model saved as TensorFlow SavedModel: {tf_path}")
-        
-        # Save metadata
-        metadata_path = os.path.join(model_dir, 'model_metadata.pkl')
         metadata = {
             'input_shape': self.input_shape,
             'num_classes': self.num_classes,
             'training_metadata': self.training_metadata
         }
+        history = self.history.history if self.history is not None else None
         
-        with open(metadata_path, 'wb') as f:
-            pickle.dump(metadata, f)
-        print(f"Metadata saved: {metadata_path}")
-        
-        # Save training history if available
-        if self.history is not None:
-            history_path = os.path.join(model_dir, 'training_history.pkl')
-            with open(history_path, 'wb') as f:
-                pickle.dump(self.history.history, f)
-            print(f"Training history saved: {history_path}")
+        if background:
+            return write_model_async(
+                self.model, model_dir, model_name,
+                metadata=metadata, history=history, exports=exports
+            )
+        return write_model(
+            self.model, model_dir, model_name,
+            metadata=metadata, history=history, exports=exports
+        )
     
     def load_model(self, model_path):
         """
         Load a saved model.
         
         Args:
-            model_path: Path to model file (.h5 or SavedModel directory)
+            model_path: Path to a model manifest (.json), a model file
+                (.keras/.h5) or a SavedModel directory
         """
+        if model_path.endswith('.json'):
+            artifact_path, manifest = verified_artifact_path(model_path)
+            self.model = keras.models.load_model(artifact_path)
+            metadata = manifest.get('metadata', {})
+            self.training_metadata = metadata.get('training_metadata', {})
+            self.model_version = manifest['sha256'][:12]
+            print(f"Model loaded from: {artifact_path} (checksum verified)")
+            return
+        
         self.model = keras.models.load_model(model_path)
         print(f"Model loaded from: {model_path}")
         
-        # Try to load metadata
+        # Try to load legacy metadata
         model_dir = os.path.dirname(model_path) if os.path.isfile(model_path) else model_path
         metadata_path = os.path.join(model_dir, 'model_metadata.pkl')
         
@@ -308,6 +367,35 @@ class ImageClassificationModel:
                 self.training_metadata = metadata.get('training_metadata', {})
             print("Metadata loaded successfully")
     
+    def load_serving_weights(self, manifest_file, verify_checksum=True):
+        """
+        Fast load for serving: rebuild the architecture in code and restore only
+        the inference weights from the memory-mapped weights file.
+        
+        The optimizer, loss and compile config are not loaded.
+        
+        Args:
+            manifest_file: Path to a model manifest with a 'weights' export
+            verify_checksum: Verify the weights file against the manifest
+        """
+        manifest = read_manifest(manifest_file)
+        metadata = manifest.get('metadata', {})
+        self.input_shape = tuple(metadata.get('input_shape', self.input_shape))
+        self.num_classes = metadata.get('num_classes', self.num_classes)
+        
+        weights = load_weights_file(manifest_file, manifest, verify_checksum)
+        
+        self.create_cnn_model(compile=False)
+        expected = [tuple(w.shape) for w in self.model.weights]
+        actual = [w.shape for w in weights]
+        if expected != actual:
+            raise ValueError("Weights file does not match the model architecture")
+        self.model.set_weights(weights)
+        
+        self.training_metadata = metadata.get('training_metadata', {})
+        self.model_version = manifest['sha256'][:12]
+        print(f"Serving weights loaded from: {manifest['exports']['weights']}")
+    
     def get_model_summary(self):
         """
         Get a summary of the model architecture.
@@ -323,47 +411,87 @@ class ImageClassificationModel:
         self.model.summary(print_fn=lambda x: stream.write(x + '\n'))
         return stream.getvalue()
     
-    def check_retraining_needed(self, current_accuracy, threshold=0.75):
+    def check_retraining_needed(self, current_accuracy=None, threshold=0.75,
+                                drift_score=None, drift_threshold=0.25):
         """
-        Check if model retraining is needed based on accuracy threshold.
+        Check if model retraining is needed based on accuracy or input drift.
         
         Args:
-            current_accuracy: Current model accuracy
+            current_accuracy: Current model accuracy (None if unknown)
             threshold: Minimum acceptable accuracy
+            drift_score: Drift score from DriftMonitor (None if unknown)
+            drift_threshold: Drift score from which retraining is needed
         
         Returns:
             bool: True if retraining is needed
         """
-        return current_accuracy < threshold
+        if current_accuracy is not None and current_accuracy < threshold:
+            return True
+        if drift_score is not None and drift_score >= drift_threshold:
+            return True
+        return False
 
 
-def load_latest_model(model_dir='../models'):
+def load_latest_model(model_dir='../models', serving_only=False):
     """
     Load the latest trained model.
     
     Args:
         model_dir: Directory containing model files
+        serving_only: Use the fast weights-only path when available (the
+            model is then not compiled; retraining compiles it on demand)
     
     Returns:
         ImageClassificationModel instance
     """
     model_classifier = ImageClassificationModel()
     
-    # Try to load HDF5 model first
-    h5_path = os.path.join(model_dir, 'cifar10_cnn_model.h5')
-    if os.path.exists(h5_path):
-        model_classifier.load_model(h5_path)
-        return model_classifier
+    manifest_file = manifest_path(model_dir, 'cifar10_cnn_model')
+    if serving_only and os.path.exists(manifest_file):
+        if 'weights' in read_manifest(manifest_file).get('exports', {}):
+            model_classifier.load_serving_weights(manifest_file)
+            return model_classifier
     
-    # Try SavedModel format
-    tf_path = os.path.join(model_dir, 'cifar10_cnn_model')
-    if os.path.exists(tf_path):
-        model_classifier.load_model(tf_path)
-        return model_classifier
+    # Canonical checksummed model first, then legacy formats
+    candidates = [
+        manifest_path(model_dir, 'cifar10_cnn_model'),
+        os.path.join(model_dir, 'cifar10_cnn_model.keras'),
+        os.path.join(model_dir, 'cifar10_cnn_model.h5'),
+        os.path.join(model_dir, 'cifar10_cnn_model')
+    ]
+    for path in candidates:
+        if os.path.exists(path):
+            model_classifier.load_model(path)
+            return model_classifier
     
     raise FileNotFoundError(f"No model found in {model_dir}")
 
 
+def load_model_from_path(model_path, serving_only=False):
+    """
+    Load a specific saved model (e.g. a candidate for shadow evaluation).
+    
+    Args:
+        model_path: Path to a model manifest (.json), a model file
+            (.keras/.h5) or a SavedModel directory
+        serving_only: Use the fast weights-only path for manifests that
+            have a 'weights' export
+    
+    Returns:
+        ImageClassificationModel instance
+    """
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"No model found at {model_path}")
+    
+    model_classifier = ImageClassificationModel()
+    if serving_only and model_path.endswith('.json') and \
+            'weights' in read_manifest(model_path).get('exports', {}):
+        model_classifier.load_serving_weights(model_path)
+    else:
+        model_classifier.load_model(model_path)
+    return model_classifier
+
+
 if __name__ == "__main__":
     # Test model creation
     model_classifier = ImageClassificationModel()
@@ -0,0 +1,343 @@
+"""
+Model Store Module
+Atomic, checksummed model persistence with a single canonical format.
+
+A model is published as one native Keras artifact named after its content hash
+(e.g. `cifar10_cnn_model-3f2a9c1b7d4e.keras`) plus a small JSON manifest
+(`cifar10_cnn_model.json`) that points at it and records its SHA-256, the model
+metadata and the training history. Every file is written to a temporary path and
+published with an atomic rename, with the manifest last, so a concurrent reader
+always sees either the previous or the new model, never a half-written one.
+"""
+
+import os
+import json
+import uuid
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+CANONICAL_FORMAT = 'keras'
+WEIGHTS_SUFFIX = '.weights.npy'
+SUPPORTED_EXPORTS = ('weights', 'h5', 'saved_model', 'image_bytes')
+
+# One writer thread for the whole process so saves never interleave
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-writer')
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """
+    Compute the SHA-256 of a file.
+
+    Args:
+        path: File path
+        chunk_size: Read size in bytes
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_path(model_dir, model_name):
+    """Path of the manifest for a model name."""
+    return os.path.join(model_dir, f'{model_name}.json')
+
+
+def _tmp_path(model_dir, suffix=''):
+    """Hidden temporary path in the target directory (same filesystem as the target)."""
+    return os.path.join(model_dir, f'.tmp-{uuid.uuid4().hex}{suffix}')
+
+
+def _atomic_write_json(path, data):
+    tmp_path = _tmp_path(os.path.dirname(path), '.json')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _to_jsonable(value):
+    """Convert numpy scalars, tuples and nested containers to JSON types."""
+    if isinstance(value, dict):
+        return {str(k): _to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _publish_dir(tmp_dir, target_dir):
+    """Replace a directory as atomically as the filesystem allows."""
+    if os.path.exists(target_dir):
+        old_dir = _tmp_path(os.path.dirname(target_dir), '.old')
+        os.replace(target_dir, old_dir)
+        os.replace(tmp_dir, target_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+    else:
+        os.replace(tmp_dir, target_dir)
+
+
+def _write_weights_file(model, model_dir, model_name):
+    """
+    Write all inference weights (no optimizer state) as one flat float32 .npy.
+
+    A single contiguous array can be memory-mapped and sliced into per-layer
+    views without parsing a model file.
+
+    Returns:
+        dict: File name, checksum and per-tensor shapes
+    """
+    weights = model.get_weights()
+    flat = np.concatenate([np.asarray(w, dtype=np.float32).ravel() for w in weights])
+
+    tmp_path = _tmp_path(model_dir, '.npy')
+    try:
+        np.save(tmp_path, flat)
+        sha256 = file_sha256(tmp_path)
+        filename = f'{model_name}-{sha256[:12]}{WEIGHTS_SUFFIX}'
+        os.replace(tmp_path, os.path.join(model_dir, filename))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    return {
+        'file': filename,
+        'sha256': sha256,
+        'dtype': 'float32',
+        'shapes': [list(w.shape) for w in weights]
+    }
+
+
+def load_weights_file(manifest_file, manifest=None, verify_checksum=True):
+    """
+    Load inference weights from a manifest's weights file via memory mapping.
+
+    Args:
+        manifest_file: Manifest path
+        manifest: Already parsed manifest (optional)
+        verify_checksum: Verify the file against the manifest checksum
+
+    Returns:
+        list of numpy arrays (views into the memory-mapped file)
+
+    Raises:
+        ValueError: If the file does not match the manifest checksum
+    """
+    manifest = manifest or read_manifest(manifest_file)
+    info = manifest['weights']
+    path = os.path.join(os.path.dirname(manifest_file), info['file'])
+
+    if verify_checksum:
+        actual = file_sha256(path)
+        if actual != info['sha256']:
+            raise ValueError(
+                f"Checksum mismatch for {path}: expected {info['sha256']}, got {actual}"
+            )
+
+    flat = np.load(path, mmap_mode='r')
+    weights = []
+    offset = 0
+    for shape in info['shapes']:
+        size = int(np.prod(shape))
+        weights.append(flat[offset:offset + size].reshape(shape))
+        offset += size
+    if offset != flat.size:
+        raise ValueError(f"Weights file {path} does not match its manifest layout")
+    return weights
+
+
+def _write_exports(model, model_dir, model_name, exports):
+    """Write the optional non-canonical exports and return their paths."""
+    written = {}
+    for export in exports:
+        if export == 'weights':
+            # Written separately by write_model because it carries a layout
+            continue
+        if export == 'h5':
+            path = os.path.join(model_dir, f'{model_name}.h5')
+            tmp_path = _tmp_path(model_dir, '.h5')
+            model.save(tmp_path)
+            os.replace(tmp_path, path)
+        elif export == 'saved_model':
+            path = os.path.join(model_dir, f'{model_name}_savedmodel')
+            tmp_dir = _tmp_path(model_dir)
+            if hasattr(model, 'export'):
+                model.export(tmp_dir)
+            else:
+                model.save(tmp_dir, save_format='tf')
+            _publish_dir(tmp_dir, path)
+        elif export == 'image_bytes':
+            # SavedModel taking encoded PNG/JPEG bytes (see graph_serving)
+            from src.graph_serving import export_image_bytes_model
+            path = os.path.join(model_dir, f'{model_name}_image_bytes')
+            tmp_dir = _tmp_path(model_dir)
+            export_image_bytes_model(model, tmp_dir)
+            _publish_dir(tmp_dir, path)
+        else:
+            raise ValueError(f"Unsupported export '{export}'. Supported: {SUPPORTED_EXPORTS}")
+        written[export] = os.path.basename(path)
+        print(f"Model exported ({export}): {path}")
+    return written
+
+
+def _remove_stale_artifacts(model_dir, model_name, keep, suffix=f'.{CANONICAL_FORMAT}'):
+    """Delete old content-addressed files, keeping the newest `keep` (readers may still hold them)."""
+    prefix = f'{model_name}-'
+    artifacts = [
+        os.path.join(model_dir, name) for name in os.listdir(model_dir)
+        if name.startswith(prefix) and name.endswith(suffix)
+    ]
+    artifacts.sort(key=os.path.getmtime, reverse=True)
+    for path in artifacts[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def write_model(model, model_dir, model_name, metadata=None, history=None,
+                exports=(), keep_versions=2):
+    """
+    Write a model atomically in the canonical format.
+
+    Args:
+        model: Keras model
+        model_dir: Target directory
+        model_name: Base name of the model
+        metadata: dict stored in the manifest (input shape, training metadata, ...)
+        history: Optional training history dict stored in the manifest
+        exports: Extra formats to write on request ('weights', 'h5', 'saved_model',
+            'image_bytes')
+        keep_versions: Number of canonical artifacts kept on disk
+
+    Returns:
+        dict: The published manifest
+    """
+    os.makedirs(model_dir, exist_ok=True)
+
+    tmp_path = _tmp_path(model_dir, f'.{CANONICAL_FORMAT}')
+    try:
+        model.save(tmp_path)
+        sha256 = file_sha256(tmp_path)
+        artifact = f'{model_name}-{sha256[:12]}.{CANONICAL_FORMAT}'
+        os.replace(tmp_path, os.path.join(model_dir, artifact))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    manifest = {
+        'model_name': model_name,
+        'format': CANONICAL_FORMAT,
+        'artifact': artifact,
+        'sha256': sha256,
+        'size_bytes': os.path.getsize(os.path.join(model_dir, artifact)),
+        'created': datetime.now().isoformat(),
+        'metadata': _to_jsonable(metadata or {}),
+        'training_history': _to_jsonable(history) if history else None,
+        'exports': _write_exports(model, model_dir, model_name, exports)
+    }
+    if 'weights' in exports:
+        manifest['weights'] = _write_weights_file(model, model_dir, model_name)
+        manifest['exports']['weights'] = manifest['weights']['file']
+
+    # Publishing the manifest is the commit point
+    _atomic_write_json(manifest_path(model_dir, model_name), manifest)
+    _remove_stale_artifacts(model_dir, model_name, keep_versions)
+    _remove_stale_artifacts(model_dir, model_name, keep_versions, suffix=WEIGHTS_SUFFIX)
+    print(f"Model saved: {os.path.join(model_dir, artifact)} (sha256 {sha256[:12]})")
+
+    return manifest
+
+
+def write_model_async(model, model_dir, model_name, **kwargs):
+    """
+    Queue `write_model` on the background writer thread.
+
+    The model must not be trained again until the returned future is done.
+
+    Returns:
+        concurrent.futures.Future resolving to the published manifest
+    """
+    future = _writer.submit(write_model, model, model_dir, model_name, **kwargs)
+    with _pending_lock:
+        _pending.add(future)
+    future.add_done_callback(_discard_pending)
+    return future
+
+
+def _discard_pending(future):
+    with _pending_lock:
+        _pending.discard(future)
+
+
+def wait_for_pending_saves(timeout=None):
+    """
+    Block until all queued model writes are finished.
+
+    Args:
+        timeout: Optional timeout in seconds per write
+    """
+    with _pending_lock:
+        pending = list(_pending)
+    for future in pending:
+        future.result(timeout=timeout)
+
+
+def has_pending_saves():
+    """Whether a background model write is queued or running."""
+    with _pending_lock:
+        return bool(_pending)
+
+
+def read_manifest(path):
+    """
+    Read a model manifest.
+
+    Args:
+        path: Manifest path
+
+    Returns:
+        dict
+    """
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def verified_artifact_path(path):
+    """
+    Resolve a manifest to its artifact and verify the checksum.
+
+    Args:
+        path: Manifest path
+
+    Returns:
+        tuple: (artifact path, manifest dict)
+
+    Raises:
+        ValueError: If the artifact does not match the manifest checksum
+    """
+    manifest = read_manifest(path)
+    artifact_path = os.path.join(os.path.dirname(path), manifest['artifact'])
+    actual = file_sha256(artifact_path)
+    if actual != manifest['sha256']:
+        raise ValueError(
+            f"Checksum mismatch for {artifact_path}: "
+            f"expected {manifest['sha256']}, got {actual}"
+        )
+    return artifact_path, manifest
@@ -8,13 +8,42 @@ import tensorflow as tf
 from PIL import Image
 import os
 import json
+import time
+import threading
 from datetime import datetime
 
+from src.metrics import stage_timer, INFERENCE_IN_FLIGHT
+from src.image_validation import validate_image_header
+
+
+def top_k_indices(probabilities, k):
+    """
+    Indices of the k largest probabilities, highest first.
+    
+    Uses a partial sort (argpartition) and only orders the k selected values.
+    
+    Args:
+        probabilities: 1-D array of class probabilities
+        k: Number of indices to return
+    
+    Returns:
+        numpy array of k class indices
+    """
+    probabilities = np.asarray(probabilities)
+    k = min(k, probabilities.shape[0])
+    if k < probabilities.shape[0]:
+        candidates = np.argpartition(probabilities, -k)[-k:]
+    else:
+        candidates = np.arange(k)
+    return candidates[np.argsort(probabilities[candidates])[::-1]]
+
 
 class ImagePredictor:
     """Class for handling predictions."""
     
-    def __init__(self, model, class_names, preprocessor=None, persistence_file=None):
+    def __init__(self, model, class_names, preprocessor=None, persistence_file=None,
+                 store=None, history_load_limit=None, rolling_stats=None, drift_monitor=None,
+                 graph_model=None):
         """
         Initialize predictor.
         
@@ -23,12 +52,94 @@ class ImagePredictor:
             class_names: List of class names
             preprocessor: DataPreprocessor instance (optional)
             persistence_file: Path to file for saving/loading predictions (optional)
+            store: PredictionStore used for persistence instead of the JSON
+                file (optional, see src/prediction_store.py)
+            history_load_limit: Most recent predictions loaded from the store
+                into memory on startup (None for all)
+            rolling_stats: RollingStatistics updated on every prediction
+                (optional, see src/rolling_stats.py)
+            drift_monitor: DriftMonitor fed with every live model call
+                (optional, see src/drift.py)
+            graph_model: GraphImageModel that decodes and resizes uploads
+                in-graph; file predictions use it instead of the
+                preprocessor (optional, see src/graph_serving.py)
         """
         self.model = model
         self.class_names = class_names
         self.preprocessor = preprocessor
         self.prediction_history = []
+        # Bumped on every history change (cache key for derived statistics)
+        self.history_generation = 0
         self.persistence_file = persistence_file
+        self.store = store
+        self.history_load_limit = history_load_limit
+        self.rolling_stats = rolling_stats
+        self.drift_monitor = drift_monitor
+        self.graph_model = graph_model
+        # History entries before this index are already in the store
+        self._stored_count = 0
+        self._store_lock = threading.Lock()
+        self.shadow = None
+        self._live_in_flight = 0
+        self._live_lock = threading.Lock()
+    
+    def attach_shadow(self, shadow):
+        """
+        Shadow live inferences to a candidate model (see src/shadow.py).
+        
+        Args:
+            shadow: Started ShadowEvaluator, or None to detach
+        """
+        if shadow is not None:
+            shadow.is_busy = self.is_inferring
+        self.shadow = shadow
+    
+    def is_inferring(self):
+        """Whether a live model call is in progress."""
+        return self._live_in_flight > 0
+    
+    def _run_model(self, images):
+        """
+        Live model call, timed on the monotonic clock.
+        
+        Returns:
+            tuple (predictions, elapsed_ms)
+        """
+        predictions, _, elapsed_ms = self._run_live(self.model.predict, images, verbose=0)
+        return predictions, elapsed_ms
+    
+    def _run_graph(self, encoded_images):
+        """
+        Live in-graph decode and model call on encoded images.
+        
+        Returns:
+            tuple (predictions, decoded images in [0, 1], elapsed_ms)
+        """
+        return self._run_live(self.graph_model.predict_encoded, encoded_images)
+    
+    def _run_live(self, fn, inputs, **kwargs):
+        """Run a live model call, then hand its images to shadow and drift monitoring."""
+        with self._live_lock:
+            self._live_in_flight += 1
+        try:
+            start = time.perf_counter()
+            with INFERENCE_IN_FLIGHT.track_inprogress(), stage_timer('inference'):
+                outputs = fn(inputs, **kwargs)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+        finally:
+            with self._live_lock:
+                self._live_in_flight -= 1
+        
+        # The graph backend returns the decoded images along with the predictions
+        predictions, images = outputs if isinstance(outputs, tuple) else (outputs, inputs)
+        
+        shadow = self.shadow
+        if shadow is not None:
+            shadow.offer(images, predictions, elapsed_ms)
+        if self.drift_monitor is not None:
+            self.drift_monitor.observe(images, predictions)
+        
+        return predictions, images, elapsed_ms
     
     def predict_single_image(self, image, return_probabilities=True):
         """
@@ -50,35 +161,74 @@ class ImagePredictor:
             image = image.astype('float32') / 255.0
         
         # Make prediction
-        start_time = datetime.now()
-        predictions = self.model.predict(image, verbose=0)
-        end_time = datetime.now()
+        predictions, elapsed_ms = self._run_model(image)
+        
+        result = self._build_result(predictions[0], elapsed_ms, datetime.now(), return_probabilities)
+        
+        # Store in history
+        self._record([result])
         
-        # Get predicted class
-        predicted_class_idx = np.argmax(predictions[0])
-        confidence = float(predictions[0][predicted_class_idx])
+        return result
+    
+    def _record(self, results):
+        """Append results to the history and the rolling counters."""
+        self.prediction_history.extend(results)
+        self.history_generation += 1
+        if self.rolling_stats is not None:
+            self.rolling_stats.record_many(results)
+    
+    def _build_result(self, probabilities, elapsed_ms, end_time, return_probabilities=True):
+        """Prediction dict for one row of model output."""
+        predicted_class_idx = np.argmax(probabilities)
+        confidence = float(probabilities[predicted_class_idx])
         predicted_class = self.class_names[predicted_class_idx]
         
-        # Prepare result
         result = {
             'predicted_class': predicted_class,
             'predicted_class_index': int(predicted_class_idx),
             'confidence': confidence,
-            'prediction_time_ms': (end_time - start_time).total_seconds() * 1000,
+            'prediction_time_ms': elapsed_ms,
             'timestamp': end_time.isoformat()
         }
         
         if return_probabilities:
             result['all_probabilities'] = {
-                self.class_names[i]: float(predictions[0][i])
+                self.class_names[i]: float(probabilities[i])
                 for i in range(len(self.class_names))
             }
         
-        # Store in history
-        self.prediction_history.append(result)
-        
         return result
     
+    def predict_tensor(self, images):
+        """
+        Predict classes for already-decoded pixels in a single model call.
+        
+        Unlike predict_batch, each prediction is recorded in the history like
+        a single-image prediction.
+        
+        Args:
+            images: uint8 pixels (0-255) or float32 pixels in [0, 1], shape
+                (32, 32, 3) or (N, 32, 32, 3)
+        
+        Returns:
+            list of prediction dicts, one per image
+        """
+        if images.ndim == 3:
+            images = images[np.newaxis]
+        
+        # uint8 is always scaled (a dark uint8 image can have max <= 1)
+        if images.dtype == np.uint8:
+            images = images.astype(np.float32) / 255.0
+        
+        predictions, elapsed_ms = self._run_model(images)
+        end_time = datetime.now()
+        
+        per_image_ms = elapsed_ms / len(images)
+        results = [self._build_result(row, per_image_ms, end_time) for row in predictions]
+        self._record(results)
+        
+        return results
+    
     def predict_batch(self, images):
         """
         Predict classes for multiple images.
@@ -89,11 +239,7 @@ class ImagePredictor:
         Returns:
             list of prediction results
         """
-        start_time = datetime.now()
-        predictions = self.model.predict(images, verbose=0)
-        end_time = datetime.now()
-        
-        total_time = (end_time - start_time).total_seconds() * 1000
+        predictions, total_time = self._run_model(images)
         avg_time_per_image = total_time / len(images)
         
         results = []
@@ -118,7 +264,7 @@ class ImagePredictor:
             'total_images': len(images),
             'total_time_ms': total_time,
             'avg_time_per_image_ms': avg_time_per_image,
-            'timestamp': end_time.isoformat(),
+            'timestamp': datetime.now().isoformat(),
             'predictions': results
         }
         
@@ -134,6 +280,12 @@ class ImagePredictor:
         Returns:
             dict containing prediction results
         """
+        if self.graph_model is not None:
+            result = self.predict_files([file_path])[0]
+            if isinstance(result, Exception):
+                raise result
+            return result
+        
         if self.preprocessor is None:
             raise ValueError("Preprocessor is required for file predictions")
         
@@ -147,6 +299,70 @@ class ImagePredictor:
         
         return result
     
+    def predict_files(self, file_paths):
+        """
+        Predict classes for several image files.
+        
+        With a graph model, every file passing header validation is decoded
+        and classified in one call (decoding runs in parallel in-graph);
+        otherwise each file goes through predict_from_file.
+        
+        Args:
+            file_paths: Paths to image files
+        
+        Returns:
+            list with, per file, its prediction dict or the exception it
+            raised (e.g. ImageRejected)
+        """
+        if self.graph_model is None:
+            outcomes = []
+            for file_path in file_paths:
+                try:
+                    outcomes.append(self.predict_from_file(file_path))
+                except Exception as e:
+                    outcomes.append(e)
+            return outcomes
+        
+        outcomes = [None] * len(file_paths)
+        valid, encoded = [], []
+        limits = self.preprocessor.image_limits if self.preprocessor is not None else None
+        for i, file_path in enumerate(file_paths):
+            try:
+                # tf.io.decode_image has no size guard: check the header first
+                with stage_timer('validate'):
+                    validate_image_header(file_path, limits)
+                with open(file_path, 'rb') as f:
+                    encoded.append(f.read())
+                valid.append(i)
+            except Exception as e:
+                outcomes[i] = e
+        
+        if encoded:
+            try:
+                groups = [(valid, self._run_graph(encoded))]
+            except tf.errors.InvalidArgumentError:
+                # A body that fails to decode fails the whole call: isolate it
+                groups = []
+                for i, data in zip(valid, encoded):
+                    try:
+                        groups.append(([i], self._run_graph([data])))
+                    except tf.errors.InvalidArgumentError as e:
+                        outcomes[i] = ValueError(f"Could not decode image: {e.message}")
+            
+            end_time = datetime.now()
+            results = []
+            for indices, (predictions, _, elapsed_ms) in groups:
+                per_image_ms = elapsed_ms / len(indices)
+                for i, row in zip(indices, predictions):
+                    result = self._build_result(row, per_image_ms, end_time)
+                    result['file_path'] = file_paths[i]
+                    result['file_name'] = os.path.basename(file_paths[i])
+                    outcomes[i] = result
+                    results.append(result)
+            self._record(results)
+        
+        return outcomes
+    
     def predict_from_folder(self, folder_path, extensions=('.png', '.jpg', '.jpeg')):
         """
         Predict classes for all images in a folder.
@@ -201,11 +417,8 @@ class ImagePredictor:
         # Make prediction
         predictions = self.model.predict(image, verbose=0)[0]
         
-        # Get top k indices
-        top_k_indices = np.argsort(predictions)[-k:][::-1]
-        
         top_k_results = []
-        for idx in top_k_indices:
+        for idx in top_k_indices(predictions, k):
             top_k_results.append({
                 'class': self.class_names[idx],
                 'class_index': int(idx),
@@ -283,6 +496,8 @@ class ImagePredictor:
     def clear_history(self):
         """Clear prediction history."""
         self.prediction_history = []
+        self._stored_count = 0
+        self.history_generation += 1
     
     def save_predictions(self, filepath):
         """
@@ -304,10 +519,23 @@ class ImagePredictor:
         """
         with open(filepath, 'r') as f:
             self.prediction_history = json.load(f)
+        self.history_generation += 1
         print(f"Predictions loaded from: {filepath}")
     
     def save_to_persistence(self):
-        """Save predictions to persistence file if configured."""
+        """Save predictions to the store or persistence file if configured."""
+        if self.store is not None:
+            # Only new entries; the store writes them off the request thread.
+            # Concurrent saves take disjoint ranges, and entries appended after
+            # `end` is read are left for the next save.
+            with self._store_lock:
+                history = self.prediction_history
+                end = len(history)
+                new_predictions = history[self._stored_count:end]
+                self._stored_count = end
+            self.store.append(new_predictions)
+            return
+        
         if self.persistence_file and self.prediction_history:
             try:
                 os.makedirs(os.path.dirname(self.persistence_file), exist_ok=True)
@@ -338,7 +566,12 @@ class ImagePredictor:
                 print(f"Warning: Could not save predictions to persistence: {str(e)}")
     
     def load_from_persistence(self):
-        """Load predictions from persistence file if it exists."""
+        """Load predictions from the store or persistence file if it exists."""
+        self.history_generation += 1
+        if self.store is not None:
+            self._load_from_store()
+            return
+        
         if self.persistence_file and os.path.exists(self.persistence_file):
             try:
                 with open(self.persistence_file, 'r') as f:
@@ -362,6 +595,25 @@ class ImagePredictor:
             except Exception as e:
                 print(f"Warning: Could not load predictions from persistence: {str(e)}")
                 self.prediction_history = []
+    
+    def _load_from_store(self):
+        """Load recent history from the store, importing a legacy JSON file once."""
+        try:
+            if self.store.count() == 0 and self.persistence_file and os.path.exists(self.persistence_file):
+                with open(self.persistence_file, 'r') as f:
+                    content = f.read()
+                legacy = json.loads(content) if content.strip() else []
+                if legacy:
+                    self.store.append(legacy)
+                    self.store.flush()
+                    print(f"Imported {len(legacy)} predictions from {self.persistence_file} into the store")
+            
+            self.prediction_history = self.store.recent(self.history_load_limit)
+            print(f"Loaded {len(self.prediction_history)} predictions from the store")
+        except Exception as e:
+            print(f"Warning: Could not load predictions from the store: {str(e)}")
+            self.prediction_history = []
+        self._stored_count = len(self.prediction_history)
 
 
 def visualize_prediction(image, prediction_result, save_path=None):
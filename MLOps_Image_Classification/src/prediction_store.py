@@ -0,0 +1,349 @@
+"""
+Prediction Store Module
+Indexed, queryable prediction log in SQLite (WAL mode).
+
+Replaces rewriting the whole persistence JSON after every request:
+    - predictions are appended to an in-memory queue and written by a
+      background thread, many rows per transaction
+    - timestamp, predicted class and confidence are indexed, so time-window,
+      class and confidence queries do not scan the table
+    - pages are addressed by a (timestamp, id) cursor (keyset pagination),
+      so page N costs the same as page 1
+"""
+
+import json
+import time
+import atexit
+import queue
+import base64
+import sqlite3
+import threading
+from datetime import datetime
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    predicted_class TEXT NOT NULL,
+    predicted_class_index INTEGER,
+    confidence REAL NOT NULL,
+    prediction_time_ms REAL,
+    probabilities TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_ts ON predictions(ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_class_ts ON predictions(predicted_class, ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_confidence ON predictions(confidence);
+"""
+
+def parse_time(value):
+    """
+    Parse a query time bound.
+
+    Args:
+        value: Epoch seconds or an ISO 8601 timestamp (str), or None
+
+    Returns:
+        float epoch seconds, or None
+
+    Raises:
+        ValueError: If the value is neither
+    """
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        raise ValueError(f"Invalid time: {value!r} (use epoch seconds or ISO 8601)")
+
+
+def encode_cursor(ts, row_id):
+    return base64.urlsafe_b64encode(f"{ts!r}:{row_id}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        ts, row_id = base64.urlsafe_b64decode(padded.encode()).decode().split(':')
+        return float(ts), int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+def _to_row(prediction):
+    """Table row for one prediction dict (as built by ImagePredictor)."""
+    timestamp = prediction.get('timestamp') or datetime.now().isoformat()
+    try:
+        ts = datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        ts = time.time()
+    probabilities = prediction.get('all_probabilities')
+    return (
+        ts,
+        str(timestamp),
+        prediction['predicted_class'],
+        prediction.get('predicted_class_index'),
+        float(prediction['confidence']),
+        prediction.get('prediction_time_ms'),
+        json.dumps(probabilities, separators=(',', ':')) if probabilities is not None else None,
+    )
+
+
+class PredictionStore:
+    """
+    Append-mostly prediction table with a batching background writer.
+
+    Usage:
+        store = PredictionStore('persistence/predictions.db').start()
+        store.append(results)               # never blocks on disk
+        page = store.query(since=t0, predicted_class='Cat', limit=50)
+    """
+
+    def __init__(self, db_path, batch_size=500, flush_interval=0.5, queue_size=10000):
+        """
+        Initialize store and create the schema.
+
+        Args:
+            db_path: SQLite database file
+            batch_size: Maximum rows per write transaction
+            flush_interval: Seconds a pending row may wait before being written
+            queue_size: Pending append() calls before callers are slowed down
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()
+        self._thread = None
+        self.rows_written = 0
+        self.transactions = 0
+        self.errors = 0
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _reader(self):
+        """Per-thread read connection (WAL readers never block the writer)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def start(self):
+        """Start the background writer."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='prediction-store', daemon=True)
+            self._thread.start()
+            # Pending rows are written on interpreter exit
+            atexit.register(self.stop)
+        return self
+
+    def append(self, predictions):
+        """
+        Queue predictions for writing.
+
+        Args:
+            predictions: Iterable of prediction dicts
+        """
+        rows = [_to_row(p) for p in predictions]
+        if rows:
+            # Blocks only when the writer is queue_size calls behind
+            self._queue.put(rows)
+
+    def flush(self, timeout=None):
+        """Wait until everything appended so far is committed."""
+        if self._thread is None:
+            self._write(self._drain_nowait())
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def stop(self):
+        """Write pending rows and stop the writer."""
+        if self._thread is not None:
+            self.flush(timeout=10)
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _drain_nowait(self):
+        rows = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return rows
+            if isinstance(item, list):
+                rows.extend(item)
+            elif isinstance(item, threading.Event):
+                item.set()
+
+    def _write(self, rows):
+        if not rows:
+            return
+        conn = getattr(self, '_writer_conn', None)
+        if conn is None:
+            conn = self._writer_conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    'INSERT INTO predictions (ts, timestamp, predicted_class, predicted_class_index, '
+                    'confidence, prediction_time_ms, probabilities) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    rows
+                )
+            self.rows_written += len(rows)
+            self.transactions += 1
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"Warning: Could not write {len(rows)} predictions to store: {str(e)}")
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            barriers = []
+            rows = []
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if isinstance(item, list):
+                    rows.extend(item)
+                elif isinstance(item, threading.Event):
+                    barriers.append(item)
+                    break
+                elif item is None:
+                    self._write(rows)
+                    return
+                if len(rows) >= self.batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            self._write(rows)
+            for barrier in barriers:
+                barrier.set()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def count(self):
+        return self._reader().execute('SELECT COUNT(*) FROM predictions').fetchone()[0]
+
+    def recent(self, limit=None):
+        """
+        Most recent predictions as dicts, oldest first.
+
+        Args:
+            limit: Maximum rows (None for all)
+        """
+        sql = 'SELECT * FROM predictions ORDER BY ts DESC, id DESC'
+        params = ()
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params = (int(limit),)
+        rows = self._reader().execute(sql, params).fetchall()
+        predictions = [self._to_prediction(row, True) for row in reversed(rows)]
+        for prediction in predictions:
+            # Same shape as the in-memory history entries
+            del prediction['id']
+        return predictions
+
+    def query(self, since=None, until=None, predicted_class=None, min_confidence=None,
+              max_confidence=None, cursor=None, limit=50, include_probabilities=False):
+        """
+        One page of predictions, newest first.
+
+        Args:
+            since: Inclusive lower time bound (epoch seconds)
+            until: Exclusive upper time bound (epoch seconds)
+            predicted_class: Only this class
+            min_confidence: Inclusive lower confidence bound
+            max_confidence: Inclusive upper confidence bound
+            cursor: next_cursor of the previous page
+            limit: Page size
+            include_probabilities: Include all class probabilities
+
+        Returns:
+            dict with 'predictions' and 'next_cursor' (None on the last page)
+        """
+        where = []
+        params = []
+        if since is not None:
+            where.append('ts >= ?')
+            params.append(since)
+        if until is not None:
+            where.append('ts < ?')
+            params.append(until)
+        if predicted_class is not None:
+            where.append('predicted_class = ?')
+            params.append(predicted_class)
+        if min_confidence is not None:
+            where.append('confidence >= ?')
+            params.append(min_confidence)
+        if max_confidence is not None:
+            where.append('confidence <= ?')
+            params.append(max_confidence)
+        if cursor is not None:
+            cursor_ts, cursor_id = decode_cursor(cursor)
+            where.append('(ts, id) < (?, ?)')
+            params.extend([cursor_ts, cursor_id])
+
+        sql = 'SELECT * FROM predictions'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        # One extra row tells whether there is a next page
+        sql += ' ORDER BY ts DESC, id DESC LIMIT ?'
+        params.append(int(limit) + 1)
+
+        rows = self._reader().execute(sql, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['ts'], rows[-1]['id'])
+
+        return {
+            'predictions': [self._to_prediction(row, include_probabilities) for row in rows],
+            'next_cursor': next_cursor
+        }
+
+    @staticmethod
+    def _to_prediction(row, include_probabilities):
+        prediction = {
+            'id': row['id'],
+            'predicted_class': row['predicted_class'],
+            'predicted_class_index': row['predicted_class_index'],
+            'confidence': row['confidence'],
+            'prediction_time_ms': row['prediction_time_ms'],
+            'timestamp': row['timestamp']
+        }
+        if include_probabilities and row['probabilities'] is not None:
+            prediction['all_probabilities'] = json.loads(row['probabilities'])
+        return prediction
+
+    def stats(self):
+        return {
+            'rows_written': self.rows_written,
+            'transactions': self.transactions,
+            'pending': self.pending,
+            'errors': self.errors
+        }
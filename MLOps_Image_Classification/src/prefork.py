@@ -0,0 +1,332 @@
+"""
+Pre-fork Serving Module
+Runs app.py under several worker processes forked from one master.
+
+The master never initializes the TensorFlow runtime (importing it starts no
+threads, so forking stays safe). Before forking it:
+    - imports the heavy modules (TensorFlow, NumPy, PIL, Flask) so their
+      code and data pages are shared copy-on-write, then freezes the GC so
+      collections in the workers do not touch (and copy) those pages
+    - reads the model's flat weights file (see model_store) once, so the
+      workers load it from the page cache instead of the disk
+    - picks the worker count and TensorFlow intra/inter-op thread pool
+      sizes, so that workers x intra-op threads never exceeds the cores this
+      container may use (affinity and cgroup quota)
+
+Each worker sizes its thread pools before its first TensorFlow op, then
+imports app.py and loads the model itself. The weights are not shared:
+TensorFlow copies every array, memory-mapped or not, into its own buffers,
+and the model cannot be built in the master without starting the runtime.
+Each worker therefore holds a private copy of the weights (a few MB for
+this model, against a few hundred MB of runtime per process). For a single
+copy of the model, serve with INFERENCE_MODE=remote (src/inference_server.py).
+
+Layouts can be auto-tuned: every candidate (1 x N, 2 x N/2, ... workers x
+threads) is run for a few seconds in fresh processes on this machine, and
+the layout with the highest aggregate throughput wins. Fewer workers are
+preferred when within 5%, as they use less memory. The result is cached per
+core count and model version.
+"""
+
+import os
+import gc
+import json
+import math
+import time
+import tempfile
+import multiprocessing
+from datetime import datetime
+
+import numpy as np
+
+
+# Layouts within this fraction of the best throughput count as equal
+TIE_TOLERANCE = 0.05
+# Most of a worker's request threads an /api/events stream may hold (each holds one for minutes)
+SSE_THREAD_SHARE = 0.25
+
+
+def available_cores():
+    """
+    CPU cores this process may use: the affinity mask, capped by a cgroup
+    v2 CPU quota (e.g. `docker run --cpus`).
+    """
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS / Windows
+        cores = os.cpu_count() or 1
+    try:
+        with open('/sys/fs/cgroup/cpu.max', 'r') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cores = min(cores, max(1, math.ceil(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return cores
+
+
+def candidate_layouts(cores, max_workers=None):
+    """
+    Worker/thread layouts that use every core without oversubscribing.
+
+    Args:
+        cores: Available cores
+        max_workers: Upper bound on worker processes (memory)
+
+    Returns:
+        list of dicts with 'workers', 'intra_op_threads', 'inter_op_threads',
+        fewest workers first
+    """
+    max_workers = max_workers or cores
+    layouts = []
+    for workers in range(1, min(cores, max_workers) + 1):
+        if cores % workers:
+            continue
+        # The CNN is a chain of ops, so inter-op parallelism has nothing to overlap
+        layouts.append({'workers': workers, 'intra_op_threads': cores // workers,
+                        'inter_op_threads': 1})
+    return layouts
+
+
+def thread_environment(intra_op_threads, inter_op_threads):
+    """Environment variables sizing TensorFlow's and OpenMP's thread pools."""
+    return {
+        'TF_NUM_INTRAOP_THREADS': str(intra_op_threads),
+        'TF_NUM_INTEROP_THREADS': str(inter_op_threads),
+        'OMP_NUM_THREADS': str(intra_op_threads)
+    }
+
+
+def configure_tf_threads(intra_op_threads, inter_op_threads):
+    """
+    Size this process's TensorFlow thread pools.
+
+    Must run before the first TensorFlow op of the process.
+    """
+    os.environ.update(thread_environment(intra_op_threads, inter_op_threads))
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+
+def sse_stream_budget(threads_per_worker, max_subscribers):
+    """
+    Event streams one worker accepts: a quarter of its request threads, so
+    open dashboards never starve predictions (further streams get a 503 and
+    the dashboard polls instead).
+    """
+    return min(max_subscribers, int(threads_per_worker * SSE_THREAD_SHARE))
+
+
+def model_version(model_dir):
+    """Version of the model a worker would load (manifest checksum or file times)."""
+    from src.model_store import manifest_path, read_manifest
+    manifest_file = manifest_path(model_dir, 'cifar10_cnn_model')
+    if os.path.exists(manifest_file):
+        return read_manifest(manifest_file)['sha256'][:12]
+    stamps = sorted(f"{name}:{int(os.path.getmtime(os.path.join(model_dir, name)))}"
+                    for name in os.listdir(model_dir) if name.startswith('cifar10_cnn_model'))
+    return ','.join(stamps) or None
+
+
+def warm_shared_weights(model_dir):
+    """
+    Read the model's flat weights file into the page cache.
+
+    Every worker then loads its own copy from memory rather than the disk.
+
+    Returns:
+        Path of the weights file, or None if the model has no weights export
+    """
+    from src.model_store import manifest_path, read_manifest
+    manifest_file = manifest_path(model_dir, 'cifar10_cnn_model')
+    if not os.path.exists(manifest_file):
+        return None
+    manifest = read_manifest(manifest_file)
+    if 'weights' not in manifest.get('exports', {}):
+        return None
+    path = os.path.join(model_dir, manifest['weights']['file'])
+    flat = np.load(path, mmap_mode='r')
+    # One read per page faults the whole file in
+    float(flat[::1024].sum())
+    return path
+
+
+def preload_modules():
+    """Import heavy modules in the master so forked workers share them."""
+    import tensorflow  # noqa: F401  (import only; no runtime threads yet)
+    import PIL.Image  # noqa: F401
+    import flask  # noqa: F401
+    gc.collect()
+    gc.freeze()
+
+
+def _benchmark_worker(model_dir, intra_op_threads, inter_op_threads, batch_size,
+                      duration, barrier, results):
+    """One benchmark process: load the model, then predict in a loop."""
+    configure_tf_threads(intra_op_threads, inter_op_threads)
+    from src.model import load_latest_model
+    model = load_latest_model(model_dir, serving_only=True).model
+
+    rng = np.random.default_rng(os.getpid())
+    images = rng.integers(0, 256, (batch_size, 32, 32, 3), dtype=np.uint8).astype(np.float32) / 255.0
+    for _ in range(3):
+        model.predict(images, verbose=0)
+
+    latencies = []
+    barrier.wait()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        model.predict(images, verbose=0)
+        latencies.append((time.perf_counter() - start) * 1000)
+    results.put(latencies)
+
+
+def benchmark_layout(model_dir, layout, duration=3.0, batch_size=1, timeout=300):
+    """
+    Measure one layout: its workers predict concurrently for `duration`.
+
+    Returns:
+        dict: layout plus images_per_second and latency p50/p95 (ms)
+    """
+    # Benchmark workers are spawned; the caller may already run TensorFlow
+    ctx = multiprocessing.get_context('spawn')
+    barrier = ctx.Barrier(layout['workers'])
+    results = ctx.Queue()
+    processes = [
+        ctx.Process(target=_benchmark_worker, args=(
+            model_dir, layout['intra_op_threads'], layout['inter_op_threads'],
+            batch_size, duration, barrier, results
+        ))
+        for _ in range(layout['workers'])
+    ]
+    for process in processes:
+        process.start()
+
+    latencies = []
+    try:
+        for _ in processes:
+            latencies.extend(results.get(timeout=timeout))
+    finally:
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+
+    latencies = np.asarray(latencies)
+    return {
+        **layout,
+        'images_per_second': len(latencies) * batch_size / duration,
+        'latency_p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+        'latency_p95_ms': float(np.percentile(latencies, 95)) if len(latencies) else None
+    }
+
+
+def choose_layout(results):
+    """Highest throughput; among layouts within TIE_TOLERANCE of it, the fewest workers."""
+    best = max(r['images_per_second'] for r in results)
+    return min((r for r in results if r['images_per_second'] >= best * (1 - TIE_TOLERANCE)),
+               key=lambda r: r['workers'])
+
+
+def autotune(model_dir, cores=None, max_workers=None, duration=3.0, cache_file=None, retune=False):
+    """
+    Pick the serving layout for this machine, benchmarking if needed.
+
+    Args:
+        model_dir: Model directory
+        cores: Available cores (detected when None)
+        max_workers: Upper bound on worker processes
+        duration: Seconds each candidate layout is measured
+        cache_file: JSON file caching the result per core count and model
+        retune: Ignore a cached result
+
+    Returns:
+        dict: chosen layout, plus 'results' of every candidate and 'cached'
+    """
+    cores = cores or available_cores()
+    layouts = candidate_layouts(cores, max_workers)
+    key = {'cores': cores, 'max_workers': max_workers, 'model_version': model_version(model_dir)}
+
+    if cache_file and not retune and os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r') as f:
+                cached = json.load(f)
+            if cached.get('key') == key:
+                return {**cached['chosen'], 'results': cached['results'], 'cached': True}
+        except (OSError, ValueError):
+            pass
+
+    if len(layouts) == 1:
+        results = [{**layouts[0], 'images_per_second': None,
+                    'latency_p50_ms': None, 'latency_p95_ms': None}]
+        chosen = layouts[0]
+    else:
+        results = [benchmark_layout(model_dir, layout, duration=duration) for layout in layouts]
+        chosen = choose_layout(results)
+        chosen = {k: chosen[k] for k in ('workers', 'intra_op_threads', 'inter_op_threads')}
+
+    if cache_file:
+        os.makedirs(os.path.dirname(cache_file) or '.', exist_ok=True)
+        tmp_path = f"{cache_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'key': key, 'tuned_at': datetime.now().isoformat(),
+                       'chosen': chosen, 'results': results}, f, indent=2)
+        os.replace(tmp_path, cache_file)
+    return {**chosen, 'results': results, 'cached': False}
+
+
+def run_server(layout, bind, threads_per_worker=8, timeout=120):
+    """
+    Serve app.py with gunicorn workers forked from this process.
+
+    Args:
+        layout: dict with 'workers', 'intra_op_threads', 'inter_op_threads'
+        bind: Address, e.g. '0.0.0.0:5000'
+        threads_per_worker: Request threads per worker (gthread)
+        timeout: Seconds before a silent worker is restarted
+    """
+    from gunicorn.app.base import BaseApplication
+
+    # Scrapes must merge every worker; prometheus_client reads this at import
+    if layout['workers'] > 1 and not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='prometheus_multiproc_')
+    os.environ.update(thread_environment(layout['intra_op_threads'], layout['inter_op_threads']))
+    base_replica_id = os.environ.get('REPLICA_ID', '')
+
+    def post_fork(server, worker):
+        configure_tf_threads(layout['intra_op_threads'], layout['inter_op_threads'])
+        from config import Config
+        # app.py refuses retrain/evaluate when other workers would keep the old model
+        Config.SERVE_ACTIVE_WORKERS = layout['workers']
+        Config.SSE_MAX_SUBSCRIBERS = sse_stream_budget(threads_per_worker, Config.SSE_MAX_SUBSCRIBERS)
+        if base_replica_id:
+            # One cluster-statistics snapshot per worker, not one per container
+            Config.REPLICA_ID = f"{base_replica_id}-w{worker.age}"
+
+    def child_exit(server, worker):
+        from src import metrics
+        metrics.mark_process_dead(worker.pid)
+
+    class PreforkApplication(BaseApplication):
+        def load_config(self):
+            settings = {
+                'bind': bind,
+                'workers': layout['workers'],
+                'worker_class': 'gthread',
+                'threads': threads_per_worker,
+                'timeout': timeout,
+                # app.py starts threads and opens SQLite at import: once per worker
+                'preload_app': False,
+                'post_fork': post_fork,
+                'child_exit': child_exit
+            }
+            for name, value in settings.items():
+                self.cfg.set(name, value)
+
+        def load(self):
+            from app import app
+            return app
+
+    PreforkApplication().run()
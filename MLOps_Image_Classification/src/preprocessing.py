@@ -12,11 +12,19 @@ import pickle
 import os
 from PIL import Image
 
+from src.metrics import stage_timer
+from src.image_validation import validate_image_header
+
 
 class DataPreprocessor:
     """Class for handling data preprocessing operations."""
     
-    def __init__(self):
+    def __init__(self, image_limits=None):
+        """
+        Args:
+            image_limits: ImageLimits for uploaded images (defaults when None)
+        """
+        self.image_limits = image_limits
         self.class_names = ['Airplane', 'Automobile', 'Bird', 'Cat', 'Deer', 
                            'Dog', 'Frog', 'Horse', 'Ship', 'Truck']
         self.input_shape = (32, 32, 3)
@@ -109,6 +117,41 @@ class DataPreprocessor:
         )
         return datagen
     
+    def load_image_pixels(self, fp):
+        """
+        Decode an uploaded image to 32x32 RGB pixels.
+        
+        Args:
+            fp: path or binary file object
+        
+        Returns:
+            uint8 array (32, 32, 3)
+        
+        Raises:
+            ImageRejected: If the header fails validation (nothing is decoded)
+        """
+        with stage_timer('validate'):
+            header = validate_image_header(fp, self.image_limits)
+        
+        # Load image (PIL decodes lazily, so force it to time decoding on its own)
+        with stage_timer('decode'):
+            img = Image.open(fp, formats=(header.format,))
+            if header.downscale:
+                # Let the JPEG decoder scale down by up to 1/8 while decoding;
+                # keeps at least 2x the target size for the LANCZOS resize
+                img.draft('RGB', (64, 64))
+            img.load()
+            
+            # Convert to RGB if needed
+            if img.mode != 'RGB':
+                img = img.convert('RGB')
+        
+        with stage_timer('resize'):
+            # Resize to 32x32 using high-quality resampling
+            # Use LANCZOS for better quality when downsampling
+            img = img.resize((32, 32), Image.Resampling.LANCZOS)
+            return np.asarray(img, dtype=np.uint8)
+    
     def load_and_preprocess_uploaded_image(self, file_path):
         """
         Load and preprocess an uploaded image file.
@@ -118,23 +161,12 @@ class DataPreprocessor:
         
         Returns:
             preprocessed image
-        """
-        # Load image
-        img = Image.open(file_path)
-        
-        # Convert to RGB if needed
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # Resize to 32x32 using high-quality resampling
-        # Use LANCZOS for better quality when downsampling
-        img = img.resize((32, 32), Image.Resampling.LANCZOS)
-        
-        # Convert to numpy array
-        img_array = np.array(img, dtype=np.float32)
         
+        Raises:
+            ImageRejected: If the header fails validation (nothing is decoded)
+        """
         # Normalize to [0, 1] range immediately
-        img_array = img_array / 255.0
+        img_array = self.load_image_pixels(file_path).astype(np.float32) / 255.0
         
         # Add batch dimension
         img_array = np.expand_dims(img_array, axis=0)
@@ -166,18 +198,23 @@ class DataPreprocessor:
         with open(filepath, 'rb') as f:
             return pickle.load(f)
     
-    def prepare_training_data(self, with_augmentation=False):
+    def prepare_training_data(self, with_augmentation=False, extra_samples=None):
         """
         Prepare complete training dataset.
         
         Args:
             with_augmentation: whether to include data augmentation
+            extra_samples: optional (uint8 images, class indices) appended to
+                the training split, e.g. TrainingShards.load()
         
         Returns:
             dict containing prepared data
         """
         # Load data
         (X_train, y_train), (X_test, y_test) = self.load_cifar10_data()
+        if extra_samples is not None and len(extra_samples[0]):
+            X_train = np.concatenate([X_train, extra_samples[0]])
+            y_train = np.concatenate([y_train, np.reshape(extra_samples[1], (-1, 1)).astype(y_train.dtype)])
         
         # Normalize
         X_train_normalized = self.normalize_images(X_train)
@@ -250,7 +287,9 @@ def get_data_statistics(X, y, class_names):
         'pixel_mean': float(X.mean()),
         'pixel_std': float(X.std()),
         'pixel_min': float(X.min()),
-        'pixel_max': float(X.max())
+        'pixel_max': float(X.max()),
+        'channel_mean': [float(v) for v in X.mean(axis=tuple(range(X.ndim - 1)))],
+        'channel_std': [float(v) for v in X.std(axis=tuple(range(X.ndim - 1)))]
     }
     
     # Class distribution
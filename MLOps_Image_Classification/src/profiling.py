@@ -0,0 +1,366 @@
+"""
+Profiling Module
+On-demand profiling of the inference path: a sampled Python profile of the
+request threads plus a TensorFlow profiler trace, for the next N requests or
+T seconds.
+
+Nothing runs while the profiler is idle: no sampler thread, no profile hooks,
+no TF trace. The only cost on the request path is one attribute check.
+"""
+
+import os
+import sys
+import json
+import time
+import glob
+import uuid
+import threading
+from collections import Counter
+from datetime import datetime
+
+import tensorflow as tf
+
+try:
+    from tensorflow.tsl.profiler.protobuf import xplane_pb2
+except ImportError:  # layout differs between TF releases
+    xplane_pb2 = None
+
+
+def _frame_key(code):
+    """Readable, stable name for a code object."""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def summarize_tf_trace(logdir, top_n=15):
+    """
+    Aggregate op/event durations from a TensorFlow profiler trace.
+
+    Args:
+        logdir: Directory passed to tf.profiler.experimental.start
+        top_n: Number of ops to return
+
+    Returns:
+        list of dicts (op, thread, count, total_ms), slowest first. Times are
+        inclusive of nested events.
+    """
+    if xplane_pb2 is None:
+        return []
+
+    totals = Counter()
+    counts = Counter()
+    for path in glob.glob(os.path.join(logdir, '**', '*.xplane.pb'), recursive=True):
+        space = xplane_pb2.XSpace()
+        with open(path, 'rb') as f:
+            space.ParseFromString(f.read())
+        for plane in space.planes:
+            for line in plane.lines:
+                # Thread names carry a numeric suffix per instance
+                thread = line.name.split('/')[0]
+                for event in line.events:
+                    key = (plane.event_metadata[event.metadata_id].name, thread)
+                    totals[key] += event.duration_ps
+                    counts[key] += 1
+
+    return [
+        {'op': op, 'thread': thread, 'count': counts[(op, thread)],
+         'total_ms': total_ps / 1e9}
+        for (op, thread), total_ps in totals.most_common(top_n)
+    ]
+
+
+class _ProfileSession:
+    """State of one armed profiling window."""
+
+    def __init__(self, session_dir, max_requests, seconds, tf_trace):
+        self.session_id = os.path.basename(session_dir)
+        self.session_dir = session_dir
+        self.max_requests = max_requests
+        self.seconds = seconds
+        self.tf_trace = tf_trace
+        self.tf_trace_error = None
+        self.started = datetime.now()
+        self.start_clock = time.perf_counter()
+        self.threads = Counter()
+        self.requests_started = 0
+        self.requests_completed = 0
+        self.samples = 0
+        self.stacks = Counter()
+        self.self_samples = Counter()
+        self.inclusive_samples = Counter()
+        self.sampler = None
+        self.stop_event = threading.Event()
+        self.done = threading.Event()
+        self.summary = None
+
+
+class RequestProfiler:
+    """
+    Captures Python and TensorFlow profiles of the next requests on demand.
+
+    Usage:
+        profiler.start(max_requests=20, seconds=30)
+        ...
+        token = profiler.enter_request()   # in each profiled request
+        try:
+            handle()
+        finally:
+            profiler.exit_request(token)
+    """
+
+    def __init__(self, dump_dir, sample_interval_ms=5, max_seconds=60, max_requests=1000):
+        """
+        Initialize profiler.
+
+        Args:
+            dump_dir: Directory for profile dumps (one subdirectory per session)
+            sample_interval_ms: Stack sampling interval
+            max_seconds: Upper bound (and default) for a session's duration
+            max_requests: Upper bound for requests per session
+        """
+        self.dump_dir = dump_dir
+        self.sample_interval = sample_interval_ms / 1000.0
+        self.max_seconds = max_seconds
+        self.max_requests = max_requests
+
+        self._lock = threading.Lock()
+        self._session = None
+        self._latest = None
+        self._last_summary = None
+
+    @property
+    def active(self):
+        """Whether a profiling session is running."""
+        return self._session is not None
+
+    def start(self, max_requests=None, seconds=None, tf_trace=True):
+        """
+        Arm a profiling session.
+
+        The session ends after `max_requests` profiled requests or `seconds`
+        seconds, whichever comes first. Without `seconds`, `max_seconds` applies,
+        so a session always ends.
+
+        Args:
+            max_requests: Number of requests to profile (None: time-bound only)
+            seconds: Session duration in seconds
+            tf_trace: Whether to capture a TensorFlow profiler trace
+
+        Returns:
+            dict describing the session
+
+        Raises:
+            RuntimeError: If a session is already running
+            ValueError: If the limits are invalid
+        """
+        if max_requests is not None and not 1 <= int(max_requests) <= self.max_requests:
+            raise ValueError(f"requests must be between 1 and {self.max_requests}")
+        if seconds is not None and not 0 < float(seconds) <= self.max_seconds:
+            raise ValueError(f"seconds must be between 0 and {self.max_seconds}")
+
+        with self._lock:
+            if self._session is not None:
+                raise RuntimeError(f"Profiling session {self._session.session_id} already running")
+
+            session_dir = os.path.join(
+                self.dump_dir,
+                f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+            )
+            os.makedirs(session_dir, exist_ok=True)
+            session = _ProfileSession(
+                session_dir,
+                int(max_requests) if max_requests is not None else None,
+                float(seconds) if seconds is not None else float(self.max_seconds),
+                tf_trace
+            )
+
+            if tf_trace:
+                try:
+                    tf.profiler.experimental.start(os.path.join(session_dir, 'tf_trace'))
+                except Exception as e:  # another trace may already be running
+                    session.tf_trace = False
+                    session.tf_trace_error = str(e)
+
+            session.sampler = threading.Thread(target=self._sample_loop, args=(session,),
+                                               name='profile-sampler', daemon=True)
+            session.sampler.start()
+            self._session = session
+            self._latest = session
+
+        timer = threading.Timer(session.seconds, self._finish, args=(session,))
+        timer.daemon = True
+        timer.start()
+
+        return self.status()
+
+    def enter_request(self):
+        """
+        Register the calling thread as part of a profiled request.
+
+        Returns:
+            Session token for exit_request, or None if nothing is profiled
+        """
+        session = self._session
+        if session is None:
+            return None
+        with self._lock:
+            if self._session is not session:
+                return None
+            if session.max_requests is not None and session.requests_started >= session.max_requests:
+                return None
+            session.requests_started += 1
+            session.threads[threading.get_ident()] += 1
+        return session
+
+    def exit_request(self, token):
+        """
+        Unregister the calling thread; ends the session after the last request.
+
+        Args:
+            token: Value returned by enter_request
+        """
+        if token is None:
+            return
+        finished = False
+        with self._lock:
+            ident = threading.get_ident()
+            token.threads[ident] -= 1
+            if token.threads[ident] <= 0:
+                del token.threads[ident]
+            token.requests_completed += 1
+            finished = (token.max_requests is not None
+                        and token.requests_completed >= token.max_requests)
+        if finished:
+            # Writing dumps happens off the request thread
+            threading.Thread(target=self._finish, args=(token,), daemon=True).start()
+
+    def _sample_loop(self, session):
+        """Sample the stacks of threads serving profiled requests."""
+        own_ident = threading.get_ident()
+        while not session.stop_event.wait(self.sample_interval):
+            with self._lock:
+                idents = [ident for ident in session.threads if ident != own_ident]
+            if not idents:
+                continue
+            frames = sys._current_frames()
+            for ident in idents:
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_key(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()
+
+                session.samples += 1
+                session.stacks[';'.join(stack)] += 1
+                session.self_samples[stack[-1]] += 1
+                for key in set(stack):
+                    session.inclusive_samples[key] += 1
+
+    def _finish(self, session, top_n=20):
+        """Stop a session, write its dumps and build the summary."""
+        with self._lock:
+            if self._session is not session:
+                return
+            self._session = None
+
+        session.stop_event.set()
+        session.sampler.join(timeout=1)
+        tf_logdir = os.path.join(session.session_dir, 'tf_trace')
+        if session.tf_trace:
+            try:
+                tf.profiler.experimental.stop()
+            except Exception as e:
+                session.tf_trace_error = str(e)
+
+        # Folded stacks can be fed straight into flamegraph tools
+        stacks_file = os.path.join(session.session_dir, 'python_stacks.folded')
+        with open(stacks_file, 'w') as f:
+            for stack, count in session.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        total = max(1, session.samples)
+        summary = {
+            'session_id': session.session_id,
+            'started': session.started.isoformat(),
+            'ended': datetime.now().isoformat(),
+            'duration_seconds': time.perf_counter() - session.start_clock,
+            'requests_profiled': session.requests_completed,
+            'sample_interval_ms': self.sample_interval * 1000,
+            'samples': session.samples,
+            'top_functions': [
+                {
+                    'function': name,
+                    'self_samples': count,
+                    'self_pct': 100.0 * count / total,
+                    'inclusive_samples': session.inclusive_samples[name],
+                    'inclusive_pct': 100.0 * session.inclusive_samples[name] / total
+                }
+                for name, count in session.self_samples.most_common(top_n)
+            ],
+            'top_tf_ops': summarize_tf_trace(tf_logdir) if session.tf_trace else [],
+            'tf_trace_dir': tf_logdir if session.tf_trace else None,
+            'tf_trace_error': session.tf_trace_error,
+            'dump_dir': session.session_dir,
+            'stacks_file': stacks_file
+        }
+        with open(os.path.join(session.session_dir, 'summary.json'), 'w') as f:
+            json.dump(summary, f, indent=2)
+
+        session.summary = summary
+        self._last_summary = summary
+        session.done.set()
+
+    def stop(self):
+        """
+        End the running session early.
+
+        Returns:
+            Summary of the session, or None if none was running
+        """
+        session = self._session
+        if session is None:
+            return None
+        self._finish(session)
+        session.done.wait(5)
+        return session.summary
+
+    def wait(self, timeout=None):
+        """
+        Block until the running session ends.
+
+        Args:
+            timeout: Seconds to wait at most
+
+        Returns:
+            Summary of the latest session (None if it is still running)
+        """
+        session = self._latest
+        if session is None:
+            return None
+        # The session may already be detached while its dumps are being written
+        session.done.wait(timeout)
+        return session.summary
+
+    def status(self):
+        """
+        Current profiler state.
+
+        Returns:
+            dict
+        """
+        session = self._session
+        if session is None:
+            return {'active': False, 'last_summary': self._last_summary}
+        return {
+            'active': True,
+            'session_id': session.session_id,
+            'started': session.started.isoformat(),
+            'max_requests': session.max_requests,
+            'seconds': session.seconds,
+            'requests_profiled': session.requests_completed,
+            'tf_trace': session.tf_trace,
+            'tf_trace_error': session.tf_trace_error,
+            'dump_dir': session.session_dir
+        }
@@ -0,0 +1,81 @@
+"""
+Response Cache Module
+Memoized JSON bodies with content ETags for read-mostly endpoints.
+
+Each endpoint's body is rebuilt only when its key changes (e.g. the model
+version or the prediction history generation). The ETag is derived from the
+body, so clients revalidating with If-None-Match get a 304 without the body
+being rebuilt or re-sent.
+"""
+
+import json
+import hashlib
+import threading
+
+
+class CachedBody:
+    """Encoded response body with the key it was built for."""
+
+    __slots__ = ('key', 'body', 'etag')
+
+    def __init__(self, key, body):
+        self.key = key
+        self.body = body
+        self.etag = hashlib.blake2b(body, digest_size=12).hexdigest()
+
+
+class ResponseCache:
+    """
+    One memoized body per endpoint.
+
+    Usage:
+        cache = ResponseCache()
+        entry = cache.get('statistics', (predictor_id, generation), build_stats)
+    """
+
+    def __init__(self, encode=json.dumps):
+        """
+        Initialize cache.
+
+        Args:
+            encode: Function serializing a payload to str or bytes
+        """
+        self.encode = encode
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name, key, build):
+        """
+        Cached body for an endpoint, rebuilt when the key changed.
+
+        Args:
+            name: Endpoint name
+            key: Hashable value identifying the state the body depends on
+            build: Function returning the payload (called on a miss only)
+
+        Returns:
+            CachedBody
+        """
+        entry = self._entries.get(name)
+        if entry is not None and entry.key == key:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        body = self.encode(build())
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        entry = CachedBody(key, body)
+        with self._lock:
+            self._entries[name] = entry
+        return entry
+
+    def invalidate(self, name=None):
+        """Drop one endpoint's body, or all of them."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(name, None)
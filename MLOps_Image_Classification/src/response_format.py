@@ -0,0 +1,230 @@
+"""
+Response Format Module
+Shaping and encoding of prediction responses.
+
+Clients opt in per request; without options the response is the same JSON as
+before. Query parameters:
+    top_k=<n>            add the n most likely classes (partial sort)
+    probabilities=...    'dict' (default), 'array' (ordered like class
+                         indices), 'f16' (packed little-endian float16 bytes,
+                         msgpack only) or 'none'
+    precision=<digits>   round confidence and probabilities
+    compact=1            drop file_path and timestamp
+    format=json|msgpack  encoding (also negotiated from the Accept header)
+    gzip=1               compress (also negotiated from Accept-Encoding)
+"""
+
+import gzip
+import json
+
+import msgpack
+import numpy as np
+
+from src.prediction import top_k_indices
+
+
+JSON_MIMETYPE = 'application/json'
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+PROBABILITY_LAYOUTS = ('dict', 'array', 'f16', 'none')
+VERBOSE_FIELDS = ('file_path', 'timestamp')
+MAX_PRECISION = 8
+
+
+def _accepts(header, tokens):
+    """Whether a comma-separated Accept-style header lists one of tokens with q > 0."""
+    for part in (header or '').split(','):
+        params = part.strip().split(';')
+        if params[0].strip().lower() not in tokens:
+            continue
+        quality = 1.0
+        for param in params[1:]:
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            return True
+    return False
+
+
+def _flag(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+class ResponseOptions:
+    """Per-request shaping and encoding choices."""
+
+    def __init__(self, top_k=None, probabilities='dict', precision=None, compact=False,
+                 encoding='json', gzip=False):
+        self.top_k = top_k
+        self.probabilities = probabilities
+        self.precision = precision
+        self.compact = compact
+        self.encoding = encoding
+        self.gzip = gzip
+
+    @property
+    def shapes_results(self):
+        """Whether prediction dicts need rewriting at all."""
+        return (self.top_k is not None or self.probabilities != 'dict'
+                or self.precision is not None or self.compact)
+
+
+def parse_response_options(args, accept=None, accept_encoding=None, num_classes=None):
+    """
+    Read response options from query parameters and headers.
+
+    Args:
+        args: Mapping of query parameters
+        accept: Accept header value
+        accept_encoding: Accept-Encoding header value
+        num_classes: Upper bound for top_k (optional)
+
+    Returns:
+        ResponseOptions
+
+    Raises:
+        ValueError: If an option is malformed
+    """
+    top_k = args.get('top_k')
+    if top_k is not None:
+        try:
+            top_k = int(top_k)
+        except ValueError:
+            raise ValueError("top_k must be an integer")
+        if top_k < 1 or (num_classes is not None and top_k > num_classes):
+            raise ValueError(f"top_k must be between 1 and {num_classes or 'the number of classes'}")
+
+    probabilities = args.get('probabilities', 'dict').lower()
+    if probabilities not in PROBABILITY_LAYOUTS:
+        raise ValueError(f"probabilities must be one of: {', '.join(PROBABILITY_LAYOUTS)}")
+
+    precision = args.get('precision')
+    if precision is not None:
+        try:
+            precision = int(precision)
+        except ValueError:
+            raise ValueError("precision must be an integer")
+        if not 0 <= precision <= MAX_PRECISION:
+            raise ValueError(f"precision must be between 0 and {MAX_PRECISION}")
+
+    encoding = args.get('format')
+    if encoding is None:
+        encoding = 'msgpack' if _accepts(accept, MSGPACK_MIMETYPES) else 'json'
+    encoding = encoding.lower()
+    if encoding not in ('json', 'msgpack'):
+        raise ValueError("format must be 'json' or 'msgpack'")
+    if probabilities == 'f16' and encoding != 'msgpack':
+        raise ValueError("probabilities=f16 requires format=msgpack")
+
+    if 'gzip' in args:
+        use_gzip = _flag(args['gzip'])
+    else:
+        use_gzip = _accepts(accept_encoding, ('gzip',))
+
+    return ResponseOptions(
+        top_k=top_k,
+        probabilities=probabilities,
+        precision=precision,
+        compact=_flag(args.get('compact', '')),
+        encoding=encoding,
+        gzip=use_gzip
+    )
+
+
+def shape_prediction(result, options):
+    """
+    Apply shaping options to one prediction result.
+
+    The input dict is not modified (it is also kept in the prediction history).
+
+    Args:
+        result: Prediction dict as returned by ImagePredictor
+        options: ResponseOptions
+
+    Returns:
+        New prediction dict
+    """
+    if not options.shapes_results:
+        return result
+
+    precision = options.precision
+    shaped = {}
+    for key, value in result.items():
+        if key == 'all_probabilities' or (options.compact and key in VERBOSE_FIELDS):
+            continue
+        shaped[key] = value
+    if precision is not None and 'confidence' in shaped:
+        shaped['confidence'] = round(shaped['confidence'], precision)
+
+    probabilities = result.get('all_probabilities')
+    if probabilities is None:
+        return shaped
+
+    class_names = list(probabilities)
+    vector = np.fromiter(probabilities.values(), dtype=np.float32, count=len(class_names))
+    if precision is not None:
+        vector = vector.astype(np.float64).round(precision)
+
+    if options.top_k is not None:
+        shaped['top_k'] = [
+            {'class': class_names[i], 'class_index': int(i), 'probability': float(vector[i])}
+            for i in top_k_indices(vector, options.top_k)
+        ]
+
+    if options.probabilities == 'dict':
+        shaped['all_probabilities'] = dict(zip(class_names, vector.tolist()))
+    elif options.probabilities == 'array':
+        shaped['probabilities'] = vector.tolist()
+    elif options.probabilities == 'f16':
+        shaped['probabilities_f16'] = vector.astype('<f2').tobytes()
+
+    return shaped
+
+
+def shape_batch(payload, options):
+    """
+    Apply shaping options to every prediction of a batch response.
+
+    Args:
+        payload: Batch response dict with a 'predictions' list
+        options: ResponseOptions
+
+    Returns:
+        New batch response dict
+    """
+    if not options.shapes_results:
+        return payload
+    shaped = dict(payload)
+    shaped['predictions'] = [shape_prediction(p, options) for p in payload['predictions']]
+    return shaped
+
+
+def encode_response(payload, options, gzip_min_bytes=1024, gzip_level=6):
+    """
+    Encode a response payload.
+
+    Args:
+        payload: JSON-compatible dict (bytes values only with msgpack)
+        options: ResponseOptions
+        gzip_min_bytes: Bodies smaller than this are never compressed
+        gzip_level: gzip compression level
+
+    Returns:
+        tuple (body bytes, headers dict)
+    """
+    if options.encoding == 'msgpack':
+        body = msgpack.packb(payload, use_bin_type=True)
+        headers = {'Content-Type': MSGPACK_MIMETYPES[0]}
+    else:
+        body = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        headers = {'Content-Type': JSON_MIMETYPE}
+    headers['Vary'] = 'Accept, Accept-Encoding'
+
+    if options.gzip and len(body) >= gzip_min_bytes:
+        body = gzip.compress(body, compresslevel=gzip_level)
+        headers['Content-Encoding'] = 'gzip'
+
+    return body, headers
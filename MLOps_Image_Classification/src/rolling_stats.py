@@ -0,0 +1,254 @@
+"""
+Rolling Statistics Module
+Trailing-window prediction statistics from bucketed counters.
+
+Every prediction updates one per-second and one per-minute bucket in two
+fixed-size rings:
+    - per-class counts, confidence sum and latency sum
+    - a latency histogram on fixed log-spaced bounds (mergeable by addition)
+
+A trailing window (1m, 5m, 1h, 24h, ...) is answered by summing the buckets
+it covers: the second ring for windows up to SECOND_BUCKETS seconds, the
+minute ring beyond that. The cost depends on the number of buckets, not on
+the number of predictions, and raw history is never read.
+"""
+
+import re
+import time
+import bisect
+import threading
+
+import numpy as np
+
+
+SECOND_BUCKETS = 600       # 10 minutes at 1 s resolution
+MINUTE_BUCKETS = 1440      # 24 hours at 1 min resolution
+
+# Latency histogram bounds: 0.1 ms .. ~100 s, 12 bins per decade
+LATENCY_BOUNDS_MS = np.logspace(-1, 5, 73)
+_LATENCY_BOUNDS_LIST = LATENCY_BOUNDS_MS.tolist()
+
+DEFAULT_WINDOWS = ('1m', '5m', '1h', '24h')
+
+_WINDOW_PATTERN = re.compile(r'^(\d+(?:\.\d+)?)\s*([smhd]?)$')
+_WINDOW_UNITS = {'': 1, 's': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_window(value):
+    """
+    Parse a window like '90s', '5m', '1h' or '1d' (bare numbers are seconds).
+
+    Returns:
+        float seconds
+
+    Raises:
+        ValueError: If malformed or longer than the minute ring covers
+    """
+    match = _WINDOW_PATTERN.match(str(value).strip().lower())
+    if not match:
+        raise ValueError(f"Invalid window: {value!r} (e.g. 30s, 5m, 1h, 24h)")
+    seconds = float(match.group(1)) * _WINDOW_UNITS[match.group(2)]
+    if not 0 < seconds <= MINUTE_BUCKETS * 60:
+        raise ValueError(f"Window must be between 1s and {MINUTE_BUCKETS // 60}h")
+    return seconds
+
+
+def latency_quantiles(histogram, quantiles=(0.5, 0.95, 0.99)):
+    """
+    Approximate latency quantiles from a histogram on LATENCY_BOUNDS_MS.
+
+    Each quantile is reported as the geometric midpoint of its bin (within
+    ~10% of the true value).
+
+    Returns:
+        dict like {'p50': ..., 'p95': ..., 'p99': ...} (None when empty)
+    """
+    total = histogram.sum()
+    result = {}
+    cumulative = np.cumsum(histogram)
+    for q in quantiles:
+        name = f"p{q * 100:g}"
+        if total == 0:
+            result[name] = None
+            continue
+        index = int(np.searchsorted(cumulative, q * total))
+        if index == 0:
+            result[name] = float(LATENCY_BOUNDS_MS[0])
+        elif index >= len(LATENCY_BOUNDS_MS):
+            result[name] = float(LATENCY_BOUNDS_MS[-1])
+        else:
+            result[name] = float(np.sqrt(LATENCY_BOUNDS_MS[index - 1] * LATENCY_BOUNDS_MS[index]))
+    return result
+
+
+def merge_window_sketches(sketches):
+    """Sum window sketches of the same window (e.g. from several replicas)."""
+    sketches = list(sketches)
+    return {
+        'window_seconds': max(sk['window_seconds'] for sk in sketches),
+        'resolution_seconds': max(sk['resolution_seconds'] for sk in sketches),
+        'class_counts': np.sum([sk['class_counts'] for sk in sketches], axis=0).tolist(),
+        'confidence_sum': sum(sk['confidence_sum'] for sk in sketches),
+        'latency_sum': sum(sk['latency_sum'] for sk in sketches),
+        'latency_hist': np.sum([sk['latency_hist'] for sk in sketches], axis=0).tolist()
+    }
+
+
+def summarize_window(sketch, class_names):
+    """
+    Statistics from a window sketch.
+
+    Returns:
+        dict with totals, rate, per-class counts, confidence and latency
+    """
+    class_counts = np.asarray(sketch['class_counts'])
+    total = int(class_counts.sum())
+    window_seconds = sketch['window_seconds']
+    stats = {
+        'window_seconds': window_seconds,
+        'resolution_seconds': sketch['resolution_seconds'],
+        'total_predictions': total,
+        'predictions_per_second': total / window_seconds,
+        'predictions_per_class': {
+            name: int(count) for name, count in zip(class_names, class_counts)
+        },
+        'average_confidence': sketch['confidence_sum'] / total if total else None,
+        'average_prediction_time_ms': sketch['latency_sum'] / total if total else None
+    }
+    stats.update({
+        f"prediction_time_{name}_ms": value
+        for name, value in latency_quantiles(np.asarray(sketch['latency_hist'])).items()
+    })
+    return stats
+
+
+class _Ring:
+    """Fixed number of time buckets of one width, reused cyclically."""
+
+    def __init__(self, size, width, num_classes):
+        self.size = size
+        self.width = width
+        self.epochs = np.full(size, -1, dtype=np.int64)
+        self.class_counts = np.zeros((size, num_classes), dtype=np.int64)
+        self.confidence_sum = np.zeros(size, dtype=np.float64)
+        self.latency_sum = np.zeros(size, dtype=np.float64)
+        self.latency_hist = np.zeros((size, len(LATENCY_BOUNDS_MS) + 1), dtype=np.int64)
+
+    def record(self, now, class_index, confidence, latency_bin, latency_ms):
+        epoch = int(now // self.width)
+        slot = epoch % self.size
+        if self.epochs[slot] != epoch:
+            # Bucket last used one lap ago; start it over
+            self.epochs[slot] = epoch
+            self.class_counts[slot] = 0
+            self.confidence_sum[slot] = 0.0
+            self.latency_sum[slot] = 0.0
+            self.latency_hist[slot] = 0
+        self.class_counts[slot, class_index] += 1
+        self.confidence_sum[slot] += confidence
+        self.latency_sum[slot] += latency_ms
+        self.latency_hist[slot, latency_bin] += 1
+
+    def merge(self, now, buckets):
+        """Sums over the `buckets` most recent buckets (including the current one)."""
+        current = int(now // self.width)
+        mask = (self.epochs > current - buckets) & (self.epochs <= current)
+        return (
+            self.class_counts[mask].sum(axis=0),
+            float(self.confidence_sum[mask].sum()),
+            float(self.latency_sum[mask].sum()),
+            self.latency_hist[mask].sum(axis=0)
+        )
+
+
+class RollingStatistics:
+    """
+    Per-second and per-minute prediction counters with trailing-window queries.
+
+    Usage:
+        rolling = RollingStatistics(class_names)
+        rolling.record(result)                 # on every prediction
+        rolling.window_stats(300)              # last 5 minutes
+    """
+
+    def __init__(self, class_names, clock=time.time):
+        """
+        Initialize counters.
+
+        Args:
+            class_names: Class names, indexed like predicted_class_index
+            clock: Function returning epoch seconds (overridable in tests)
+        """
+        self.class_names = list(class_names)
+        self.clock = clock
+        self._seconds = _Ring(SECOND_BUCKETS, 1, len(self.class_names))
+        self._minutes = _Ring(MINUTE_BUCKETS, 60, len(self.class_names))
+        self._lock = threading.Lock()
+
+    def record(self, result, now=None):
+        """
+        Count one prediction.
+
+        Args:
+            result: Prediction dict with predicted_class_index, confidence and
+                prediction_time_ms
+            now: Epoch seconds (defaults to the clock)
+        """
+        now = self.clock() if now is None else now
+        class_index = result['predicted_class_index']
+        confidence = result['confidence']
+        latency_ms = result.get('prediction_time_ms') or 0.0
+        # bisect on a list is several times cheaper than np.searchsorted for one value
+        latency_bin = bisect.bisect_left(_LATENCY_BOUNDS_LIST, latency_ms)
+        with self._lock:
+            self._seconds.record(now, class_index, confidence, latency_bin, latency_ms)
+            self._minutes.record(now, class_index, confidence, latency_bin, latency_ms)
+
+    def record_many(self, results, now=None):
+        now = self.clock() if now is None else now
+        for result in results:
+            self.record(result, now)
+
+    def window_sketch(self, seconds):
+        """
+        Raw sums over the trailing window, mergeable across replicas with
+        merge_window_sketches.
+
+        Windows up to SECOND_BUCKETS seconds are exact to the second; longer
+        ones are rounded up to whole minutes.
+
+        Args:
+            seconds: Window length
+
+        Returns:
+            dict of JSON-serializable counts and sums
+        """
+        now = self.clock()
+        if seconds <= SECOND_BUCKETS:
+            ring, buckets = self._seconds, int(np.ceil(seconds))
+        else:
+            ring, buckets = self._minutes, int(np.ceil(seconds / 60))
+        with self._lock:
+            class_counts, confidence_sum, latency_sum, latency_hist = ring.merge(now, buckets)
+
+        return {
+            'window_seconds': buckets * ring.width,
+            'resolution_seconds': ring.width,
+            'class_counts': class_counts.tolist(),
+            'confidence_sum': confidence_sum,
+            'latency_sum': latency_sum,
+            'latency_hist': latency_hist.tolist()
+        }
+
+    def window_stats(self, seconds):
+        """
+        Statistics over the trailing window (see window_sketch).
+
+        Returns:
+            dict with totals, rate, per-class counts, confidence and latency
+        """
+        return summarize_window(self.window_sketch(seconds), self.class_names)
+
+    def windows(self, windows=DEFAULT_WINDOWS):
+        """window_stats for several windows, keyed by their label."""
+        return {label: self.window_stats(parse_window(label)) for label in windows}
@@ -0,0 +1,207 @@
+"""
+Shadow Evaluation Module
+Scores a candidate model on a sample of live traffic, off the request path.
+
+ImagePredictor hands every live inference to `offer`, which samples a
+fraction of them into a bounded queue (dropping when it is full, never
+blocking). A background worker with lowered OS priority runs the candidate on
+the queued inputs, waiting while live inference is in progress, and compares
+its output with the live model's:
+    - agreement rate of the predicted class
+    - confidence deltas (candidate minus live)
+    - candidate vs live inference latency
+"""
+
+import os
+import time
+import queue
+import random
+import threading
+from collections import Counter, deque
+
+import numpy as np
+
+
+class ShadowEvaluator:
+    """
+    Background comparison of a candidate model against the live one.
+
+    Usage:
+        shadow = ShadowEvaluator(candidate_model, class_names, version='abc123').start()
+        predictor.attach_shadow(shadow)
+        ...
+        shadow.stats()
+    """
+
+    def __init__(self, candidate_model, class_names, version=None, sample_rate=0.1,
+                 queue_size=64, max_defer_ms=1000, latency_window=1000):
+        """
+        Initialize evaluator.
+
+        Args:
+            candidate_model: Keras model to evaluate
+            class_names: List of class names
+            version: Candidate model version (for reporting)
+            sample_rate: Fraction of live inferences that are shadowed
+            queue_size: Queued samples before new ones are dropped
+            max_defer_ms: Longest a sample waits for live inference to go idle
+            latency_window: Recent latencies kept for percentiles
+        """
+        if not 0 < sample_rate <= 1:
+            raise ValueError("sample_rate must be in (0, 1]")
+
+        self.candidate_model = candidate_model
+        self.class_names = class_names
+        self.version = version
+        self.sample_rate = sample_rate
+        self.max_defer = max_defer_ms / 1000
+        self.is_busy = lambda: False
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._worker = None
+        self._started_at = None
+
+        self._offered = 0
+        self._sampled = 0
+        self._dropped = 0
+        self._errors = 0
+        self._images = 0
+        self._agreements = 0
+        self._confidence_delta_sum = 0.0
+        self._abs_confidence_delta_sum = 0.0
+        self._live_class_delta_sum = 0.0
+        self._disagreements = Counter()
+        self._live_latency = deque(maxlen=latency_window)
+        self._candidate_latency = deque(maxlen=latency_window)
+
+    def start(self):
+        """Start the background worker."""
+        self._started_at = time.time()
+        self._worker = threading.Thread(target=self._run, name='shadow-eval', daemon=True)
+        self._worker.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Stop the worker; queued samples are discarded."""
+        self._stop.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+
+    @property
+    def active(self):
+        return self._worker is not None and self._worker.is_alive()
+
+    def offer(self, images, live_predictions, live_latency_ms):
+        """
+        Hand over a live inference; cheap and non-blocking.
+
+        Args:
+            images: Model input of the live call (N, 32, 32, 3)
+            live_predictions: Live model output (N, num_classes)
+            live_latency_ms: Live model call latency
+        """
+        self._offered += 1
+        if self._stop.is_set() or random.random() >= self.sample_rate:
+            return
+        try:
+            self._queue.put_nowait((np.array(images), np.array(live_predictions), live_latency_ms))
+            self._sampled += 1
+        except queue.Full:
+            self._dropped += 1
+
+    def _lower_priority(self):
+        # On Linux the niceness of a single thread can be set through its native id
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+
+    def _wait_for_idle(self):
+        deadline = time.monotonic() + self.max_defer
+        while self.is_busy() and time.monotonic() < deadline and not self._stop.is_set():
+            time.sleep(0.002)
+
+    def _run(self):
+        self._lower_priority()
+        while not self._stop.is_set():
+            try:
+                images, live_predictions, live_latency_ms = self._queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+
+            self._wait_for_idle()
+            try:
+                start = time.perf_counter()
+                candidate_predictions = self.candidate_model.predict(images, verbose=0)
+                candidate_latency_ms = (time.perf_counter() - start) * 1000
+            except Exception:
+                with self._lock:
+                    self._errors += 1
+                continue
+
+            self._record(live_predictions, candidate_predictions, live_latency_ms, candidate_latency_ms)
+
+    def _record(self, live_predictions, candidate_predictions, live_latency_ms, candidate_latency_ms):
+        rows = np.arange(len(live_predictions))
+        live_classes = np.argmax(live_predictions, axis=1)
+        candidate_classes = np.argmax(candidate_predictions, axis=1)
+        confidence_delta = candidate_predictions[rows, candidate_classes] - live_predictions[rows, live_classes]
+        live_class_delta = candidate_predictions[rows, live_classes] - live_predictions[rows, live_classes]
+
+        with self._lock:
+            self._images += len(rows)
+            self._agreements += int(np.sum(live_classes == candidate_classes))
+            self._confidence_delta_sum += float(np.sum(confidence_delta))
+            self._abs_confidence_delta_sum += float(np.sum(np.abs(confidence_delta)))
+            self._live_class_delta_sum += float(np.sum(live_class_delta))
+            for live, candidate in zip(live_classes, candidate_classes):
+                if live != candidate:
+                    self._disagreements[(int(live), int(candidate))] += 1
+            self._live_latency.append(live_latency_ms)
+            self._candidate_latency.append(candidate_latency_ms)
+
+    @staticmethod
+    def _latency_summary(values):
+        if not values:
+            return None
+        values = np.asarray(values)
+        return {
+            'mean_ms': float(np.mean(values)),
+            'p50_ms': float(np.percentile(values, 50)),
+            'p95_ms': float(np.percentile(values, 95))
+        }
+
+    def stats(self):
+        """
+        Comparison results so far.
+
+        Returns:
+            dict with sampling counters, agreement rate, confidence deltas and
+            latency of both models
+        """
+        with self._lock:
+            images = self._images
+            return {
+                'candidate_version': self.version,
+                'active': self.active,
+                'started_at': self._started_at,
+                'sample_rate': self.sample_rate,
+                'offered': self._offered,
+                'sampled': self._sampled,
+                'dropped': self._dropped,
+                'queued': self._queue.qsize(),
+                'errors': self._errors,
+                'images_compared': images,
+                'agreement_rate': self._agreements / images if images else None,
+                'mean_confidence_delta': self._confidence_delta_sum / images if images else None,
+                'mean_abs_confidence_delta': self._abs_confidence_delta_sum / images if images else None,
+                'mean_live_class_probability_delta': self._live_class_delta_sum / images if images else None,
+                'top_disagreements': [
+                    {'live': self.class_names[live], 'candidate': self.class_names[candidate], 'count': count}
+                    for (live, candidate), count in self._disagreements.most_common(5)
+                ],
+                'live_latency': self._latency_summary(self._live_latency),
+                'candidate_latency': self._latency_summary(self._candidate_latency)
+            }
@@ -0,0 +1,212 @@
+"""
+Static Assets Module
+In-memory index of the static directory for cache-friendly serving.
+
+Each file is hashed once (and again only when its size or mtime changes) to
+provide:
+    - a content-hash ETag
+    - a fingerprinted name (`plot.<hash>.png`) that can be cached forever,
+      since any change to the file changes the URL
+    - a gzip-precompressed body for compressible types
+    - a downscaled thumbnail for images, written once per content hash to a
+      cache directory
+"""
+
+import os
+import gzip
+import time
+import hashlib
+import mimetypes
+import threading
+
+from PIL import Image
+
+
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+THUMBNAIL_TYPES = ('image/png', 'image/jpeg')
+MIN_COMPRESS_BYTES = 1024
+
+
+class Asset:
+    """One indexed static file."""
+
+    __slots__ = ('name', 'path', 'size', 'mtime_ns', 'digest', 'mimetype',
+                 'fingerprinted_name', 'gzip_body', 'thumbnail_path')
+
+    def __init__(self, name, path, size, mtime_ns, digest, mimetype):
+        self.name = name
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.digest = digest
+        self.mimetype = mimetype
+        stem, ext = os.path.splitext(name)
+        self.fingerprinted_name = f"{stem}.{digest}{ext}"
+        self.gzip_body = None
+        self.thumbnail_path = None
+
+    @property
+    def etag(self):
+        return self.digest
+
+    @property
+    def thumbnail_name(self):
+        if self.thumbnail_path is None:
+            return None
+        stem, _ = os.path.splitext(self.name)
+        return f"{stem}.{self.digest}.thumb{os.path.splitext(self.thumbnail_path)[1]}"
+
+
+def _file_digest(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class StaticAssetIndex:
+    """
+    Index of a static directory, refreshed when files change.
+
+    Usage:
+        index = StaticAssetIndex('static', cache_dir='static_cache')
+        asset, variant = index.resolve('plot.3f2a9c1e0b7d4a55.png')
+    """
+
+    def __init__(self, static_dir, cache_dir=None, thumbnail_width=480,
+                 refresh_interval=2.0):
+        """
+        Initialize index and scan the directory.
+
+        Args:
+            static_dir: Directory to index
+            cache_dir: Directory for generated thumbnails (None disables them)
+            thumbnail_width: Maximum thumbnail width in pixels
+            refresh_interval: Minimum seconds between two change checks
+        """
+        self.static_dir = static_dir
+        self.cache_dir = cache_dir
+        self.thumbnail_width = thumbnail_width
+        self.refresh_interval = refresh_interval
+        self.version = 0
+        self._assets = {}
+        self._by_served_name = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.refresh(force=True)
+
+    def _thumbnail(self, asset):
+        """Create (once per content hash) a downscaled WebP of an image."""
+        if self.cache_dir is None or asset.mimetype not in THUMBNAIL_TYPES:
+            return None
+        path = os.path.join(self.cache_dir, f"{asset.digest}.thumb.webp")
+        if os.path.exists(path):
+            return path
+        try:
+            with Image.open(asset.path) as img:
+                img.thumbnail((self.thumbnail_width, self.thumbnail_width * 4))
+                if img.mode not in ('RGB', 'RGBA'):
+                    img = img.convert('RGBA')
+                os.makedirs(self.cache_dir, exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                img.save(tmp_path, format='WEBP', quality=80, method=4)
+            os.replace(tmp_path, path)
+            return path
+        except Exception as e:
+            print(f"Warning: Could not create thumbnail for {asset.name}: {str(e)}")
+            return None
+
+    def _index_file(self, name, path, stat):
+        mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        asset = Asset(name, path, stat.st_size, stat.st_mtime_ns, _file_digest(path), mimetype)
+
+        if stat.st_size >= MIN_COMPRESS_BYTES and mimetype.startswith(COMPRESSIBLE_TYPES):
+            with open(path, 'rb') as f:
+                compressed = gzip.compress(f.read(), compresslevel=9)
+            if len(compressed) < stat.st_size:
+                asset.gzip_body = compressed
+
+        asset.thumbnail_path = self._thumbnail(asset)
+        return asset
+
+    def refresh(self, force=False):
+        """
+        Re-stat the directory and re-index changed files.
+
+        Unchanged files (same size and mtime) keep their hash. Checks are
+        rate-limited to one per refresh_interval unless forced.
+
+        Returns:
+            bool: True if the index changed
+        """
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.refresh_interval:
+            return False
+
+        with self._lock:
+            self._checked_at = now
+            assets = {}
+            if os.path.isdir(self.static_dir):
+                for root, _, files in os.walk(self.static_dir):
+                    for filename in files:
+                        path = os.path.join(root, filename)
+                        name = os.path.relpath(path, self.static_dir).replace(os.sep, '/')
+                        try:
+                            stat = os.stat(path)
+                        except FileNotFoundError:
+                            continue
+                        current = self._assets.get(name)
+                        if current is not None and current.size == stat.st_size \
+                                and current.mtime_ns == stat.st_mtime_ns:
+                            assets[name] = current
+                        else:
+                            assets[name] = self._index_file(name, path, stat)
+
+            if assets.keys() == self._assets.keys() and \
+                    all(assets[n] is self._assets[n] for n in assets):
+                return False
+
+            by_served_name = {}
+            for asset in assets.values():
+                by_served_name[asset.fingerprinted_name] = (asset, None)
+                if asset.thumbnail_name is not None:
+                    by_served_name[asset.thumbnail_name] = (asset, 'thumbnail')
+            self._assets = assets
+            self._by_served_name = by_served_name
+            self.version += 1
+            return True
+
+    def assets(self):
+        """All indexed assets (after a rate-limited change check)."""
+        self.refresh()
+        return list(self._assets.values())
+
+    def resolve(self, name):
+        """
+        Look up a requested file name.
+
+        Args:
+            name: Plain, fingerprinted or thumbnail name
+
+        Returns:
+            tuple (Asset, kind) where kind is 'plain', 'fingerprinted' or
+            'thumbnail'; (None, None) if unknown
+        """
+        self.refresh()
+        asset = self._assets.get(name)
+        if asset is not None:
+            return asset, 'plain'
+        asset, variant = self._by_served_name.get(name, (None, None))
+        if asset is None:
+            return None, None
+        return asset, variant or 'fingerprinted'
+
+    def url_for(self, name, thumbnail=False, prefix='/static/'):
+        """Fingerprinted URL of an asset (or its thumbnail), or None."""
+        asset = self._assets.get(name)
+        if asset is None:
+            return None
+        if thumbnail:
+            return prefix + asset.thumbnail_name if asset.thumbnail_name else None
+        return prefix + asset.fingerprinted_name
@@ -0,0 +1,113 @@
+"""
+Tensor Input Module
+Parses raw pixel tensors sent by clients that already hold decoded images.
+
+Two request body formats are accepted:
+    - a .npy file (np.save output), detected by its magic string
+    - raw little-endian bytes, with the shape in the X-Tensor-Shape header
+      (e.g. "32,32,3" or "8,32,32,3") and the dtype in X-Tensor-Dtype
+      ("uint8", the default, or "float32")
+
+The body is wrapped with np.frombuffer, so no copy is made until the pixels
+are normalized for the model.
+"""
+
+import io
+import numpy as np
+
+
+IMAGE_SHAPE = (32, 32, 3)
+NPY_MAGIC = b'\x93NUMPY'
+SUPPORTED_DTYPES = {
+    'uint8': np.dtype('|u1'),
+    'float32': np.dtype('<f4')
+}
+
+
+class TensorPayloadError(ValueError):
+    """Raised when a tensor payload is malformed or has the wrong shape/dtype."""
+
+
+def _parse_shape(value):
+    try:
+        return tuple(int(dim) for dim in value.replace('x', ',').split(','))
+    except (AttributeError, ValueError):
+        raise TensorPayloadError(f"Invalid X-Tensor-Shape header: {value!r}")
+
+
+def _read_npy_header(body):
+    """Return (shape, dtype, data offset) of a .npy payload."""
+    header = io.BytesIO(body[:4096])
+    try:
+        version = np.lib.format.read_magic(header)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(header)
+        elif version in ((2, 0), (3, 0)):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(header)
+        else:
+            raise TensorPayloadError(f"Unsupported .npy version: {version}")
+    except TensorPayloadError:
+        raise
+    except Exception as e:
+        raise TensorPayloadError(f"Invalid .npy payload: {e}")
+
+    if fortran_order:
+        raise TensorPayloadError("Fortran-ordered .npy arrays are not supported")
+    return shape, dtype, header.tell()
+
+
+def parse_tensor(body, shape=None, dtype=None, max_batch=64):
+    """
+    Wrap a request body as an image tensor without copying it.
+
+    Args:
+        body: Request body bytes
+        shape: X-Tensor-Shape header value (raw payloads only)
+        dtype: X-Tensor-Dtype header value (raw payloads only, default uint8)
+        max_batch: Largest accepted batch
+
+    Returns:
+        read-only numpy array of shape (32, 32, 3) or (N, 32, 32, 3), uint8
+        or float32
+
+    Raises:
+        TensorPayloadError: If the payload does not describe valid images
+    """
+    if body.startswith(NPY_MAGIC):
+        shape, array_dtype, offset = _read_npy_header(body)
+        if array_dtype not in SUPPORTED_DTYPES.values():
+            raise TensorPayloadError(
+                f"Unsupported dtype {array_dtype}; expected little-endian uint8 or float32"
+            )
+    else:
+        if shape is None:
+            raise TensorPayloadError("Raw tensors need an X-Tensor-Shape header (or send a .npy file)")
+        shape = _parse_shape(shape)
+        dtype_name = (dtype or 'uint8').lower()
+        if dtype_name not in SUPPORTED_DTYPES:
+            raise TensorPayloadError(f"X-Tensor-Dtype must be one of: {', '.join(SUPPORTED_DTYPES)}")
+        array_dtype = SUPPORTED_DTYPES[dtype_name]
+        offset = 0
+
+    shape = tuple(shape)
+    if shape[-3:] != IMAGE_SHAPE or len(shape) not in (3, 4):
+        raise TensorPayloadError(f"Expected shape (32, 32, 3) or (N, 32, 32, 3), got {shape}")
+    if len(shape) == 4 and not 1 <= shape[0] <= max_batch:
+        raise TensorPayloadError(f"Batch size must be between 1 and {max_batch}, got {shape[0]}")
+
+    count = int(np.prod(shape))
+    expected_bytes = count * array_dtype.itemsize
+    if len(body) - offset != expected_bytes:
+        raise TensorPayloadError(
+            f"Payload has {len(body) - offset} data bytes, shape {shape} "
+            f"with dtype {array_dtype.name} needs {expected_bytes}"
+        )
+
+    tensor = np.frombuffer(body, dtype=array_dtype, count=count, offset=offset).reshape(shape)
+
+    if tensor.dtype == np.float32:
+        low, high = float(tensor.min()), float(tensor.max())
+        if not (np.isfinite(low) and np.isfinite(high)) or low < 0.0 or high > 1.0:
+            raise TensorPayloadError("float32 pixels must be finite and normalized to [0, 1]")
+
+    return tensor
@@ -0,0 +1,298 @@
+"""
+Training Shards Module
+Packed, deduplicated storage of uploaded training samples.
+
+Every upload is decoded and resized once, to 32x32x3 uint8, and appended to
+fixed-size shards in one directory:
+    shard-00000.images    raw uint8 pixels, count x 32 x 32 x 3 (np.memmap)
+    shard-00000.labels    one uint8 class index per sample
+    shard-00000.digests   16-byte BLAKE2b digest of each sample's pixels
+    manifest.json         class names, shard counts, per-class totals and the
+                          dataset fingerprint
+
+A sample whose pixels are already stored is a duplicate and is not stored
+again, whatever its file name or encoding. The fingerprint is a hash chained
+over every (digest, label) pair in insertion order, so it changes exactly
+when samples are added; a retrain over an unchanged fingerprint has nothing
+new to learn from.
+
+The manifest is the commit point: it is replaced atomically after the shard
+files are written, and bytes past the counts it records (from an interrupted
+write) are truncated before the next append. Writers from several processes
+are serialized with a lock file where fcntl is available.
+"""
+
+import os
+import copy
+import json
+import hashlib
+import threading
+from datetime import datetime
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; writers are then per-process only
+    fcntl = None
+
+
+IMAGE_SHAPE = (32, 32, 3)
+DIGEST_SIZE = 16
+MANIFEST_FILE = 'manifest.json'
+LOCK_FILE = '.lock'
+EMPTY_FINGERPRINT = hashlib.sha256(b'').hexdigest()
+
+
+def sample_digest(pixels):
+    """Content hash of one uint8 32x32x3 sample."""
+    return hashlib.blake2b(np.ascontiguousarray(pixels).tobytes(), digest_size=DIGEST_SIZE).digest()
+
+
+def chain_fingerprint(fingerprint, digest, label):
+    """Fingerprint after appending one sample."""
+    return hashlib.sha256(bytes.fromhex(fingerprint) + digest + bytes([label])).hexdigest()
+
+
+def resolve_label(label, class_names):
+    """
+    Class index of an upload label.
+
+    Args:
+        label: Class name (case-insensitive) or class index
+        class_names: Class names
+
+    Returns:
+        int
+
+    Raises:
+        ValueError: If the label names no class
+    """
+    text = str(label).strip()
+    if text.isdigit() and int(text) < len(class_names):
+        return int(text)
+    for index, name in enumerate(class_names):
+        if name.lower() == text.lower():
+            return index
+    raise ValueError(f"Unknown label: {label!r} (expected one of {', '.join(class_names)})")
+
+
+class _DirectoryLock:
+    """Exclusive lock across threads and, with fcntl, across processes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self._lock.acquire()
+        if fcntl is not None:
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._file is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+        self._lock.release()
+        return False
+
+
+class TrainingShards:
+    """
+    Append-only store of uploaded training samples.
+
+    Usage:
+        shards = TrainingShards('data/train/shards', class_names)
+        shards.add(pixels, labels)        # uint8 (N, 32, 32, 3), class indices
+        X, y = shards.load()              # uint8 images, int labels
+        shards.fingerprint
+    """
+
+    def __init__(self, directory, class_names, shard_size=10000):
+        """
+        Initialize store.
+
+        Args:
+            directory: Shard directory (created if missing)
+            class_names: Class names (labels are stored as indices)
+            shard_size: Samples per shard file
+        """
+        self.directory = directory
+        self.class_names = list(class_names)
+        self.shard_size = shard_size
+        os.makedirs(directory, exist_ok=True)
+        self._lock = _DirectoryLock(os.path.join(directory, LOCK_FILE))
+        self._manifest = None
+        self._digests = set()
+        with self._lock:
+            self._refresh()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_manifest(self):
+        try:
+            with open(self._path(MANIFEST_FILE), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {
+                'version': 1,
+                'image_shape': list(IMAGE_SHAPE),
+                'class_names': self.class_names,
+                'shard_size': self.shard_size,
+                'shards': [],
+                'class_counts': [0] * len(self.class_names),
+                'total_samples': 0,
+                'fingerprint': EMPTY_FINGERPRINT,
+                'updated_at': None
+            }
+
+    def _refresh(self):
+        """Pick up samples appended by other processes (caller holds the lock)."""
+        manifest = self._read_manifest()
+        if self._manifest is not None and manifest['fingerprint'] == self._manifest['fingerprint']:
+            return
+        if manifest['class_names'] != self.class_names:
+            raise ValueError(f"Shards in {self.directory} were written for classes {manifest['class_names']}")
+        digests = set()
+        for shard in manifest['shards']:
+            with open(self._path(shard['name'] + '.digests'), 'rb') as f:
+                raw = f.read(shard['count'] * DIGEST_SIZE)
+            digests.update(raw[i:i + DIGEST_SIZE] for i in range(0, len(raw), DIGEST_SIZE))
+        self._manifest = manifest
+        self._digests = digests
+
+    def _write_manifest(self, manifest):
+        manifest['updated_at'] = datetime.now().isoformat()
+        tmp_path = self._path(f"{MANIFEST_FILE}.tmp-{os.getpid()}")
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path(MANIFEST_FILE))
+
+    def _append_to_shard(self, shard, images, labels, digests):
+        """Append samples to one shard's files, dropping any uncommitted tail first."""
+        sample_bytes = int(np.prod(IMAGE_SHAPE))
+        for suffix, itemsize, data in (('.images', sample_bytes, images.tobytes()),
+                                       ('.labels', 1, labels.tobytes()),
+                                       ('.digests', DIGEST_SIZE, b''.join(digests))):
+            with open(self._path(shard['name'] + suffix), 'ab') as f:
+                f.truncate(shard['count'] * itemsize)
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        shard['count'] += len(labels)
+
+    def add(self, images, labels):
+        """
+        Append samples, skipping those whose pixels are already stored.
+
+        Args:
+            images: uint8 array (N, 32, 32, 3)
+            labels: N class indices
+
+        Returns:
+            list of N statuses, 'added' or 'duplicate'
+        """
+        images = np.ascontiguousarray(images, dtype=np.uint8).reshape((-1,) + IMAGE_SHAPE)
+        labels = np.asarray(labels, dtype=np.uint8).ravel()
+        if len(images) != len(labels):
+            raise ValueError('Number of images and labels must match')
+        if len(labels) and int(labels.max()) >= len(self.class_names):
+            raise ValueError(f"Label out of range: {int(labels.max())}")
+
+        with self._lock:
+            self._refresh()
+            manifest = copy.deepcopy(self._manifest)
+            statuses = []
+            keep, new_digests, seen = [], [], set()
+            fingerprint = manifest['fingerprint']
+            for i, pixels in enumerate(images):
+                digest = sample_digest(pixels)
+                if digest in self._digests or digest in seen:
+                    statuses.append('duplicate')
+                    continue
+                statuses.append('added')
+                keep.append(i)
+                new_digests.append(digest)
+                seen.add(digest)
+                fingerprint = chain_fingerprint(fingerprint, digest, int(labels[i]))
+            if not keep:
+                return statuses
+
+            keep = np.asarray(keep)
+            images, labels = images[keep], labels[keep]
+            start = 0
+            while start < len(keep):
+                shards = manifest['shards']
+                if not shards or shards[-1]['count'] >= self.shard_size:
+                    shards.append({'name': f"shard-{len(shards):05d}", 'count': 0})
+                shard = shards[-1]
+                end = start + min(self.shard_size - shard['count'], len(keep) - start)
+                self._append_to_shard(shard, images[start:end], labels[start:end], new_digests[start:end])
+                start = end
+
+            manifest['class_counts'] = (
+                np.asarray(manifest['class_counts']) + np.bincount(labels, minlength=len(self.class_names))
+            ).tolist()
+            manifest['total_samples'] += len(keep)
+            manifest['fingerprint'] = fingerprint
+            self._write_manifest(manifest)
+            self._manifest = manifest
+            self._digests.update(new_digests)
+            return statuses
+
+    def __len__(self):
+        return self._manifest['total_samples']
+
+    @property
+    def fingerprint(self):
+        """Dataset fingerprint as of the last read or write of this process."""
+        return self._manifest['fingerprint']
+
+    def refresh(self):
+        """Re-read the manifest; returns the current fingerprint."""
+        with self._lock:
+            self._refresh()
+        return self.fingerprint
+
+    def load(self):
+        """
+        All stored samples.
+
+        Shards are memory-mapped, so this costs one copy of the pixels and
+        no decoding.
+
+        Returns:
+            tuple (uint8 images (N, 32, 32, 3), int64 labels (N,))
+        """
+        with self._lock:
+            self._refresh()
+            shards = list(self._manifest['shards'])
+        images, labels = [], []
+        for shard in shards:
+            if shard['count'] == 0:
+                continue
+            images.append(np.memmap(self._path(shard['name'] + '.images'), dtype=np.uint8,
+                                    mode='r', shape=(shard['count'],) + IMAGE_SHAPE))
+            labels.append(np.fromfile(self._path(shard['name'] + '.labels'), dtype=np.uint8,
+                                      count=shard['count']))
+        if not images:
+            return np.empty((0,) + IMAGE_SHAPE, dtype=np.uint8), np.empty(0, dtype=np.int64)
+        return np.concatenate(images), np.concatenate(labels).astype(np.int64)
+
+    def summary(self):
+        """Manifest fields for API responses."""
+        manifest = self._manifest
+        return {
+            'total_samples': manifest['total_samples'],
+            'shards': len(manifest['shards']),
+            'samples_per_class': dict(zip(self.class_names, manifest['class_counts'])),
+            'fingerprint': manifest['fingerprint'],
+            'updated_at': manifest['updated_at']
+        }
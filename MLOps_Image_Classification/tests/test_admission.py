@@ -0,0 +1,111 @@
+"""
+Unit tests for admission control module
+"""
+
+import pytest
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.admission import AdmissionController
+
+
+class TestAdmissionController:
+    """Test cases for AdmissionController."""
+
+    @pytest.fixture
+    def controller(self):
+        return AdmissionController(latency_target_ms=100, max_in_flight=4, min_in_flight=1)
+
+    def test_admits_up_to_limit(self, controller):
+        """Test that requests beyond the limit are shed."""
+        slots = [controller.try_acquire() for _ in range(4)]
+        assert all(slots)
+
+        assert controller.try_acquire() == 0
+        state = controller.state()
+        assert state['in_flight'] == 4
+        assert state['shed_total'] == 1
+        assert state['overloaded'] is True
+
+    def test_release_frees_slots(self, controller):
+        """Test that released slots can be reused."""
+        for _ in range(4):
+            controller.try_acquire()
+        controller.release(1, latency_seconds=0.01)
+
+        assert controller.try_acquire() == 1
+
+    def test_limit_shrinks_over_target(self, controller):
+        """Test multiplicative decrease when latency exceeds the target."""
+        for _ in range(10):
+            slots = controller.try_acquire()
+            controller.release(slots, latency_seconds=0.5)
+
+        assert controller.limit == 1
+        assert controller.state()['ewma_latency_ms'] > 100
+
+    def test_limit_recovers_under_target(self, controller):
+        """Test additive increase once latency is back under the target."""
+        for _ in range(10):
+            slots = controller.try_acquire()
+            controller.release(slots, latency_seconds=0.5)
+        assert controller.limit == 1
+
+        for _ in range(50):
+            held = [controller.try_acquire() for _ in range(controller.limit)]
+            for slots in held:
+                controller.release(slots, latency_seconds=0.001)
+
+        assert controller.limit == 4
+
+    def test_slow_batches_shrink_the_limit(self, controller):
+        """Test that a batch is judged by its wall-clock latency, not per image."""
+        start_limit = controller.limit
+        for _ in range(3):
+            # 4 slots in 1.5 s is 375 ms per image, but the client waited 1.5 s
+            slots = controller.try_acquire(cost=4)
+            controller.release(slots, latency_seconds=1.5, batch=True)
+        assert controller.limit < start_limit
+        assert controller.state()['batch_ewma_latency_ms'] > controller.batch_latency_target_ms
+
+    def test_normal_batches_keep_the_limit(self, controller):
+        """Test that batches within their own target do not shed single images."""
+        for _ in range(10):
+            # Slow for a single image (100 ms target), normal for a batch (1 s)
+            slots = controller.try_acquire(cost=4)
+            controller.release(slots, latency_seconds=0.6, batch=True)
+        assert controller.limit == 4
+        assert controller.state()['ewma_latency_ms'] is None
+
+        slots = controller.try_acquire()
+        controller.release(slots, latency_seconds=0.01)
+        assert controller.try_acquire(cost=3) == 3
+
+    def test_batch_cost_capped_at_limit(self, controller):
+        """Test that large batches are admitted with at most `limit` slots."""
+        assert controller.try_acquire(cost=20) == 4
+        assert controller.try_acquire() == 0
+
+    def test_failed_requests_do_not_update_latency(self, controller):
+        """Test that releases without latency keep the EWMA unchanged."""
+        slots = controller.try_acquire()
+        controller.release(slots)
+
+        assert controller.state()['ewma_latency_ms'] is None
+        assert controller.state()['in_flight'] == 0
+
+    def test_retry_after(self, controller):
+        """Test that Retry-After is at least one second."""
+        assert controller.retry_after_seconds() >= 1
+
+        for _ in range(4):
+            controller.try_acquire()
+        controller._ewma_ms = 3000
+        assert controller.retry_after_seconds() == 3
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -6,6 +6,7 @@ import pytest
 import sys
 import os
 import io
+from datetime import datetime
 from PIL import Image
 import numpy as np
 
@@ -63,9 +64,67 @@ class TestHealthEndpoints:
         assert 'uptime_seconds' in data
         assert 'uptime_minutes' in data
         assert 'uptime_hours' in data
+        # The body is at most UPTIME_CACHE_RESOLUTION_SECONDS (1 s by default) old
+        age = datetime.now() - datetime.fromisoformat(data['current_time'])
+        assert age.total_seconds() < 2
         assert 'is_retraining' in data
 
 
+class TestConditionalRequests:
+    """Test ETag revalidation of read-mostly endpoints."""
+
+    @pytest.mark.parametrize('url', [
+        '/api/model/uptime', '/api/model/info', '/api/statistics', '/api/visualizations'
+    ])
+    def test_not_modified(self, client, url, monkeypatch):
+        """Test that a matching If-None-Match is answered with 304."""
+        # Keep the uptime body from rolling over to the next second mid-test
+        monkeypatch.setitem(client.application.config, 'UPTIME_CACHE_RESOLUTION_SECONDS', 3600)
+        response = client.get(url)
+        if response.status_code != 200:
+            pytest.skip("Model not available")
+        etag = response.headers['ETag']
+        assert response.headers['Cache-Control'] == 'no-cache'
+
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+
+    def test_statistics_change_after_prediction(self, client):
+        """Test that a new prediction invalidates the cached statistics."""
+        etag = client.get('/api/statistics').headers['ETag']
+        response = client.post(
+            '/api/predict',
+            data={'file': (create_test_image(), 'test.png')},
+            content_type='multipart/form-data'
+        )
+        if response.status_code != 200:
+            pytest.skip("Model not available")
+
+        response = client.get('/api/statistics', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+
+
+class TestEventStream:
+    """Test the server-sent events endpoint."""
+
+    def test_stream_starts_with_snapshot(self, client):
+        """Test that a subscriber first receives a snapshot of every topic."""
+        import json
+        response = client.get('/api/events')
+        try:
+            assert response.status_code == 200
+            assert response.mimetype == 'text/event-stream'
+
+            first = next(response.response)
+            first = first.decode() if isinstance(first, bytes) else first
+            data = json.loads(first.split('data: ', 1)[1])
+            assert {'uptime', 'retrain', 'statistics', 'model'} <= set(data)
+        finally:
+            response.close()
+
+
 class TestPredictionEndpoints:
     """Test prediction endpoints."""
     
@@ -95,7 +154,70 @@ class TestPredictionEndpoints:
             assert 'predicted_class' in data
             assert 'confidence' in data
             assert 'prediction_time_ms' in data
+            assert data['file_name'] == 'test.png'
     
+    def test_predict_compact_msgpack(self, client):
+        """Test response shaping and msgpack negotiation."""
+        import msgpack
+        response = client.post(
+            '/api/predict?top_k=3&probabilities=array&precision=4&compact=1',
+            data={'file': (create_test_image(), 'test.png')},
+            content_type='multipart/form-data',
+            headers={'Accept': 'application/msgpack'}
+        )
+        assert response.status_code in [200, 500]
+
+        if response.status_code == 200:
+            assert response.mimetype == 'application/msgpack'
+            data = msgpack.unpackb(response.data, raw=False)
+            assert len(data['top_k']) == 3
+            assert len(data['probabilities']) == 10
+            assert 'all_probabilities' not in data
+            assert 'file_path' not in data
+
+    def test_predict_rejects_invalid_image(self, client):
+        """Test that a non-image upload is rejected from its header."""
+        response = client.post(
+            '/api/predict',
+            data={'file': (io.BytesIO(b'not an image at all'), 'test.png')},
+            content_type='multipart/form-data'
+        )
+        assert response.status_code in [400, 500]
+
+        if response.status_code == 400:
+            assert response.get_json()['reason'] == 'unsupported_format'
+
+    def test_predict_invalid_response_option(self, client):
+        """Test that malformed response options are rejected."""
+        response = client.post('/api/predict?top_k=abc')
+        assert response.status_code == 400
+
+    def test_predict_tensor(self, client):
+        """Test prediction from raw uint8 pixels."""
+        pixels = np.random.randint(0, 256, (2, 32, 32, 3), dtype=np.uint8)
+        response = client.post(
+            '/api/predict/tensor',
+            data=pixels.tobytes(),
+            content_type='application/octet-stream',
+            headers={'X-Tensor-Shape': '2,32,32,3', 'X-Tensor-Dtype': 'uint8'}
+        )
+        assert response.status_code in [200, 500]
+
+        if response.status_code == 200:
+            data = response.get_json()
+            assert data['total_processed'] == 2
+            assert 'predicted_class' in data['predictions'][0]
+
+    def test_predict_tensor_bad_shape(self, client):
+        """Test that a tensor of the wrong shape is rejected."""
+        response = client.post(
+            '/api/predict/tensor',
+            data=bytes(64 * 64 * 3),
+            content_type='application/octet-stream',
+            headers={'X-Tensor-Shape': '64,64,3'}
+        )
+        assert response.status_code == 400
+
     def test_batch_predict_no_files(self, client):
         """Test batch prediction without files."""
         response = client.post('/api/predict/batch')
@@ -110,6 +232,271 @@ class TestPredictionEndpoints:
         assert response.status_code in [200, 500]
 
 
+class TestAdmissionControl:
+    """Test admission control and load shedding."""
+    
+    def test_admission_state(self, client):
+        """Test admission state endpoint."""
+        response = client.get('/api/admission')
+        assert response.status_code == 200
+        
+        data = response.get_json()
+        assert 'enabled' in data
+        if data['enabled']:
+            assert 'in_flight' in data
+            assert 'limit' in data
+            assert 'ewma_latency_ms' in data
+    
+    def test_predict_shed_when_saturated(self, client):
+        """Test that a saturated server answers 503 with Retry-After."""
+        import app as app_module
+        controller = app_module.admission_controller
+        if controller is None:
+            pytest.skip("Admission control disabled")
+        
+        held = controller.try_acquire(cost=controller.limit)
+        try:
+            response = client.post(
+                '/api/predict',
+                data={'file': (create_test_image(), 'test.png')},
+                content_type='multipart/form-data'
+            )
+            assert response.status_code == 503
+            assert int(response.headers['Retry-After']) >= 1
+            assert 'X-Admission-Limit' in response.headers
+        finally:
+            controller.release(held)
+
+
+class TestMetricsInstrumentation:
+    """Test Prometheus instrumentation of the API."""
+
+    def test_requests_counted_per_endpoint(self, client):
+        """Test that requests are counted under their URL rule."""
+        from prometheus_client import REGISTRY
+        labels = {'endpoint': '/api/health', 'method': 'GET', 'status': '200'}
+        before = REGISTRY.get_sample_value('http_requests_total', labels) or 0
+
+        client.get('/api/health')
+
+        assert REGISTRY.get_sample_value('http_requests_total', labels) == before + 1
+        assert REGISTRY.get_sample_value('http_requests_in_flight') == 0
+
+    def test_predict_records_stages(self, client):
+        """Test that a prediction observes every pipeline stage."""
+        from prometheus_client import REGISTRY
+        from src.metrics import PIPELINE_STAGES
+
+        def counts():
+            return {stage: REGISTRY.get_sample_value(
+                'pipeline_stage_duration_seconds_count', {'stage': stage}) or 0
+                for stage in PIPELINE_STAGES}
+
+        before = counts()
+        response = client.post(
+            '/api/predict',
+            data={'file': (create_test_image(), 'test.png')},
+            content_type='multipart/form-data'
+        )
+        if response.status_code != 200:
+            pytest.skip("Model not available")
+
+        after = counts()
+        assert all(after[stage] > before[stage] for stage in PIPELINE_STAGES)
+
+
+class TestProfilingEndpoints:
+    """Test the admin profiling endpoint."""
+
+    def test_disabled_without_token(self, app, client):
+        """Test that admin endpoints are off when no token is configured."""
+        app.config['ADMIN_TOKEN'] = ''
+        response = client.post('/api/admin/profile', json={'requests': 1})
+        assert response.status_code == 403
+
+    def test_rejects_wrong_token(self, app, client):
+        """Test that a wrong token is refused."""
+        app.config['ADMIN_TOKEN'] = 'secret'
+        try:
+            response = client.get('/api/admin/profile',
+                                  headers={'Authorization': 'Bearer wrong'})
+            assert response.status_code == 401
+        finally:
+            app.config['ADMIN_TOKEN'] = ''
+
+    def test_start_and_stop_session(self, app, client):
+        """Test arming a session and ending it early."""
+        app.config['ADMIN_TOKEN'] = 'secret'
+        headers = {'Authorization': 'Bearer secret'}
+        try:
+            response = client.post('/api/admin/profile', headers=headers,
+                                   json={'requests': 5, 'seconds': 10, 'tf_trace': False})
+            assert response.status_code == 202
+            assert response.get_json()['active'] is True
+
+            response = client.delete('/api/admin/profile', headers=headers)
+            assert response.status_code == 200
+            assert 'top_functions' in response.get_json()['summary']
+        finally:
+            app.config['ADMIN_TOKEN'] = ''
+
+
+class TestShadowEndpoints:
+    """Test the admin shadow evaluation endpoint."""
+
+    def test_rejects_path_outside_model_dir(self, app, client):
+        """Test that candidates can only be loaded from the model directory."""
+        app.config['ADMIN_TOKEN'] = 'secret'
+        try:
+            response = client.post('/api/admin/shadow', json={'model_path': '../config.py'},
+                                   headers={'Authorization': 'Bearer secret'})
+            assert response.status_code == 400
+        finally:
+            app.config['ADMIN_TOKEN'] = ''
+
+    def test_status_without_shadow(self, app, client):
+        """Test that the status is 404 while no shadow runs."""
+        app.config['ADMIN_TOKEN'] = 'secret'
+        try:
+            response = client.get('/api/admin/shadow', headers={'Authorization': 'Bearer secret'})
+            assert response.status_code == 404
+        finally:
+            app.config['ADMIN_TOKEN'] = ''
+
+
+class TestRollingStatistics:
+    """Test trailing-window statistics."""
+
+    def test_default_windows(self, client):
+        """Test that the default windows are reported."""
+        response = client.get('/api/statistics/rolling')
+        assert response.status_code == 200
+        windows = response.get_json()['windows']
+        assert set(windows) == {'1m', '5m', '1h', '24h'}
+        assert windows['5m']['window_seconds'] == 300
+
+    def test_prediction_is_counted(self, client):
+        """Test that a prediction shows up in the last-minute window."""
+        before = client.get('/api/statistics/rolling?window=1m').get_json()['windows']['1m']
+        response = client.post(
+            '/api/predict',
+            data={'file': (create_test_image(), 'test.png')},
+            content_type='multipart/form-data'
+        )
+        if response.status_code != 200:
+            pytest.skip("Model not available")
+        after = client.get('/api/statistics/rolling?window=1m').get_json()['windows']['1m']
+        assert after['total_predictions'] >= before['total_predictions'] + 1
+
+    def test_invalid_window(self, client):
+        """Test that malformed windows are rejected."""
+        assert client.get('/api/statistics/rolling?window=forever').status_code == 400
+
+
+class TestClusterStatistics:
+    """Test statistics merged across replicas."""
+
+    def test_other_replicas_are_merged(self, client):
+        """Test that a live peer snapshot is added and a stale one is reported."""
+        import time
+        import app as app_module
+        from src.cluster_stats import write_snapshot, SNAPSHOT_SUFFIX
+
+        directory = app_module.app.config['CLUSTER_STATS_DIR']
+        own = client.get('/api/statistics/cluster').get_json()
+        own_total = own['totals'].get('total_predictions', 0)
+
+        peer = app_module.cluster_stats_publisher.snapshot()
+        peer['totals'] = dict(peer['totals'], count=5, class_counts=[5] + [0] * 9,
+                              confidence_sum=2.5, confidence_min=0.5, confidence_max=0.5)
+        paths = [
+            write_snapshot(directory, dict(peer, replica_id='test-peer')),
+            write_snapshot(directory, dict(peer, replica_id='test-stale', published_at=time.time() - 3600))
+        ]
+        try:
+            data = client.get('/api/statistics/cluster').get_json()
+        finally:
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
+        assert data['totals']['total_predictions'] == own_total + 5
+        assert 'test-peer' in [r['replica_id'] for r in data['replicas']]
+        assert [r['replica_id'] for r in data['stale_replicas']] == ['test-stale']
+
+
+class TestPredictionQueries:
+    """Test the stored prediction query endpoint."""
+
+    def test_latest_prediction_is_queryable(self, client):
+        """Test that a prediction can be found by class and time window."""
+        import app as app_module
+        response = client.post(
+            '/api/predict',
+            data={'file': (create_test_image(), 'test.png')},
+            content_type='multipart/form-data'
+        )
+        if response.status_code != 200:
+            pytest.skip("Model not available")
+        predicted_class = response.get_json()['predicted_class']
+        app_module.prediction_store.flush(timeout=5)
+
+        response = client.get('/api/predictions', query_string={
+            'class': predicted_class, 'since': response.get_json()['timestamp'], 'limit': 1
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['limit'] == 1
+        assert len(data['predictions']) == 1
+        assert data['predictions'][0]['predicted_class'] == predicted_class
+
+    @pytest.mark.parametrize('query', [
+        {'class': 'Unicorn'}, {'limit': 0}, {'since': 'yesterday'}, {'cursor': '!!!'}
+    ])
+    def test_invalid_query(self, client, query):
+        """Test that invalid filters are rejected with 400."""
+        response = client.get('/api/predictions', query_string=query)
+        assert response.status_code == 400
+        assert 'error' in response.get_json()
+
+
+class TestStaticAssets:
+    """Test indexed static file serving."""
+
+    @pytest.fixture
+    def asset(self, app):
+        import app as app_module
+        path = os.path.join(app.config['STATIC_DIR'], 'test_static_asset.png')
+        Image.fromarray(np.zeros((64, 64, 3), dtype=np.uint8)).save(path)
+        app_module.static_index.refresh(force=True)
+        yield 'test_static_asset.png'
+        os.remove(path)
+        app_module.static_index.refresh(force=True)
+
+    def test_plain_and_fingerprinted(self, client, asset):
+        """Test cache headers of plain and fingerprinted URLs."""
+        response = client.get(f'/static/{asset}')
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == 'no-cache'
+        etag = response.headers['ETag']
+
+        assert client.get(f'/static/{asset}', headers={'If-None-Match': etag}).status_code == 304
+
+        visualization = next(v for v in client.get('/api/visualizations').get_json()['visualizations']
+                             if v['filename'] == asset)
+        response = client.get(visualization['url'])
+        assert response.status_code == 200
+        assert 'immutable' in response.headers['Cache-Control']
+
+        response = client.get(visualization['thumbnail_url'])
+        assert response.status_code == 200
+        assert response.mimetype == 'image/webp'
+
+    def test_unknown_file(self, client):
+        """Test that unknown files are 404."""
+        assert client.get('/static/does_not_exist.png').status_code == 404
+
+
 class TestVisualizationEndpoints:
     """Test visualization endpoints."""
     
@@ -123,9 +510,107 @@ class TestVisualizationEndpoints:
         assert isinstance(data['visualizations'], list)
 
 
+class TestTrainingData:
+    """Test training data ingestion."""
+
+    def test_upload_is_deduplicated(self, client, monkeypatch, tmp_path):
+        """Test that uploads are stored once and re-uploads count as duplicates."""
+        import app as app_module
+        from src.training_shards import TrainingShards
+        if app_module.preprocessor is None:
+            pytest.skip("Preprocessor not available")
+        shards = TrainingShards(str(tmp_path), app_module.class_names)
+        monkeypatch.setattr(app_module, 'training_shards', shards)
+        image = create_test_image().getvalue()
+
+        def upload(label):
+            return client.post(
+                '/api/upload/training-data',
+                data={'files': [(io.BytesIO(image), 'a.png'), (io.BytesIO(b'junk'), 'b.png')],
+                      'labels': [label, 'cat']},
+                content_type='multipart/form-data'
+            ).get_json()
+
+        data = upload('cat')
+        assert data['files_saved'] == 1
+        assert data['files_rejected'][0]['reason'] == 'unsupported_format'
+        assert data['dataset']['samples_per_class']['Cat'] == 1
+
+        data = upload('3')
+        assert data['files_saved'] == 0
+        assert data['duplicates'] == 1
+        assert upload('unicorn')['files_rejected'][0]['reason'] == 'unknown_label'
+
+        summary = client.get('/api/training-data').get_json()
+        assert summary['total_samples'] == 1
+        assert summary['fingerprint'] == shards.fingerprint
+
+
 class TestRetrainingEndpoints:
     """Test retraining endpoints."""
     
+    def test_drift_report(self, client):
+        """Test the drift endpoint."""
+        response = client.get('/api/drift')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert 'drift_score' in data
+        assert 'drift_threshold' in data
+
+    def test_retrain_skipped_without_drift(self, client, monkeypatch):
+        """Test that retraining is skipped while inputs match the training profile."""
+        import app as app_module
+        from src.drift import DriftMonitor, build_reference_profile
+        if app_module.model_classifier is None:
+            pytest.skip("Model not available")
+
+        images = np.random.default_rng(0).random((500, 32, 32, 3)).astype(np.float32)
+        labels = np.arange(500) % 10
+        probabilities = np.eye(10, dtype=np.float32)[labels]
+        monitor = DriftMonitor(app_module.class_names,
+                               reference=build_reference_profile(images, labels, app_module.class_names),
+                               min_samples=100)
+        monitor.observe(images, probabilities)
+        monkeypatch.setattr(app_module, 'drift_monitor', monitor)
+        monkeypatch.setattr(app_module, 'is_retraining', False)
+
+        response = client.post('/api/retrain')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['status'] == 'skipped'
+        assert data['drift']['drift_score'] < app_module.app.config['DRIFT_THRESHOLD']
+
+    def test_retrain_skipped_without_new_data(self, client, monkeypatch, tmp_path):
+        """Test that retraining is skipped when the last run saw the same training data."""
+        import app as app_module
+        from src.training_shards import TrainingShards
+        from src.checkpointing import new_run_dir, TrainingCheckpointer
+        if app_module.model_classifier is None:
+            pytest.skip("Model not available")
+
+        shards = TrainingShards(str(tmp_path / 'shards'), app_module.class_names)
+        run_dir = new_run_dir(str(tmp_path / 'checkpoints'))
+        TrainingCheckpointer(run_dir).mark('completed', data_fingerprint=shards.fingerprint)
+        monkeypatch.setattr(app_module, 'training_shards', shards)
+        monkeypatch.setattr(app_module, 'is_retraining', False)
+        monkeypatch.setattr(app_module.drift_monitor, 'report', lambda: {'ready': False, 'drift_score': None})
+        monkeypatch.setitem(app_module.app.config, 'CHECKPOINT_DIR', str(tmp_path / 'checkpoints'))
+
+        response = client.post('/api/retrain')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['status'] == 'skipped'
+        assert data['last_run_id'] == os.path.basename(run_dir)
+
+    def test_retrain_refused_with_several_workers(self, client, monkeypatch):
+        """Test that retrain and evaluate are refused when other workers would keep the old model."""
+        import app as app_module
+        monkeypatch.setitem(app_module.app.config, 'SERVE_ACTIVE_WORKERS', 2)
+        for path in ('/api/retrain', '/api/model/evaluate'):
+            response = client.post(path)
+            assert response.status_code == 409
+            assert 'SERVE_WORKERS=1' in response.get_json()['error']
+
     def test_retrain_status(self, client):
         """Test retraining status endpoint."""
         response = client.get('/api/retrain/status')
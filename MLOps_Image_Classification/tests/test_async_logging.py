@@ -0,0 +1,137 @@
+"""
+Unit tests for async logging module
+"""
+
+import pytest
+import os
+import sys
+import logging
+import threading
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.async_logging import AsyncLogging, HotPathSampler, NonBlockingQueueHandler, HOT_PATH
+
+
+class RecordingHandler(logging.Handler):
+    """Collects formatted messages and the thread that formatted them."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+        self.threads = []
+
+    def emit(self, record):
+        self.messages.append(self.format(record))
+        self.threads.append(threading.get_ident())
+
+
+class FormatSpy:
+    """Argument that records which thread converted it to a string."""
+
+    def __init__(self):
+        self.formatted_on = None
+
+    def __str__(self):
+        self.formatted_on = threading.get_ident()
+        return 'spy'
+
+
+def _record(msg='Prediction successful: %s', hot_path=True):
+    record = logging.LogRecord('test', logging.INFO, __file__, 1, msg, ('Cat',), None)
+    if hot_path:
+        record.hot_path = True
+    return record
+
+
+class TestHotPathSampler:
+    """Test cases for HotPathSampler."""
+
+    def test_regular_records_always_pass(self):
+        """Test that unmarked records are never sampled."""
+        sampler = HotPathSampler(sample_rate=0, burst=0)
+        assert all(sampler.filter(_record(hot_path=False)) for _ in range(100))
+
+    def test_burst_then_sampling(self):
+        """Test that the burst passes and the rest is sampled."""
+        sampler = HotPathSampler(sample_rate=0.1, burst=5)
+        passed = sum(sampler.filter(_record()) for _ in range(105))
+
+        # 5 burst + every 10th of the remaining 100
+        assert passed == 15
+
+    def test_flush_summary(self):
+        """Test that suppressed records are summarized per template."""
+        sampler = HotPathSampler(sample_rate=0, burst=2)
+        for _ in range(10):
+            sampler.filter(_record())
+
+        summary = sampler.flush_summary()
+        assert summary == {'Prediction successful: %s': (10, 8)}
+
+        # A new interval starts with a fresh burst
+        assert sampler.filter(_record()) is True
+        assert sampler.flush_summary() == {}
+
+
+class TestNonBlockingQueueHandler:
+    """Test cases for NonBlockingQueueHandler."""
+
+    def test_drops_when_full(self):
+        """Test that a full queue drops instead of blocking."""
+        import queue
+        handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        handler.handle(_record(hot_path=False))
+        handler.handle(_record(hot_path=False))
+
+        assert handler.dropped == 1
+
+
+class TestAsyncLogging:
+    """Test cases for AsyncLogging."""
+
+    @pytest.fixture
+    def pipeline(self):
+        handler = RecordingHandler()
+        pipeline = AsyncLogging([handler], sample_rate=0, burst=3, summary_interval=3600)
+        logger = logging.getLogger(f'test_async_logging_{id(pipeline)}')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        pipeline.attach(logger)
+        pipeline.listener.start()
+        yield pipeline, logger, handler
+        pipeline.stop()
+        logger.removeHandler(pipeline.queue_handler)
+
+    def test_formatting_happens_off_caller_thread(self, pipeline):
+        """Test that messages are formatted by the listener, not the caller."""
+        pipeline, logger, handler = pipeline
+        spy = FormatSpy()
+
+        logger.info('value: %s', spy)
+        pipeline.stop()
+
+        assert handler.messages == ['value: spy']
+        assert spy.formatted_on is not None
+        assert spy.formatted_on != threading.get_ident()
+
+    def test_summary_replaces_suppressed_lines(self, pipeline):
+        """Test that a burst of hot-path lines collapses into one summary."""
+        pipeline, logger, handler = pipeline
+        for i in range(50):
+            logger.info('Prediction successful: %s', i, extra=HOT_PATH)
+        logger.warning('not sampled')
+
+        pipeline.stop()
+
+        assert handler.messages[:3] == ['Prediction successful: 0', 'Prediction successful: 1',
+                                        'Prediction successful: 2']
+        assert 'not sampled' in handler.messages
+        summaries = [m for m in handler.messages if m.startswith('Log summary')]
+        assert len(summaries) == 1
+        assert "50 x 'Prediction successful: %s' (47 suppressed)" in summaries[0]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
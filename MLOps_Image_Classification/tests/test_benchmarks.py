@@ -0,0 +1,161 @@
+"""
+Unit tests for the benchmark suite helpers
+"""
+
+import pytest
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.run_benchmarks import (
+    baseline_mismatch, compare_to_baseline, host_fingerprint, make_history, time_call, CLASS_NAMES
+)
+from benchmarks.load_sweep import parse_locust_csv, find_knee, classify_error, compare_reports
+
+
+class TestBenchmarkSuite:
+    """Test cases for benchmark helpers."""
+
+    def test_time_call(self):
+        """Test that timings are reported for every repeat."""
+        calls = []
+        result = time_call(lambda: calls.append(1), repeats=3, warmup=1)
+
+        assert len(calls) == 4
+        assert result['repeats'] == 3
+        assert result['min_ms'] <= result['median_ms'] <= result['max_ms']
+
+    def test_make_history_shape(self):
+        """Test that synthetic history matches prediction results."""
+        history = make_history(50)
+
+        assert len(history) == 50
+        entry = history[0]
+        assert entry['predicted_class'] in CLASS_NAMES
+        assert set(entry['all_probabilities']) == set(CLASS_NAMES)
+        assert entry['confidence'] == max(entry['all_probabilities'].values())
+
+    def test_compare_flags_regressions(self):
+        """Test regression flags against a baseline."""
+        report = {'results': {
+            'fast_case': {'median_ms': 10.0},
+            'slow_case': {'median_ms': 20.0},
+            'new_case': {'median_ms': 5.0}
+        }}
+        baseline = {'results': {
+            'fast_case': {'median_ms': 11.0},
+            'slow_case': {'median_ms': 10.0}
+        }}
+
+        regressions = compare_to_baseline(report, baseline, tolerance=0.25)
+
+        assert regressions == ['slow_case']
+        assert report['results']['slow_case']['change_pct'] == pytest.approx(100.0)
+        assert report['results']['fast_case']['regression'] is False
+        assert report['results']['new_case']['baseline_median_ms'] is None
+
+    def test_baseline_from_another_host(self):
+        """Test that only baselines from the same host are comparable."""
+        host = host_fingerprint()
+        report = {'meta': {'host': host}, 'results': {}}
+
+        assert baseline_mismatch(report, {'meta': {'host': dict(host)}}) == []
+        assert baseline_mismatch(report, {'meta': {'host': {**host, 'cpu_count': 64}}}) == ['cpu_count']
+        assert baseline_mismatch(report, {'meta': {}}) == ['host']
+
+    def test_compare_ignores_tiny_absolute_changes(self):
+        """Test that sub-millisecond jitter is not flagged."""
+        report = {'results': {'tiny_case': {'median_ms': 0.2}}}
+        baseline = {'results': {'tiny_case': {'median_ms': 0.1}}}
+
+        assert compare_to_baseline(report, baseline, tolerance=0.25, min_delta_ms=1.0) == []
+        assert report['results']['tiny_case']['change_pct'] == pytest.approx(100.0)
+
+
+
+STATS_HEADER = ('Type,Name,Request Count,Failure Count,Median Response Time,Average Response Time,'
+                'Min Response Time,Max Response Time,Average Content Size,Requests/s,Failures/s,'
+                '50%,66%,75%,80%,90%,95%,98%,99%,99.9%,99.99%,100%')
+
+
+class TestLoadSweep:
+    """Test cases for the load-sweep report helpers."""
+
+    def _level(self, users, rps, p99, error_rate=0.0):
+        return {'users': users, 'rps': rps, 'successful_rps': rps * (1 - error_rate),
+                'p99_ms': p99, 'error_rate': error_rate}
+
+    def test_parse_locust_csv(self, tmp_path):
+        """Test summarizing locust stats and failures."""
+        prefix = str(tmp_path / 'level_4')
+        with open(f'{prefix}_stats.csv', 'w') as f:
+            f.write(STATS_HEADER + '\n')
+            f.write('POST,/api/predict [POST],90,10,120,150,10,900,100,3.0,0.3,'
+                    '120,130,140,150,300,500,700,800,900,900,900\n')
+            f.write(',Aggregated,100,10,100,140,5,900,90,4.0,0.4,'
+                    '100,120,130,140,280,450,650,750,900,900,900\n')
+        with open(f'{prefix}_failures.csv', 'w') as f:
+            f.write('Method,Name,Error,Occurrences\n')
+            f.write("POST,/api/predict [POST],CatchResponseError('Got status code 503'),8\n")
+            f.write("POST,/api/predict [POST],ConnectionResetError(104),2\n")
+
+        level = parse_locust_csv(prefix)
+
+        assert level['requests'] == 100
+        assert level['error_rate'] == pytest.approx(0.1)
+        assert level['p99_ms'] == 750
+        assert level['successful_rps'] == pytest.approx(3.6)
+        assert level['endpoints']['/api/predict [POST]']['p99_ms'] == 800
+        assert level['errors_by_status'] == {'connection': 2, 'http_503': 8}
+
+    def test_classify_error(self):
+        """Test error bucketing by status code."""
+        assert classify_error("CatchResponseError('Got status code 500')") == 'http_500'
+        assert classify_error('ConnectionRefusedError(111)') == 'connection'
+
+    def test_find_knee_on_latency(self):
+        """Test that the knee is the first level over the p99 target."""
+        levels = [self._level(1, 1.0, 100), self._level(4, 3.5, 400),
+                  self._level(8, 4.0, 1500), self._level(16, 4.1, 3000)]
+
+        capacity = find_knee(levels, p99_target_ms=1000, max_error_rate=0.01)
+
+        assert capacity['knee_users'] == 8
+        assert capacity['knee_reason'] == 'p99'
+        assert capacity['max_sustainable_rps'] == 3.5
+        assert capacity['max_sustainable_users'] == 4
+
+    def test_find_knee_on_errors(self):
+        """Test that shedding/errors also mark saturation."""
+        levels = [self._level(1, 1.0, 100), self._level(4, 3.0, 300, error_rate=0.2)]
+
+        capacity = find_knee(levels, p99_target_ms=1000, max_error_rate=0.01)
+
+        assert capacity['knee_users'] == 4
+        assert capacity['knee_reason'] == 'errors'
+        assert capacity['max_sustainable_rps'] == 1.0
+
+    def test_unsaturated_sweep(self):
+        """Test a sweep that never crosses the objectives."""
+        capacity = find_knee([self._level(1, 1.0, 100), self._level(2, 2.0, 120)], 1000, 0.01)
+
+        assert capacity['saturated'] is False
+        assert capacity['max_sustainable_rps'] == 2.0
+
+    def test_compare_reports(self):
+        """Test headline capacity diff between two reports."""
+        previous = {'meta': {'commit': 'abc123'},
+                    'capacity': {'max_sustainable_rps': 4.0, 'knee_users': 8}}
+        current = {'capacity': {'max_sustainable_rps': 5.0, 'knee_users': 16}}
+
+        diff = compare_reports(current, previous)
+
+        assert diff['max_sustainable_rps']['change_pct'] == pytest.approx(25.0)
+        assert diff['knee_users'] == {'before': 8, 'after': 16, 'change_pct': pytest.approx(100.0)}
+        assert diff['previous_commit'] == 'abc123'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
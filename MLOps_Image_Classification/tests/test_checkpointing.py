@@ -0,0 +1,120 @@
+"""
+Unit tests for checkpointing module
+"""
+
+import pytest
+import numpy as np
+from tensorflow import keras
+import os
+import sys
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.model import ImageClassificationModel
+from src.checkpointing import (
+    TrainingCheckpointer, new_run_dir, list_runs, find_resumable_run,
+    load_run_state, garbage_collect_runs
+)
+
+
+def make_data(n=32):
+    """Create a small synthetic dataset."""
+    X = np.random.rand(n, 32, 32, 3).astype(np.float32)
+    y = keras.utils.to_categorical(np.random.randint(0, 10, n), 10)
+    return X, y
+
+
+class TestTrainingCheckpointer:
+    """Test cases for TrainingCheckpointer."""
+
+    @pytest.fixture
+    def checkpoint_root(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield tmpdir
+
+    def test_checkpoint_and_resume(self, checkpoint_root):
+        """Test that an interrupted run resumes from its last checkpoint."""
+        X, y = make_data()
+        run_dir = new_run_dir(checkpoint_root)
+
+        model_classifier = ImageClassificationModel()
+        model_classifier.create_cnn_model()
+        checkpointer = TrainingCheckpointer(run_dir, max_to_keep=2, epochs_requested=4)
+        # EarlyStopping may restore earlier weights after the last checkpoint
+        snapshot = {}
+        capture = keras.callbacks.LambdaCallback(
+            on_epoch_end=lambda epoch, logs: snapshot.update(
+                weights=model_classifier.model.get_weights())
+        )
+        model_classifier.retrain_model(X, y, X, y, epochs=3, batch_size=16,
+                                       extra_callbacks=[checkpointer, capture])
+
+        state = load_run_state(run_dir)
+        assert state['status'] == 'in_progress'
+        assert state['epochs_completed'] == 3
+        assert len(state['history']['loss']) == 3
+
+        # Old checkpoints are garbage-collected
+        checkpoints = [f for f in os.listdir(os.path.join(run_dir, 'checkpoints'))
+                       if f.endswith('.index')]
+        assert len(checkpoints) == 2
+
+        # A fresh process would rebuild the model and restore
+        assert find_resumable_run(checkpoint_root) == run_dir
+        restored = ImageClassificationModel()
+        restored.create_cnn_model()
+        resumed = TrainingCheckpointer(run_dir, epochs_requested=4)
+        initial_epoch = resumed.restore(restored.model)
+
+        assert initial_epoch == 3
+        for original, loaded in zip(snapshot['weights'], restored.model.get_weights()):
+            np.testing.assert_allclose(original, loaded)
+        assert int(restored.model.optimizer.iterations.numpy()) == \
+            int(model_classifier.model.optimizer.iterations.numpy())
+
+        restored.retrain_model(X, y, X, y, epochs=4, batch_size=16,
+                               extra_callbacks=[resumed], initial_epoch=initial_epoch)
+        assert load_run_state(run_dir)['epochs_completed'] == 4
+        assert restored.training_metadata['retraining_history'][-1]['resumed_from_epoch'] == 3
+
+    def test_restore_without_checkpoint(self, checkpoint_root):
+        """Test that restoring a new run starts from epoch 0."""
+        model_classifier = ImageClassificationModel()
+        model_classifier.create_cnn_model()
+        checkpointer = TrainingCheckpointer(new_run_dir(checkpoint_root))
+
+        assert checkpointer.restore(model_classifier.model) == 0
+
+    def test_completed_run_not_resumable(self, checkpoint_root):
+        """Test that completed runs are skipped when resuming."""
+        X, y = make_data(16)
+        run_dir = new_run_dir(checkpoint_root)
+
+        model_classifier = ImageClassificationModel()
+        model_classifier.create_cnn_model()
+        checkpointer = TrainingCheckpointer(run_dir)
+        model_classifier.retrain_model(X, y, X, y, epochs=1, batch_size=16,
+                                       extra_callbacks=[checkpointer])
+        checkpointer.mark('completed')
+
+        assert find_resumable_run(checkpoint_root) is None
+
+
+class TestRunGarbageCollection:
+    """Test cases for run directory cleanup."""
+
+    def test_garbage_collect_runs(self):
+        """Test that only the newest runs are kept."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            runs = [new_run_dir(tmpdir) for _ in range(5)]
+
+            deleted = garbage_collect_runs(tmpdir, keep_runs=2, exclude=runs[0])
+
+            assert len(deleted) == 2
+            assert list_runs(tmpdir) == [runs[0], runs[3], runs[4]]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,86 @@
+"""
+Unit tests for cluster statistics module
+"""
+
+import pytest
+import os
+import sys
+import time
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.rolling_stats import RollingStatistics
+from src.cluster_stats import (
+    ClusterStatsPublisher, history_totals, load_snapshots, aggregate, write_snapshot
+)
+
+
+CLASS_NAMES = ['Airplane', 'Automobile', 'Bird', 'Cat', 'Deer',
+               'Dog', 'Frog', 'Horse', 'Ship', 'Truck']
+
+
+def make_history(class_index, confidences, latency_ms=10.0):
+    return [{'predicted_class': CLASS_NAMES[class_index], 'predicted_class_index': class_index,
+             'confidence': c, 'prediction_time_ms': latency_ms} for c in confidences]
+
+
+def replica_snapshot(history):
+    """Snapshot as a replica with this history would publish it."""
+    rolling = RollingStatistics(CLASS_NAMES)
+    rolling.record_many(history)
+    return {
+        'totals': history_totals(history, len(CLASS_NAMES)),
+        'windows': {'1m': rolling.window_sketch(60)}
+    }
+
+
+class TestClusterStats:
+    """Test cases for snapshot merging and publishing."""
+
+    def test_merge_matches_single_replica(self):
+        """Test that merged snapshots equal the stats of the combined history."""
+        first = make_history(3, [0.9, 0.7], latency_ms=10.0)
+        second = make_history(5, [0.2], latency_ms=40.0)
+
+        merged = aggregate([replica_snapshot(first), replica_snapshot(second)], CLASS_NAMES)
+        combined = replica_snapshot(first + second)
+        expected = aggregate([combined], CLASS_NAMES)
+
+        assert merged['totals']['predictions_per_class'] == expected['totals']['predictions_per_class']
+        assert merged['totals']['average_confidence'] == pytest.approx(expected['totals']['average_confidence'])
+        assert merged['totals']['total_predictions'] == 3
+        assert merged['totals']['min_confidence'] == 0.2
+        assert merged['totals']['predictions_per_class']['Dog'] == 1
+        assert merged['windows']['1m']['prediction_time_p99_ms'] == \
+            expected['windows']['1m']['prediction_time_p99_ms']
+
+    def test_stale_and_expired_replicas(self, tmp_path):
+        """Test that old snapshots are excluded, and very old ones deleted."""
+        now = time.time()
+        for replica_id, age in (('live', 5), ('stale', 60), ('dead', 7200)):
+            snapshot = replica_snapshot(make_history(0, [0.5]))
+            snapshot.update(replica_id=replica_id, published_at=now - age)
+            write_snapshot(str(tmp_path), snapshot)
+
+        fresh, stale = load_snapshots(str(tmp_path), stale_after=30, expire_after=3600, now=now)
+
+        assert [s['replica_id'] for s in fresh] == ['live']
+        assert [s['replica_id'] for s in stale] == ['stale']
+        assert not (tmp_path / 'dead.stats.json').exists()
+
+    def test_publisher_withdraws_on_stop(self, tmp_path):
+        """Test that a stopped replica removes its snapshot."""
+        publisher = ClusterStatsPublisher(
+            str(tmp_path), lambda: replica_snapshot([]), replica_id='replica-a', interval=60
+        ).start()
+        fresh, _ = load_snapshots(str(tmp_path), stale_after=30)
+        assert [s['replica_id'] for s in fresh] == ['replica-a']
+        assert aggregate(fresh, CLASS_NAMES)['totals'] == {'message': 'No predictions made yet'}
+
+        publisher.stop()
+        assert load_snapshots(str(tmp_path), stale_after=30) == ([], [])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
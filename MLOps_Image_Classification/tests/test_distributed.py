@@ -0,0 +1,126 @@
+"""
+Unit tests for distributed training module
+"""
+
+import pytest
+import numpy as np
+import os
+import sys
+import tempfile
+import time
+import multiprocessing
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.distributed import (
+    build_tf_config, find_free_ports, is_chief, threads_per_worker,
+    load_training_arrays, make_sharded_dataset, launch_local_workers,
+    wait_for_workers
+)
+
+
+class TestClusterSetup:
+    """Test cases for local cluster configuration."""
+
+    def test_find_free_ports(self):
+        """Test that distinct ports are returned."""
+        ports = find_free_ports(4)
+        assert len(ports) == 4
+        assert len(set(ports)) == 4
+
+    def test_build_tf_config(self):
+        """Test TF_CONFIG cluster spec."""
+        tf_config = build_tf_config([1111, 2222], task_index=1)
+
+        assert tf_config['cluster']['worker'] == ['localhost:1111', 'localhost:2222']
+        assert tf_config['task'] == {'type': 'worker', 'index': 1}
+
+    def test_is_chief(self):
+        """Test that only worker 0 is the chief."""
+        assert is_chief(0) is True
+        assert is_chief(1) is False
+
+    def test_threads_per_worker(self):
+        """Test that cores are split between workers."""
+        assert threads_per_worker(4, cpu_count=16) == 4
+        assert threads_per_worker(8, cpu_count=4) == 1
+
+
+class TestDataSharding:
+    """Test cases for the sharded input pipeline."""
+
+    def test_synthetic_arrays(self):
+        """Test synthetic data shapes."""
+        X_train, y_train, X_val, y_val = load_training_arrays(synthetic=True, num_samples=128)
+
+        assert X_train.shape == (128, 32, 32, 3)
+        assert y_train.shape == (128, 10)
+        assert X_val.shape[1:] == (32, 32, 3)
+
+    def test_sharded_dataset_batches(self):
+        """Test that training batches have the global batch size."""
+        X = np.random.rand(100, 32, 32, 3).astype(np.float32)
+        y = np.eye(10, dtype=np.float32)[np.random.randint(0, 10, 100)]
+
+        dataset = make_sharded_dataset(X, y, global_batch_size=32, shuffle=True)
+        batch_sizes = [int(images.shape[0]) for images, _ in dataset]
+
+        # Remainder is dropped so all workers step together
+        assert batch_sizes == [32, 32, 32]
+
+
+class TestLocalWorkers:
+    """Test cases for launching local workers."""
+
+    def test_single_worker_run(self):
+        """Test a tiny run with one worker process."""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            summary = launch_local_workers(
+                1, tmpdir, epochs=1, batch_size=32,
+                synthetic=True, num_samples=64, save_model=False, timeout=600
+            )
+
+            assert summary['num_workers'] == 1
+            assert summary['train_seconds'] > 0
+            assert os.path.exists(os.path.join(tmpdir, 'training_summary.json'))
+            assert os.path.exists(os.path.join(tmpdir, 'checkpoints', 'epoch_001.weights.h5'))
+
+    def test_failed_worker_terminates_the_others(self):
+        """Test that one dead worker ends the run instead of hanging it."""
+        ctx = multiprocessing.get_context('spawn')
+        # Task 0 stands in for a chief blocked in an all-reduce
+        processes = [ctx.Process(target=time.sleep, args=(600,)),
+                     ctx.Process(target=sys.exit, args=(1,))]
+        for process in processes:
+            process.start()
+
+        start = time.monotonic()
+        assert wait_for_workers(processes, timeout=120) == [0, 1]
+        assert time.monotonic() - start < 60
+        assert not any(process.is_alive() for process in processes)
+
+    def test_two_worker_run_only_chief_writes(self, tmp_path, monkeypatch):
+        """Test a tiny two-worker run: both finish, gradients are all-reduced, only the chief saves."""
+        # Spawned workers create their throwaway directories under TMPDIR
+        scratch = tmp_path / 'scratch'
+        scratch.mkdir()
+        monkeypatch.setenv('TMPDIR', str(scratch))
+        output_dir = tmp_path / 'output'
+
+        # Raises unless both worker processes exit cleanly
+        summary = launch_local_workers(
+            2, str(output_dir), epochs=1, batch_size=16,
+            synthetic=True, num_samples=64, save_model=True, timeout=600
+        )
+
+        assert summary['num_workers'] == 2
+        assert summary['global_batch_size'] == 32
+        assert os.path.exists(output_dir / 'checkpoints' / 'epoch_001.weights.h5')
+        assert os.path.exists(output_dir / 'cifar10_cnn_model.json')
+        # The non-chief wrote only to its throwaway directory, which it removed
+        assert not [name for name in os.listdir(scratch) if name.startswith('worker_')]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
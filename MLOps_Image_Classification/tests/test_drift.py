@@ -0,0 +1,110 @@
+"""
+Unit tests for drift monitoring module
+"""
+
+import pytest
+import os
+import sys
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.drift import (
+    DriftMonitor, build_reference_profile, save_reference_profile, load_reference_profile,
+    pixel_features, psi
+)
+
+
+CLASS_NAMES = ['Airplane', 'Automobile', 'Bird', 'Cat', 'Deer',
+               'Dog', 'Frog', 'Horse', 'Ship', 'Truck']
+
+
+class UniformModel:
+    """Stand-in model predicting the label-like class with fixed confidence."""
+
+    def predict(self, images, verbose=0):
+        probabilities = np.full((len(images), 10), 0.02, dtype=np.float32)
+        probabilities[np.arange(len(images)), np.arange(len(images)) % 10] = 0.82
+        return probabilities
+
+
+def make_images(n, brightness=0.5, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.clip(rng.normal(brightness, 0.2, size=(n, 32, 32, 3)), 0, 1).astype(np.float32)
+
+
+@pytest.fixture
+def reference():
+    X = make_images(2000)
+    y = np.arange(2000) % 10
+    return build_reference_profile(X, y, CLASS_NAMES, model=UniformModel())
+
+
+class TestDriftMonitor:
+    """Test cases for DriftMonitor."""
+
+    def test_same_distribution_has_low_score(self, reference):
+        """Test that traffic like the training data does not drift."""
+        monitor = DriftMonitor(CLASS_NAMES, reference=reference, min_samples=100)
+        images = make_images(500, seed=1)
+        monitor.observe(images, UniformModel().predict(images))
+
+        report = monitor.report()
+        assert report['ready']
+        assert report['drift_score'] < 0.1
+
+    def test_shifted_inputs_drift(self, reference):
+        """Test that darker inputs and different predictions raise the score."""
+        monitor = DriftMonitor(CLASS_NAMES, reference=reference, min_samples=100)
+        images = make_images(500, brightness=0.2, seed=1)
+        probabilities = np.full((500, 10), 0.01, dtype=np.float32)
+        probabilities[:, 3] = 0.91
+        monitor.observe(images, probabilities)
+
+        report = monitor.report()
+        assert report['drift_score'] > 0.25
+        assert report['components']['pixel_features']['mean_r'] > 0.25
+        assert report['components']['predicted_class'] > 0.25
+
+    def test_decay_forgets_old_traffic(self, reference):
+        """Test that recent traffic dominates the live histograms."""
+        monitor = DriftMonitor(CLASS_NAMES, reference=reference, half_life=100, min_samples=100)
+        dark = make_images(500, brightness=0.2, seed=1)
+        monitor.observe(dark, UniformModel().predict(dark))
+        for seed in range(20):
+            images = make_images(100, seed=seed + 2)
+            monitor.observe(images, UniformModel().predict(images))
+
+        assert monitor.report()['drift_score'] < 0.1
+
+    def test_not_ready(self, reference):
+        """Test that no score is reported without a reference or enough samples."""
+        images = make_images(10)
+        without_reference = DriftMonitor(CLASS_NAMES)
+        without_reference.observe(images, UniformModel().predict(images))
+        assert without_reference.report()['drift_score'] is None
+
+        too_few = DriftMonitor(CLASS_NAMES, reference=reference, min_samples=100)
+        too_few.observe(images, UniformModel().predict(images))
+        report = too_few.report()
+        assert report['ready'] is False
+        assert report['drift_score'] is None
+
+    def test_profile_round_trip(self, reference, tmp_path):
+        """Test that a saved profile loads back unchanged."""
+        path = str(tmp_path / 'reference_profile.json')
+        save_reference_profile(reference, path)
+
+        assert load_reference_profile(path) == reference
+        assert load_reference_profile(str(tmp_path / 'missing.json')) is None
+
+    def test_features_and_psi(self):
+        """Test uint8 scaling of features and PSI of identical histograms."""
+        images = np.full((2, 32, 32, 3), 255, dtype=np.uint8)
+        assert np.allclose(pixel_features(images)[:, :3], 1.0)
+        assert psi([1, 2, 3], [2, 4, 6]) == pytest.approx(0.0)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,136 @@
+"""
+Unit tests for event stream module
+"""
+
+import pytest
+import os
+import sys
+import json
+import time
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.event_stream import EventBroadcaster, format_event
+
+
+def parse(message):
+    """Event name and payload of one SSE message."""
+    fields = dict(line.split(': ', 1) for line in message.strip().split('\n'))
+    return fields['event'], json.loads(fields['data'])
+
+
+class Counter:
+    """Topic source whose payload changes on demand."""
+
+    def __init__(self):
+        self.value = 0
+        self.builds = 0
+
+    def build(self):
+        self.builds += 1
+        return {'value': self.value, 'constant': 'x'}
+
+
+class TestFormatEvent:
+    """Test cases for format_event."""
+
+    def test_format(self):
+        """Test the SSE wire format."""
+        message = format_event('statistics', {'a': 1}, event_id=7, retry_ms=3000)
+        assert message == 'retry: 3000\nid: 7\nevent: statistics\ndata: {"a":1}\n\n'
+
+
+class TestEventBroadcaster:
+    """Test cases for EventBroadcaster."""
+
+    @pytest.fixture
+    def broadcaster(self):
+        broadcaster = EventBroadcaster(min_interval=0.05, poll_interval=10)
+        yield broadcaster
+        broadcaster.stop()
+
+    def test_snapshot_then_deltas(self, broadcaster):
+        """Test that subscribers get a snapshot, then only changed fields."""
+        source = Counter()
+        broadcaster.add_topic('counter', source.build, key_fn=lambda: source.value)
+
+        subscription = broadcaster.subscribe()
+        assert parse(subscription.queue.get_nowait()) == ('snapshot', {'counter': {'value': 0, 'constant': 'x'}})
+
+        source.value = 1
+        assert broadcaster.tick() == 1
+        assert parse(subscription.queue.get_nowait()) == ('counter', {'value': 1})
+
+    def test_unchanged_keys_are_not_rebuilt(self, broadcaster):
+        """Test that topics are rebuilt only when their key changes."""
+        source = Counter()
+        broadcaster.add_topic('counter', source.build, key_fn=lambda: source.value)
+        broadcaster.subscribe()
+        builds = source.builds
+
+        for _ in range(5):
+            assert broadcaster.tick() == 0
+        assert source.builds == builds
+
+    def test_one_computation_fans_out(self, broadcaster):
+        """Test that one build serves every subscriber."""
+        source = Counter()
+        broadcaster.add_topic('counter', source.build, key_fn=lambda: source.value)
+        subscriptions = [broadcaster.subscribe() for _ in range(10)]
+        for subscription in subscriptions:
+            subscription.queue.get_nowait()
+        builds = source.builds
+
+        source.value = 1
+        broadcaster.tick()
+
+        assert source.builds == builds + 1
+        assert all(parse(s.queue.get_nowait())[0] == 'counter' for s in subscriptions)
+
+    def test_notify_is_coalesced(self, broadcaster):
+        """Test that a burst of notifications results in few ticks."""
+        source = Counter()
+        broadcaster.add_topic('counter', source.build, key_fn=lambda: source.value)
+        broadcaster.subscribe()
+        broadcaster.min_interval = 0.2
+
+        for i in range(50):
+            source.value = i
+            broadcaster.notify()
+            time.sleep(0.004)
+        time.sleep(0.3)
+
+        assert 1 <= broadcaster.ticks <= 3
+
+    def test_slow_subscriber_is_dropped(self, broadcaster):
+        """Test that a subscriber with a full queue is disconnected."""
+        source = Counter()
+        broadcaster.add_topic('counter', source.build, key_fn=lambda: source.value)
+        broadcaster.queue_size = 2
+        subscription = broadcaster.subscribe()
+
+        for i in range(1, 5):
+            source.value = i
+            broadcaster.tick()
+
+        assert subscription.closed
+        assert broadcaster.subscriber_count == 0
+
+    def test_capacity_and_unsubscribe(self, broadcaster):
+        """Test the subscriber limit and that closed streams free their slot."""
+        broadcaster.max_subscribers = 1
+        broadcaster.add_topic('counter', Counter().build)
+
+        subscription = broadcaster.subscribe()
+        assert broadcaster.subscribe() is None
+
+        stream = subscription.messages(heartbeat=0.01, max_seconds=0.05)
+        assert next(stream).startswith('retry:')
+        assert all(message == ': keep-alive\n\n' for message in stream)
+        assert broadcaster.subscriber_count == 0
+        assert broadcaster.subscribe() is not None
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
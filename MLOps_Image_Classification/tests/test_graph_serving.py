@@ -0,0 +1,116 @@
+"""
+Unit tests for graph serving module
+"""
+
+import pytest
+import io
+import os
+import sys
+import numpy as np
+from PIL import Image
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.graph_serving import GraphImageModel, export_image_bytes_model, warm_up
+from src.image_validation import ImageRejected
+from src.model import ImageClassificationModel
+from src.model_store import write_model
+from src.prediction import ImagePredictor
+from src.preprocessing import DataPreprocessor
+
+
+CLASS_NAMES = ['Airplane', 'Automobile', 'Bird', 'Cat', 'Deer',
+               'Dog', 'Frog', 'Horse', 'Ship', 'Truck']
+
+
+def encode(pixels, fmt='PNG', mode=None):
+    image = Image.fromarray(pixels)
+    if mode:
+        image = image.convert(mode)
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def smooth_image(size, seed=0):
+    """Photo-like pixels (resampling filters agree closely on smooth content)."""
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, (8, 8, 3), dtype=np.uint8)
+    return np.asarray(Image.fromarray(small).resize(size, Image.Resampling.BILINEAR))
+
+
+@pytest.fixture(scope='module')
+def keras_model():
+    model_classifier = ImageClassificationModel()
+    model_classifier.create_cnn_model()
+    return model_classifier.model
+
+
+@pytest.fixture(scope='module')
+def graph_model(keras_model):
+    graph_model = GraphImageModel.from_keras(keras_model, parallel_iterations=4)
+    warm_up(graph_model)
+    return graph_model
+
+
+class TestGraphServing:
+    """Test cases for in-graph decoding and the graph predictor backend."""
+
+    def test_matches_pil_path(self, keras_model, graph_model):
+        """Test that in-graph decode/resize gives the PIL pixels and predictions."""
+        preprocessor = DataPreprocessor()
+        uploads = [encode(smooth_image((96, 64), seed=i), fmt) for i, fmt in enumerate(['PNG', 'JPEG', 'PNG'])]
+        probabilities, images = graph_model.predict_encoded(uploads)
+
+        expected = np.stack([preprocessor.load_image_pixels(io.BytesIO(u)) for u in uploads]) / 255.0
+        assert images.shape == (3, 32, 32, 3)
+        assert np.abs(images - expected).mean() < 0.01
+        assert np.allclose(probabilities, keras_model.predict(expected.astype(np.float32), verbose=0), atol=1e-2)
+
+    def test_converts_modes_to_rgb(self, graph_model):
+        """Test that grayscale and RGBA uploads decode to three channels."""
+        pixels = smooth_image((40, 40))
+        _, images = graph_model.predict_encoded([encode(pixels, mode='L'), encode(pixels, mode='RGBA')])
+        assert images.shape == (2, 32, 32, 3)
+        # Grayscale is replicated across channels
+        assert np.allclose(images[0, ..., 0], images[0, ..., 2])
+
+    def test_export_round_trip(self, keras_model, graph_model, tmp_path):
+        """Test that the exported SavedModel serves the same outputs."""
+        export_image_bytes_model(keras_model, str(tmp_path / 'export'))
+        loaded = GraphImageModel.load(str(tmp_path / 'export'))
+        uploads = [encode(smooth_image((50, 50), seed=3))]
+        assert np.allclose(loaded.predict_encoded(uploads)[0], graph_model.predict_encoded(uploads)[0], atol=1e-6)
+
+    def test_model_store_export(self, keras_model, tmp_path):
+        """Test that 'image_bytes' is a model store export."""
+        manifest = write_model(keras_model, str(tmp_path), 'cifar10_cnn_model', exports=('image_bytes',))
+        assert manifest['exports']['image_bytes'] == 'cifar10_cnn_model_image_bytes'
+        assert os.path.isdir(tmp_path / 'cifar10_cnn_model_image_bytes')
+
+    def test_predictor_backend(self, keras_model, graph_model, tmp_path):
+        """Test batch file predictions: valid files in one call, bad ones isolated."""
+        predictor = ImagePredictor(keras_model, CLASS_NAMES, DataPreprocessor(), graph_model=graph_model)
+        paths = []
+        for name, data in (('a.png', encode(smooth_image((64, 64)))),
+                           ('b.jpg', encode(smooth_image((48, 80), seed=1), 'JPEG')),
+                           ('truncated.png', encode(smooth_image((64, 64)))[:200]),
+                           ('c.gif', encode(smooth_image((16, 16)), 'GIF'))):
+            path = tmp_path / name
+            path.write_bytes(data)
+            paths.append(str(path))
+
+        outcomes = predictor.predict_files(paths)
+        assert outcomes[0]['file_name'] == 'a.png'
+        assert outcomes[1]['predicted_class'] in CLASS_NAMES
+        assert 'all_probabilities' in outcomes[1]
+        assert isinstance(outcomes[2], Exception)
+        assert isinstance(outcomes[3], ImageRejected)
+        assert outcomes[3].reason == 'unsupported_format'
+        assert len(predictor.prediction_history) == 2
+
+        result = predictor.predict_from_file(paths[0])
+        assert result['predicted_class_index'] == outcomes[0]['predicted_class_index']
+        with pytest.raises(ImageRejected):
+            predictor.predict_from_file(paths[3])
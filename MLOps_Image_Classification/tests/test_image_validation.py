@@ -0,0 +1,101 @@
+"""
+Unit tests for image validation module
+"""
+
+import pytest
+import os
+import sys
+import io
+import time
+import struct
+import zlib
+import numpy as np
+from PIL import Image
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.image_validation import ImageLimits, ImageRejected, validate_image_header
+from src.preprocessing import DataPreprocessor
+
+
+def encode_image(width, height, format='PNG', mode='RGB', **params):
+    img = Image.fromarray(np.random.randint(0, 255, (height, width, 3), dtype=np.uint8)).convert(mode)
+    buffer = io.BytesIO()
+    img.save(buffer, format=format, **params)
+    buffer.seek(0)
+    return buffer
+
+
+def png_bomb(width, height):
+    """A valid PNG header claiming huge dimensions, with a few bytes of pixel data."""
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return io.BytesIO(b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) +
+                      chunk(b'IDAT', zlib.compress(b'\x00' * 1024)) + chunk(b'IEND', b''))
+
+
+def rejection_reason(fp, limits=None):
+    with pytest.raises(ImageRejected) as excinfo:
+        validate_image_header(fp, limits)
+    return excinfo.value.reason
+
+
+class TestImageValidation:
+    """Test cases for header validation."""
+
+    def test_accepts_png_and_jpeg(self):
+        """Test that ordinary uploads pass and the stream is rewound."""
+        for format in ('PNG', 'JPEG'):
+            buffer = encode_image(40, 30, format=format)
+            header = validate_image_header(buffer)
+            assert (header.format, header.width, header.height) == (format, 40, 30)
+            assert not header.downscale
+            assert buffer.tell() == 0
+
+    def test_decompression_bomb_rejected_without_decoding(self):
+        """Test that a tiny PNG claiming 60000x60000 pixels is rejected from its header."""
+        start = time.perf_counter()
+        assert rejection_reason(png_bomb(60000, 60000)) == 'too_many_pixels'
+        assert time.perf_counter() - start < 0.5
+
+        assert rejection_reason(png_bomb(6000, 6000)) == 'too_many_pixels'
+        assert rejection_reason(png_bomb(9000, 100)) == 'too_large_dimensions'
+
+    @pytest.mark.parametrize('payload, reason', [
+        (b'', 'empty'),
+        (b'GIF89a' + bytes(64), 'unsupported_format'),
+        (b'\x89PNG\r\n\x1a\n' + bytes(16), 'corrupt_header'),
+    ])
+    def test_malformed_uploads(self, payload, reason):
+        """Test that empty, unknown and truncated files are rejected."""
+        assert rejection_reason(io.BytesIO(payload)) == reason
+
+    def test_format_and_frame_limits(self):
+        """Test rejection of other formats and of animations."""
+        assert rejection_reason(encode_image(8, 8, format='TIFF')) == 'unsupported_format'
+        frames = [Image.new('RGB', (8, 8), color) for color in ('red', 'blue')]
+        buffer = io.BytesIO()
+        frames[0].save(buffer, format='PNG', save_all=True, append_images=frames[1:])
+        buffer.seek(0)
+        assert rejection_reason(buffer) == 'animated'
+        buffer.seek(0)
+        assert validate_image_header(buffer, ImageLimits(max_frames=2)).frames == 2
+
+    def test_large_jpeg_decoded_downscaled(self, tmp_path):
+        """Test that large JPEGs take the reduced-size decode and still preprocess."""
+        path = str(tmp_path / 'large.jpg')
+        with open(path, 'wb') as f:
+            f.write(encode_image(2048, 1536, format='JPEG').read())
+
+        assert validate_image_header(path).downscale
+        image = DataPreprocessor().load_and_preprocess_uploaded_image(path)
+        assert image.shape == (1, 32, 32, 3)
+
+        with pytest.raises(ImageRejected):
+            DataPreprocessor(ImageLimits(max_dimension=1024)).load_and_preprocess_uploaded_image(path)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
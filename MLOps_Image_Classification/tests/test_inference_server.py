@@ -0,0 +1,141 @@
+"""
+Unit tests for inference server module
+"""
+
+import pytest
+import os
+import sys
+import threading
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.inference_server import (
+    InferenceServer, InferenceClient, RemoteModelClassifier, to_uint8
+)
+
+
+class FakeModel:
+    """Returns the mean pixel of each image as its class-0 probability."""
+
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.batch_sizes = []
+
+    def predict(self, images, verbose=0):
+        if self.fail:
+            raise RuntimeError('model exploded')
+        if self.delay:
+            threading.Event().wait(self.delay)
+        self.batch_sizes.append(len(images))
+        probabilities = np.zeros((len(images), 10), dtype=np.float32)
+        probabilities[:, 0] = images.reshape(len(images), -1).mean(axis=1)
+        return probabilities
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    return str(tmp_path / 'inference.sock')
+
+
+def serve(model, socket_path, **kwargs):
+    info = {'model_version': 'abc123', 'input_shape': [32, 32, 3], 'num_classes': 10,
+            'training_metadata': {'test_accuracy': 0.9}, 'model_summary': 'summary'}
+    return InferenceServer(model, socket_path, info=info, **kwargs).start()
+
+
+class TestInferenceServer:
+    """Test cases for the inference server and client."""
+
+    def test_round_trip(self, socket_path):
+        """Test that probabilities come back per image, in order."""
+        server = serve(FakeModel(), socket_path)
+        try:
+            client = InferenceClient(socket_path)
+            images = np.stack([np.full((32, 32, 3), value, dtype=np.uint8) for value in (0, 51, 255)])
+            probabilities, model_ms = client.predict(images)
+            assert probabilities.shape == (3, 10)
+            assert probabilities[:, 0] == pytest.approx([0.0, 0.2, 1.0])
+            assert model_ms >= 0
+            single, _ = client.predict(images[1])
+            assert single.shape == (1, 10)
+            empty, _ = client.predict(np.empty((0, 32, 32, 3), dtype=np.uint8))
+            assert len(empty) == 0
+        finally:
+            server.stop()
+
+    def test_batches_concurrent_clients(self, socket_path):
+        """Test that requests from several connections share model calls."""
+        model = FakeModel(delay=0.02)
+        server = serve(model, socket_path, max_wait_ms=20)
+        try:
+            client = InferenceClient(socket_path)
+            results = {}
+
+            def call(i):
+                image = np.full((1, 32, 32, 3), i * 10, dtype=np.uint8)
+                results[i] = client.predict(image)[0]
+
+            threads = [threading.Thread(target=call, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            # Every caller gets its own row back
+            for i in range(8):
+                assert results[i][0, 0] == pytest.approx(i * 10 / 255, abs=1e-6)
+            stats = server.stats()
+            assert stats['requests'] == 8
+            assert stats['average_batch_size'] > 1
+            assert max(model.batch_sizes) > 1
+        finally:
+            server.stop()
+
+    def test_info_and_remote_classifier(self, socket_path):
+        """Test that workers see the served model's attributes."""
+        server = serve(FakeModel(), socket_path)
+        try:
+            classifier = RemoteModelClassifier(InferenceClient(socket_path))
+            assert classifier.is_remote
+            assert classifier.model_version == 'abc123'
+            assert classifier.input_shape == (32, 32, 3)
+            assert classifier.num_classes == 10
+            assert classifier.get_model_summary() == 'summary'
+            probabilities = classifier.model.predict(np.zeros((2, 32, 32, 3), dtype=np.float32))
+            assert probabilities.shape == (2, 10)
+            assert 'requests' in classifier.client.info()
+        finally:
+            server.stop()
+
+    def test_model_errors_reach_the_caller(self, socket_path):
+        """Test that a failing model call raises in the client, not a hang."""
+        server = serve(FakeModel(fail=True), socket_path)
+        try:
+            with pytest.raises(RuntimeError, match='model exploded'):
+                InferenceClient(socket_path).predict(np.zeros((1, 32, 32, 3), dtype=np.uint8))
+            assert server.stats()['errors'] == 1
+        finally:
+            server.stop()
+
+    def test_client_reconnects_after_restart(self, socket_path):
+        """Test that a client survives the server being replaced."""
+        client = InferenceClient(socket_path)
+        server = serve(FakeModel(), socket_path)
+        client.predict(np.zeros((1, 32, 32, 3), dtype=np.uint8))
+        server.stop()
+
+        server = serve(FakeModel(), socket_path)
+        try:
+            probabilities, _ = client.predict(np.full((1, 32, 32, 3), 255, dtype=np.uint8))
+            assert probabilities[0, 0] == pytest.approx(1.0)
+        finally:
+            server.stop()
+
+    def test_to_uint8(self):
+        """Test that normalized floats round-trip to the original pixels."""
+        pixels = np.arange(256, dtype=np.uint8).reshape(1, 16, 16, 1)
+        assert np.array_equal(to_uint8(pixels.astype(np.float32) / 255.0), pixels)
+        assert to_uint8(pixels) is pixels
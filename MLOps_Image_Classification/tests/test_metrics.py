@@ -0,0 +1,83 @@
+"""
+Unit tests for metrics module
+"""
+
+import pytest
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from prometheus_client import REGISTRY
+
+from src import metrics
+
+
+def _sample(name, **labels):
+    """Current value of a sample in the default registry (0 if absent)."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestMetrics:
+    """Test cases for metrics helpers."""
+
+    def test_stage_timer_observes(self):
+        """Test that stage_timer records one observation per use."""
+        before = _sample('pipeline_stage_duration_seconds_count', stage='decode')
+        with metrics.stage_timer('decode'):
+            pass
+        after = _sample('pipeline_stage_duration_seconds_count', stage='decode')
+
+        assert after == before + 1
+
+    def test_stage_timer_records_on_error(self):
+        """Test that failing stages are still timed and the error propagates."""
+        before = _sample('pipeline_stage_duration_seconds_count', stage='resize')
+        with pytest.raises(ValueError):
+            with metrics.stage_timer('resize'):
+                raise ValueError('boom')
+
+        assert _sample('pipeline_stage_duration_seconds_count', stage='resize') == before + 1
+
+    def test_unknown_stage_rejected(self):
+        """Test that only declared stages can be timed."""
+        with pytest.raises(KeyError):
+            metrics.stage_timer('not_a_stage')
+
+    def test_observe_request(self):
+        """Test request counter and latency histogram."""
+        labels = {'endpoint': '/api/test', 'method': 'GET', 'status': '200'}
+        before = _sample('http_requests_total', **labels)
+        metrics.observe_request('/api/test', 'GET', 200, 0.003)
+
+        assert _sample('http_requests_total', **labels) == before + 1
+        assert _sample('http_request_duration_seconds_bucket',
+                       endpoint='/api/test', le='0.005') >= 1
+
+    def test_model_version_switch(self):
+        """Test that the previous model version series is cleared."""
+        metrics.set_model_version('aaa111')
+        metrics.set_model_version('bbb222', previous='aaa111')
+
+        assert _sample('model_info', version='aaa111') == 0
+        assert _sample('model_info', version='bbb222') == 1
+
+    def test_retraining_gauge(self):
+        """Test the retraining state gauge."""
+        metrics.set_retraining(True)
+        assert _sample('retraining_in_progress') == 1
+        metrics.set_retraining(False)
+        assert _sample('retraining_in_progress') == 0
+
+    def test_render_metrics(self):
+        """Test text exposition output."""
+        payload, content_type = metrics.render_metrics()
+
+        assert content_type.startswith('text/plain')
+        assert b'pipeline_stage_duration_seconds_bucket' in payload
+        assert b'http_requests_in_flight' in payload
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -118,17 +118,45 @@ class TestImageClassificationModel:
             model_classifier.save_model(model_dir=tmpdir, model_name='test_model')
             
             # Check files exist
-            assert os.path.exists(os.path.join(tmpdir, 'test_model.h5'))
-            assert os.path.exists(os.path.join(tmpdir, 'model_metadata.pkl'))
+            assert os.path.exists(os.path.join(tmpdir, 'test_model.json'))
+            keras_files = [f for f in os.listdir(tmpdir) if f.endswith('.keras')]
+            assert len(keras_files) == 1
             
             # Create new classifier and load
             new_classifier = ImageClassificationModel()
-            new_classifier.load_model(os.path.join(tmpdir, 'test_model.h5'))
+            new_classifier.load_model(os.path.join(tmpdir, 'test_model.json'))
             
             # Check model is loaded
             assert new_classifier.model is not None
             assert new_classifier.model.input_shape == (None, 32, 32, 3)
     
+    def test_load_latest_model(self, model_classifier):
+        """Test loading the canonical model from a model directory."""
+        model_classifier.create_cnn_model()
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            model_classifier.save_model(model_dir=tmpdir)
+            
+            loaded = load_latest_model(tmpdir)
+            
+            assert loaded.model is not None
+            assert loaded.model_version is not None
+    
+    def test_load_serving_weights(self, model_classifier):
+        """Test the fast weights-only load path."""
+        model_classifier.create_cnn_model()
+        image = np.random.rand(1, 32, 32, 3).astype(np.float32)
+        expected = model_classifier.model.predict(image, verbose=0)
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            model_classifier.save_model(model_dir=tmpdir)
+            
+            loaded = load_latest_model(tmpdir, serving_only=True)
+            
+            # Optimizer is skipped for serving
+            assert not loaded.is_compiled()
+            np.testing.assert_allclose(loaded.model.predict(image, verbose=0), expected, rtol=1e-5)
+    
     def test_retrain_model(self, model_classifier):
         """Test model retraining."""
         # Create and train initial model
@@ -154,6 +182,11 @@ class TestImageClassificationModel:
         
         # High accuracy should not trigger retraining
         assert model_classifier.check_retraining_needed(0.85, threshold=0.75) is False
+        
+        # Drift alone gates retraining when accuracy is unknown
+        assert model_classifier.check_retraining_needed(drift_score=0.4, drift_threshold=0.25) is True
+        assert model_classifier.check_retraining_needed(drift_score=0.05, drift_threshold=0.25) is False
+        assert model_classifier.check_retraining_needed() is False
 
 
 if __name__ == '__main__':
@@ -0,0 +1,101 @@
+"""
+Unit tests for model store module
+"""
+
+import pytest
+import numpy as np
+import os
+import sys
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.model import ImageClassificationModel
+from src.model_store import (
+    write_model, write_model_async, wait_for_pending_saves, has_pending_saves,
+    read_manifest, verified_artifact_path, manifest_path, file_sha256,
+    load_weights_file
+)
+
+
+class TestModelStore:
+    """Test cases for atomic model persistence."""
+
+    @pytest.fixture
+    def model_classifier(self):
+        model_classifier = ImageClassificationModel()
+        model_classifier.create_cnn_model()
+        return model_classifier
+
+    @pytest.fixture
+    def model_dir(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            yield tmpdir
+
+    def test_single_canonical_artifact(self, model_classifier, model_dir):
+        """Test that one artifact, its serving weights and one manifest are written."""
+        manifest = model_classifier.save_model(model_dir=model_dir)
+
+        files = sorted(os.listdir(model_dir))
+        assert files == sorted([
+            'cifar10_cnn_model.json', manifest['artifact'], manifest['weights']['file']
+        ])
+        assert manifest['format'] == 'keras'
+        assert manifest['metadata']['num_classes'] == 10
+        assert manifest['sha256'] == file_sha256(os.path.join(model_dir, manifest['artifact']))
+
+    def test_checksum_verified_on_load(self, model_classifier, model_dir):
+        """Test that a corrupted artifact is rejected."""
+        manifest = write_model(model_classifier.model, model_dir, 'test_model')
+        artifact_path = os.path.join(model_dir, manifest['artifact'])
+
+        with open(artifact_path, 'ab') as f:
+            f.write(b'corrupted')
+
+        with pytest.raises(ValueError, match='Checksum mismatch'):
+            verified_artifact_path(manifest_path(model_dir, 'test_model'))
+
+    def test_background_save(self, model_classifier, model_dir):
+        """Test that background saves publish a manifest when done."""
+        future = model_classifier.save_model(model_dir=model_dir, background=True)
+
+        wait_for_pending_saves()
+
+        assert future.done()
+        assert not has_pending_saves()
+        manifest = read_manifest(manifest_path(model_dir, 'cifar10_cnn_model'))
+        assert manifest['sha256'] == future.result()['sha256']
+
+    def test_optional_h5_export(self, model_classifier, model_dir):
+        """Test that extra formats are only written on request."""
+        manifest = write_model(model_classifier.model, model_dir, 'test_model', exports=('h5',))
+
+        assert manifest['exports'] == {'h5': 'test_model.h5'}
+        assert os.path.exists(os.path.join(model_dir, 'test_model.h5'))
+
+    def test_weights_file_layout(self, model_classifier, model_dir):
+        """Test that the weights file restores every inference tensor."""
+        write_model(model_classifier.model, model_dir, 'test_model', exports=('weights',))
+
+        weights = load_weights_file(manifest_path(model_dir, 'test_model'))
+
+        original = model_classifier.model.get_weights()
+        assert len(weights) == len(original)
+        for loaded, expected in zip(weights, original):
+            np.testing.assert_array_equal(loaded, expected)
+
+    def test_stale_artifacts_removed(self, model_classifier, model_dir):
+        """Test that only the newest artifacts are kept."""
+        for _ in range(3):
+            weights = model_classifier.model.get_weights()
+            model_classifier.model.set_weights([w + np.float32(0.01) for w in weights])
+            write_model(model_classifier.model, model_dir, 'test_model', keep_versions=2)
+
+        artifacts = [f for f in os.listdir(model_dir) if f.endswith('.keras')]
+        assert len(artifacts) == 2
+        assert not [f for f in os.listdir(model_dir) if f.startswith('.tmp-')]
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -14,6 +14,7 @@ import json
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from src.prediction import ImagePredictor
+from src.prediction_store import PredictionStore
 from src.model import ImageClassificationModel
 from src.preprocessing import DataPreprocessor
 
@@ -93,6 +94,41 @@ class TestImagePredictor:
             assert 'confidence' in pred
             assert 'all_probabilities' in pred
     
+    def test_predict_tensor(self, predictor):
+        """Test single-call prediction of uint8 pixels."""
+        images = np.random.randint(0, 256, (3, 32, 32, 3), dtype=np.uint8)
+        
+        results = predictor.predict_tensor(images)
+        
+        assert len(results) == 3
+        assert len(predictor.prediction_history) == 3
+        
+        # Same output as the float path on the same pixels
+        expected = predictor.predict_single_image(images[0].astype(np.float32) / 255.0)
+        assert results[0]['predicted_class'] == expected['predicted_class']
+        assert abs(results[0]['confidence'] - expected['confidence']) < 1e-5
+    
+    def test_shadow_receives_live_inputs(self, predictor):
+        """Test that an attached shadow compares the candidate on live inputs."""
+        import time
+        from src.shadow import ShadowEvaluator
+        
+        # The live model as its own candidate must agree everywhere
+        shadow = ShadowEvaluator(predictor.model, predictor.class_names, sample_rate=1).start()
+        predictor.attach_shadow(shadow)
+        try:
+            predictor.predict_tensor(np.random.randint(0, 256, (4, 32, 32, 3), dtype=np.uint8))
+            deadline = time.time() + 30
+            while shadow.stats()['images_compared'] < 4 and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            predictor.attach_shadow(None)
+            shadow.stop()
+        
+        stats = shadow.stats()
+        assert stats['images_compared'] == 4
+        assert stats['agreement_rate'] == 1.0
+    
     def test_get_top_k_predictions(self, predictor):
         """Test getting top k predictions."""
         # Create a test image
@@ -249,6 +285,81 @@ class TestImagePredictor:
         finally:
             if os.path.exists(persistence_file):
                 os.remove(persistence_file)
+    
+    def test_store_persistence_integration(self, tmp_path):
+        """Test that the store receives each prediction once and imports legacy JSON."""
+        model_classifier = ImageClassificationModel()
+        model_classifier.create_cnn_model()
+        class_names = ['Airplane', 'Automobile', 'Bird', 'Cat', 'Deer', 
+                       'Dog', 'Frog', 'Horse', 'Ship', 'Truck']
+        
+        legacy_file = tmp_path / 'predictions.json'
+        legacy_file.write_text(json.dumps([{
+            'predicted_class': 'Cat', 'predicted_class_index': 3, 'confidence': 0.9,
+            'prediction_time_ms': 5.0, 'timestamp': '2025-01-01T00:00:00'
+        }]))
+        store = PredictionStore(str(tmp_path / 'predictions.db')).start()
+        
+        try:
+            predictor = ImagePredictor(
+                model_classifier.model,
+                class_names,
+                persistence_file=str(legacy_file),
+                store=store
+            )
+            predictor.load_from_persistence()
+            assert len(predictor.prediction_history) == 1
+            
+            for _ in range(2):
+                predictor.predict_single_image(np.random.rand(32, 32, 3).astype(np.float32))
+                predictor.save_to_persistence()
+            predictor.save_to_persistence()
+            store.flush(timeout=5)
+            
+            assert store.count() == 3
+            
+            reloaded = ImagePredictor(model_classifier.model, class_names, store=store,
+                                      history_load_limit=2)
+            reloaded.load_from_persistence()
+            assert reloaded.prediction_history == predictor.prediction_history[-2:]
+        finally:
+            store.stop()
+    
+    def test_concurrent_saves_store_each_prediction_once(self):
+        """Test that saves racing with new predictions neither drop nor repeat entries."""
+        import threading
+        
+        class ListStore:
+            def __init__(self):
+                self.rows = []
+                self.lock = threading.Lock()
+            
+            def append(self, predictions):
+                with self.lock:
+                    self.rows.extend(p['n'] for p in predictions)
+        
+        store = ListStore()
+        predictor = ImagePredictor(None, ['a', 'b'], store=store)
+        
+        def worker(offset):
+            for i in range(500):
+                predictor._record([{'n': offset + i}])
+                predictor.save_to_persistence()
+        
+        # Switch threads as often as possible to widen the race window
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            threads = [threading.Thread(target=worker, args=(t * 1000,)) for t in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        predictor.save_to_persistence()
+        
+        assert sorted(store.rows) == sorted(t * 1000 + i for t in range(8) for i in range(500))
 
 
 if __name__ == '__main__':
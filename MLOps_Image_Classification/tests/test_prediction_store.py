@@ -0,0 +1,112 @@
+"""
+Unit tests for prediction store module
+"""
+
+import pytest
+import os
+import sys
+from datetime import datetime, timedelta
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.prediction_store import PredictionStore, parse_time, encode_cursor, decode_cursor
+
+
+CLASS_NAMES = ['Airplane', 'Automobile', 'Bird', 'Cat', 'Deer',
+               'Dog', 'Frog', 'Horse', 'Ship', 'Truck']
+START = datetime(2025, 1, 1)
+
+
+def make_predictions(n):
+    """One prediction per minute, cycling through classes and confidences."""
+    return [{
+        'predicted_class': CLASS_NAMES[i % 10],
+        'predicted_class_index': i % 10,
+        'confidence': (i % 10) / 10 + 0.05,
+        'prediction_time_ms': 10.0,
+        'timestamp': (START + timedelta(minutes=i)).isoformat(),
+        'all_probabilities': {name: 0.1 for name in CLASS_NAMES}
+    } for i in range(n)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PredictionStore(str(tmp_path / 'predictions.db'), flush_interval=0.05).start()
+    yield store
+    store.stop()
+
+
+class TestPredictionStore:
+    """Test cases for PredictionStore."""
+
+    def test_batched_writes(self, store):
+        """Test that appends are committed in few transactions."""
+        for prediction in make_predictions(100):
+            store.append([prediction])
+        assert store.flush(timeout=5)
+
+        assert store.count() == 100
+        assert store.transactions < 100
+
+    def test_filters(self, store):
+        """Test time window, class and confidence filters."""
+        store.append(make_predictions(100))
+        store.flush(timeout=5)
+
+        window = store.query(since=parse_time((START + timedelta(minutes=10)).isoformat()),
+                             until=parse_time((START + timedelta(minutes=20)).isoformat()), limit=100)
+        assert len(window['predictions']) == 10
+
+        cats = store.query(predicted_class='Cat', limit=100)['predictions']
+        assert len(cats) == 10
+        assert all(p['predicted_class'] == 'Cat' for p in cats)
+
+        confident = store.query(min_confidence=0.8, max_confidence=0.9, limit=100)['predictions']
+        assert {p['predicted_class'] for p in confident} == {'Ship'}
+
+    def test_cursor_pagination(self, store):
+        """Test that cursor pages cover every row once, newest first."""
+        store.append(make_predictions(25))
+        store.flush(timeout=5)
+
+        seen = []
+        cursor = None
+        while True:
+            page = store.query(cursor=cursor, limit=10)
+            seen.extend(p['timestamp'] for p in page['predictions'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+
+        assert len(seen) == 25
+        assert seen == sorted(seen, reverse=True)
+
+    def test_recent_matches_history_shape(self, store):
+        """Test that recent() returns history entries oldest first."""
+        predictions = make_predictions(5)
+        store.append(predictions)
+        store.flush(timeout=5)
+
+        recent = store.recent(limit=3)
+        assert recent == predictions[-3:]
+
+    def test_probabilities_are_optional(self, store):
+        """Test that probabilities are only returned when requested."""
+        store.append(make_predictions(1))
+        store.flush(timeout=5)
+
+        assert 'all_probabilities' not in store.query()['predictions'][0]
+        assert store.query(include_probabilities=True)['predictions'][0]['all_probabilities']['Cat'] == 0.1
+
+    def test_invalid_inputs(self):
+        """Test rejection of malformed times and cursors."""
+        with pytest.raises(ValueError):
+            parse_time('yesterday')
+        with pytest.raises(ValueError):
+            decode_cursor('not-a-cursor')
+        assert decode_cursor(encode_cursor(1.5, 7)) == (1.5, 7)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
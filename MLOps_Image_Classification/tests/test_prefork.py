@@ -0,0 +1,68 @@
+"""
+Unit tests for pre-fork serving module
+"""
+
+import pytest
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.prefork import (
+    available_cores, candidate_layouts, choose_layout, thread_environment, autotune,
+    sse_stream_budget
+)
+
+
+class TestPrefork:
+    """Test cases for layout selection."""
+
+    def test_layouts_never_oversubscribe(self):
+        """Test that every layout uses exactly the available cores."""
+        layouts = candidate_layouts(8)
+        assert [l['workers'] for l in layouts] == [1, 2, 4, 8]
+        assert all(l['workers'] * l['intra_op_threads'] == 8 for l in layouts)
+        assert [l['workers'] for l in candidate_layouts(8, max_workers=2)] == [1, 2]
+        assert candidate_layouts(1) == [{'workers': 1, 'intra_op_threads': 1, 'inter_op_threads': 1}]
+        assert available_cores() >= 1
+
+    def test_choose_prefers_fewer_workers_on_ties(self):
+        """Test that near-equal throughput picks the layout with fewer processes."""
+        results = [
+            {'workers': 1, 'images_per_second': 100.0},
+            {'workers': 2, 'images_per_second': 190.0},
+            {'workers': 4, 'images_per_second': 195.0}
+        ]
+        assert choose_layout(results)['workers'] == 2
+        results[1]['images_per_second'] = 150.0
+        assert choose_layout(results)['workers'] == 4
+
+    def test_sse_streams_leave_threads_for_predictions(self):
+        """Test that event streams may only hold a quarter of a worker's request threads."""
+        assert sse_stream_budget(8, 100) == 2
+        assert sse_stream_budget(32, 100) == 8
+        assert sse_stream_budget(32, 3) == 3
+        assert sse_stream_budget(2, 100) == 0
+
+    def test_thread_environment(self):
+        """Test the thread pool variables handed to workers."""
+        env = thread_environment(4, 1)
+        assert env['TF_NUM_INTRAOP_THREADS'] == '4'
+        assert env['OMP_NUM_THREADS'] == '4'
+        assert env['TF_NUM_INTEROP_THREADS'] == '1'
+
+    def test_autotune_single_core_is_cached(self, tmp_path):
+        """Test that one core needs no benchmark and the result is cached."""
+        cache_file = str(tmp_path / 'tuning.json')
+        first = autotune(str(tmp_path), cores=1, cache_file=cache_file)
+        assert first['workers'] == 1
+        assert first['cached'] is False
+
+        second = autotune(str(tmp_path), cores=1, cache_file=cache_file)
+        assert second['cached'] is True
+        assert autotune(str(tmp_path), cores=1, cache_file=cache_file, retune=True)['cached'] is False
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,132 @@
+"""
+Unit tests for profiling module
+"""
+
+import pytest
+import os
+import sys
+import json
+import time
+import threading
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from tensorflow import keras
+
+from src.profiling import RequestProfiler
+
+
+def busy_inference_stand_in(seconds=0.1):
+    """CPU-bound work that should show up as a hot function."""
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+class TestRequestProfiler:
+    """Test cases for RequestProfiler."""
+
+    @pytest.fixture
+    def profiler(self, tmp_path):
+        profiler = RequestProfiler(str(tmp_path), sample_interval_ms=1, max_seconds=10)
+        yield profiler
+        profiler.stop()
+
+    def _profiled_request(self, profiler, work):
+        token = profiler.enter_request()
+        try:
+            work()
+        finally:
+            profiler.exit_request(token)
+
+    def test_idle_by_default(self, profiler):
+        """Test that nothing is captured without a session."""
+        assert profiler.active is False
+        assert profiler.enter_request() is None
+        assert profiler.status() == {'active': False, 'last_summary': None}
+
+    def test_profiles_next_n_requests(self, profiler):
+        """Test request-bound session with a sampled Python profile."""
+        profiler.start(max_requests=2, tf_trace=False)
+        assert profiler.active
+
+        for _ in range(2):
+            self._profiled_request(profiler, busy_inference_stand_in)
+
+        summary = profiler.wait(timeout=10)
+        assert profiler.active is False
+        assert summary['requests_profiled'] == 2
+        assert summary['samples'] > 0
+
+        functions = [entry['function'] for entry in summary['top_functions']]
+        assert any('busy_inference_stand_in' in name for name in functions)
+
+        assert os.path.exists(summary['stacks_file'])
+        with open(os.path.join(summary['dump_dir'], 'summary.json')) as f:
+            assert json.load(f)['session_id'] == summary['session_id']
+
+    def test_requests_beyond_limit_not_profiled(self, profiler):
+        """Test that only the first N requests join the session."""
+        profiler.start(max_requests=1, tf_trace=False)
+
+        first = profiler.enter_request()
+        assert first is not None
+        assert profiler.enter_request() is None
+        profiler.exit_request(first)
+
+        assert profiler.wait(timeout=10)['requests_profiled'] == 1
+
+    def test_time_bound_session(self, profiler):
+        """Test that a session ends after its duration."""
+        profiler.start(seconds=0.2, tf_trace=False)
+
+        worker = threading.Thread(
+            target=self._profiled_request, args=(profiler, lambda: busy_inference_stand_in(0.1))
+        )
+        worker.start()
+        worker.join()
+
+        summary = profiler.wait(timeout=10)
+        assert summary['requests_profiled'] == 1
+        assert profiler.active is False
+
+    def test_single_session_at_a_time(self, profiler):
+        """Test that a second session is refused while one is running."""
+        profiler.start(seconds=5, tf_trace=False)
+        with pytest.raises(RuntimeError):
+            profiler.start(seconds=5, tf_trace=False)
+
+    def test_invalid_limits(self, profiler):
+        """Test validation of requests/seconds."""
+        with pytest.raises(ValueError):
+            profiler.start(seconds=60)
+        with pytest.raises(ValueError):
+            profiler.start(max_requests=0)
+        assert profiler.active is False
+
+    def test_tf_trace_summary(self, profiler):
+        """Test that a TensorFlow trace is captured and summarized."""
+        model = keras.Sequential([
+            keras.Input(shape=(32, 32, 3)),
+            keras.layers.Conv2D(4, 3),
+            keras.layers.Flatten(),
+            keras.layers.Dense(10)
+        ])
+        images = np.zeros((1, 32, 32, 3), dtype=np.float32)
+        model.predict(images, verbose=0)
+
+        profiler.start(max_requests=1, tf_trace=True)
+        self._profiled_request(profiler, lambda: model.predict(images, verbose=0))
+        summary = profiler.wait(timeout=30)
+
+        assert summary['tf_trace_error'] is None
+        assert os.path.isdir(summary['tf_trace_dir'])
+        assert len(summary['top_tf_ops']) > 0
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
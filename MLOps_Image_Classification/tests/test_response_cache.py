@@ -0,0 +1,56 @@
+"""
+Unit tests for response cache module
+"""
+
+import pytest
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.response_cache import ResponseCache
+
+
+class TestResponseCache:
+    """Test cases for ResponseCache."""
+
+    def test_rebuilds_only_when_key_changes(self):
+        """Test that the body is built once per key."""
+        cache = ResponseCache()
+        builds = []
+
+        def build():
+            builds.append(1)
+            return {'value': len(builds)}
+
+        first = cache.get('stats', 1, build)
+        second = cache.get('stats', 1, build)
+        assert first is second
+        assert len(builds) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        third = cache.get('stats', 2, build)
+        assert third.body == b'{"value": 2}'
+        assert third.etag != first.etag
+
+    def test_etag_follows_content(self):
+        """Test that equal bodies under different keys share an ETag."""
+        cache = ResponseCache()
+        first = cache.get('stats', 1, lambda: {'value': 1})
+        second = cache.get('stats', 2, lambda: {'value': 1})
+        assert first.etag == second.etag
+
+    def test_endpoints_are_independent(self):
+        """Test that entries are kept per endpoint and can be invalidated."""
+        cache = ResponseCache()
+        cache.get('a', 1, lambda: {'a': 1})
+        cache.get('b', 1, lambda: {'b': 1})
+        assert cache.get('a', 1, lambda: pytest.fail('rebuilt')).body == b'{"a": 1}'
+
+        cache.invalidate('a')
+        assert cache.get('a', 1, lambda: {'a': 2}).body == b'{"a": 2}'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,153 @@
+"""
+Unit tests for response format module
+"""
+
+import pytest
+import os
+import sys
+import gzip
+import json
+import msgpack
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.prediction import top_k_indices
+from src.response_format import (
+    parse_response_options, shape_prediction, shape_batch, encode_response, ResponseOptions
+)
+
+
+CLASS_NAMES = ['Airplane', 'Automobile', 'Bird', 'Cat', 'Deer',
+               'Dog', 'Frog', 'Horse', 'Ship', 'Truck']
+
+
+def make_result():
+    probabilities = np.array([0.01, 0.02, 0.05, 0.6, 0.03, 0.2, 0.04, 0.02, 0.02, 0.01])
+    return {
+        'predicted_class': 'Cat',
+        'predicted_class_index': 3,
+        'confidence': 0.6000123456,
+        'prediction_time_ms': 12.5,
+        'timestamp': '2025-01-01T00:00:00',
+        'all_probabilities': {name: float(p) for name, p in zip(CLASS_NAMES, probabilities)},
+        'file_path': '/tmp/uploads/abc_test.png',
+        'file_name': 'test.png'
+    }
+
+
+class TestTopKIndices:
+    """Test cases for top_k_indices."""
+
+    def test_matches_full_sort(self):
+        """Test that the partial sort agrees with a full argsort."""
+        rng = np.random.default_rng(0)
+        for _ in range(20):
+            probabilities = rng.random(10)
+            for k in (1, 3, 10):
+                expected = np.argsort(probabilities)[::-1][:k]
+                assert list(top_k_indices(probabilities, k)) == list(expected)
+
+
+class TestParseResponseOptions:
+    """Test cases for parse_response_options."""
+
+    def test_defaults(self):
+        """Test that no options means the legacy JSON response."""
+        options = parse_response_options({})
+        assert options.encoding == 'json'
+        assert not options.shapes_results
+        assert not options.gzip
+
+    def test_header_negotiation(self):
+        """Test msgpack and gzip negotiation from headers."""
+        options = parse_response_options({}, accept='application/msgpack, application/json;q=0.5',
+                                         accept_encoding='gzip, deflate')
+        assert options.encoding == 'msgpack'
+        assert options.gzip
+
+        options = parse_response_options({}, accept_encoding='gzip;q=0')
+        assert not options.gzip
+
+    def test_query_overrides_headers(self):
+        """Test that query parameters win over headers."""
+        options = parse_response_options({'format': 'json', 'gzip': '0'},
+                                         accept='application/msgpack', accept_encoding='gzip')
+        assert options.encoding == 'json'
+        assert not options.gzip
+
+    @pytest.mark.parametrize('args', [
+        {'top_k': '0'}, {'top_k': '11'}, {'top_k': 'x'}, {'precision': '12'},
+        {'probabilities': 'list'}, {'format': 'xml'}, {'probabilities': 'f16'}
+    ])
+    def test_invalid_options(self, args):
+        """Test that malformed options are rejected."""
+        with pytest.raises(ValueError):
+            parse_response_options(args, num_classes=10)
+
+
+class TestShaping:
+    """Test cases for shape_prediction and shape_batch."""
+
+    def test_default_is_passthrough(self):
+        """Test that default options return the result unchanged."""
+        result = make_result()
+        assert shape_prediction(result, ResponseOptions()) is result
+
+    def test_top_k_array_and_precision(self):
+        """Test top-k, array layout, rounding and compact output."""
+        result = make_result()
+        shaped = shape_prediction(result, ResponseOptions(
+            top_k=2, probabilities='array', precision=3, compact=True))
+
+        assert [p['class'] for p in shaped['top_k']] == ['Cat', 'Dog']
+        assert shaped['probabilities'][3] == 0.6
+        assert len(shaped['probabilities']) == 10
+        assert shaped['confidence'] == 0.6
+        assert 'all_probabilities' not in shaped
+        assert 'file_path' not in shaped and 'timestamp' not in shaped
+
+        # The original (kept in prediction history) is untouched
+        assert 'all_probabilities' in result and 'file_path' in result
+
+    def test_f16_probabilities(self):
+        """Test packed float16 probabilities."""
+        shaped = shape_prediction(make_result(), ResponseOptions(probabilities='f16', encoding='msgpack'))
+        vector = np.frombuffer(shaped['probabilities_f16'], dtype='<f2')
+        assert vector.shape == (10,)
+        assert abs(float(vector[3]) - 0.6) < 1e-3
+
+    def test_shape_batch(self):
+        """Test that every prediction in a batch is shaped."""
+        payload = {'total_processed': 2, 'total_errors': 0, 'errors': [],
+                   'predictions': [make_result(), make_result()]}
+        shaped = shape_batch(payload, ResponseOptions(probabilities='none'))
+        assert shaped['total_processed'] == 2
+        assert all('all_probabilities' not in p for p in shaped['predictions'])
+
+
+class TestEncodeResponse:
+    """Test cases for encode_response."""
+
+    def test_msgpack_round_trip(self):
+        """Test that msgpack bodies decode to the payload."""
+        payload = shape_prediction(make_result(), ResponseOptions(probabilities='f16', encoding='msgpack'))
+        body, headers = encode_response(payload, ResponseOptions(encoding='msgpack'))
+        assert headers['Content-Type'] == 'application/msgpack'
+        assert msgpack.unpackb(body, raw=False) == payload
+
+    def test_gzip_only_above_threshold(self):
+        """Test that small bodies are sent uncompressed."""
+        options = ResponseOptions(gzip=True)
+        body, headers = encode_response({'a': 1}, options, gzip_min_bytes=100)
+        assert 'Content-Encoding' not in headers
+
+        payload = {'predictions': [make_result() for _ in range(20)]}
+        body, headers = encode_response(payload, options, gzip_min_bytes=100)
+        assert headers['Content-Encoding'] == 'gzip'
+        assert json.loads(gzip.decompress(body)) == payload
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,95 @@
+"""
+Unit tests for rolling statistics module
+"""
+
+import pytest
+import os
+import sys
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.rolling_stats import (
+    RollingStatistics, parse_window, latency_quantiles, LATENCY_BOUNDS_MS, SECOND_BUCKETS
+)
+
+
+CLASS_NAMES = ['Airplane', 'Automobile', 'Bird', 'Cat', 'Deer',
+               'Dog', 'Frog', 'Horse', 'Ship', 'Truck']
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def result(class_index=3, confidence=0.8, latency_ms=10.0):
+    return {'predicted_class_index': class_index, 'confidence': confidence,
+            'prediction_time_ms': latency_ms}
+
+
+class TestRollingStatistics:
+    """Test cases for RollingStatistics."""
+
+    def test_trailing_windows(self):
+        """Test that each window only counts predictions inside it."""
+        clock = FakeClock()
+        rolling = RollingStatistics(CLASS_NAMES, clock=clock)
+
+        rolling.record(result(class_index=0))              # now - 2h
+        clock.now += 3600
+        rolling.record(result(class_index=1))              # now - 1h
+        clock.now += 3600 - 120
+        rolling.record(result(class_index=2))              # now - 2m
+        clock.now += 120
+        rolling.record(result(class_index=3, confidence=0.4))
+
+        assert rolling.window_stats(60)['total_predictions'] == 1
+        assert rolling.window_stats(300)['total_predictions'] == 2
+        assert rolling.window_stats(3600)['total_predictions'] == 2
+        stats = rolling.window_stats(86400)
+        assert stats['total_predictions'] == 4
+        assert stats['predictions_per_class']['Airplane'] == 1
+
+        last_minute = rolling.window_stats(60)
+        assert last_minute['average_confidence'] == pytest.approx(0.4)
+        assert last_minute['predictions_per_class']['Cat'] == 1
+
+    def test_buckets_are_reused_after_a_lap(self):
+        """Test that a reused bucket does not carry counts from a lap ago."""
+        clock = FakeClock()
+        rolling = RollingStatistics(CLASS_NAMES, clock=clock)
+        rolling.record(result())
+        clock.now += SECOND_BUCKETS
+        rolling.record(result())
+
+        assert rolling.window_stats(1)['total_predictions'] == 1
+
+    def test_latency_quantiles(self):
+        """Test that sketched quantiles are close to the exact ones."""
+        rolling = RollingStatistics(CLASS_NAMES, clock=FakeClock())
+        latencies = np.random.default_rng(0).lognormal(3, 0.5, size=5000)
+        rolling.record_many([result(latency_ms=float(v)) for v in latencies])
+
+        stats = rolling.window_stats(60)
+        assert stats['prediction_time_p50_ms'] == pytest.approx(np.percentile(latencies, 50), rel=0.15)
+        assert stats['prediction_time_p99_ms'] == pytest.approx(np.percentile(latencies, 99), rel=0.15)
+        assert latency_quantiles(np.zeros(len(LATENCY_BOUNDS_MS) + 1))['p50'] is None
+
+    def test_parse_window(self):
+        """Test window parsing and limits."""
+        assert parse_window('90s') == 90
+        assert parse_window('5m') == 300
+        assert parse_window('24h') == 86400
+        assert parse_window('120') == 120
+        for invalid in ('soon', '0s', '2d'):
+            with pytest.raises(ValueError):
+                parse_window(invalid)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,118 @@
+"""
+Unit tests for shadow evaluation module
+"""
+
+import pytest
+import os
+import sys
+import time
+import threading
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.shadow import ShadowEvaluator
+
+
+CLASS_NAMES = ['Airplane', 'Automobile', 'Bird', 'Cat', 'Deer',
+               'Dog', 'Frog', 'Horse', 'Ship', 'Truck']
+
+
+class FixedModel:
+    """Stand-in candidate that always predicts the same distribution."""
+
+    def __init__(self, probabilities, delay=0.0):
+        self.probabilities = np.asarray(probabilities, dtype=np.float32)
+        self.delay = delay
+        self.calls = 0
+
+    def predict(self, images, verbose=0):
+        self.calls += 1
+        time.sleep(self.delay)
+        return np.tile(self.probabilities, (len(images), 1))
+
+
+def one_hot(index, confidence):
+    probabilities = np.full(10, (1 - confidence) / 9, dtype=np.float32)
+    probabilities[index] = confidence
+    return probabilities
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+class TestShadowEvaluator:
+    """Test cases for ShadowEvaluator."""
+
+    def test_agreement_and_deltas(self):
+        """Test agreement rate and confidence deltas against the live output."""
+        shadow = ShadowEvaluator(FixedModel(one_hot(3, 0.7)), CLASS_NAMES, sample_rate=1).start()
+        try:
+            images = np.zeros((1, 32, 32, 3), dtype=np.float32)
+            shadow.offer(images, one_hot(3, 0.9)[np.newaxis], 10.0)   # agrees
+            shadow.offer(images, one_hot(5, 0.6)[np.newaxis], 12.0)   # disagrees
+            assert wait_for(lambda: shadow.stats()['images_compared'] == 2)
+        finally:
+            shadow.stop()
+
+        stats = shadow.stats()
+        assert stats['agreement_rate'] == 0.5
+        assert stats['mean_confidence_delta'] == pytest.approx(((0.7 - 0.9) + (0.7 - 0.6)) / 2, abs=1e-5)
+        assert stats['top_disagreements'] == [{'live': 'Dog', 'candidate': 'Cat', 'count': 1}]
+        assert stats['live_latency']['mean_ms'] == pytest.approx(11.0)
+        assert stats['candidate_latency'] is not None
+
+    def test_drops_instead_of_blocking(self):
+        """Test that a full queue drops samples and offer never blocks."""
+        shadow = ShadowEvaluator(FixedModel(one_hot(0, 0.9)), CLASS_NAMES, sample_rate=1, queue_size=2)
+        images = np.zeros((1, 32, 32, 3), dtype=np.float32)
+
+        start = time.perf_counter()
+        for _ in range(10):
+            shadow.offer(images, one_hot(0, 0.9)[np.newaxis], 1.0)
+        assert time.perf_counter() - start < 0.5
+
+        stats = shadow.stats()
+        assert stats['sampled'] == 2
+        assert stats['dropped'] == 8
+
+    def test_sampling_rate(self):
+        """Test that only a fraction of live inferences are queued."""
+        shadow = ShadowEvaluator(FixedModel(one_hot(0, 0.9)), CLASS_NAMES, sample_rate=0.1, queue_size=10000)
+        images = np.zeros((1, 32, 32, 3), dtype=np.float32)
+        for _ in range(2000):
+            shadow.offer(images, one_hot(0, 0.9)[np.newaxis], 1.0)
+
+        assert 100 < shadow.stats()['sampled'] < 300
+
+    def test_waits_for_live_inference(self):
+        """Test that the candidate runs only once live inference is idle."""
+        candidate = FixedModel(one_hot(0, 0.9))
+        busy = threading.Event()
+        busy.set()
+        shadow = ShadowEvaluator(candidate, CLASS_NAMES, sample_rate=1, max_defer_ms=5000)
+        shadow.is_busy = busy.is_set
+        shadow.start()
+        try:
+            shadow.offer(np.zeros((1, 32, 32, 3), dtype=np.float32), one_hot(0, 0.9)[np.newaxis], 1.0)
+            time.sleep(0.3)
+            assert candidate.calls == 0
+
+            busy.clear()
+            assert wait_for(lambda: candidate.calls == 1)
+        finally:
+            shadow.stop()
+
+    def test_invalid_sample_rate(self):
+        """Test that the sample rate is validated."""
+        with pytest.raises(ValueError):
+            ShadowEvaluator(FixedModel(one_hot(0, 0.9)), CLASS_NAMES, sample_rate=0)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,104 @@
+"""
+Unit tests for static assets module
+"""
+
+import pytest
+import os
+import sys
+import gzip
+import time
+import tempfile
+import numpy as np
+from PIL import Image
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.static_assets import StaticAssetIndex
+
+
+def write_png(path, width=800, height=600, seed=0):
+    pixels = np.random.default_rng(seed).integers(0, 255, (height, width, 3), dtype=np.uint8)
+    Image.fromarray(pixels).save(path)
+
+
+class TestStaticAssetIndex:
+    """Test cases for StaticAssetIndex."""
+
+    @pytest.fixture
+    def dirs(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            static_dir = os.path.join(tmp_dir, 'static')
+            cache_dir = os.path.join(tmp_dir, 'cache')
+            os.makedirs(static_dir)
+            yield static_dir, cache_dir
+
+    def test_fingerprint_and_thumbnail(self, dirs):
+        """Test fingerprinted and thumbnail names of an image."""
+        static_dir, cache_dir = dirs
+        write_png(os.path.join(static_dir, 'training_history.png'))
+
+        index = StaticAssetIndex(static_dir, cache_dir=cache_dir, thumbnail_width=200)
+        asset, kind = index.resolve('training_history.png')
+        assert kind == 'plain'
+
+        url = index.url_for('training_history.png')
+        assert url == f'/static/training_history.{asset.digest}.png'
+        assert index.resolve(url[len('/static/'):]) == (asset, 'fingerprinted')
+
+        thumbnail_name = index.url_for('training_history.png', thumbnail=True)[len('/static/'):]
+        assert index.resolve(thumbnail_name) == (asset, 'thumbnail')
+        with Image.open(asset.thumbnail_path) as thumbnail:
+            assert thumbnail.size[0] == 200
+        assert os.path.getsize(asset.thumbnail_path) < asset.size
+
+    def test_refresh_on_change(self, dirs):
+        """Test that changed files get a new fingerprint and unchanged ones are not rehashed."""
+        static_dir, cache_dir = dirs
+        write_png(os.path.join(static_dir, 'a.png'), 50, 50, seed=1)
+        write_png(os.path.join(static_dir, 'b.png'), 50, 50, seed=2)
+        index = StaticAssetIndex(static_dir, cache_dir=cache_dir, refresh_interval=0)
+        old_a, _ = index.resolve('a.png')
+        old_b, _ = index.resolve('b.png')
+        version = index.version
+
+        time.sleep(0.01)
+        write_png(os.path.join(static_dir, 'a.png'), 50, 50, seed=3)
+
+        new_a, _ = index.resolve('a.png')
+        assert new_a.digest != old_a.digest
+        assert index.resolve('b.png')[0] is old_b
+        assert index.version == version + 1
+        # The old fingerprinted URL no longer resolves
+        assert index.resolve(old_a.fingerprinted_name) == (None, None)
+
+    def test_rate_limited_refresh(self, dirs):
+        """Test that the directory is not re-scanned within the refresh interval."""
+        static_dir, cache_dir = dirs
+        index = StaticAssetIndex(static_dir, cache_dir=cache_dir, refresh_interval=3600)
+        write_png(os.path.join(static_dir, 'late.png'), 20, 20)
+
+        assert index.resolve('late.png') == (None, None)
+        assert index.refresh(force=True)
+        assert index.resolve('late.png')[1] == 'plain'
+
+    def test_precompressed_text(self, dirs):
+        """Test gzip variants for compressible types only."""
+        static_dir, cache_dir = dirs
+        with open(os.path.join(static_dir, 'report.json'), 'w') as f:
+            f.write('{"value": 1}' * 500)
+
+        index = StaticAssetIndex(static_dir, cache_dir=cache_dir)
+        asset, _ = index.resolve('report.json')
+        assert asset.gzip_body is not None
+        assert gzip.decompress(asset.gzip_body) == b'{"value": 1}' * 500
+
+    def test_unknown_names(self, dirs):
+        """Test that only indexed names resolve (no path traversal)."""
+        static_dir, cache_dir = dirs
+        index = StaticAssetIndex(static_dir, cache_dir=cache_dir)
+        assert index.resolve('../config.py') == (None, None)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
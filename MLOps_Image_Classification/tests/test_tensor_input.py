@@ -0,0 +1,81 @@
+"""
+Unit tests for tensor input module
+"""
+
+import pytest
+import io
+import os
+import sys
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.tensor_input import parse_tensor, TensorPayloadError
+
+
+def npy_bytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+class TestParseTensor:
+    """Test cases for parse_tensor."""
+
+    def test_raw_uint8_single(self):
+        """Test a raw single image with a shape header."""
+        pixels = np.random.randint(0, 256, (32, 32, 3), dtype=np.uint8)
+        body = pixels.tobytes()
+
+        tensor = parse_tensor(body, shape='32,32,3')
+
+        assert tensor.dtype == np.uint8
+        assert np.array_equal(tensor, pixels)
+        # Zero-copy view over the request body
+        assert not tensor.flags.writeable
+        assert np.shares_memory(tensor, np.frombuffer(body, dtype=np.uint8))
+
+    def test_raw_float32_batch(self):
+        """Test a raw float32 batch."""
+        pixels = np.random.rand(4, 32, 32, 3).astype('<f4')
+        tensor = parse_tensor(pixels.tobytes(), shape='4x32x32x3', dtype='float32')
+        assert tensor.shape == (4, 32, 32, 3)
+        assert np.array_equal(tensor, pixels)
+
+    @pytest.mark.parametrize('array', [
+        np.zeros((32, 32, 3), dtype=np.uint8),
+        np.random.rand(2, 32, 32, 3).astype(np.float32)
+    ])
+    def test_npy(self, array):
+        """Test .npy payloads of both dtypes."""
+        tensor = parse_tensor(npy_bytes(array))
+        assert tensor.shape == array.shape
+        assert tensor.dtype == array.dtype
+
+    @pytest.mark.parametrize('body, shape, dtype', [
+        (bytes(32 * 32 * 3), None, None),                 # no shape header
+        (bytes(32 * 32 * 3), '32,32', None),              # wrong rank
+        (bytes(64 * 64 * 3), '64,64,3', None),            # wrong size
+        (bytes(32 * 32 * 3 - 1), '32,32,3', None),        # truncated
+        (bytes(32 * 32 * 3), '32,32,3', 'float64'),       # unsupported dtype
+        (bytes(100 * 32 * 32 * 3), '100,32,32,3', None),  # batch too large
+        (bytes(32 * 32 * 3), 'a,b,c', None),              # unparsable shape
+    ])
+    def test_rejects_invalid_raw(self, body, shape, dtype):
+        """Test that malformed raw payloads are rejected."""
+        with pytest.raises(TensorPayloadError):
+            parse_tensor(body, shape=shape, dtype=dtype, max_batch=64)
+
+    def test_rejects_invalid_npy(self):
+        """Test that .npy payloads with bad dtype or range are rejected."""
+        with pytest.raises(TensorPayloadError):
+            parse_tensor(npy_bytes(np.zeros((32, 32, 3), dtype=np.float64)))
+        with pytest.raises(TensorPayloadError):
+            parse_tensor(npy_bytes(np.full((32, 32, 3), 255.0, dtype=np.float32)))
+        with pytest.raises(TensorPayloadError):
+            parse_tensor(npy_bytes(np.zeros((32, 32, 3), dtype=np.uint8))[:-1])
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
@@ -0,0 +1,96 @@
+"""
+Unit tests for training shards module
+"""
+
+import pytest
+import os
+import sys
+import numpy as np
+
+# Add src to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from src.training_shards import TrainingShards, resolve_label, EMPTY_FINGERPRINT
+
+
+CLASS_NAMES = ['Airplane', 'Automobile', 'Bird', 'Cat', 'Deer',
+               'Dog', 'Frog', 'Horse', 'Ship', 'Truck']
+
+
+def make_pixels(n, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (n, 32, 32, 3), dtype=np.uint8)
+
+
+class TestTrainingShards:
+    """Test cases for TrainingShards."""
+
+    def test_add_and_load_across_shards(self, tmp_path):
+        """Test that samples spill over into new shards and load back in order."""
+        shards = TrainingShards(str(tmp_path), CLASS_NAMES, shard_size=4)
+        pixels = make_pixels(10)
+        labels = np.arange(10) % 3
+
+        assert shards.add(pixels[:3], labels[:3]) == ['added'] * 3
+        assert shards.add(pixels[3:], labels[3:]) == ['added'] * 7
+
+        X, y = shards.load()
+        assert X.dtype == np.uint8
+        assert np.array_equal(X, pixels)
+        assert np.array_equal(y, labels)
+        summary = shards.summary()
+        assert summary['shards'] == 3
+        assert summary['samples_per_class']['Airplane'] == 4
+
+    def test_duplicates_are_skipped(self, tmp_path):
+        """Test deduplication within a batch and against stored samples."""
+        shards = TrainingShards(str(tmp_path), CLASS_NAMES)
+        pixels = make_pixels(2)
+        shards.add(pixels, [0, 1])
+        fingerprint = shards.fingerprint
+
+        batch = np.stack([pixels[1], make_pixels(1, seed=1)[0], make_pixels(1, seed=1)[0]])
+        assert shards.add(batch, [1, 2, 2]) == ['duplicate', 'added', 'duplicate']
+        assert len(shards) == 3
+        assert shards.fingerprint != fingerprint
+
+        fingerprint = shards.fingerprint
+        assert shards.add(pixels, [0, 1]) == ['duplicate', 'duplicate']
+        assert shards.fingerprint == fingerprint
+
+    def test_reopen_and_other_writers(self, tmp_path):
+        """Test that the manifest persists and a second store sees new samples."""
+        first = TrainingShards(str(tmp_path), CLASS_NAMES)
+        assert first.fingerprint == EMPTY_FINGERPRINT
+        first.add(make_pixels(3), [4, 5, 6])
+
+        second = TrainingShards(str(tmp_path), CLASS_NAMES)
+        assert second.fingerprint == first.fingerprint
+        assert second.add(make_pixels(3), [4, 5, 6]) == ['duplicate'] * 3
+
+        second.add(make_pixels(1, seed=7), [7])
+        assert first.refresh() == second.fingerprint
+        assert len(first) == 4
+
+    def test_uncommitted_tail_is_dropped(self, tmp_path):
+        """Test that bytes written without a manifest update are overwritten."""
+        shards = TrainingShards(str(tmp_path), CLASS_NAMES)
+        shards.add(make_pixels(2), [0, 1])
+        with open(tmp_path / 'shard-00000.images', 'ab') as f:
+            f.write(b'\xff' * 1000)
+
+        shards.add(make_pixels(1, seed=3), [2])
+        X, y = shards.load()
+        assert os.path.getsize(tmp_path / 'shard-00000.images') == 3 * 32 * 32 * 3
+        assert np.array_equal(X[2], make_pixels(1, seed=3)[0])
+        assert y.tolist() == [0, 1, 2]
+
+    def test_resolve_label(self):
+        """Test labels given as class names or indices."""
+        assert resolve_label('cat', CLASS_NAMES) == 3
+        assert resolve_label('9', CLASS_NAMES) == 9
+        with pytest.raises(ValueError):
+            resolve_label('unicorn', CLASS_NAMES)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
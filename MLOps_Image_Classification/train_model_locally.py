@@ -13,6 +13,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.preprocessing import DataPreprocessor
 from src.model import ImageClassificationModel
+from src.drift import build_reference_profile, save_reference_profile
 from config import get_config
 
 print("=" * 70)
@@ -66,16 +67,17 @@ history = model_classifier.train_model(
 model_dir = config.MODEL_DIR
 os.makedirs(model_dir, exist_ok=True)
 
-# Save in both formats for compatibility
-h5_path = os.path.join(model_dir, 'cifar10_cnn_model.h5')
-keras_path = os.path.join(model_dir, 'cifar10_cnn_model.keras')
-
 print(f"\n💾 Saving model...")
-model_classifier.save_model(h5_path)
-model_classifier.save_model(keras_path)
+manifest = model_classifier.save_model(model_dir=model_dir)
+
+print(f"✓ Model saved to: {os.path.join(model_dir, manifest['artifact'])}")
+print(f"✓ Manifest: {os.path.join(model_dir, 'cifar10_cnn_model.json')} (sha256 {manifest['sha256'][:12]})")
 
-print(f"✓ Model saved to: {h5_path}")
-print(f"✓ Model saved to: {keras_path}")
+# Reference profile for drift monitoring (/api/drift, gates /api/retrain)
+profile = build_reference_profile(data['X_train'], data['y_train'], data['class_names'],
+                                  model=model_classifier.model)
+save_reference_profile(profile, config.REFERENCE_PROFILE_FILE)
+print(f"✓ Drift reference profile: {config.REFERENCE_PROFILE_FILE}")
 
 # Display training results
 print("\n" + "=" * 70)